@@ -0,0 +1,9 @@
+"""
+Load benchmarks of the dataservice API
+
+The benchmarks seed a dataset of a configurable size and drive the Flask
+application through a fixed set of scenarios, recording the latency, number
+of database queries and throughput of each. Run them with `flask bench`.
+"""
+from benchmarks.runner import run_benchmarks, compare_results
+from benchmarks.scenarios import SCENARIOS
@@ -0,0 +1,96 @@
+"""
+Benchmark the encoders of API responses
+
+Pages of genomic files are dumped with their schema once and then encoded
+repeatedly by each encoder, so that only the time spent encoding is measured.
+"""
+import time
+from itertools import cycle, islice
+
+from flask import current_app, json
+
+from dataservice.api.common import encoding
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.genomic_file.schemas import GenomicFileSchema
+from benchmarks.runner import isolated_services, percentile
+from benchmarks.seed import seed_dataset, clear_dataset
+
+PAGE_SIZES = (10, 100, 1000)
+
+
+def _encode_stdlib(data):
+    return (json.dumps(data, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def _encode_orjson(data):
+    # Measure orjson even if the app is configured to use another encoder
+    backend = current_app.config['JSON_ENCODER']
+    current_app.config['JSON_ENCODER'] = 'orjson'
+    try:
+        return encoding.encode_json(data)
+    finally:
+        current_app.config['JSON_ENCODER'] = backend
+
+
+def encoders():
+    """
+    The encoders available in this environment keyed by name
+    """
+    available = {'json': _encode_stdlib}
+    if encoding.orjson is not None:
+        available['orjson'] = _encode_orjson
+    if encoding.msgpack is not None:
+        available['msgpack'] = encoding.encode_msgpack
+    return available
+
+
+def page(results):
+    """
+    Wrap results in the envelope of a paginated response
+    """
+    return {
+        '_status': {'code': 200, 'message': 'success'},
+        '_links': {'self': '/genomic-files', 'next': '/genomic-files?after=0'},
+        'limit': len(results),
+        'total': len(results),
+        'results': results
+    }
+
+
+def run_encoding_benchmarks(size=10, iterations=20, page_sizes=PAGE_SIZES):
+    """
+    Time each encoder on pages of genomic files of several sizes
+
+    :param size: Number of participants in the seeded study, pages larger
+    than the number of seeded files repeat them
+    :param iterations: Number of times each page is encoded by each encoder
+    :param page_sizes: Number of results in each page
+    :returns: A dict of metrics keyed by encoder name and page size
+    """
+    app = current_app._get_current_object()
+    with isolated_services(app):
+        dataset = seed_dataset(size)
+        try:
+            files = (GenomicFile.query
+                     .filter(GenomicFile.kf_id.in_(dataset.genomic_file_ids))
+                     .all())
+            rows = GenomicFileSchema(many=True).dump(files).data
+        finally:
+            clear_dataset(dataset)
+
+    results = {}
+    for name, encode in encoders().items():
+        results[name] = {}
+        for page_size in page_sizes:
+            data = page(list(islice(cycle(rows), page_size)))
+            latencies = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                body = encode(data)
+                latencies.append((time.perf_counter() - start) * 1000)
+            results[name][page_size] = {
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p95_ms': round(percentile(latencies, 95), 3),
+                'bytes': len(body)
+            }
+    return results
@@ -0,0 +1,71 @@
+"""
+Benchmark loading large pages of list endpoints
+
+Each endpoint is requested for a full page of the seeded study with pages
+loaded as rows and as entities, measuring the latency of the requests and the
+peak memory allocated while serving one of them.
+"""
+import time
+import tracemalloc
+
+from flask import current_app
+
+from dataservice.extensions import db
+from benchmarks.runner import isolated_services, percentile
+from benchmarks.seed import seed_dataset, clear_dataset
+
+ENDPOINTS = ('/participants', '/biospecimens')
+
+
+def run_page_benchmarks(size=500, iterations=5, limit=1000,
+                        endpoints=ENDPOINTS):
+    """
+    Time pages of list endpoints loaded as rows and as entities
+
+    :param size: Number of participants in the seeded study
+    :param iterations: Number of times each page is requested in each mode
+    :param limit: Number of results requested per page
+    :param endpoints: The list endpoints to request
+    :returns: A dict of metrics keyed by endpoint and mode
+    """
+    app = current_app._get_current_object()
+    client = app.test_client()
+    page_rows = app.config['PAGE_ROWS']
+    results = {}
+    with isolated_services(app):
+        dataset = seed_dataset(size)
+        db.session.remove()
+        try:
+            for endpoint in endpoints:
+                results[endpoint] = {}
+                for mode, rows in [('entities', False), ('rows', True)]:
+                    app.config['PAGE_ROWS'] = rows
+                    results[endpoint][mode] = _measure(
+                        client, endpoint, iterations,
+                        {'study_id': dataset.study_id, 'limit': limit})
+        finally:
+            app.config['PAGE_ROWS'] = page_rows
+            clear_dataset(dataset)
+    return results
+
+
+def _measure(client, endpoint, iterations, params):
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        resp = client.get(endpoint, query_string=params)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert resp.status_code == 200, resp.data
+        db.session.remove()
+
+    # Tracing allocations slows requests down, so memory is measured apart
+    tracemalloc.start()
+    client.get(endpoint, query_string=params)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.remove()
+    return {
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'peak_memory_kb': peak // 1024,
+        'results': len(resp.json['results'])
+    }
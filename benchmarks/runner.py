@@ -0,0 +1,182 @@
+"""
+Run benchmark scenarios and compare their results against a baseline
+"""
+import time
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy import event
+
+from dataservice.extensions import db, indexd
+from dataservice.util.fake_indexd import FakeIndexd
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.seed import seed_dataset, clear_dataset
+
+# Metrics compared against a baseline and whether a larger value is better
+COMPARED_METRICS = [
+    ('p50_ms', False),
+    ('p95_ms', False),
+    ('p99_ms', False),
+    ('queries_per_request', False),
+    ('indexd_calls_per_request', False),
+    ('requests_per_second', True),
+]
+
+
+def percentile(values, pct):
+    """
+    Compute a percentile by linear interpolation between the closest ranks
+
+    :param values: A non-empty list of numbers
+    :param pct: The percentile, between 0 and 100
+    """
+    values = sorted(values)
+    rank = (len(values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+class QueryCounter(object):
+    """
+    Count the statements executed by the database engine
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _increment(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._increment)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._increment)
+
+
+@contextmanager
+def isolated_services(app, indexd_latency=0):
+    """
+    Replace the services outside of the database while benchmarking
+
+    Indexd is replaced by a FakeIndexd served from this process, and the
+    bucket service and SNS events are turned off.
+
+    :param indexd_latency: Seconds the fake indexd waits before each response
+    :returns: The running FakeIndexd
+    """
+    overrides = {'BUCKET_SERVICE_URL': None, 'SNS_EVENT_ARN': None}
+    saved = {k: app.config.get(k) for k in overrides}
+    indexd_url = indexd.url
+    app.config.update(overrides)
+    try:
+        with FakeIndexd(latency=indexd_latency) as fake:
+            indexd.url = fake.url
+            yield fake
+    finally:
+        app.config.update(saved)
+        indexd.url = indexd_url
+
+
+def run_scenario(scenario, fake_indexd):
+    """
+    Run all operations of a scenario and summarize their measurements
+
+    The session is removed after each operation so that no request benefits
+    from objects loaded by a previous one.
+
+    :param scenario: A benchmarks.scenarios.Scenario
+    :param fake_indexd: The FakeIndexd used by the app
+    :returns: A dict of the scenario's metrics
+    """
+    scenario.setup()
+    db.session.remove()
+
+    latencies = []
+    requests = 0
+    indexd_calls = sum(fake_indexd.calls.values())
+    try:
+        with QueryCounter(db.engine) as counter:
+            for i in range(scenario.iterations):
+                start = time.perf_counter()
+                requests += scenario.operation(i)
+                latencies.append((time.perf_counter() - start) * 1000)
+                db.session.remove()
+            queries = counter.count
+        indexd_calls = sum(fake_indexd.calls.values()) - indexd_calls
+    finally:
+        db.session.rollback()
+        scenario.teardown()
+
+    elapsed = sum(latencies) / 1000
+    return {
+        'operations': len(latencies),
+        'requests': requests,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'queries_per_request': round(queries / requests, 2),
+        'indexd_calls_per_request': round(indexd_calls / requests, 2),
+        'requests_per_second': round(requests / elapsed, 2),
+    }
+
+
+def run_benchmarks(size, iterations, scenarios=None, seed=0, keep=False,
+                   indexd_latency=0):
+    """
+    Seed a dataset and run benchmark scenarios against the current app
+
+    :param size: Number of participants in the seeded study
+    :param iterations: Number of operations run by each scenario
+    :param scenarios: Names of the scenarios to run, defaults to all
+    :param seed: Seed of all random values used by the benchmarks
+    :param keep: Do not remove the seeded data when done
+    :param indexd_latency: Seconds the fake indexd waits before each response
+    :returns: A dict of metrics keyed by scenario name
+    """
+    app = current_app._get_current_object()
+    client = app.test_client()
+    results = {}
+    with isolated_services(app, indexd_latency) as fake_indexd:
+        dataset = seed_dataset(size, seed=seed)
+        try:
+            for name in scenarios or SCENARIOS:
+                scenario = SCENARIOS[name](client, dataset, iterations,
+                                           seed=seed)
+                results[name] = run_scenario(scenario, fake_indexd)
+        finally:
+            db.session.rollback()
+            if not keep:
+                clear_dataset(dataset)
+    return results
+
+
+def compare_results(results, baseline, tolerance=0.2):
+    """
+    Compare benchmark results against a baseline
+
+    :param results: Results returned by run_benchmarks
+    :param baseline: Results of a previous run
+    :param tolerance: Fraction by which a metric may get worse before it is
+    reported as a regression
+    :returns: A list of (scenario, metric, baseline value, value, change)
+    tuples for every metric that regressed
+    """
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old = baseline[name].get(metric)
+            new = metrics.get(metric)
+            # Skip metrics missing from either run or without a base value
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if worse > tolerance:
+                regressions.append((name, metric, old, new, change))
+    return regressions
@@ -0,0 +1,275 @@
+"""
+Benchmark scenarios
+
+A scenario performs one operation per iteration against the Flask test
+client. Most operations are a single request, the bulk scenarios send a
+batch of requests per operation and the concurrent scenario sends requests
+from several threads at once.
+"""
+import json
+import random
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from dataservice.extensions import db
+from dataservice.api.genomic_file.models import GenomicFile
+from benchmarks.seed import ANALYTE_TYPES, seed_study
+
+# Number of requests in an operation of the bulk scenarios
+BULK_SIZE = 25
+# Page size used when paginating
+PAGE_LIMIT = 100
+# Number of requests sent at once by the concurrent scenario
+CONCURRENCY = 8
+
+SCENARIOS = OrderedDict()
+
+
+class BenchmarkError(Exception):
+    """ A request made by a scenario did not succeed """
+
+
+def scenario(name):
+    """
+    Register a Scenario subclass under a name
+    """
+    def register(cls):
+        cls.name = name
+        SCENARIOS[name] = cls
+        return cls
+    return register
+
+
+class Scenario(object):
+    """
+    A fixed workload run against the API
+
+    :param client: A Flask test client
+    :param dataset: The seeded benchmarks.seed.Dataset
+    :param iterations: Number of operations that will be run
+    :param seed: Seed of any random values generated by the scenario
+    """
+    name = None
+
+    def __init__(self, client, dataset, iterations, seed=0):
+        self.client = client
+        self.dataset = dataset
+        self.iterations = iterations
+        self.rng = random.Random(seed)
+
+    def setup(self):
+        """
+        Prepare the scenario, this is not timed
+        """
+
+    def teardown(self):
+        """
+        Remove any data created by the scenario outside of the dataset
+        """
+
+    def operation(self, i):
+        """
+        Run the i'th operation of the scenario
+
+        :returns: Number of requests made
+        """
+        raise NotImplementedError
+
+    def request(self, method, url, body=None, expected=200, client=None):
+        """
+        Make a request to the API
+
+        :param client: Test client to send the request with, defaults to the
+        scenario's client
+        :raises BenchmarkError: If the response status is not `expected`
+        :returns: The decoded response body
+        """
+        response = (client or self.client).open(
+            url, method=method,
+            data=json.dumps(body) if body is not None else None,
+            headers={'Accept': 'application/json',
+                     'Content-Type': 'application/json'})
+        if response.status_code != expected:
+            raise BenchmarkError('{} {} returned {}: {}'.format(
+                method, url, response.status_code,
+                response.data.decode('utf-8')))
+        return json.loads(response.data.decode('utf-8'))
+
+
+@scenario('genomic_file_pages')
+class GenomicFilePages(Scenario):
+    """
+    Deep pagination of a study's genomic files
+
+    All pages of /genomic-files?study_id= are found during setup and
+    operations request them in turn, so late pages are measured as often as
+    early ones.
+    """
+
+    def setup(self):
+        url = '/genomic-files?study_id={}&limit={}'.format(
+            self.dataset.study_id, PAGE_LIMIT)
+        self.pages = []
+        while url:
+            self.pages.append(url)
+            url = self.request('GET', url)['_links'].get('next')
+
+    def operation(self, i):
+        self.request('GET', self.pages[i % len(self.pages)])
+        return 1
+
+
+@scenario('genomic_file_concurrent')
+class GenomicFileConcurrent(Scenario):
+    """
+    Pages of a study's genomic files requested from several threads at once
+
+    Each operation sends CONCURRENCY requests from separate threads, as they
+    would be served by a threaded worker. Every file on a page is merged
+    from indexd, so with --indexd-latency the requests per second show how
+    much of the time waiting on indexd overlaps.
+    """
+    limit = 10
+
+    def setup(self):
+        self.executor = ThreadPoolExecutor(CONCURRENCY)
+        self.url = '/genomic-files?study_id={}&limit={}'.format(
+            self.dataset.study_id, self.limit)
+
+    def teardown(self):
+        self.executor.shutdown()
+
+    def operation(self, i):
+        app = self.client.application
+        list(self.executor.map(
+            lambda _: self.request('GET', self.url, client=app.test_client()),
+            range(CONCURRENCY)))
+        return CONCURRENCY
+
+
+@scenario('biospecimen_filter')
+class BiospecimenFilter(Scenario):
+    """
+    First page of a study's biospecimens filtered by analyte type
+    """
+
+    def operation(self, i):
+        self.request('GET', '/biospecimens?study_id={}&analyte_type={}'
+                     '&limit={}'.format(self.dataset.study_id,
+                                        ANALYTE_TYPES[i % len(ANALYTE_TYPES)],
+                                        PAGE_LIMIT))
+        return 1
+
+
+@scenario('detail_get')
+class DetailGet(Scenario):
+    """
+    Get participants, biospecimens and genomic files by kf_id
+    """
+
+    def setup(self):
+        self.urls = [
+            '{}/{}'.format(endpoint, self.rng.choice(kf_ids))
+            for endpoint, kf_ids in [
+                ('/participants', self.dataset.participant_ids),
+                ('/biospecimens', self.dataset.biospecimen_ids),
+                ('/genomic-files', self.dataset.genomic_file_ids),
+            ]
+        ]
+
+    def operation(self, i):
+        self.request('GET', self.urls[i % len(self.urls)])
+        return 1
+
+
+@scenario('participant_post')
+class ParticipantPost(Scenario):
+    """
+    Create a single participant
+    """
+
+    def operation(self, i):
+        self.request('POST', '/participants', {
+            'external_id': 'benchmark-post-{}'.format(i),
+            'is_proband': i % 2 == 0,
+            'study_id': self.dataset.study_id
+        }, expected=201)
+        return 1
+
+
+@scenario('participant_patch')
+class ParticipantPatch(Scenario):
+    """
+    Update a single participant
+    """
+
+    def operation(self, i):
+        kf_id = self.dataset.participant_ids[
+            i % len(self.dataset.participant_ids)]
+        self.request('PATCH', '/participants/{}'.format(kf_id),
+                     {'external_id': 'benchmark-patch-{}'.format(i)})
+        return 1
+
+
+@scenario('biospecimen_bulk_post')
+class BiospecimenBulkPost(Scenario):
+    """
+    Create a batch of biospecimens, one request each
+    """
+
+    def operation(self, i):
+        for j in range(BULK_SIZE):
+            self.request('POST', '/biospecimens', {
+                'external_sample_id': 'benchmark-post-{}-{}'.format(i, j),
+                'analyte_type': self.rng.choice(ANALYTE_TYPES),
+                'participant_id': self.rng.choice(
+                    self.dataset.participant_ids),
+                'sequencing_center_id': self.dataset.sequencing_center_id
+            }, expected=201)
+        return BULK_SIZE
+
+
+@scenario('biospecimen_bulk_patch')
+class BiospecimenBulkPatch(Scenario):
+    """
+    Update a batch of biospecimens, one request each
+    """
+
+    def operation(self, i):
+        ids = self.dataset.biospecimen_ids
+        for j in range(BULK_SIZE):
+            kf_id = ids[(i * BULK_SIZE + j) % len(ids)]
+            self.request('PATCH', '/biospecimens/{}'.format(kf_id),
+                         {'volume_ul': float(i)})
+        return BULK_SIZE
+
+
+@scenario('study_delete')
+class StudyDelete(Scenario):
+    """
+    Delete a study along with its participants and biospecimens
+
+    A study of a tenth of the dataset's size is seeded for every iteration.
+    Genomic files are not deleted with a study and are removed on teardown.
+    """
+
+    def setup(self):
+        size = max(1, len(self.dataset.participant_ids) // 10)
+        studies = [
+            seed_study(self.rng, self.dataset.sequencing_center_id, size,
+                       'benchmark-delete-{}'.format(i))
+            for i in range(self.iterations)
+        ]
+        self.study_ids = [s.study_id for s in studies]
+        self.genomic_file_ids = [kf_id for s in studies
+                                 for kf_id in s.genomic_file_ids]
+
+    def teardown(self):
+        (GenomicFile.query
+         .filter(GenomicFile.kf_id.in_(self.genomic_file_ids))
+         .delete(synchronize_session=False))
+        db.session.commit()
+
+    def operation(self, i):
+        self.request('DELETE', '/studies/{}'.format(self.study_ids[i]))
+        return 1
@@ -0,0 +1,126 @@
+"""
+Seed the database with a dataset for the benchmarks
+"""
+import random
+from collections import namedtuple
+
+from dataservice.extensions import db
+from dataservice.api.study.models import Study
+from dataservice.api.participant.models import Participant
+from dataservice.api.biospecimen.models import Biospecimen
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.biospecimen_genomic_file.models import (
+    BiospecimenGenomicFile
+)
+from dataservice.api.sequencing_center.models import SequencingCenter
+
+ANALYTE_TYPES = ['DNA', 'RNA', 'Other']
+DATA_TYPES = ['Aligned Reads', 'Unaligned Reads', 'Variant Calls']
+BIOSPECIMENS_PER_PARTICIPANT = 2
+FILES_PER_BIOSPECIMEN = 2
+
+Dataset = namedtuple('Dataset', ['sequencing_center_id', 'study_id',
+                                 'participant_ids', 'biospecimen_ids',
+                                 'genomic_file_ids'])
+
+
+def seed_dataset(size, seed=0):
+    """
+    Create a study with `size` participants along with their biospecimens
+    and genomic files
+
+    Every participant has two biospecimens, each with two genomic files. Field
+    values are drawn from a generator seeded with `seed` so that the same
+    arguments always produce the same dataset.
+
+    :param size: Number of participants in the study
+    :param seed: Seed of the random values in the dataset
+    :returns: A Dataset with the kf_ids of the created entities
+    """
+    rng = random.Random(seed)
+    sc = SequencingCenter(name='Benchmark Sequencing Center {}'.format(seed))
+    db.session.add(sc)
+    db.session.flush()
+    return seed_study(rng, sc.kf_id, size, 'benchmark')
+
+
+def seed_study(rng, sequencing_center_id, size, external_id):
+    """
+    Create a single study of `size` participants and commit it
+
+    :param rng: A random.Random used to generate field values
+    :param sequencing_center_id: kf_id of the biospecimens' sequencing center
+    :param size: Number of participants in the study
+    :param external_id: External id of the study
+    :returns: A Dataset with the kf_ids of the created entities
+    """
+    study = Study(external_id=external_id)
+    biospecimens = []
+    genomic_files = []
+    for i in range(size):
+        p = Participant(external_id='{}-PT-{}'.format(external_id, i),
+                        is_proband=rng.random() < 0.5,
+                        gender=rng.choice(['Male', 'Female']))
+        study.participants.append(p)
+        for j in range(BIOSPECIMENS_PER_PARTICIPANT):
+            bs = Biospecimen(
+                external_sample_id='{}-BS-{}-{}'.format(external_id, i, j),
+                analyte_type=rng.choice(ANALYTE_TYPES),
+                sequencing_center_id=sequencing_center_id,
+                participant=p)
+            biospecimens.append(bs)
+            for k in range(FILES_PER_BIOSPECIMEN):
+                name = '{}-GF-{}-{}-{}'.format(external_id, i, j, k)
+                gf = GenomicFile(
+                    external_id=name,
+                    file_name='{}.cram'.format(name),
+                    data_type=rng.choice(DATA_TYPES),
+                    urls=['s3://benchmark/{}.cram'.format(name)],
+                    hashes={'md5': '{:032x}'.format(rng.getrandbits(128))},
+                    size=rng.randint(1, 2 ** 36))
+                db.session.add(BiospecimenGenomicFile(biospecimen=bs,
+                                                      genomic_file=gf))
+                genomic_files.append(gf)
+    db.session.add(study)
+    db.session.commit()
+
+    return Dataset(sequencing_center_id=sequencing_center_id,
+                   study_id=study.kf_id,
+                   participant_ids=[p.kf_id for p in study.participants],
+                   biospecimen_ids=[bs.kf_id for bs in biospecimens],
+                   genomic_file_ids=[gf.kf_id for gf in genomic_files])
+
+
+def clear_dataset(dataset):
+    """
+    Remove a dataset created by seed_dataset and any studies created in its
+    sequencing center
+
+    Studies are deleted through the ORM so that their participants and
+    biospecimens are removed with them. Genomic files are not owned by a study
+    and are removed afterwards.
+    """
+    studies = (Study.query
+               .join(Study.participants)
+               .join(Participant.biospecimens)
+               .filter(Biospecimen.sequencing_center_id ==
+                       dataset.sequencing_center_id)
+               .distinct()
+               .all())
+    file_ids = (db.session.query(BiospecimenGenomicFile.genomic_file_id)
+                .join(Biospecimen)
+                .filter(Biospecimen.sequencing_center_id ==
+                        dataset.sequencing_center_id)
+                .subquery())
+    orphans = [kf_id for kf_id, in db.session.query(file_ids)]
+    for study in studies:
+        db.session.delete(study)
+    db.session.flush()
+
+    (GenomicFile.query
+     .filter(GenomicFile.kf_id.in_(orphans))
+     .delete(synchronize_session=False))
+    (SequencingCenter.query
+     .filter_by(kf_id=dataset.sequencing_center_id)
+     .delete(synchronize_session=False))
+    db.session.commit()
@@ -0,0 +1,83 @@
+"""
+Profile the start up of the dataservice app
+
+Each step of `create_app` is timed, along with importing the package. Start
+up must be profiled in a new process, so that nothing has been imported or
+created yet. The script is run directly rather than as a module of the
+benchmarks package, which imports the app:
+
+    python benchmarks/startup.py --config production
+
+which prints the profile as JSON.
+"""
+import argparse
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from functools import wraps
+
+# Steps of create_app that are timed
+STEPS = [
+    'register_extensions',
+    'register_shellcontext',
+    'register_commands',
+    'register_error_handlers',
+    'register_blueprints',
+    'prefetch_status',
+    'register_spec',
+]
+
+
+def profile_startup(config_name):
+    """
+    Import the package, create an app and serve its first /swagger request
+
+    :param config_name: The config to create the app with
+    :returns: A dict of milliseconds spent in each step, the total, and the
+    memory allocated while starting up
+    """
+    timings = OrderedDict()
+
+    def timed(name, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[name] = round((time.perf_counter() - start) * 1000,
+                                      3)
+        return wrapper
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    timed('import', __import__)('dataservice')
+    dataservice = sys.modules['dataservice']
+    for name in STEPS:
+        setattr(dataservice, name, timed(name, getattr(dataservice, name)))
+    app = timed('create_app', dataservice.create_app)(config_name)
+    boot_ms = round((time.perf_counter() - start) * 1000, 3)
+    boot_memory, _ = tracemalloc.get_traced_memory()
+
+    client = app.test_client()
+    timed('first_swagger', client.get)('/swagger')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'steps_ms': timings,
+        'boot_ms': boot_ms,
+        'boot_memory_kb': boot_memory // 1024,
+        'peak_memory_kb': peak // 1024,
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--config', default='default')
+    args = parser.parse_args()
+    print(json.dumps(profile_startup(args.config)))
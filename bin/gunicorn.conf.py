@@ -0,0 +1,33 @@
+"""
+Gunicorn settings for the dataservice
+
+Most of the time spent serving file endpoints is spent waiting on indexd, so
+by default each worker serves several requests at once. The worker class is
+chosen with GUNICORN_WORKER_CLASS:
+
+- gthread: each worker serves GUNICORN_THREADS requests at once in threads
+- sync: each worker serves one request at a time
+
+Every request being served may hold a database connection, so the size of
+the connection pool of each worker follows its concurrency, up to
+MAX_POOL_SIZE, unless SQLALCHEMY_POOL_SIZE is set.
+"""
+import os
+
+# Largest connection pool given to a worker by default
+MAX_POOL_SIZE = 20
+
+bind = os.environ.get('GUNICORN_BIND', 'localhost:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 3))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+if worker_class == 'gthread':
+    concurrency = threads
+else:
+    concurrency = 1
+
+os.environ.setdefault('SQLALCHEMY_POOL_SIZE',
+                      str(min(concurrency, MAX_POOL_SIZE)))
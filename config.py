@@ -16,19 +16,114 @@ class Config:
     SQLALCHEMY_DATABASE_URI = 'postgres://{}:{}@{}:{}/{}'.format(
         PG_USER, PG_PASS, PG_HOST, PG_PORT, PG_NAME)
 
+    # An optional read replica of the database that serves GET requests
+    PG_REPLICA_HOST = os.environ.get('PG_REPLICA_HOST', None)
+    PG_REPLICA_PORT = os.environ.get('PG_REPLICA_PORT', PG_PORT)
+    SQLALCHEMY_REPLICA_URI = None
+    if PG_REPLICA_HOST:
+        SQLALCHEMY_REPLICA_URI = 'postgres://{}:{}@{}:{}/{}'.format(
+            PG_USER, PG_PASS, PG_REPLICA_HOST, PG_REPLICA_PORT, PG_NAME)
+    # Seconds the replica may be behind before the primary serves reads
+    REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 10))
+    # Seconds between checks of the replica's lag
+    REPLICA_CHECK_INTERVAL = float(os.environ.get('REPLICA_CHECK_INTERVAL',
+                                                  5))
+    # Seconds after a write during which the same client reads from the
+    # primary, so that it sees its own writes
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS',
+                                                15))
+
+    # Database connections kept open by each process, bin/gunicorn.conf.py
+    # sets this to the number of requests a worker serves at once
+    SQLALCHEMY_POOL_SIZE = int(os.environ.get('SQLALCHEMY_POOL_SIZE', 5))
+    # Connections that may be opened beyond the pool size when it is busy
+    SQLALCHEMY_MAX_OVERFLOW = int(os.environ.get('SQLALCHEMY_MAX_OVERFLOW',
+                                                 10))
+    # Seconds to wait for a connection from the pool
+    SQLALCHEMY_POOL_TIMEOUT = int(os.environ.get('SQLALCHEMY_POOL_TIMEOUT',
+                                                 30))
+    # Seconds after which a connection is replaced, -1 to keep them open
+    SQLALCHEMY_POOL_RECYCLE = int(os.environ.get('SQLALCHEMY_POOL_RECYCLE',
+                                                 1800))
+    # Test connections before they are used
+    SQLALCHEMY_POOL_PRE_PING = os.environ.get(
+        'SQLALCHEMY_POOL_PRE_PING', 'true') == 'true'
+    # Set to pgbouncer when connecting through a PgBouncer in transaction
+    # mode so that connections are not also pooled by each process
+    SQLALCHEMY_POOL_PROFILE = os.environ.get('SQLALCHEMY_POOL_PROFILE',
+                                             'default')
+
+    # Milliseconds a statement may run for, by the kind of request
+    STATEMENT_TIMEOUTS = {
+        # GET requests for a single entity
+        'detail': int(os.environ.get('STATEMENT_TIMEOUT_DETAIL', 5000)),
+        'default': int(os.environ.get('STATEMENT_TIMEOUT_DEFAULT', 30000)),
+        # Endpoints that change or export many entities at once
+        'bulk': int(os.environ.get('STATEMENT_TIMEOUT_BULK', 300000)),
+    }
+
+    # Backend that encodes JSON responses, orjson or json
+    JSON_ENCODER = os.environ.get('JSON_ENCODER', 'orjson')
+
+    # A swagger spec written by `flask build-spec`, served instead of
+    # building the spec in each process
+    SWAGGER_SPEC_PATH = os.environ.get('SWAGGER_SPEC_PATH', None)
+    # Create the swagger spec when it is first used rather than on start up
+    LAZY_SPEC = os.environ.get('LAZY_SPEC', 'true') == 'true'
+    # Git and package metadata written by `flask build-metadata`, loaded
+    # instead of calling git on start up
+    BUILD_METADATA_PATH = os.environ.get('BUILD_METADATA_PATH', None)
+
+    # Dump lists with serializers compiled from each schema's fields
+    COMPILED_SERIALIZERS = os.environ.get('COMPILED_SERIALIZERS',
+                                          'true') == 'true'
+
+    # Load list pages as rows of columns rather than model instances when
+    # their schemas only dump columns
+    PAGE_ROWS = os.environ.get('PAGE_ROWS', 'true') == 'true'
+
     # Default number of results per request
     DEFAULT_PAGE_LIMIT = 100
     # Determines the maximum number of results per request
     MAX_PAGE_LIMIT = 1000
 
+    # Seconds a change is held back from change feeds, so that changes are
+    # not returned after changes that were committed after them
+    CHANGE_FEED_DELAY = int(os.environ.get('CHANGE_FEED_DELAY', 30))
+    # Days that records of deleted entities are kept for
+    TOMBSTONE_RETENTION_DAYS = int(os.environ.get('TOMBSTONE_RETENTION_DAYS',
+                                                  90))
+
+    # Seconds a worker waits between checks of an empty job queue
+    JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 5))
+    # Seconds after the last heartbeat of a running job that it is claimed
+    # by another worker, as its worker is presumed dead
+    JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', 300))
+    # Seconds before the first retry of a failed job, doubled for each
+    # further attempt
+    JOB_RETRY_DELAY = float(os.environ.get('JOB_RETRY_DELAY', 30))
+
+    # Number of kf_ids each process allocates from the database at once
+    KF_ID_BLOCK_SIZE = int(os.environ.get('KF_ID_BLOCK_SIZE', 1000))
+    # Maximum number of kf_ids that may be reserved per request
+    MAX_KF_ID_RESERVATION = 10000
+
     INDEXD_URL = os.environ.get('INDEXD_URL', None)
     INDEXD_USER = os.environ.get('INDEXD_USER', 'test')
     INDEXD_PASS = os.environ.get('INDEXD_PASS', 'test')
+    # Reuse connections to indexd across the requests served by a thread
+    INDEXD_KEEP_ALIVE = os.environ.get('INDEXD_KEEP_ALIVE', 'true') == 'true'
 
     GEN3_URL = os.environ.get('GEN3_URL', 'gen3')
 
     BUCKET_SERVICE_URL = os.environ.get('BUCKET_SERVICE_URL', None)
     BUCKET_SERVICE_TOKEN = os.environ.get('BUCKET_SERVICE_TOKEN', None)
+    # Seconds to wait on the bucket service before a bucket job fails, and
+    # number of times the bucket of a new study is attempted
+    BUCKET_SERVICE_TIMEOUT = float(
+        os.environ.get('BUCKET_SERVICE_TIMEOUT', 10))
+    BUCKET_SERVICE_MAX_ATTEMPTS = int(
+        os.environ.get('BUCKET_SERVICE_MAX_ATTEMPTS', 5))
     SNS_EVENT_ARN = os.environ.get('SNS_EVENT_ARN', None)
 
     @staticmethod
@@ -50,9 +145,14 @@ class TestingConfig(Config):
     SQLALCHEMY_TRACK_MODIFICATIONS = True
 
     INDEXD_URL = os.environ.get('INDEXD_URL', '')
+    # Tests replace the indexd client's requests module, so sessions
+    # must not outlive a request
+    INDEXD_KEEP_ALIVE = False
     BUCKET_SERVICE_URL = os.environ.get('BUCKET_SERVICE_URL', '')
     BUCKET_SERVICE_TOKEN = 'test123'
 
+    CHANGE_FEED_DELAY = 0
+
     MODEL_VERSION = '0.1.0'
     MIGRATION = 'aaaaaaaaaaaa'
     SNS_EVENT_ARN = None
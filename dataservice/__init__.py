@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 """The app module, containing the app factory function."""
+import json
 import logging
+import os
 import re
 import requests
 import subprocess
+import threading
 from flask import Flask
 from alembic.config import Config
 from alembic import command
@@ -13,6 +16,7 @@ from dataservice.utils import _get_version
 from dataservice.extensions import db, ma, indexd, migrate
 from dataservice.api.investigator.models import Investigator
 from dataservice.api.study.models import Study
+from dataservice.api.study_summary.models import StudySummary
 from dataservice.api.participant.models import Participant
 from dataservice.api.family.models import Family
 from dataservice.api.family_relationship.models import FamilyRelationship
@@ -38,7 +42,10 @@ from dataservice.api.cavatica_app.models import CavaticaApp
 from dataservice.api.study_file.models import StudyFile
 from config import config
 
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+# Guards the creation of an app's spec on first use
+_spec_lock = threading.Lock()
 
 
 def create_app(config_name):
@@ -56,8 +63,8 @@ def create_app(config_name):
     register_commands(app)
     register_error_handlers(app)
     register_blueprints(app)
-    register_spec(app)
     prefetch_status(app)
+    register_spec(app)
 
     if not (app.config['TESTING']):
         import logging
@@ -69,13 +76,36 @@ def create_app(config_name):
 
 def register_spec(app):
     """
-    Creates an API spec and puts it on the app
+    Puts the API spec on the app
+
+    Creating the spec parses the docstrings of every view, which takes a
+    large part of the app's start up. Unless LAZY_SPEC is off, the spec is
+    created on first use by `get_spec` instead.
+    """
+    app.spec = None
+    if not app.config['LAZY_SPEC']:
+        get_spec(app)
+
+
+def get_spec(app):
+    """
+    Get the API spec of an app, creating it on first use
+    """
+    with _spec_lock:
+        if app.spec is None:
+            app.spec = create_spec(app)
+    return app.spec
+
+
+def create_spec(app):
+    """
+    Creates an API spec of the app's views
     """
     from apispec import APISpec
 
     spec = APISpec(
         title='Kids First Data Service',
-        version=_get_version(),
+        version=app.config['PKG_VERSION'],
         plugins=[
             'apispec.ext.flask',
             'apispec.ext.marshmallow',
@@ -94,7 +124,7 @@ def register_spec(app):
         for view in views:
             spec.add_path(view=view)
 
-    app.spec = spec
+    return spec
 
 
 def register_shellcontext(app):
@@ -117,6 +147,18 @@ def register_commands(app):
     app.cli.add_command(commands.erd)
     app.cli.add_command(commands.populate_db)
     app.cli.add_command(commands.clear_db)
+    app.cli.add_command(commands.refresh_summaries)
+    app.cli.add_command(commands.worker)
+    app.cli.add_command(commands.add_aliases)
+    app.cli.add_command(commands.compact_tombstones)
+    app.cli.add_command(commands.backfill_study_ids)
+    app.cli.add_command(commands.check_study_ids)
+    app.cli.add_command(commands.bench)
+    app.cli.add_command(commands.bench_encoding)
+    app.cli.add_command(commands.bench_pages)
+    app.cli.add_command(commands.build_spec)
+    app.cli.add_command(commands.build_metadata)
+    app.cli.add_command(commands.profile_startup)
 
 
 def register_extensions(app):
@@ -142,6 +184,8 @@ def register_error_handlers(app):
     from dataservice.api import errors
     # Database integrity error
     app.register_error_handler(IntegrityError, errors.integrity_error)
+    # Database statement timeouts
+    app.register_error_handler(OperationalError, errors.operational_error)
 
     # Database validation errors
     app.register_error_handler(errors.DatabaseValidationError,
@@ -159,22 +203,45 @@ def register_blueprints(app):
 
 def prefetch_status(app):
     """
-    Pre-computes the status response by making system calls to get git branch
-    info and python package version
+    Pre-computes the status response
+
+    The build metadata is loaded from the file written by
+    `flask build-metadata` at BUILD_METADATA_PATH if there is one. Otherwise
+    it is found with system calls to get git branch info and python package
+    version.
 
     This saves the api from having to make a system level call during a request
     """
-    app.config['GIT_COMMIT'] = (subprocess.check_output(
-                                ['git', 'rev-parse', '--short', 'HEAD'])
-                                .decode("utf-8").strip())
+    path = app.config.get('BUILD_METADATA_PATH')
+    if path and os.path.exists(path):
+        with open(path) as f:
+            app.config.update(json.load(f))
+    else:
+        app.config.update(build_metadata())
+
+
+def build_metadata():
+    """
+    Get the git commit, branch and tags of the working tree and the version
+    of the package
+
+    :returns: A dict of the GIT_COMMIT, GIT_BRANCH, GIT_TAGS and PKG_VERSION
+    configs
+    """
+    commit = (subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'])
+              .decode("utf-8").strip())
 
-    app.config['GIT_BRANCH'] = (subprocess.check_output(
-                                ['git', 'rev-parse', '--abbrev-ref', 'HEAD'])
-                                .decode("utf-8").strip())
+    branch = (subprocess.check_output(
+              ['git', 'rev-parse', '--abbrev-ref', 'HEAD'])
+              .decode("utf-8").strip())
 
     tags = (subprocess.check_output(
             ['git', 'tag', '-l', '--points-at', 'HEAD'])
             .decode('utf-8').split('\n'))
 
-    app.config['GIT_TAGS'] = [] if tags[0] == '' else tags
-    app.config['PKG_VERSION'] = _get_version()
+    return {
+        'GIT_COMMIT': commit,
+        'GIT_BRANCH': branch,
+        'GIT_TAGS': [] if tags[0] == '' else tags,
+        'PKG_VERSION': _get_version()
+    }
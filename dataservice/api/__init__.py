@@ -6,10 +6,14 @@ from dataservice.api.common.views import CRUDView
 
 from dataservice.api.study import StudyAPI
 from dataservice.api.study import StudyListAPI
+from dataservice.api.study import StudyVisibilityAPI
+from dataservice.api.study_summary import StudySummaryAPI
 from dataservice.api.investigator import InvestigatorAPI
 from dataservice.api.investigator import InvestigatorListAPI
 from dataservice.api.participant import ParticipantAPI
 from dataservice.api.participant import ParticipantListAPI
+from dataservice.api.participant import ParticipantAliasesAPI
+from dataservice.api.participant import ParticipantVisibilityAPI
 from dataservice.api.family import FamilyAPI
 from dataservice.api.family import FamilyListAPI
 from dataservice.api.cavatica_app import CavaticaAppAPI
@@ -22,12 +26,16 @@ from dataservice.api.task_genomic_file import (
 )
 from dataservice.api.family_relationship import FamilyRelationshipAPI
 from dataservice.api.family_relationship import FamilyRelationshipListAPI
+from dataservice.api.family_relationship import FamilyPedigreeAPI
+from dataservice.api.family_relationship import ParticipantPedigreeAPI
 from dataservice.api.sample import SampleAPI
 from dataservice.api.sample import SampleListAPI
 from dataservice.api.sample_relationship import SampleRelationshipAPI
 from dataservice.api.sample_relationship import SampleRelationshipListAPI
+from dataservice.api.sample_relationship import SampleLineageAPI
 from dataservice.api.biospecimen import BiospecimenAPI
 from dataservice.api.biospecimen import BiospecimenListAPI
+from dataservice.api.biospecimen import BiospecimenVisibilityAPI
 from dataservice.api.diagnosis import DiagnosisAPI
 from dataservice.api.diagnosis import DiagnosisListAPI
 from dataservice.api.outcome import OutcomeAPI
@@ -60,6 +68,10 @@ from dataservice.api.biospecimen_diagnosis import (
     BiospecimenDiagnosisAPI,
     BiospecimenDiagnosisListAPI
 )
+from dataservice.api.kf_id import KfIdReservationAPI
+from dataservice.api.changes import ChangeListAPI, StudyChangeListAPI
+from dataservice.api.tombstone import DeletionListAPI
+from dataservice.api.job import JobAPI, JobListAPI
 
 from dataservice.api.study.models import Study
 
@@ -81,3 +93,5 @@ api.add_url_rule('/status', view_func=status_view, methods=['GET'])
 
 # All CRUD resources
 views = CRUDView.register_views(api)
+# Change feeds of each collection
+views += ChangeListAPI.register_feeds(api)
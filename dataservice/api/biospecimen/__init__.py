@@ -1,2 +1,3 @@
 from dataservice.api.biospecimen.resources import BiospecimenAPI
 from dataservice.api.biospecimen.resources import BiospecimenListAPI
+from dataservice.api.biospecimen.resources import BiospecimenVisibilityAPI
@@ -1,14 +1,15 @@
 from dataservice.extensions import db
-from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.model import Base, KfId, validate_flush_batch
+from dataservice.api.common.study_scope import StudyScopedMixin
 from dataservice.api.biospecimen_genomic_file.models import (
     BiospecimenGenomicFile)
 from dataservice.api.diagnosis.models import Diagnosis
 from sqlalchemy.ext.associationproxy import association_proxy
-from sqlalchemy import event
+from sqlalchemy import event, select, union_all
 from sqlalchemy.dialects.postgresql import ARRAY
 
 
-class Biospecimen(db.Model, Base):
+class Biospecimen(db.Model, Base, StudyScopedMixin):
     """
     Biospecimen entity.
     :param kf_id: Unique id given by the Kid's First DCC
@@ -59,6 +60,9 @@ class Biospecimen(db.Model, Base):
 
     __tablename__ = 'biospecimen'
     __prefix__ = 'BS'
+    # Lets duo_ids filters use the array operators @>, && and =
+    __table_args__ = (db.Index('ix_biospecimen_duo_ids', 'duo_ids',
+                               postgresql_using='gin'),)
 
     external_sample_id = db.Column(db.Text(),
                                    doc='Name given to sample by contributor')
@@ -168,7 +172,7 @@ class Biospecimen(db.Model, Base):
     )
 
 
-class BiospecimenDiagnosis(db.Model, Base):
+class BiospecimenDiagnosis(db.Model, Base, StudyScopedMixin):
     """
     Represents association table between biospecimen table and
     diagnosis table. Contains all biospecimen, diagnosis combiniations.
@@ -178,6 +182,7 @@ class BiospecimenDiagnosis(db.Model, Base):
     """
     __tablename__ = 'biospecimen_diagnosis'
     __prefix__ = 'BD'
+    __study_parent__ = ('biospecimen_id', 'biospecimen.kf_id')
     __table_args__ = (db.UniqueConstraint('diagnosis_id',
                                           'biospecimen_id'),)
     diagnosis_id = db.Column(KfId(),
@@ -198,43 +203,62 @@ class BiospecimenDiagnosis(db.Model, Base):
         cascade='all, delete-orphan'))
 
 
-def validate_diagnosis_biospecimen(target):
+def validate_diagnosis_biospecimens(connection, targets):
     """
-    Ensure that both the diagnosis and biospecimen
-    have the same participant
+    Ensure that both the diagnosis and biospecimen of each
+    biospecimen_diagnosis have the same participant
     If this is not the case then raise DatabaseValidationError
+
+    The participants of all of the biospecimens and diagnoses are fetched
+    in a single query
+
+    :param connection: connection to query with
+    :param targets: the biospecimen_diagnoses being validated
     """
     from dataservice.api.errors import DatabaseValidationError
-    # Return if biospecimen_diagnosis is None
-    if not target:
+
+    # Skip links that are missing a biospecimen or diagnosis and let the
+    # ORM handle them
+    targets = [t for t in targets
+               if t and t.biospecimen_id and t.diagnosis_id]
+    if not targets:
         return
 
-    # Get biospecimen and diagnosis by id
-    bsp = None
-    ds = None
-    if target.biospecimen_id and target.diagnosis_id:
-        bsp = Biospecimen.query.get(target.biospecimen_id)
-        ds = Diagnosis.query.get(target.diagnosis_id)
+    # Get participants of biospecimens and diagnoses by id
+    bs = Biospecimen.__table__
+    dg = Diagnosis.__table__
+    q = union_all(
+        select([bs.c.kf_id, bs.c.participant_id])
+        .where(bs.c.kf_id.in_({t.biospecimen_id for t in targets})),
+        select([dg.c.kf_id, dg.c.participant_id])
+        .where(dg.c.kf_id.in_({t.diagnosis_id for t in targets})))
+    participants = dict(connection.execute(q).fetchall())
 
-    # If biospecimen and diagnosis doesn't exist, return and
-    # let ORM handle non-existent foreign key
-    if bsp is None or ds is None:
-        return
+    messages = []
+    for target in targets:
+        # If biospecimen and diagnosis doesn't exist, skip and
+        # let ORM handle non-existent foreign key
+        if (target.biospecimen_id not in participants or
+                target.diagnosis_id not in participants):
+            continue
+
+        # Check if this diagnosis and biospecimen refer to same participant
+        ds_participant_id = participants[target.diagnosis_id]
+        bsp_participant_id = participants[target.biospecimen_id]
+        if ds_participant_id != bsp_participant_id:
+            messages.append(
+                ('a diagnosis cannot be linked with a biospecimen if they '
+                 'refer to different participants. diagnosis {} '
+                 'refers to participant {} and '
+                 'biospecimen {} refers to participant {}')
+                .format(target.diagnosis_id,
+                        ds_participant_id,
+                        target.biospecimen_id,
+                        bsp_participant_id))
 
-    # Check if this diagnosis and biospecimen refer to same participant
-    if ds.participant_id != bsp.participant_id:
-        operation = 'modify'
-        target_entity = BiospecimenDiagnosis.__tablename__
-        message = (
-            ('a diagnosis cannot be linked with a biospecimen if they '
-             'refer to different participants. diagnosis {} '
-             'refers to participant {} and '
-             'biospecimen {} refers to participant {}')
-            .format(ds.kf_id,
-                    ds.participant_id,
-                    bsp.kf_id,
-                    bsp.participant_id))
-        raise DatabaseValidationError(target_entity, operation, message)
+    if messages:
+        raise DatabaseValidationError(BiospecimenDiagnosis.__tablename__,
+                                      'modify', '; '.join(messages))
 
 
 @event.listens_for(BiospecimenDiagnosis, 'before_insert')
@@ -243,4 +267,4 @@ def biospecimen_or_diagnosis_on_insert(mapper, connection, target):
     """
     Run preprocessing/validation of diagnosis before insert
     """
-    validate_diagnosis_biospecimen(target)
+    validate_flush_batch(connection, target, validate_diagnosis_biospecimens)
@@ -14,7 +14,12 @@ from dataservice.api.biospecimen.schemas import (
     BiospecimenFilterSchema
 )
 from dataservice.api.common.views import CRUDView
-from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.schemas import (
+    filter_schema_factory,
+    VisibilitySchema
+)
+from dataservice.api.common.filters import apply_filters
+from dataservice.api.common.visibility import visibility_response
 
 
 class BiospecimenListAPI(CRUDView):
@@ -45,26 +50,12 @@ class BiospecimenListAPI(CRUDView):
         diagnosis_id = filter_params.pop('diagnosis_id', None)
         genomic_file_id = filter_params.pop('genomic_file_id', None)
 
-        # Get and remove any list type filter params that need to be
-        # handled differently than others
-        duo_ids = filter_params.pop('duo_ids', None)
-
         # Apply filter params
-        q = (Biospecimen.query
-             .filter_by(**filter_params))
-
-        # Apply duo_ids filter
-        # Get specimens whose duo ids list includes all values in duo_ids
-        if duo_ids:
-            duo_ids = [id_.strip() for id_ in duo_ids[0].split(',')]
-            q = q.filter(Biospecimen.duo_ids.contains(duo_ids))
+        q = apply_filters(Biospecimen.query, Biospecimen, filter_params)
 
         # Apply study_id filter and diagnosis_id filter
-        from dataservice.api.participant.models import Participant
-
         if study_id:
-            q = (q.join(Participant.biospecimens)
-                 .filter(Participant.study_id == study_id))
+            q = q.filter(Biospecimen.study_id == study_id)
         if diagnosis_id:
             q = (q.join(BiospecimenDiagnosis)
                  .filter(BiospecimenDiagnosis.diagnosis_id == diagnosis_id))
@@ -189,3 +180,52 @@ class BiospecimenAPI(CRUDView):
 
         return BiospecimenSchema(200, 'biospecimen {} deleted'
                                  .format(sa.kf_id)).jsonify(sa), 200
+
+
+class BiospecimenVisibilityAPI(CRUDView):
+    """
+    Biospecimen visibility API
+    """
+    endpoint = 'biospecimens_visibility'
+    rule = '/biospecimens/<string:kf_id>/visibility'
+    schemas = {'Visibility': VisibilitySchema}
+    statement_timeout = 'bulk'
+
+    def post(self, kf_id):
+        """
+        Hide or release a biospecimen and the entities below it
+
+        Sets the visibility of the biospecimen and of its genomic files and
+        their links to other entities, with one statement per table, and
+        returns the number of entities updated in each table.
+        ---
+        description: Hide or release a biospecimen and the entities below it
+        tags:
+        - Biospecimen
+        parameters:
+        - name: kf_id
+          in: path
+          type: string
+          required: true
+          description: Kids First ID of the biospecimen
+        - name: body
+          in: body
+          description: The visibility to set
+          required: true
+          schema:
+            $ref: '#/definitions/Visibility'
+        responses:
+          200:
+            description: Visibility updated
+            schema:
+              $ref: '#/definitions/VisibilityResponse'
+          400:
+            description: Invalid visibility
+            schema:
+              $ref: '#/definitions/ClientErrorResponse'
+          404:
+            description: Biospecimen not found
+            schema:
+              $ref: '#/definitions/NotFoundErrorResponse'
+        """
+        return visibility_response(Biospecimen, kf_id)
@@ -10,6 +10,7 @@ from dataservice.api.biospecimen_diagnosis.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
 
 
 class BiospecimenDiagnosisListAPI(CRUDView):
@@ -37,16 +38,12 @@ class BiospecimenDiagnosisListAPI(CRUDView):
         # Get study id and remove from model filter params
         study_id = filter_params.pop('study_id', None)
 
-        q = BiospecimenDiagnosis.query.filter_by(**filter_params)
+        q = apply_filters(BiospecimenDiagnosis.query, BiospecimenDiagnosis,
+                          filter_params)
 
         # Filter by study
-        from dataservice.api.participant.models import Participant
-        from dataservice.api.biospecimen.models import Biospecimen
-
         if study_id:
-            q = (q.join(BiospecimenDiagnosis.biospecimen)
-                 .join(Biospecimen.participant)
-                 .filter(Participant.study_id == study_id))
+            q = q.filter(BiospecimenDiagnosis.study_id == study_id)
 
         return (BiospecimenDiagnosisSchema(many=True)
                 .jsonify(Pagination(q, after, limit)))
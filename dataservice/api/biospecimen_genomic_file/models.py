@@ -1,8 +1,9 @@
 from dataservice.extensions import db
 from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.study_scope import StudyScopedMixin
 
 
-class BiospecimenGenomicFile(db.Model, Base):
+class BiospecimenGenomicFile(db.Model, Base, StudyScopedMixin):
     """
     Represents association table between biospecimen table and
     genomic_file table. Contains all biospecimen, genomic_file combiniations.
@@ -14,6 +15,7 @@ class BiospecimenGenomicFile(db.Model, Base):
 
     __tablename__ = 'biospecimen_genomic_file'
     __prefix__ = 'BG'
+    __study_parent__ = ('biospecimen_id', 'biospecimen.kf_id')
     __table_args__ = (db.UniqueConstraint('genomic_file_id',
                                           'biospecimen_id'),)
     genomic_file_id = db.Column(KfId(),
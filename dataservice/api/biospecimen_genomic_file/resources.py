@@ -12,6 +12,7 @@ from dataservice.api.biospecimen_genomic_file.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
 
 
 class BiospecimenGenomicFileListAPI(CRUDView):
@@ -39,16 +40,12 @@ class BiospecimenGenomicFileListAPI(CRUDView):
         # Get study id and remove from model filter params
         study_id = filter_params.pop('study_id', None)
 
-        q = BiospecimenGenomicFile.query.filter_by(**filter_params)
+        q = apply_filters(BiospecimenGenomicFile.query, BiospecimenGenomicFile,
+                          filter_params)
 
         # Filter by study
-        from dataservice.api.participant.models import Participant
-        from dataservice.api.biospecimen.models import Biospecimen
-
         if study_id:
-            q = (q.join(BiospecimenGenomicFile.biospecimen)
-                 .join(Biospecimen.participant)
-                 .filter(Participant.study_id == study_id))
+            q = q.filter(BiospecimenGenomicFile.study_id == study_id)
 
         return (BiospecimenGenomicFileSchema(many=True)
                 .jsonify(Pagination(q, after, limit)))
@@ -11,6 +11,7 @@ from dataservice.api.cavatica_app.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
 
 
 class CavaticaAppListAPI(CRUDView):
@@ -38,7 +39,7 @@ class CavaticaAppListAPI(CRUDView):
         # Get study id and remove from model filter params
         study_id = filter_params.pop('study_id', None)
 
-        q = (CavaticaApp.query.filter_by(**filter_params))
+        q = apply_filters(CavaticaApp.query, CavaticaApp, filter_params)
 
         # Filter by study
         from dataservice.api.participant.models import Participant
@@ -0,0 +1,2 @@
+from dataservice.api.changes.resources import ChangeListAPI
+from dataservice.api.changes.resources import StudyChangeListAPI
@@ -0,0 +1,267 @@
+from flask import abort, request
+from sqlalchemy import literal, union_all
+
+from dataservice.extensions import db
+from dataservice.api.common.pagination import (
+    paginated,
+    after_filter,
+    settled,
+    page_response,
+    Pagination
+)
+from dataservice.api.common.model import Base
+from dataservice.api.common.views import CRUDView
+from dataservice.api.common.study_scope import files_in_study
+from dataservice.api.changes.schemas import ChangeSchema
+from dataservice.api.study.models import Study
+from dataservice.api.study_file.models import StudyFile
+from dataservice.api.participant.models import Participant
+from dataservice.api.family.models import Family
+from dataservice.api.family_relationship.models import FamilyRelationship
+from dataservice.api.diagnosis.models import Diagnosis
+from dataservice.api.phenotype.models import Phenotype
+from dataservice.api.outcome.models import Outcome
+from dataservice.api.biospecimen.models import (
+    Biospecimen,
+    BiospecimenDiagnosis
+)
+from dataservice.api.sample.models import Sample
+from dataservice.api.sample_relationship.models import SampleRelationship
+from dataservice.api.biospecimen_genomic_file.models import (
+    BiospecimenGenomicFile
+)
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.sequencing_experiment.models import (
+    SequencingExperiment,
+    SequencingExperimentGenomicFile
+)
+from dataservice.api.read_group.models import (
+    ReadGroup,
+    ReadGroupGenomicFile
+)
+from dataservice.api.task.models import Task, TaskGenomicFile
+
+
+def change_feeds():
+    """
+    Get the list views of the collections that have a change feed, keyed by
+    the table of the collection's entities
+    """
+    feeds = {}
+    for c in CRUDView.__subclasses__():
+        if not (c.__name__.endswith('ListAPI') and c.endpoint and
+                c.endpoint.endswith('_list') and '<' not in c.rule and
+                len(c.schemas) == 1):
+            continue
+        schema = next(iter(c.schemas.values()))
+        model = getattr(schema.Meta, 'model', None)
+        if model is not None and issubclass(model, Base):
+            feeds[model.__tablename__] = c
+    return feeds
+
+
+def study_entities(study_id):
+    """
+    Criteria for the entities of each table in the subgraph of a study
+
+    Entities that may be shared by studies, such as investigators, sequencing
+    centers and cavatica apps, are not part of a study's subgraph.
+
+    :param study_id: The kf_id of the study
+    :returns: A list of (model, criterion) tuples
+    """
+    q = db.session.query
+    participants = q(Participant.kf_id).filter(
+        Participant.study_id == study_id)
+    samples = q(Sample.kf_id).filter(Sample.study_id == study_id)
+
+    def linked(model, link_id):
+        link = link_id.class_
+        return model.kf_id.in_(q(link_id).filter(
+            files_in_study(link.genomic_file_id, study_id)))
+
+    return [
+        (Study, Study.kf_id == study_id),
+        (StudyFile, StudyFile.study_id == study_id),
+        (Participant, Participant.study_id == study_id),
+        (Family, Family.kf_id.in_(
+            q(Participant.family_id).filter(
+                Participant.study_id == study_id))),
+        (FamilyRelationship,
+         FamilyRelationship.participant1_id.in_(participants)),
+        (Diagnosis, Diagnosis.study_id == study_id),
+        (Phenotype, Phenotype.study_id == study_id),
+        (Outcome, Outcome.study_id == study_id),
+        (Biospecimen, Biospecimen.study_id == study_id),
+        (BiospecimenDiagnosis, BiospecimenDiagnosis.study_id == study_id),
+        (Sample, Sample.study_id == study_id),
+        (SampleRelationship, SampleRelationship.child_id.in_(samples)),
+        (BiospecimenGenomicFile,
+         BiospecimenGenomicFile.study_id == study_id),
+        (GenomicFile, files_in_study(GenomicFile.kf_id, study_id)),
+        (SequencingExperimentGenomicFile, files_in_study(
+            SequencingExperimentGenomicFile.genomic_file_id, study_id)),
+        (SequencingExperiment, linked(
+            SequencingExperiment,
+            SequencingExperimentGenomicFile.sequencing_experiment_id)),
+        (ReadGroupGenomicFile, files_in_study(
+            ReadGroupGenomicFile.genomic_file_id, study_id)),
+        (ReadGroup, linked(ReadGroup, ReadGroupGenomicFile.read_group_id)),
+        (TaskGenomicFile, files_in_study(TaskGenomicFile.genomic_file_id,
+                                         study_id)),
+        (Task, linked(Task, TaskGenomicFile.task_id)),
+    ]
+
+
+class ChangeListAPI(CRUDView):
+    """
+    Change feed of a collection
+
+    Registered on the `/changes` path of each collection by `register_feeds`
+    rather than by `register_views`.
+    """
+    methods = ['GET']
+
+    def __init__(self, schema, *args, **kwargs):
+        super(ChangeListAPI, self).__init__(*args, **kwargs)
+        self.schema = schema
+
+    @classmethod
+    def register_feeds(cls, app):
+        """
+        Registers a change feed for each collection on the app or blueprint
+
+        :param app: the application or blueprint to register the views on
+        :returns: The registered views
+        """
+        views = []
+        for list_view in change_feeds().values():
+            endpoint = list_view.endpoint[:-len('_list')] + '_changes'
+            schema = next(iter(list_view.schemas.values()))
+            view = cls.as_view(endpoint, schema)
+            app.add_url_rule(list_view.rule + '/changes', view_func=view,
+                             methods=cls.methods)
+            views.append(view)
+        return views
+
+    @paginated(cursor='since')
+    def get(self, after, limit):
+        """
+        Get the entities of a collection that changed since a cursor
+
+        Entities are ordered by the time they were last modified. Follow
+        the `next` link of each page to get every change, and store the
+        `self` link of the last page to continue from later.
+        ---
+        description: Get the entities that changed since a cursor
+        tags:
+        - Changes
+        parameters:
+        - name: since
+          in: query
+          type: string
+          description: Time after which changes are returned
+        - name: since_uuid
+          in: query
+          type: string
+          description: uuid of the last change returned at the `since` time
+        - name: limit
+          in: query
+          type: integer
+          description: Maximum number of changes to return
+        responses:
+          200:
+            description: Entities that changed since the cursor
+        """
+        model = self.schema.Meta.model
+        q = (model.query
+             .filter(settled(model.modified_at))
+             .filter(after_filter(model, after, 'modified_at')))
+        pager = Pagination(q, after, limit, key='modified_at')
+        schema = self.schema(many=True)
+        # Files that were deleted in indexd are removed as they are loaded
+        items = [i for i in schema.page_items(pager)
+                 if not getattr(i, 'was_deleted', False)]
+
+        data = schema.dump(items).data
+        return page_response(data, pager, request.endpoint)
+
+
+class StudyChangeListAPI(CRUDView):
+    """
+    Change feed of a study's subgraph
+    """
+    endpoint = 'study_changes'
+    rule = '/studies/<string:kf_id>/changes'
+    schemas = {'Change': ChangeSchema}
+    # Reads the subgraph of a whole study
+    statement_timeout = 'default'
+
+    @paginated(cursor='since')
+    def get(self, kf_id, after, limit):
+        """
+        Get the entities of a study that changed since a cursor
+
+        Returns the type and kf_id of each entity in the study's subgraph
+        that changed, from the study down to its participants, biospecimens,
+        genomic files and the entities linked to them. Changes of all types
+        are ordered by the time they were last modified and may be followed
+        with the `next` link of each page.
+        ---
+        description: Get the entities of a study that changed since a cursor
+        tags:
+        - Changes
+        parameters:
+        - name: kf_id
+          in: path
+          type: string
+          required: true
+          description: Kids First ID of the study
+        - name: since
+          in: query
+          type: string
+          description: Time after which changes are returned
+        - name: since_uuid
+          in: query
+          type: string
+          description: uuid of the last change returned at the `since` time
+        - name: limit
+          in: query
+          type: integer
+          description: Maximum number of changes to return
+        responses:
+          200:
+            description: Entities that changed since the cursor
+            schema:
+              $ref: '#/definitions/ChangePaginated'
+          404:
+            description: Study not found
+            schema:
+              $ref: '#/definitions/NotFoundErrorResponse'
+        """
+        if Study.query.get(kf_id) is None:
+            abort(404, 'could not find {} `{}`'.format('study', kf_id))
+
+        # Each table's changes are filtered by the cursor before they are
+        # combined so that each may be read from its modified_at index
+        changes = union_all(*[
+            db.session.query(literal(model.__tablename__).label('type'),
+                             model.kf_id.label('kf_id'),
+                             model.modified_at.label('modified_at'),
+                             model.uuid.label('uuid'))
+            .filter(criterion)
+            .filter(settled(model.modified_at))
+            .filter(after_filter(model, after, 'modified_at'))
+            for model, criterion in study_entities(kf_id)
+        ]).alias('changes')
+        pager = Pagination(db.session.query(changes), after, limit,
+                           key='modified_at', model=changes.c)
+
+        resource_urls = {
+            table: next(iter(c.schemas.values())).Meta.resource_url
+            for table, c in change_feeds().items()
+        }
+        data = ChangeSchema(many=True, context={
+            'resource_urls': resource_urls
+        }).dump(pager.items).data
+        return page_response(data, pager, request.endpoint, kf_id=kf_id)
@@ -0,0 +1,28 @@
+from flask import url_for
+from flask_marshmallow import Schema
+from marshmallow import fields, post_dump
+
+
+class ChangeSchema(Schema):
+    """
+    An entity of a study that was created or modified
+    """
+    type = fields.Str(description='Table of the entity', example='participant')
+    kf_id = fields.Str(example='PT_DZB048J5')
+    modified_at = fields.DateTime(description='Time of last modification')
+    _links = fields.Method('get_links')
+
+    def __init__(self, code=200, message='success', *args, **kwargs):
+        self.status_code = code
+        self.status_message = message
+        super(ChangeSchema, self).__init__(*args, **kwargs)
+
+    def get_links(self, change):
+        resource_url = self.context['resource_urls'][change.type]
+        return {'self': url_for(resource_url, kf_id=change.kf_id)}
+
+    @post_dump(pass_many=True)
+    def wrap_envelope(self, data, many):
+        return {'_status': {'message': self.status_message,
+                            'code': self.status_code},
+                'results': data}
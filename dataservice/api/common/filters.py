@@ -0,0 +1,164 @@
+"""
+Operators for filter params of list endpoints
+
+Besides equality, `field=value`, filter params may apply an operator to a
+field with `field[op]=value`:
+
+- `ne`: not equal to the value
+- `lt`, `lte`, `gt`, `gte`: less than, less than or equal to, greater than
+  and greater than or equal to the value
+- `in`: equal to one of a comma separated list of values
+
+List fields take comma separated lists of values. Equality, `field=a,b`,
+matches entities whose list contains all of the values, and operators match
+other ways of comparing lists:
+
+- `all`: the list contains all of the values, the same as equality
+- `any`: the list contains any of the values
+- `exact`: the list has exactly the values, in any order
+
+For example, `/diagnoses?age_at_event_days[gte]=100&age_at_event_days[lt]=365`
+or `/biospecimens?duo_ids[any]=DUO:0000005,DUO:0000021`
+
+Operators are applied in the database, so they may not be applied to fields
+that are not columns of the entity's table, such as the `size` and `hashes`
+of files that are stored in indexd, and are rejected for those fields.
+"""
+import copy
+import operator
+import re
+
+from marshmallow import fields, ValidationError
+from sqlalchemy import and_, inspect
+from sqlalchemy.dialects.postgresql import ARRAY
+from webargs.fields import DelimitedList
+
+OPERATORS = {
+    'ne': operator.ne,
+    'lt': operator.lt,
+    'lte': operator.le,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'in': lambda column, values: column.in_(values),
+    'all': lambda column, values: column.contains(values),
+    'any': lambda column, values: column.overlap(values),
+    'exact': lambda column, values: and_(column.contains(values),
+                                         column.contained_by(values)),
+}
+# Operators that may be applied to each type of field
+RANGE_OPERATORS = ['ne', 'lt', 'lte', 'gt', 'gte', 'in']
+FIELD_OPERATORS = [
+    (fields.Number, RANGE_OPERATORS),
+    (fields.DateTime, RANGE_OPERATORS),
+    (fields.Date, RANGE_OPERATORS),
+    (fields.String, ['ne', 'in']),
+    (fields.List, ['all', 'any', 'exact']),
+]
+
+FILTER_KEY_RE = re.compile(r'^(?P<name>\w+)\[(?P<op>\w+)\]$')
+
+
+class ListParam(DelimitedList):
+    """
+    A list of comma separated values in a single query param
+
+    Whitespace around values is ignored, so `a, b` is the list `['a', 'b']`
+    """
+
+    def _deserialize(self, value, attr, data):
+        if isinstance(value, str):
+            value = [v.strip() for v in value.split(self.delimiter)]
+        return super()._deserialize(value, attr, data)
+
+
+def reject_operator(value):
+    """
+    Reject an operator applied to a field that is not a column
+    """
+    raise ValidationError('Only equality filters may be applied to this '
+                          'field, as it is not stored in the entity\'s table.')
+
+
+def filter_key(name, op):
+    """
+    Get the query param key of an operator applied to a field
+    """
+    return '{}[{}]'.format(name, op)
+
+
+def parse_filter_key(key):
+    """
+    Split a query param key into a field name and operator
+
+    :returns: A tuple of the field name and operator, the operator is None
+    for equality
+    """
+    m = FILTER_KEY_RE.match(key)
+    if m:
+        return m.group('name'), m.group('op')
+    return key, None
+
+
+def operator_fields(schema_cls):
+    """
+    Create the fields of a filter schema for the operators that may be
+    applied to each column of the schema's model
+
+    Each operator field is a copy of the column's field, so values are
+    validated as they are for equality, except for `in` which validates a
+    list of values. List fields are replaced by a field that parses their
+    values from a single query param. Operators on fields that are not
+    columns, such as those stored in indexd, are rejected.
+
+    :param schema_cls: A model schema class
+    :returns: A dict of fields keyed by their query param
+    """
+    model = getattr(schema_cls.opts, 'model', None)
+    if model is None:
+        return {}
+    columns = inspect(model).column_attrs.keys()
+
+    operator_fields = {}
+    for name, field in schema_cls._declared_fields.items():
+        ops = next((ops for field_cls, ops in FIELD_OPERATORS
+                    if isinstance(field, field_cls)), [])
+        if name not in columns:
+            for op in ops:
+                operator_fields[filter_key(name, op)] = fields.Raw(
+                    validate=reject_operator)
+            continue
+        if isinstance(field, fields.List):
+            # Validators of the list apply to the parsed list
+            field = ListParam(copy.deepcopy(field.container),
+                              validate=field.validators)
+            operator_fields[name] = field
+        for op in ops:
+            op_field = copy.deepcopy(field)
+            op_field.dump_only = False
+            op_field.load_from = None
+            if op == 'in':
+                op_field = ListParam(op_field)
+            operator_fields[filter_key(name, op)] = op_field
+    return operator_fields
+
+
+def apply_filters(query, model, filter_params):
+    """
+    Filter a query by params loaded with a filter schema
+
+    :param query: The query to filter
+    :param model: The model whose columns are filtered
+    :param filter_params: A dict of loaded filter params, keyed by field name
+    or `field[op]`
+    :returns: The filtered query
+    """
+    for key, value in filter_params.items():
+        name, op = parse_filter_key(key)
+        column = getattr(model, name)
+        if op is None and isinstance(getattr(column, 'type', None), ARRAY):
+            op = 'all'
+        if op is None:
+            query = query.filter(column == value)
+        else:
+            query = query.filter(OPERATORS[op](column, value))
+    return query
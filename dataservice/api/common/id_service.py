@@ -1,6 +1,19 @@
+import os
 import uuid
 import random
+import threading
+from collections import deque
+
 import base32_crockford as b32
+from flask import current_app, has_app_context
+from sqlalchemy import select, text
+
+# Postgres sequence that kf_ids are allocated from
+KF_ID_SEQUENCE = 'kf_id_seq'
+# Number of distinct kf_ids, 8 Crockford base 32 characters
+KF_ID_SPACE = 32**8
+# Default number of kf_ids to allocate from the sequence at once
+DEFAULT_BLOCK_SIZE = 1000
 
 
 def uuid_generator():
@@ -23,12 +36,118 @@ def kf_id_generator(prefix):
     'SA_D167JSHP'
     'DM_ZZZZZZZZ'
     'ST_00000000'
+
+    The number is drawn at random and is not checked for collisions. Models
+    allocate their kf_ids with a KfIdAllocator instead.
     """
     assert len(prefix) == 2, 'Prefix must be two characters'
     prefix = prefix.upper()
 
     def generator():
-        return '{0}_{1:0>8}'.format(prefix,
-                                    b32.encode(random.randint(0, 32**8-1)))
+        return encode_kf_id(prefix, random.randint(0, KF_ID_SPACE - 1))
 
     return generator
+
+
+def encode_kf_id(prefix, number):
+    """
+    Encode a number in the kf_id space as a kf_id with the given prefix
+    """
+    return '{0}_{1:0>8}'.format(prefix, b32.encode(number))
+
+
+def permute(number):
+    """
+    Scramble a number in the kf_id space
+
+    A bijection made of odd multiplications and xor-shifts modulo the size of
+    the kf_id space, so that consecutive numbers map to unique numbers that
+    do not look sequential.
+    """
+    x = number % KF_ID_SPACE
+    x = (x * 0x9E3779B97F) % KF_ID_SPACE
+    x ^= x >> 20
+    x = (x * 0xC2B2AE3D27) % KF_ID_SPACE
+    x ^= x >> 20
+    return x
+
+
+class KfIdAllocator(object):
+    """
+    Allocates kf_ids with a given prefix from the kf_id Postgres sequence
+
+    Numbers are drawn from the sequence a block at a time and held in
+    memory, so a block only costs one round trip to the database. Each number
+    is permuted and encoded in the kf_id format. Since the sequence never
+    hands out the same number twice, the only kf_ids that may collide are
+    those generated at random before the allocator was introduced. These are
+    skipped by checking the block against the table being inserted into.
+
+    An instance is used as the default of a model's kf_id column, in which
+    case SQLAlchemy calls it with the execution context of the insert.
+
+    :param prefix: Two character prefix of the kf_ids
+    :param block_size: Number of kf_ids to allocate at once. Defaults to the
+    KF_ID_BLOCK_SIZE app config
+    """
+
+    def __init__(self, prefix, block_size=None):
+        assert len(prefix) == 2, 'Prefix must be two characters'
+        self.prefix = prefix.upper()
+        self._block_size = block_size
+        self._ids = deque()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def block_size(self):
+        if self._block_size:
+            return self._block_size
+        if has_app_context():
+            return current_app.config.get('KF_ID_BLOCK_SIZE',
+                                          DEFAULT_BLOCK_SIZE)
+        return DEFAULT_BLOCK_SIZE
+
+    def __call__(self, context):
+        """
+        Get the next kf_id, allocating a new block if needed
+
+        :param context: The SQLAlchemy execution context of the insert
+        """
+        with self._lock:
+            # Blocks must not be shared with forked worker processes
+            if self._pid != os.getpid():
+                self._ids.clear()
+                self._pid = os.getpid()
+
+            if not self._ids:
+                table = getattr(context.compiled.statement, 'table', None)
+                self._ids.extend(self.reserve(context.connection,
+                                              self.block_size, table))
+            return self._ids.popleft()
+
+    def reserve(self, connection, count, table=None):
+        """
+        Allocate kf_ids from the sequence
+
+        :param connection: Connection to draw numbers from the sequence with
+        :param count: Number of kf_ids to allocate
+        :param table: Table whose existing kf_ids are skipped
+        :returns: list of `count` kf_ids
+        """
+        kf_ids = []
+        while len(kf_ids) < count:
+            numbers = connection.execute(
+                text('SELECT nextval(:seq) FROM generate_series(1, :count)'),
+                seq=KF_ID_SEQUENCE, count=count - len(kf_ids))
+            block = [encode_kf_id(self.prefix, permute(n)) for n, in numbers]
+
+            if table is not None:
+                taken = {kf_id for kf_id, in connection.execute(
+                    select([table.c.kf_id])
+                    .where(table.c.kf_id.in_(block)))}
+                block = [kf_id for kf_id in block if kf_id not in taken]
+
+            kf_ids.extend(block)
+
+        return kf_ids
@@ -2,14 +2,20 @@ from datetime import datetime
 from flask import abort, current_app
 from requests.exceptions import HTTPError
 import sqlalchemy.types as types
+from itertools import chain
 from sqlalchemy import event, inspect
-from sqlalchemy.orm import reconstructor
+from sqlalchemy.orm import reconstructor, object_session
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.dialects.postgresql import UUID
 
 from dataservice.extensions import db, indexd
 from dataservice.extensions.flask_indexd import RecordNotFound
-from dataservice.api.common.id_service import uuid_generator, kf_id_generator
+from dataservice.api.common.id_service import (
+    uuid_generator,
+    KfIdAllocator,
+    KF_ID_SEQUENCE,
+    KF_ID_SPACE
+)
 
 COMMON_ENUM = {"Not Reported", "Not Applicable", "Not Allowed To Collect",
                "Not Available", "Reported Unknown"}
@@ -20,6 +26,12 @@ VISIBILITY_REASON_ENUM = {
 }
 
 
+# Sequence that kf_ids are allocated from, see KfIdAllocator
+kf_id_sequence = db.Sequence(KF_ID_SEQUENCE, minvalue=1,
+                             maxvalue=KF_ID_SPACE - 1,
+                             metadata=db.Model.metadata)
+
+
 class KfId(types.TypeDecorator):
     """
     A kids first id type
@@ -41,7 +53,7 @@ class IDMixin:
     def kf_id(cls):
         kf_id = db.Column(KfId(), primary_key=True,
                           doc="ID assigned by Kids First",
-                          default=kf_id_generator(cls.__prefix__))
+                          default=KfIdAllocator(cls.__prefix__))
         return kf_id
 
     uuid = db.Column(UUID(), unique=True, default=uuid_generator)
@@ -221,3 +233,63 @@ class Base(IDMixin, TimestampMixin):
         db.Text(),
         doc='Additional details for the visibility reason'
     )
+
+
+@event.listens_for(Base, 'instrument_class', propagate=True)
+def index_modified_at(mapper, cls):
+    """
+    Index the (modified_at, uuid) order that change feeds page through on
+    each table
+    """
+    table = cls.__table__
+    db.Index('ix_{}_modified_at_uuid'.format(table.name),
+             table.c.modified_at, table.c.uuid)
+
+
+def validate_flush_batch(connection, target, validate):
+    """
+    Validate all pending instances of a model once per flush
+
+    Meant to be called from a model's before_insert and before_update
+    listeners. The first call of a flush collects every new or modified
+    instance of the target's model in the session and passes them, along
+    with the flush's connection, to `validate` so that they may be checked
+    with a handful of queries instead of a few queries per row. The other
+    instances are flagged so that their own listener calls are skipped.
+
+    Foreign keys of all instances of a model have been populated by the time
+    its first before_insert or before_update is called.
+
+    :param connection: The connection of the flush
+    :param target: The instance the listener was called for
+    :param validate: Function taking the connection and the list of
+    instances to validate. Should raise on an invalid instance.
+    """
+    if target.__dict__.pop('_flush_validated', False):
+        return
+
+    session = object_session(target)
+    model = type(target)
+    batch = [target]
+    if session is not None:
+        batch.extend(obj for obj in chain(session.new, session.dirty)
+                     if isinstance(obj, model) and obj is not target)
+
+    validate(connection, batch)
+
+    # Only flag instances once the whole batch is known to be valid, so
+    # that they are validated again if the flush is retried
+    for obj in batch[1:]:
+        obj.__dict__['_flush_validated'] = True
+
+
+def reserve_kf_ids(model, count):
+    """
+    Allocate kf_ids for a model ahead of inserting its instances
+
+    :param model: A model deriving from Base
+    :param count: Number of kf_ids to allocate
+    :returns: list of kf_ids
+    """
+    allocator = model.__table__.c.kf_id.default.arg
+    return allocator.reserve(db.session.connection(), count, model.__table__)
@@ -1,16 +1,67 @@
+from collections import namedtuple
 from typing import Optional, Tuple
 from uuid import UUID
-from flask import request, current_app
-from functools import wraps
+from flask import request, current_app, url_for
+from functools import partial, wraps
 from dateutil import parser
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy import and_, or_
+from sqlalchemy.util import KeyedTuple
+
+from dataservice.api.common.encoding import respond
 
 
 After = Tuple[Optional[datetime], Optional[str]]
 
+# A related entity of a row, see Pagination.load_rows
+Reference = namedtuple('Reference', ['kf_id'])
+
+
+def parse_after(after_date: str, after_uuid: Optional[str]) -> After:
+    """
+    Parse the datetime and uuid of a page cursor from url parameters
+
+    The datetime is a either a timestamp or parseable datetime (as determined
+    by the dateutil module). It falls back to the beginning of the epoch if
+    it can't be parsed. The uuid falls back to the zero uuid.
+    """
+    # Assume timestamp if ?after is a number
+    if after_date.replace('.', '').isdigit():
+        after_date = float(after_date)
+        after_date = datetime.fromtimestamp(after_date)
+    # Otherwise, try to extract a datetime with dateutil parser
+    else:
+        try:
+            after_date = parser.parse(after_date)
+        # Parser couldn't derive a datetime from the string
+        except ValueError:
+            # Fallback to begining of the epoch if we can't parse
+            after_date = datetime.fromtimestamp(0)
 
-def paginated(f):
+    # Try to parse a valid UUID, if there is one
+    if after_uuid is not None:
+        try:
+            after_uuid = str(UUID(after_uuid))
+        except ValueError:
+            after_uuid = None
+
+    # Default the uuid to the zero uuid if none is specified
+    if after_uuid is None:
+        after_uuid = str(UUID(int=0))
+
+    return (after_date, after_uuid)
+
+
+def paginated(f=None, cursor='after'):
+    """
+    Inject the page requested by a url's parameters into the wrapped
+    function's kwargs
+
+    May be applied as `@paginated`, or as `@paginated(cursor='since')` to
+    read the page's cursor from other url parameters.
+    """
+    if f is None:
+        return partial(paginated, cursor=cursor)
 
     @wraps(f)
     def paginated_wrapper(*args, **kwargs):
@@ -31,74 +82,109 @@ def paginated(f):
         def_limit = current_app.config['DEFAULT_PAGE_LIMIT']
         max_limit = current_app.config['MAX_PAGE_LIMIT']
         limit = min(request.args.get('limit', def_limit, type=int), max_limit)
-        after_date = request.args.get('after', '')
-        after_uuid = request.args.get('after_uuid', None)
-
-        # Assume timestamp if ?after is a number
-        if after_date.replace('.', '').isdigit():
-            after_date = float(after_date)
-            after_date = datetime.fromtimestamp(after_date)
-        # Otherwise, try to extract a datetime with dateutil parser
-        else:
-            try:
-                after_date = parser.parse(after_date)
-            # Parser couldn't derive a datetime from the string
-            except ValueError:
-                # Fallback to begining of the epoch if we can't parse
-                after_date = datetime.fromtimestamp(0)
-
-        # Try to parse a valid UUID, if there is one
-        if after_uuid is not None:
-            try:
-                after_uuid = str(UUID(after_uuid))
-            except ValueError:
-                after_uuid = None
-
-        # Default the uuid to the zero uuid if none is specified
-        if after_uuid is None:
-            after_uuid = str(UUID(int=0))
-
-        after = (after_date, after_uuid)
+        after = parse_after(request.args.get(cursor, ''),
+                            request.args.get(cursor + '_uuid', None))
         return f(*args, **kwargs, after=after, limit=limit)
 
     return paginated_wrapper
 
 
+def after_filter(model, after: After, key: str = 'created_at'):
+    """
+    Criterion for the rows of a model that come after a page cursor when
+    ordered by a datetime column and uuid
+
+    :param model: The model, or the columns of a selectable
+    :param after: The (datetime, uuid) cursor
+    :param key: The name of the datetime column
+    """
+    after_date, after_uuid = after
+    column = getattr(model, key)
+    # Resolve any rows that have the same datetime by their uuid, return all
+    # other rows that came later
+    return or_(
+        and_(column == after_date, model.uuid > after_uuid),
+        column > after_date,
+    )
+
+
 class Pagination(object):
     """
     Object to help paginate through endpoints using the created_at field and
     uuid fields
+
+    :param query: The query to paginate
+    :param after: The (datetime, uuid) cursor of the page
+    :param limit: The number of results on the page
+    :param key: The name of the datetime column to page by
+    :param model: The model, or the columns of a selectable, that is paged
+    through. Defaults to the entity of the query.
     """
 
-    def __init__(self, query: str, after: After, limit: int):
+    def __init__(self, query: str, after: After, limit: int,
+                 key: str = 'created_at', model=None):
         self.query = query
         self.after = after
         self.limit = limit
+        self.key = key
         self.total = query.count()
         # Assumes that we only provide queries for one entity
         # This is safe as pagination only accesses one entity at a time
-        model = query._entities[0].mapper.entity
-
-        after_date, after_uuid = after
-
-        query = query.order_by(model.created_at.asc(), model.uuid.asc())
-        # Resolve any rows that have the same created_at time by their uuid,
-        # return all other rows that were created later
-        query = query.filter(
-            or_(
-                and_(model.created_at == after_date, model.uuid > after_uuid),
-                model.created_at > after_date,
-            )
-        )
+        if model is None:
+            model = query._entities[0].mapper.entity
+
+        query = query.order_by(getattr(model, key).asc(), model.uuid.asc())
+        query = query.filter(after_filter(model, after, key))
         query = query.limit(limit)
 
-        self.items = query.all()
+        self.model = model
+        self._page_query = query
+        self._items = None
+
+    @property
+    def items(self):
+        """ The entities on the page, loaded when first used """
+        if self._items is None:
+            self._items = self._page_query.all()
+        return self._items
+
+    @items.setter
+    def items(self, items):
+        self._items = items
+
+    def load_rows(self, keys, references=()):
+        """
+        Load the page as named tuples of columns rather than entities
+
+        Rows are not added to the session's identity map and are not
+        reconstructed as model instances, which is quicker and lighter for
+        pages that are only read.
+
+        :param keys: The names of the model's column attributes to load
+        :param references: (relationship, foreign key) pairs of many-to-one
+        relationships to add to the rows as references, which only have the
+        kf_id of the related entity
+        :returns: The rows on the page
+        """
+        if self._items is None:
+            columns = [getattr(self.model, k) for k in keys]
+            rows = self._page_query.with_entities(*columns).all()
+            if references:
+                labels = list(keys) + [name for name, _ in references]
+                indexes = [keys.index(key) for _, key in references]
+                rows = [KeyedTuple(tuple(row) + tuple(
+                        None if row[i] is None else Reference(row[i])
+                        for i in indexes), labels)
+                        for row in rows]
+            self._items = rows
+        return self._items
 
     @property
     def prev_num(self) -> After:
         """ Returns the (datetime, uuid) tuple of the first item """
         if len(self.items) > 0:
-            return (self.items[0].created_at, str(self.items[0].uuid))
+            return (getattr(self.items[0], self.key),
+                    str(self.items[0].uuid))
         return (datetime.fromtimestamp(0), str(UUID(int=0)))
 
     @property
@@ -110,7 +196,8 @@ class Pagination(object):
     def next_num(self) -> Optional[After]:
         """ Returns the timestamp, uuid of the last item"""
         if self.has_next:
-            return (self.items[-1].created_at, str(self.items[-1].uuid))
+            return (getattr(self.items[-1], self.key),
+                    str(self.items[-1].uuid))
 
     @property
     def has_next(self):
@@ -118,6 +205,50 @@ class Pagination(object):
         return len(self.items) >= self.limit
 
 
+def settled(column):
+    """
+    Criterion for the rows whose changes are old enough to be returned by a
+    change feed
+
+    Times such as modified_at are set when a change is flushed rather than
+    when it is committed, so changes made in the last CHANGE_FEED_DELAY
+    seconds are held back until transactions that were open at the time
+    have committed. Otherwise a client could move its cursor past a change
+    that becomes visible later.
+
+    :param column: The datetime column the feed is ordered by
+    """
+    delay = current_app.config['CHANGE_FEED_DELAY']
+    return column <= datetime.now() - timedelta(seconds=delay)
+
+
+def page_response(data, pager, endpoint, **values):
+    """
+    Add the links and counts of a page of changes to a dumped response
+
+    Cursors are formatted as ISO 8601 datetimes so that they keep the
+    microseconds of modified_at.
+
+    :param data: The dumped response
+    :param pager: The Pagination of the changes
+    :param endpoint: The endpoint of the change feed
+    :param values: Other url parameters of the endpoint
+    """
+    def link(after):
+        # No cursor, the feed starts from the first change
+        if after == (datetime.fromtimestamp(0), str(UUID(int=0))):
+            return url_for(endpoint, **values)
+        return url_for(endpoint, since=after[0].isoformat(),
+                       since_uuid=after[1], **values)
+
+    data['_links'] = {'self': link(pager.curr_num)}
+    if pager.has_next:
+        data['_links']['next'] = link(pager.next_num)
+    data['total'] = int(pager.total)
+    data['limit'] = int(pager.limit)
+    return respond(data)
+
+
 def indexd_pagination(q, after, limit):
     """
     Special logic to paginate through indexd objects.
@@ -11,10 +11,17 @@ from marshmallow import (
     validates,
     ValidationError
 )
-from flask import url_for, request
+from marshmallow.schema import MarshalResult
+from flask import current_app, has_app_context, url_for, request
 from flask_marshmallow import Schema
 from dataservice.api.common.pagination import Pagination, After
-from dataservice.api.common.validation import validate_kf_id
+from dataservice.api.common.encoding import respond
+from dataservice.api.common.serializers import dump_compiled, row_keys
+from dataservice.api.common.filters import operator_fields
+from dataservice.api.common.validation import (
+    validate_kf_id,
+    enum_validation_generator
+)
 from dataservice.api.common.model import VISIBILITY_REASON_ENUM
 from dataservice.extensions import db
 
@@ -46,11 +53,50 @@ class BaseSchema(ma.ModelSchema):
         exclude = ('uuid',)
         dump_only = ('created_at', 'modified_at')
 
+    def dump(self, obj, many=None, update_fields=True, **kwargs):
+        """
+        Serialize an object, or a collection with the schema's compiled
+        serializer unless COMPILED_SERIALIZERS is off, see
+        dataservice.api.common.serializers
+        """
+        many = self.many if many is None else bool(many)
+        if (many and has_app_context() and
+                current_app.config['COMPILED_SERIALIZERS']):
+            data = dump_compiled(self, obj)
+            if data is not None:
+                return MarshalResult(data, {})
+        return super(BaseSchema, self).dump(obj, many=many,
+                                            update_fields=update_fields,
+                                            **kwargs)
+
+    def jsonify(self, obj, many=None, *args, **kwargs):
+        """
+        Create a response of the serialized object, encoded in the format
+        the client accepts, see dataservice.api.common.encoding
+        """
+        if many is None:
+            many = self.many
+        data = self.dump(obj, many=many).data
+        return respond(data)
+
+    def page_items(self, pager):
+        """
+        Get the items on a page to dump
+
+        If PAGE_ROWS is on and the schema only dumps columns of the page's
+        model, the page is loaded as rows rather than model instances.
+        """
+        if current_app.config['PAGE_ROWS'] and pager.model is self.opts.model:
+            keys = row_keys(self)
+            if keys is not None:
+                return pager.load_rows(*keys)
+        return pager.items
+
     @pre_dump(pass_many=True)
     def wrap_pre(self, data, many):
         if isinstance(data, Pagination):
             self.__pagination__ = data
-            return data.items
+            return self.page_items(data)
         return data
 
     @validates('kf_id')
@@ -207,6 +253,8 @@ def filter_schema_factory(model_schema_cls):
     Dynamically define filter schemas based on model schema
     and filter schema mixin classes
     Remove schema attributes that are not applicable to filters (_links)
+    Add fields for the operators that may be applied to model columns, see
+    dataservice.api.common.filters
     Allow partially populated schema
     Validate with strict=True - reuse model schema's validators
     """
@@ -215,7 +263,7 @@ def filter_schema_factory(model_schema_cls):
     cls_name = ('{}FilterSchema'
                 .format(model_schema_cls.__name__.split('Schema')[0]))
     base_classes = (FilterSchemaMixin, model_schema_cls)
-    cls = type(cls_name, base_classes, {})
+    cls = type(cls_name, base_classes, operator_fields(model_schema_cls))
 
     # Update some class attributes
     exclude = ('_links', )
@@ -244,6 +292,36 @@ class FilterSchemaMixin(ma.Schema):
         return data
 
 
+class VisibilitySchema(Schema):
+    """
+    A visibility change applied to an entity and the entities below it
+    """
+    visible = fields.Boolean(required=True,
+                             description='Whether the entities are visible')
+    visibility_reason = fields.Str(
+        allow_none=True,
+        validate=enum_validation_generator(VISIBILITY_REASON_ENUM,
+                                           common=False),
+        description='Justification for the visibility')
+    visibility_comment = fields.Str(
+        allow_none=True, description='Details of the visibility reason')
+    updated = fields.Dict(dump_only=True,
+                          example={'participant': 1, 'biospecimen': 2},
+                          description='Number of entities updated, keyed by '
+                          'table')
+
+    def __init__(self, code=200, message='success', *args, **kwargs):
+        self.status_code = code
+        self.status_message = message
+        super(VisibilitySchema, self).__init__(*args, **kwargs)
+
+    @post_dump(pass_many=False)
+    def wrap_envelope(self, data):
+        return {'_status': {'message': self.status_message,
+                            'code': self.status_code},
+                'results': data}
+
+
 class StatusSchema(Schema):
 
     message = fields.String(description='status message', example='success')
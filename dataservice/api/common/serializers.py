@@ -0,0 +1,308 @@
+"""
+Compiled serializers of model schemas
+
+Dumping a list with marshmallow dispatches every field of every object
+through the generic field machinery. A compiled serializer is a function
+generated once per schema from its bound fields that produces the same
+output with plain attribute access:
+
+- String, Integer and Boolean values that need no formatting are copied
+- Other values are formatted by their field's `_serialize`
+- Links of `Hyperlinks` fields are built by filling in url templates,
+  created once per dump with `url_for`, with the object's kf_ids
+
+Anything that may be formatted differently, such as a missing attribute or a
+url value that would be quoted, is handled by the field itself. Schemas are
+still dumped by marshmallow when they serialize a single object, and are
+always loaded and validated by marshmallow.
+"""
+import re
+import threading
+from collections.abc import Mapping
+
+from flask_marshmallow.fields import Hyperlinks, URLFor, _tpl
+from marshmallow import fields, missing, utils, ValidationError
+from marshmallow.decorators import PRE_DUMP, POST_DUMP
+from marshmallow_sqlalchemy.fields import Related
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm.interfaces import MANYTOONE
+
+# Values that are not changed by url quoting and may be put in a url as is
+SAFE_URL_VALUE = re.compile(r'^[A-Za-z0-9_.~-]+$').match
+
+# Values copied as is by a field, keyed by the field's class
+COPIED_TYPES = {
+    fields.String: str,
+    fields.Integer: int,
+    fields.Boolean: bool,
+}
+
+_compiled = {}
+_row_keys = {}
+_lock = threading.Lock()
+
+
+class _Sentinels(object):
+    """
+    An object whose attributes are placeholders, used to create url templates
+    """
+
+    def __getattr__(self, name):
+        return _sentinel(name)
+
+
+def _sentinel(name):
+    return 'zz{}zz'.format(name)
+
+
+class CompiledSerializer(object):
+    """
+    A dump function generated from the fields of a schema instance
+
+    :param schema: An instance of the schema to compile
+    """
+
+    def __init__(self, schema):
+        self.keys = _dump_keys(schema)
+        self.links = []
+        namespace = {'MISSING': missing, 'SAFE': SAFE_URL_VALUE,
+                     'ACCESSOR': schema.get_attribute, 'F': [], 'L': []}
+        lines = ['def dump(obj, T):', '    d = {}']
+        for name, field in schema.fields.items():
+            if field.load_only:
+                continue
+            key = field.dump_to or name
+            namespace['F'].append(field)
+            lines.extend(self._compile_field(name, key, field,
+                                             len(namespace['F']) - 1,
+                                             namespace['L']))
+        lines.append('    return d')
+        exec('\n'.join(lines), namespace)
+        self._dump = namespace['dump']
+
+    def _compile_field(self, name, key, field, i, links):
+        """
+        Generate the lines of code that dump a field
+        """
+        generic = ['    v = F[{}].serialize({!r}, obj, ACCESSOR)'.format(
+                   i, name),
+                   '    if v is not MISSING:',
+                   '        d[{!r}] = v'.format(key)]
+
+        if isinstance(field, Hyperlinks):
+            if not all(isinstance(v, URLFor) for v in field.schema.values()):
+                return generic
+            lines = ['    l = {}']
+            for link, url_field in field.schema.items():
+                links.append(url_field)
+                lines.extend(self._compile_link(link, url_field,
+                                                len(links) - 1))
+            lines.append('    d[{!r}] = l'.format(key))
+            return lines
+
+        attribute = field.attribute or name
+        if (not field._CHECK_ATTRIBUTE or '.' in attribute or
+                type(field).get_value is not fields.Field.get_value):
+            return generic
+
+        lines = [
+            '    v = getattr(obj, {!r}, MISSING)'.format(attribute),
+            '    if v is MISSING:',
+        ] + ['    ' + line for line in generic]
+        copied = COPIED_TYPES.get(type(field))
+        if copied is not None and not getattr(field, 'as_string', False):
+            lines.extend([
+                '    elif v is None or v.__class__ is {}:'.format(
+                    copied.__name__),
+                '        d[{!r}] = v'.format(key)])
+        lines.extend([
+            '    else:',
+            '        d[{!r}] = F[{}]._serialize(v, {!r}, obj)'.format(
+                key, i, name)])
+        return lines
+
+    def _compile_link(self, link, url_field, j):
+        """
+        Generate the lines of code that build a link from its template
+        """
+        attrs = [_tpl(str(v)) for v in url_field.params.values()
+                 if _tpl(str(v))]
+        self.links.append((link, url_field, attrs))
+        fallback = 'L[{}]._serialize(None, {!r}, obj)'.format(j, link)
+        if not attrs:
+            return ['    l[{!r}] = T[{}] if T[{}] is not None else {}'
+                    .format(link, j, j, fallback)]
+
+        lines = []
+        checks = ['T[{}] is not None'.format(j)]
+        for k, attr in enumerate(attrs):
+            lines.append('    v{} = getattr(obj, {!r}, None)'.format(k, attr))
+            checks.append('v{0}.__class__ is str and SAFE(v{0})'.format(k))
+        values = ', '.join('v{}'.format(k) for k in range(len(attrs)))
+        lines.extend([
+            '    if {}:'.format(' and '.join(checks)),
+            '        l[{!r}] = T[{}] % ({},)'.format(link, j, values),
+            '    else:',
+            '        l[{!r}] = {}'.format(link, fallback)])
+        return lines
+
+    def templates(self):
+        """
+        Create the url template of each link in the current request
+
+        A template is None if the link may not be built from a template, in
+        which case its field builds it.
+        """
+        sentinels = _Sentinels()
+        templates = []
+        for link, url_field, attrs in self.links:
+            try:
+                url = url_field._serialize(None, link, sentinels)
+            except Exception:
+                url = None
+            if url is None or not attrs:
+                templates.append(url)
+                continue
+            # Each value must appear once, in the order it is passed in
+            positions = [url.find(_sentinel(attr)) for attr in attrs]
+            if (any(url.count(_sentinel(attr)) != 1 for attr in attrs) or
+                    positions != sorted(positions)):
+                templates.append(None)
+                continue
+            template = url.replace('%', '%%')
+            for attr in attrs:
+                template = template.replace(_sentinel(attr), '%s')
+            templates.append(template)
+        return templates
+
+    def dump(self, objs):
+        """
+        Dump a list of objects
+
+        :param objs: The objects to dump
+        :returns: A list of dicts of the dumped objects
+        """
+        templates = self.templates()
+        return [self._dump(obj, templates) for obj in objs]
+
+
+def _dump_keys(schema):
+    return tuple(name for name, field in schema.fields.items()
+                 if not field.load_only)
+
+
+def compiled_serializer(schema):
+    """
+    Get the compiled serializer of a schema, compiling it on first use
+
+    Serializers are kept per schema class and set of dumped fields.
+    """
+    key = (type(schema), _dump_keys(schema))
+    serializer = _compiled.get(key)
+    if serializer is None:
+        with _lock:
+            serializer = _compiled.get(key)
+            if serializer is None:
+                serializer = _compiled[key] = CompiledSerializer(schema)
+    return serializer
+
+
+def row_keys(schema):
+    """
+    Get the columns to load to dump objects with a schema from rows
+
+    Rows may only be dumped if every attribute the schema reads, including
+    those of its links, is a column of its model, and if the model is not
+    reconstructed when it is loaded. Related fields of many-to-one
+    relationships are read from references built from their foreign key.
+
+    :param schema: A model schema instance
+    :returns: The names of the model's column attributes and the
+    (relationship, foreign key) pairs of the references to build, or None if
+    the schema must dump model instances
+    """
+    key = (type(schema), _dump_keys(schema))
+    if key not in _row_keys:
+        _row_keys[key] = _find_row_keys(schema)
+    return _row_keys[key]
+
+
+def _find_row_keys(schema):
+    model = getattr(schema.opts, 'model', None)
+    if model is None:
+        return None
+    mapper = sa_inspect(model)
+    if mapper._reconstructor is not None:
+        return None
+    columns = [prop.key for prop in mapper.column_attrs]
+
+    attrs = set()
+    references = []
+    for name, field in schema.fields.items():
+        if field.load_only:
+            continue
+        if isinstance(field, Hyperlinks):
+            for url_field in field.schema.values():
+                if not isinstance(url_field, URLFor):
+                    return None
+                attrs.update(_tpl(str(v)) for v in url_field.params.values()
+                             if _tpl(str(v)))
+        elif isinstance(field, Related):
+            reference = _reference(mapper, field, field.attribute or name)
+            if reference is None:
+                return None
+            references.append(reference)
+        elif field._CHECK_ATTRIBUTE:
+            attrs.add(field.attribute or name)
+        else:
+            return None
+    if not attrs.issubset(columns):
+        return None
+    return tuple(columns), tuple(references)
+
+
+def _reference(mapper, field, name):
+    """
+    Get the (relationship, foreign key) of a related field that only dumps
+    the kf_id of a many-to-one relationship
+    """
+    prop = mapper.relationships.get(name)
+    if (prop is None or prop.direction is not MANYTOONE or
+            len(prop.local_remote_pairs) != 1 or
+            [c.key for c in field.related_keys] != ['kf_id']):
+        return None
+    local, remote = prop.local_remote_pairs[0]
+    if remote.key != 'kf_id':
+        return None
+    return name, mapper.get_property_by_column(local).key
+
+
+def dump_compiled(schema, obj):
+    """
+    Dump a collection with a schema's compiled serializer
+
+    The schema's dump processors are invoked as they are by marshmallow.
+
+    :param schema: The schema instance to dump with
+    :param obj: The collection to dump
+    :returns: The dumped data, or None if the collection must be dumped by
+    marshmallow instead
+    """
+    if schema.ordered or schema.extra or schema.prefix:
+        return None
+    if utils.is_iterable_but_not_string(obj):
+        obj = list(obj)
+    items = schema._invoke_dump_processors(PRE_DUMP, obj, True,
+                                           original_data=obj)
+    if isinstance(items, Mapping):
+        return None
+    items = list(items)
+    if any(isinstance(item, Mapping) for item in items):
+        return None
+    try:
+        data = compiled_serializer(schema).dump(items)
+    # Let marshmallow collect the errors
+    except ValidationError:
+        return None
+    return schema._invoke_dump_processors(POST_DUMP, data, True,
+                                          original_data=obj)
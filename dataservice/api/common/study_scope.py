@@ -0,0 +1,329 @@
+"""
+Denormalized study_id of entities below participants
+
+Entities such as biospecimens and genomic files belong to a study through
+their participants. Models with the StudyScopedMixin keep a copy of the
+kf_id of their study in an indexed study_id column so that filtering them by
+study does not need to join up to participants.
+
+The study_id of an entity is copied from the entity it belongs to, named by
+the model's `__study_parent__`: a pair of the column of its own table and
+the `table.column` it matches, whose row holds the study_id to copy. A
+genomic file, which belongs to a study through its biospecimens, copies the
+study_id of its first link to a biospecimen. As a file may be linked to
+biospecimens of several studies, files and the entities below them are
+filtered by study with `files_in_study`, through the study_id of the file's
+links, rather than by their own copy.
+
+Study ids are kept in sync after every flush by `sync_study_ids`, which
+updates the entities added, moved or unlinked in the flush and cascades the
+changes down to the entities below them, one statement per table. Rows
+written outside of the session must be synced with `backfill_study_ids`.
+"""
+from collections import defaultdict
+
+from sqlalchemy import event, inspect, select, exists, and_, or_, func
+from sqlalchemy.ext.declarative import declared_attr
+from sqlalchemy.orm.attributes import set_committed_value
+
+from dataservice.extensions import db
+from dataservice.api.common.model import KfId
+
+# Models with a denormalized study_id keyed by table name
+_scoped = {}
+
+
+class StudyScopedMixin:
+    """
+    Adds a denormalized study_id, see `dataservice.api.common.study_scope`
+
+    :param study_id: Kids First id of the study the entity belongs to
+    """
+    __study_parent__ = ('participant_id', 'participant.kf_id')
+
+    @declared_attr
+    def study_id(cls):
+        return db.Column(KfId(),
+                         db.ForeignKey('study.kf_id', ondelete='SET NULL'),
+                         doc='Kids First id of the study the entity belongs '
+                         'to, maintained from its links')
+
+
+@event.listens_for(StudyScopedMixin, 'instrument_class', propagate=True)
+def register_scoped(mapper, cls):
+    """
+    Register a study scoped model and index its study_id in the order that
+    lists are paged through
+    """
+    table = cls.__table__
+    db.Index('ix_{}_study_id'.format(table.name),
+             table.c.study_id, table.c.created_at, table.c.uuid)
+    _scoped[table.name] = cls
+
+
+def _parent(model):
+    """
+    Get the (local column, parent table, parent column) of a scoped model
+    """
+    local, remote = model.__study_parent__
+    table_name, column = remote.split('.')
+    return (model.__table__.c[local], db.metadata.tables[table_name],
+            column)
+
+
+def scoped_models():
+    """
+    The study scoped models, each after the models it copies study_id from
+    """
+    ordered = []
+    remaining = dict(_scoped)
+    while remaining:
+        ready = [name for name, model in sorted(remaining.items())
+                 if _parent(model)[1].name not in remaining]
+        if not ready:
+            raise RuntimeError('Study parents of {} form a cycle'
+                               .format(', '.join(sorted(remaining))))
+        for name in ready:
+            ordered.append(remaining.pop(name))
+    return ordered
+
+
+def derived_study_id(model):
+    """
+    A scalar subquery of the study_id an entity of a scoped model should have
+    """
+    local, parent, column = _parent(model)
+    q = select([parent.c.study_id]).where(parent.c[column] == local)
+    if column != 'kf_id':
+        # Several rows may match, the oldest one wins
+        q = q.order_by(parent.c.created_at, parent.c.kf_id).limit(1)
+    return q.as_scalar()
+
+
+def files_in_study(genomic_file_id, study_id):
+    """
+    Criterion that a genomic file is linked to a biospecimen of a study
+
+    :param genomic_file_id: The column holding the kf_id of the file, which
+    the criterion correlates with
+    :param study_id: The kf_id of the study
+    """
+    link = db.metadata.tables['biospecimen_genomic_file']
+    return (exists()
+            .where(and_(link.c.genomic_file_id == genomic_file_id,
+                        link.c.study_id == study_id))
+            .correlate_except(link))
+
+
+def scoped_below(table_name, kf_id):
+    """
+    Criteria for the scoped entities below an entity
+
+    Entities below a study are matched by their study_id, except for genomic
+    files and their links, which are matched through the studies of the
+    files' biospecimens, see `files_in_study`. Entities below other entities
+    are matched through the study parents of their models, so a criterion
+    may correlate the tables on the way up to the entity.
+
+    :param table_name: The table of the entity
+    :param kf_id: The kf_id of the entity
+    :returns: A list of (model, criterion) tuples, each model after the
+    models it is below
+    """
+    if table_name == 'study':
+        return [(model, _in_study(model, kf_id)) for model in scoped_models()]
+    criteria = {table_name: db.metadata.tables[table_name].c.kf_id == kf_id}
+    below = []
+    for model in scoped_models():
+        local, parent, column = _parent(model)
+        if parent.name not in criteria:
+            continue
+        if parent.name == table_name and column == 'kf_id':
+            criterion = local == kf_id
+        else:
+            criterion = and_(local == parent.c[column], criteria[parent.name])
+        criteria[model.__tablename__] = criterion
+        below.append((model, criterion))
+    return below
+
+
+def _in_study(model, study_id):
+    """
+    Criterion that an entity of a scoped model is in a study
+    """
+    local, parent, column = _parent(model)
+    if (parent.name, column) in [('genomic_file', 'kf_id'),
+                                 ('biospecimen_genomic_file',
+                                  'genomic_file_id')]:
+        # The column holds the kf_id of a file that may be in several studies
+        return files_in_study(local, study_id)
+    return model.__table__.c.study_id == study_id
+
+
+def _children(table_name):
+    """
+    The scoped models that copy study_id from a table, with the column they
+    match
+    """
+    for model in _scoped.values():
+        _, parent, column = _parent(model)
+        if parent.name == table_name:
+            yield model, column
+
+
+def _history_values(state, key):
+    """
+    Current and previous values of an attribute of a flushed instance
+    """
+    history = state.attrs[key].history
+    return {v for v in history.sum() if v is not None}
+
+
+def _update_study_ids(connection, model, criterion):
+    """
+    Set the study_id of a scoped model's entities that match a criterion
+
+    :returns: The kf_id, study_id and columns that children match of the
+    entities whose study_id changed
+    """
+    table = model.__table__
+    study_id = derived_study_id(model)
+    returned = {column for _, column in _children(table.name)}
+    columns = [table.c.kf_id, table.c.study_id] + [
+        table.c[c] for c in sorted(returned - {'kf_id'})]
+    # modified_at is set to itself so that its onupdate is not applied
+    stmt = (table.update()
+            .where(and_(criterion, table.c.study_id.is_distinct_from(
+                study_id)))
+            .values(study_id=study_id, modified_at=table.c.modified_at)
+            .returning(*columns))
+    return [dict(zip([c.key for c in columns], row))
+            for row in connection.execute(stmt)]
+
+
+@event.listens_for(db.session, 'after_flush')
+def sync_study_ids(session, flush_context):
+    """
+    Update the study_id of scoped entities affected by a flush
+
+    Entities that were added or moved to another parent are updated, as are
+    the entities below any entity whose study_id changed. Instances loaded in
+    the session are given their new study_id.
+    """
+    # kf_ids of scoped entities to update, keyed by table
+    touched = defaultdict(set)
+    # Values of the columns matched by children of entities whose study_id
+    # changed, keyed by table and column
+    changed = defaultdict(lambda: defaultdict(set))
+
+    for obj in list(session.new) + list(session.dirty) + \
+            list(session.deleted):
+        state = inspect(obj)
+        table_name = getattr(type(obj), '__tablename__', None)
+        if table_name is None:
+            continue
+        model = _scoped.get(table_name)
+        deleted = obj in session.deleted
+        if model is not None and not deleted:
+            local = _parent(model)[0].key
+            if obj in session.new or \
+                    state.attrs[local].history.has_changes():
+                touched[table_name].add(obj.kf_id)
+        elif (model is None and not deleted and obj in session.dirty and
+              'study_id' in state.attrs and
+              state.attrs['study_id'].history.has_changes()):
+            changed[table_name]['kf_id'].add(obj.kf_id)
+        # Children matched by another column than kf_id may gain or lose
+        # their link to this entity, like a genomic file to a biospecimen
+        for child, column in _children(table_name):
+            if column != 'kf_id':
+                touched[child.__tablename__].update(
+                    _history_values(state, column))
+
+    if not touched and not changed:
+        return
+
+    connection = session.connection()
+    for model in scoped_models():
+        table = model.__table__
+        local, parent, column = _parent(model)
+        criteria = []
+        if touched.get(table.name):
+            criteria.append(table.c.kf_id.in_(touched[table.name]))
+        parents = changed.get(parent.name, {}).get(column)
+        if parents:
+            criteria.append(local.in_(parents))
+        if not criteria:
+            continue
+
+        rows = _update_study_ids(connection, model, or_(*criteria))
+        mapper = inspect(model)
+        for row in rows:
+            for key, value in row.items():
+                changed[table.name][key].add(value)
+            obj = session.identity_map.get(
+                mapper.identity_key_from_primary_key([row['kf_id']]))
+            if obj is not None:
+                set_committed_value(obj, 'study_id', row['study_id'])
+
+
+def backfill_study_ids(batch_size=10000):
+    """
+    Set the study_id of every scoped entity that is out of sync
+
+    Tables are updated in order so that each one copies from up to date
+    parents. Each table is walked through in batches of kf_ids, each
+    committed in its own transaction.
+
+    :param batch_size: Number of entities checked per transaction
+    :returns: The number of entities updated, keyed by table
+    """
+    updated = {}
+    for model in scoped_models():
+        table = model.__table__
+        updated[table.name] = 0
+        last = ''
+        while True:
+            kf_ids = [kf_id for kf_id, in db.session.execute(
+                select([table.c.kf_id])
+                .where(table.c.kf_id > last)
+                .order_by(table.c.kf_id)
+                .limit(batch_size))]
+            if not kf_ids:
+                break
+            rows = _update_study_ids(db.session.connection(), model,
+                                     table.c.kf_id.in_(kf_ids))
+            db.session.commit()
+            updated[table.name] += len(rows)
+            last = kf_ids[-1]
+    return updated
+
+
+def check_study_ids():
+    """
+    Count the scoped entities whose study_id is out of sync, and the
+    entities that belong to more than one study through their links
+
+    :returns: A dict of (table, problem) counts, only with the problems found
+    """
+    problems = {}
+    for model in scoped_models():
+        table = model.__table__
+        count = db.session.execute(
+            select([func.count()])
+            .where(table.c.study_id.is_distinct_from(
+                derived_study_id(model)))).scalar()
+        if count:
+            problems[(table.name, 'out of sync')] = count
+
+        _, parent, column = _parent(model)
+        if column != 'kf_id':
+            shared = (select([parent.c[column]])
+                      .group_by(parent.c[column])
+                      .having(func.count(parent.c.study_id.distinct()) > 1)
+                      .alias())
+            count = db.session.execute(
+                select([func.count()]).select_from(shared)).scalar()
+            if count:
+                problems[(table.name, 'in several studies')] = count
+    return problems
@@ -68,14 +68,6 @@ def list_validation_generator(valid_items, items_name='items'):
         All list items are converted to strings before
         doing comparison and validation.
 
-        ** NOTE **
-        This method is used by marshmallow_sqlalchemy.field_for during
-        HTTP request validation. If the HTTP request method is GET,
-        `input_items` will be a list with one element which will be a delimited
-        string representing a list of strings
-        (e.g. ['duo:0000005,duo:0000001']). This is because the value comes
-        from the URL query parameter string. No need to validate this case.
-
         :param input_items: input collection of items to validate
         :type input_items: list or str
         :raises: ValidationError when validation fails
@@ -83,11 +75,6 @@ def list_validation_generator(valid_items, items_name='items'):
         assert isinstance(input_items, list), (
             'Parameter `input_items` must be a list'
         )
-        # Don't do validation for this case, just return. See NOTE in docstring
-        if len(input_items) == 1 and any([d in input_items[0]
-                                          for d in [',', ' ', ';']]):
-            return
-
         invalid_set = set(input_items) - set(valid_items)
 
         if invalid_set:
@@ -1,9 +1,12 @@
 import boto3
 import jinja2
 import json
+import threading
+import time
 import yaml
-from flask import request, current_app
+from flask import g, request, current_app, has_app_context
 from flask.views import MethodView
+from sqlalchemy import event
 from dataservice.api.common.schemas import (
     response_generator,
     paginated_generator,
@@ -11,6 +14,29 @@ from dataservice.api.common.schemas import (
 )
 from dataservice.extensions import db
 
+# Requests that may be served by the read replica
+READ_METHODS = ['GET', 'HEAD']
+# Header a client sends to read from the primary
+READ_YOUR_WRITES_HEADER = 'X-Read-Your-Writes'
+# Cookie holding the time until which a client reads from the primary
+PRIMARY_COOKIE = 'read_primary_until'
+
+# boto3 clients may be shared between threads but creating them is not
+# thread safe, so one client is created and reused by all requests
+_sns_client = None
+_sns_client_lock = threading.Lock()
+
+
+def sns_client():
+    """
+    Get the SNS client shared by the process
+    """
+    global _sns_client
+    with _sns_client_lock:
+        if _sns_client is None:
+            _sns_client = boto3.client('sns', region_name='us-east-1')
+        return _sns_client
+
 
 class CRUDView(MethodView):
     """
@@ -23,11 +49,16 @@ class CRUDView(MethodView):
                     schema
     :param endpoint: The name of the endpoint to register in flask
     :param rule: The url routing rule for the endpoint
+    :param statement_timeout: The kind of statement timeout for the endpoint
     """
 
     schemas = {}
     endpoint = None
     rule = '/'
+    # The key of the STATEMENT_TIMEOUTS config used for requests to the
+    # view. GET requests for one entity are 'detail' and all other requests
+    # are 'default' unless this is set.
+    statement_timeout = None
     temp_env = jinja2.Environment(
         loader=jinja2.PackageLoader('dataservice.api', 'templates')
     )
@@ -44,6 +75,12 @@ class CRUDView(MethodView):
             views on
         """
         for c in cls.__subclasses__():
+            # Fill in the templates of the docstrings apispec parses
+            if c.endpoint is not None:
+                for meth in c.methods:
+                    if hasattr(c, meth.lower()):
+                        CRUDView._format_docstring(getattr(c, meth.lower()))
+
             if len(c.schemas) == 0:
                 continue
 
@@ -80,12 +117,6 @@ class CRUDView(MethodView):
             if c.endpoint is None:
                 continue
             methods = c.methods
-
-            for meth in c.methods:
-
-                if hasattr(c, meth.lower()):
-                    CRUDView._format_docstring(getattr(c, meth.lower()))
-
             view = c.as_view(c.endpoint)
             app.add_url_rule(c.rule, view_func=view, methods=methods)
             views.append(view)
@@ -180,6 +211,19 @@ class CRUDView(MethodView):
 
             - Sends request as an event to sns
 
+            - Sends the queries of GET and HEAD requests to the read replica,
+              if there is one, unless the client asks to read its own
+              writes. Clients read their own writes by sending the
+              `X-Read-Your-Writes` header, or for REPLICA_STICKY_SECONDS
+              after they make a change when they keep cookies.
+
+            - Limits how long the statements of the request may run for with
+              a postgres statement_timeout. The timeout is set with
+              SET LOCAL, so it lasts until the request's transaction ends
+              and is safe to use through PgBouncer in transaction mode. It
+              is set again in the transactions a view begins after it
+              commits.
+
             - Execute each request with sqlalchemy autoflush turned off.
               This prevents the model event listeners from triggering
               inadvertently. It happens when the db session goes out of scope
@@ -187,11 +231,18 @@ class CRUDView(MethodView):
               merge during a patch request. Its better to explicitly flush
               the session.
         """
-        # Autoflush off
-        db.session.autoflush = False
+        g.use_replica = self._use_replica()
+        try:
+            self._set_statement_timeout()
+
+            # Autoflush off
+            db.session.autoflush = False
 
-        # Send request
-        resp = super(CRUDView, self).dispatch_request(*args, **kwargs)
+            # Send request
+            resp = super(CRUDView, self).dispatch_request(*args, **kwargs)
+        finally:
+            g.pop('use_replica', None)
+            g.pop('statement_timeout', None)
 
         if isinstance(resp, tuple):
             status = resp[1]
@@ -202,11 +253,48 @@ class CRUDView(MethodView):
         # Send event to sns
         self.send_sns(resp)
 
+        # Read from the primary for a while after a change
+        if (request.method not in READ_METHODS and status < 300 and
+                current_app.config['SQLALCHEMY_REPLICA_URI']):
+            sticky = current_app.config['REPLICA_STICKY_SECONDS']
+            resp.set_cookie(PRIMARY_COOKIE, str(int(time.time() + sticky)),
+                            max_age=sticky)
+
         # Autoflush back on
         db.session.autoflush = True
 
         return resp, status
 
+    def _use_replica(self):
+        """
+        Whether the request may be served by the read replica
+        """
+        if request.method not in READ_METHODS:
+            return False
+        if request.headers.get(READ_YOUR_WRITES_HEADER, '').lower() == 'true':
+            return False
+        try:
+            if int(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time():
+                return False
+        except ValueError:
+            pass
+        return db.replica_available()
+
+    def _set_statement_timeout(self):
+        """
+        Set the statement timeout of the view from the STATEMENT_TIMEOUTS
+        config
+        """
+        kind = self.statement_timeout
+        if kind is None:
+            detail = request.method == 'GET' and 'kf_id' in request.view_args
+            kind = 'detail' if detail else 'default'
+        timeout = current_app.config['STATEMENT_TIMEOUTS'][kind]
+        db.session.execute('SET LOCAL statement_timeout = {:d}'
+                           .format(timeout))
+        # Later transactions of the request get the timeout when they begin
+        g.statement_timeout = timeout
+
     def send_sns(self, resp):
         """
         Send an event to SNS containing the response if:
@@ -229,15 +317,44 @@ class CRUDView(MethodView):
         if meth not in ['post', 'patch', 'put', 'delete']:
             return
 
+        # Encode the data the response was encoded from rather than decoding
+        # the response. Its keys are sorted as they are in the response body.
+        data = getattr(resp, 'payload', None)
+        if data is None:
+            data = json.loads(resp.data.decode('utf8'))
+        else:
+            data = _sort_keys(data)
         message = {'default': json.dumps({
             'path': request.path,
             'method': meth,
             'api_version': current_app.config['PKG_VERSION'],
             'api_commit': current_app.config['GIT_COMMIT'],
-            'data': json.loads(resp.data.decode('utf8'))
-        })}
+            'data': data
+        }, cls=current_app.json_encoder)}
 
-        client = boto3.client('sns', region_name='us-east-1')
+        client = sns_client()
         client.publish(TopicArn=arn,
                        MessageStructure='json',
                        Message=json.dumps(message))
+
+
+def _sort_keys(value):
+    """
+    Copy data with the keys of each of its dicts in sorted order
+    """
+    if isinstance(value, dict):
+        return {k: _sort_keys(value[k]) for k in sorted(value)}
+    if isinstance(value, (list, tuple)):
+        return [_sort_keys(v) for v in value]
+    return value
+
+
+@event.listens_for(db.session, 'after_begin')
+def reset_statement_timeout(session, transaction, connection):
+    """
+    Set the statement timeout of the request in transactions that begin
+    after the view committed, as SET LOCAL ends with the transaction
+    """
+    if has_app_context() and 'statement_timeout' in g:
+        connection.execute('SET LOCAL statement_timeout = {:d}'
+                           .format(g.statement_timeout))
@@ -0,0 +1,104 @@
+"""
+Visibility changes of an entity and the entities below it
+
+Hiding or releasing a study, a participant or a biospecimen applies the same
+`visible`, `visibility_reason` and `visibility_comment` to every entity below
+it with one statement per table, rather than patching each entity. Entities
+below participants are found through their study parents, see
+`dataservice.api.common.study_scope`, so a statement may update a table from
+the tables above it. Entities that may be shared by studies, such as
+families, read groups, sequencing experiments and tasks, are not changed.
+Genomic files and their links change with every study that the file's
+biospecimens belong to.
+"""
+from flask import abort, request
+from marshmallow import ValidationError
+from sqlalchemy import and_, or_
+
+from dataservice.extensions import db
+from dataservice.api.common.schemas import VisibilitySchema
+from dataservice.api.common.study_scope import scoped_below
+
+# Tables of the entities directly below a study
+STUDY_TABLES = ['study_file', 'participant']
+
+
+def visibility_targets(model, kf_id):
+    """
+    Criteria for an entity and each table of entities below it
+
+    :param model: The model of the entity
+    :param kf_id: The kf_id of the entity
+    :returns: A list of (table, criterion) tuples
+    """
+    table_name = model.__tablename__
+    targets = [(model.__table__, model.__table__.c.kf_id == kf_id)]
+    if table_name == 'study':
+        for name in STUDY_TABLES:
+            table = db.metadata.tables[name]
+            targets.append((table, table.c.study_id == kf_id))
+    return targets + [(m.__table__, criterion)
+                      for m, criterion in scoped_below(table_name, kf_id)]
+
+
+def set_visibility(model, kf_id, visible, visibility_reason=None,
+                   visibility_comment=None):
+    """
+    Set the visibility of an entity and the entities below it
+
+    Only entities whose visibility differs are updated, so their
+    modified_at is bumped and they appear in change feeds. The caller is
+    responsible for committing the session.
+
+    :param model: The model of the entity
+    :param kf_id: The kf_id of the entity
+    :param visible: Whether the entities are visible
+    :param visibility_reason: Justification for the visibility
+    :param visibility_comment: Details of the visibility reason
+    :returns: The number of entities updated, keyed by table
+    """
+    values = {'visible': visible,
+              'visibility_reason': visibility_reason,
+              'visibility_comment': visibility_comment}
+
+    # Write pending changes so the statements below see them
+    db.session.flush()
+
+    updated = {}
+    for table, criterion in visibility_targets(model, kf_id):
+        differs = or_(*[table.c[key].is_distinct_from(value)
+                        for key, value in values.items()])
+        result = db.session.execute(
+            table.update().where(and_(criterion, differs)).values(**values))
+        updated[table.name] = result.rowcount
+    return updated
+
+
+def visibility_response(model, kf_id):
+    """
+    Apply the visibility change in the body of a request to an entity and
+    the entities below it
+
+    :param model: The model of the entity
+    :param kf_id: The kf_id of the entity
+    :returns: A response with the change and the number of entities updated
+    in each table
+    """
+    resource = model.__tablename__.replace('_', ' ')
+    if model.query.get(kf_id) is None:
+        abort(404, 'could not find {} `{}`'.format(resource, kf_id))
+
+    body = request.get_json(force=True)
+    try:
+        change = VisibilitySchema(strict=True).load(body).data
+    except ValidationError as err:
+        abort(400, 'could not update visibility: {}'.format(err.messages))
+
+    change['updated'] = set_visibility(model, kf_id, **change)
+    db.session.commit()
+
+    total = sum(change['updated'].values())
+    return VisibilitySchema(
+        200, 'visibility of {} entities updated for {} {}'
+        .format(total, resource, kf_id)
+    ).jsonify(change), 200
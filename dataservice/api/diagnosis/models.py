@@ -1,9 +1,10 @@
 
 from dataservice.extensions import db
 from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.study_scope import StudyScopedMixin
 
 
-class Diagnosis(db.Model, Base):
+class Diagnosis(db.Model, Base, StudyScopedMixin):
     """
     Diagnosis entity.
 
@@ -11,6 +11,7 @@ from dataservice.api.diagnosis.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
 
 
 class DiagnosisListAPI(CRUDView):
@@ -43,15 +44,13 @@ class DiagnosisListAPI(CRUDView):
         biospecimen_id = filter_params.pop('biospecimen_id', None)
 
         # Apply entity filter params
-        q = Diagnosis.query.filter_by(**filter_params)
+        q = apply_filters(Diagnosis.query, Diagnosis, filter_params)
 
         # Apply study_id filter and biospecimen_id filter
-        from dataservice.api.participant.models import Participant
         from dataservice.api.biospecimen.models import BiospecimenDiagnosis
 
         if study_id:
-            q = (q.join(Participant.diagnoses)
-                 .filter(Participant.study_id == study_id))
+            q = q.filter(Diagnosis.study_id == study_id)
 
         if biospecimen_id:
             q = (q.join(BiospecimenDiagnosis)
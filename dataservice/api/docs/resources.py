@@ -1,6 +1,15 @@
 import glob
+import gzip
+import hashlib
+import os
+
 from flask.views import View
-from flask import jsonify, current_app, render_template, send_file
+from flask import current_app, render_template, request, send_file
+
+from dataservice.api.common.encoding import encode_json
+
+# Directory of the api package holding the resource READMEs
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 class Documentation(View):
@@ -17,38 +26,87 @@ class Swagger(View):
     """
     Swagger spec resource
 
-    Generates the swagger spec and distributes it through an endpoint
+    Distributes the rendered swagger spec through an endpoint
     """
 
-    def __init__(self, **kwargs):
-        super(Swagger, self).__init__(**kwargs)
-        self.spec = None
-
     def dispatch_request(self):
         """
-        Creates the spec and augments it with resource descriptions from
-        loading in READMEs inside each resource's directory.
+        Serve the spec rendered once per process, gzipped if the client
+        accepts it
 
-        Will only generate the spec once, then cache it.
+        Clients may revalidate with the spec's ETag.
         """
-        if self.spec:
-            return jsonify(self.spec)
-
-        self.spec = current_app.spec.to_dict()
-        with open('dataservice/api/README.md') as f:
-            self.spec['info']['description'] = f.read()
-
-        tags = []
-        for d in glob.glob('dataservice/api/*/README.md'):
-            name = d.split('/')[-2].replace('_', ' ')
-            name = name.title().replace(' ', '')
-            tag = {
-                'name': name,
-                'description': open(d, 'r').read()
-            }
-            tags.append(tag)
-
-        self.spec['tags'] = tags
-        self.spec['info']['x-logo'] = {'url': '/logo'}
-
-        return jsonify(self.spec)
+        spec = rendered_spec(current_app)
+        if 'gzip' in request.accept_encodings:
+            resp = current_app.response_class(
+                spec.gzipped, mimetype=current_app.config['JSONIFY_MIMETYPE'])
+            resp.headers['Content-Encoding'] = 'gzip'
+            resp.set_etag(spec.etag + '-gzip')
+        else:
+            resp = current_app.response_class(
+                spec.body, mimetype=current_app.config['JSONIFY_MIMETYPE'])
+            resp.set_etag(spec.etag)
+        resp.vary.add('Accept-Encoding')
+        return resp.make_conditional(request)
+
+
+class RenderedSpec(object):
+    """
+    An encoded swagger spec
+
+    :param body: The spec encoded as JSON
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self.gzipped = gzip.compress(body)
+        self.etag = hashlib.md5(body).hexdigest()
+
+
+def build_spec(app):
+    """
+    Create the spec of an app and augment it with resource descriptions from
+    the READMEs inside each resource's directory
+
+    :param app: The app to create the spec of
+    :returns: The spec as a dict
+    """
+    from dataservice import get_spec
+
+    spec = get_spec(app).to_dict()
+    with open(os.path.join(API_DIR, 'README.md')) as f:
+        spec['info']['description'] = f.read()
+
+    tags = []
+    for d in sorted(glob.glob(os.path.join(API_DIR, '*', 'README.md'))):
+        name = d.split(os.sep)[-2].replace('_', ' ')
+        name = name.title().replace(' ', '')
+        with open(d) as f:
+            tags.append({'name': name, 'description': f.read()})
+
+    spec['tags'] = tags
+    spec['info']['x-logo'] = {'url': '/logo'}
+    return spec
+
+
+def rendered_spec(app):
+    """
+    Get the encoded spec of an app, rendering it on first use
+
+    The spec is loaded from the file at SWAGGER_SPEC_PATH if one was written
+    by `flask build-spec`, otherwise it is built from the app.
+
+    :param app: The app to get the spec of
+    :returns: A RenderedSpec
+    """
+    spec = getattr(app, 'rendered_spec', None)
+    if spec is None:
+        path = app.config.get('SWAGGER_SPEC_PATH')
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                body = f.read()
+        else:
+            with app.app_context():
+                body = encode_json(build_spec(app))
+        spec = app.rendered_spec = RenderedSpec(body)
+    return spec
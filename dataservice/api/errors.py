@@ -11,6 +11,8 @@ UNIQUE_RE = re.compile('^.*"(?P<key>.*)_key"\n' +
                        '\((?P<kf_id>.*)\) already exists\.')
 UNIQUE_COL_RE = re.compile('^.*\((?P<columns>[^)]+)\)='
                            '\((?P<values>[^)]+)\) already exists\.')
+# Postgres error code of a statement cancelled by the statement_timeout
+QUERY_CANCELED = '57014'
 
 
 class DatabaseValidationError(Exception):
@@ -64,6 +66,23 @@ def handle_filter_validation_error(e):
     return data, code
 
 
+def operational_error(e):
+    """
+    Handles OperationalError exceptions raised by SQLAlchemy
+
+    Statements cancelled by the request's statement_timeout are reported as
+    a 504, all other errors are raised again.
+    """
+    db.session.rollback()
+    if getattr(e.orig, 'pgcode', None) != QUERY_CANCELED:
+        raise e
+
+    data = {'code': 504,
+            'description': 'the request took too long to complete, try '
+                           'requesting fewer results'}
+    return ErrorSchema().jsonify(data), data['code']
+
+
 def integrity_error(e):
     """
     Handles IntegrityError exceptions raised by SQLAlchemy.
@@ -2,6 +2,7 @@ from sqlalchemy import event
 
 from dataservice.extensions import db
 from dataservice.api.common.model import Base
+from dataservice.api.tombstone.models import bulk_delete, orphan_studies
 from dataservice.api.participant.models import Participant
 
 
@@ -27,4 +28,4 @@ class Family(db.Model, Base):
 def delete_orphans(mapper, connection, state):
     q = (db.session.query(Family)
          .filter(~Family.participants.any()))
-    q.delete(synchronize_session='fetch')
+    bulk_delete(Family, q, orphan_studies(Family))
@@ -9,6 +9,7 @@ from dataservice.api.family.models import Family
 from dataservice.api.family.schemas import FamilySchema
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
 
 
 class FamilyListAPI(CRUDView):
@@ -36,8 +37,7 @@ class FamilyListAPI(CRUDView):
         # Get study id and remove from model filter params
         study_id = filter_params.pop('study_id', None)
 
-        q = (Family.query
-             .filter_by(**filter_params))
+        q = apply_filters(Family.query, Family, filter_params)
 
         # Filter by study
         from dataservice.api.participant.models import Participant
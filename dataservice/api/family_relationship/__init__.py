@@ -4,3 +4,9 @@ from dataservice.api.family_relationship.resources import (
 from dataservice.api.family_relationship.resources import (
     FamilyRelationshipListAPI
 )
+from dataservice.api.family_relationship.resources import (
+    FamilyPedigreeAPI
+)
+from dataservice.api.family_relationship.resources import (
+    ParticipantPedigreeAPI
+)
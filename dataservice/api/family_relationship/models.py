@@ -3,6 +3,7 @@ from sqlalchemy import event, or_
 
 from dataservice.extensions import db
 from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.filters import apply_filters
 from dataservice.api.participant.models import Participant
 
 REVERSE_RELS = {
@@ -53,6 +54,7 @@ class FamilyRelationship(db.Model, Base):
         KfId(),
         db.ForeignKey('participant.kf_id'),
         nullable=False,
+        index=True,
         doc='kf_id of the other participant in the relationship')
 
     participant1_to_participant2_relation = db.Column(db.Text(),
@@ -94,7 +96,8 @@ class FamilyRelationship(db.Model, Base):
         # Apply model property filter params
         if model_filter_params is None:
             model_filter_params = {}
-        q = FamilyRelationship.query.filter_by(**model_filter_params)
+        q = apply_filters(FamilyRelationship.query, FamilyRelationship,
+                          model_filter_params)
 
         # Get family relationships and join with participants
         q = q.join(Participant, or_(FamilyRelationship.participant1,
@@ -121,6 +124,25 @@ class FamilyRelationship(db.Model, Base):
 
         return q
 
+    @classmethod
+    def query_pedigree(cls, participant_ids, *entities):
+        """
+        Find all family relationships involving any of the participants
+
+        :param participant_ids: Kids First IDs of the participants, may be a
+        list or a query selecting participant kf_ids
+        :param entities: Columns to select, defaults to the whole
+        FamilyRelationship
+
+        The relationships are found with a UNION of the lookups on each
+        participant column, rather than an OR join on the participant table,
+        so that each side is served by its own index.
+        """
+        entities = entities or (cls,)
+        q = db.session.query(*entities)
+        return (q.filter(cls.participant1_id.in_(participant_ids))
+                .union(q.filter(cls.participant2_id.in_(participant_ids))))
+
     def __repr__(self):
         return '<{} is {} of {}>'.format(
             self.participant1.kf_id,
@@ -1,13 +1,17 @@
 from flask import abort, request
+from sqlalchemy import or_
 from marshmallow import ValidationError
 from webargs.flaskparser import use_args
 
 from dataservice.extensions import db
 from dataservice.api.common.pagination import paginated, Pagination
+from dataservice.api.family.models import Family
+from dataservice.api.participant.models import Participant
 from dataservice.api.family_relationship.models import FamilyRelationship
 from dataservice.api.family_relationship.schemas import (
     FamilyRelationshipSchema,
-    FamilyRelationshipFilterSchema
+    FamilyRelationshipFilterSchema,
+    PedigreeSchema
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
@@ -172,3 +176,141 @@ class FamilyRelationshipAPI(CRUDView):
 
         return FamilyRelationshipSchema(200, 'family_relationship {} deleted'
                                         .format(fr.kf_id)).jsonify(fr), 200
+
+
+class FamilyPedigreeAPI(CRUDView):
+    """
+    Family pedigree API
+    """
+    endpoint = 'family_pedigree'
+    rule = '/families/<string:kf_id>/pedigree'
+    schemas = {'Pedigree': PedigreeSchema}
+    # Reads the relationships of a whole family
+    statement_timeout = 'default'
+
+    def get(self, kf_id):
+        """
+        Get the pedigree of a family
+
+        Returns all participants of the family and the family relationships
+        they are part of as a graph of nodes and edges
+        ---
+        description: Get the pedigree of a family
+        tags:
+        - FamilyRelationship
+        parameters:
+        - name: kf_id
+          in: path
+          description: ID of the Family
+          required: true
+          type: string
+        responses:
+          200:
+            description: Pedigree found
+            schema:
+              $ref: '#/definitions/PedigreeResponse'
+          404:
+            description: Family not found
+            schema:
+              $ref: '#/definitions/NotFoundErrorResponse'
+        """
+        if Family.query.get(kf_id) is None:
+            abort(404, 'could not find {} `{}`'.format('family', kf_id))
+
+        return PedigreeSchema().jsonify(build_pedigree(family_id=kf_id))
+
+
+class ParticipantPedigreeAPI(CRUDView):
+    """
+    Participant pedigree API
+    """
+    endpoint = 'participant_pedigree'
+    rule = '/participants/<string:kf_id>/pedigree'
+    schemas = {'Pedigree': PedigreeSchema}
+    # Reads the relationships of a whole family
+    statement_timeout = 'default'
+
+    def get(self, kf_id):
+        """
+        Get the pedigree of a participant
+
+        Returns the pedigree of the participant's family. If the participant
+        does not have a family, only the participant's direct family
+        relationships are returned.
+        ---
+        description: Get the pedigree of a participant
+        tags:
+        - FamilyRelationship
+        parameters:
+        - name: kf_id
+          in: path
+          description: ID of the Participant
+          required: true
+          type: string
+        responses:
+          200:
+            description: Pedigree found
+            schema:
+              $ref: '#/definitions/PedigreeResponse'
+          404:
+            description: Participant not found
+            schema:
+              $ref: '#/definitions/NotFoundErrorResponse'
+        """
+        pt = Participant.query.get(kf_id)
+        if pt is None:
+            abort(404, 'could not find {} `{}`'.format('participant', kf_id))
+
+        if pt.family_id:
+            pedigree = build_pedigree(family_id=pt.family_id)
+        else:
+            pedigree = build_pedigree(participant_id=kf_id)
+
+        return PedigreeSchema().jsonify(pedigree)
+
+
+def build_pedigree(family_id=None, participant_id=None):
+    """
+    Collect the participants and family relationships of a pedigree
+
+    :param family_id: Kids First ID of the family. All members of the family
+    and their relationships are collected.
+    :param participant_id: Kids First ID of a participant. Used when there is
+    no family and only the participant's direct relationships are collected.
+    :returns: dict with the family_id, nodes and edges of the pedigree
+    """
+    if family_id:
+        members = (db.session.query(Participant.kf_id)
+                   .filter(Participant.family_id == family_id))
+    else:
+        members = [participant_id]
+
+    edges = sorted(
+        FamilyRelationship.query_pedigree(
+            members,
+            FamilyRelationship.kf_id,
+            FamilyRelationship.participant1_id,
+            FamilyRelationship.participant2_id,
+            FamilyRelationship.participant1_to_participant2_relation,
+            FamilyRelationship.participant2_to_participant1_relation),
+        key=lambda e: e.kf_id)
+
+    # Relatives outside of the family are included as nodes too
+    node_ids = {pid for e in edges
+                for pid in (e.participant1_id, e.participant2_id)}
+    if family_id:
+        node_filter = or_(Participant.family_id == family_id,
+                          Participant.kf_id.in_(node_ids))
+    else:
+        node_filter = Participant.kf_id.in_(node_ids | {participant_id})
+    nodes = (db.session.query(Participant.kf_id,
+                              Participant.external_id,
+                              Participant.family_id,
+                              Participant.is_proband,
+                              Participant.affected_status,
+                              Participant.gender)
+             .filter(node_filter)
+             .order_by(Participant.kf_id)
+             .all())
+
+    return {'family_id': family_id, 'nodes': nodes, 'edges': edges}
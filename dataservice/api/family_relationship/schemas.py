@@ -1,7 +1,10 @@
 from marshmallow_sqlalchemy import field_for
+from flask import url_for
+from flask_marshmallow import Schema
 from marshmallow import (
     fields,
-    validates
+    validates,
+    post_dump
 )
 
 from dataservice.api.family_relationship.models import FamilyRelationship
@@ -41,3 +44,51 @@ class FamilyRelationshipFilterSchema(FamilyRelationshipSchema):
     @validates('participant_id')
     def valid_participant_id(self, value):
         validate_kf_id('PT', value)
+
+
+class PedigreeNodeSchema(Schema):
+    kf_id = fields.Str(example='PT_B048J5')
+    external_id = fields.Str()
+    family_id = fields.Str(example='FM_B048J5')
+    is_proband = fields.Bool()
+    affected_status = fields.Bool()
+    gender = fields.Str()
+
+
+class PedigreeEdgeSchema(Schema):
+    kf_id = fields.Str(example='FR_B048J5')
+    source = fields.Str(attribute='participant1_id', example='PT_B048J5',
+                        description='kf_id of participant1')
+    target = fields.Str(attribute='participant2_id', example='PT_B048J6',
+                        description='kf_id of participant2')
+    relation = fields.Str(attribute='participant1_to_participant2_relation',
+                          example='Mother',
+                          description='Relation of source to target')
+    reverse_relation = fields.Str(
+        attribute='participant2_to_participant1_relation',
+        example='Child', description='Relation of target to source')
+
+
+class PedigreeSchema(Schema):
+    """
+    The participants of a family and the directed relationships between them
+    """
+    family_id = fields.Str(example='FM_B048J5')
+    nodes = fields.List(fields.Nested(PedigreeNodeSchema))
+    edges = fields.List(fields.Nested(PedigreeEdgeSchema))
+
+    def __init__(self, code=200, message='success', *args, **kwargs):
+        self.status_code = code
+        self.status_message = message
+        super(PedigreeSchema, self).__init__(*args, **kwargs)
+
+    @post_dump(pass_many=False)
+    def wrap_envelope(self, data):
+        _links = {}
+        if data.get('family_id'):
+            _links['family'] = url_for('api.families',
+                                       kf_id=data['family_id'])
+        return {'_status': {'message': self.status_message,
+                            'code': self.status_code},
+                'results': data,
+                '_links': _links}
@@ -1,5 +1,6 @@
 from dataservice.extensions import db
 from dataservice.api.common.model import Base, IndexdFile, KfId
+from dataservice.api.common.study_scope import StudyScopedMixin
 from dataservice.api.task.models import (
     TaskGenomicFile
 )
@@ -12,7 +13,7 @@ from dataservice.api.sequencing_experiment.models import (
 )
 
 
-class GenomicFile(db.Model, Base, IndexdFile):
+class GenomicFile(db.Model, Base, IndexdFile, StudyScopedMixin):
     """
     GenomicFile entity.
 
@@ -62,6 +63,7 @@ class GenomicFile(db.Model, Base, IndexdFile):
     """
     __tablename__ = 'genomic_file'
     __prefix__ = 'GF'
+    __study_parent__ = ('kf_id', 'biospecimen_genomic_file.genomic_file_id')
 
     external_id = db.Column(db.Text(),
                             doc='external id used by contributor')
@@ -12,6 +12,8 @@ from dataservice.api.genomic_file.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
+from dataservice.api.common.study_scope import files_in_study
 
 
 class GenomicFileListAPI(CRUDView):
@@ -47,21 +49,14 @@ class GenomicFileListAPI(CRUDView):
         biospecimen_id = filter_params.pop('biospecimen_id', None)
 
         # Apply model filter params
-        q = (GenomicFile.query
-             .filter_by(**filter_params))
+        q = apply_filters(GenomicFile.query, GenomicFile, filter_params)
 
         # Filter by study
-        from dataservice.api.participant.models import Participant
-        from dataservice.api.biospecimen.models import Biospecimen
         from dataservice.api.biospecimen_genomic_file.models import (
             BiospecimenGenomicFile
         )
         if study_id:
-            q = (q.join(GenomicFile.biospecimen_genomic_files)
-                 .join(BiospecimenGenomicFile.biospecimen)
-                 .join(Biospecimen.participant)
-                 .filter(Participant.study_id == study_id)
-                 .group_by(GenomicFile.kf_id))
+            q = q.filter(files_in_study(GenomicFile.kf_id, study_id))
 
         from dataservice.api.read_group.models import ReadGroupGenomicFile
         from dataservice.api.sequencing_experiment.models import (
@@ -77,13 +72,9 @@ class GenomicFileListAPI(CRUDView):
         if read_group_id:
             q = (q.join(ReadGroupGenomicFile)
                  .filter(ReadGroupGenomicFile.read_group_id == read_group_id))
-        if biospecimen_id and not study_id:
+        if biospecimen_id:
             q = (q.join(BiospecimenGenomicFile).filter(
                  BiospecimenGenomicFile.biospecimen_id == biospecimen_id))
-        # This check is to remove duplicate join on biospecimen genomic file
-        if biospecimen_id and study_id:
-            q = (q.filter(
-                 BiospecimenGenomicFile.biospecimen_id == biospecimen_id))
         pager = indexd_pagination(q, after, limit)
 
         return (GenomicFileSchema(many=True)
@@ -12,6 +12,7 @@ from dataservice.api.investigator.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
 
 
 class InvestigatorListAPI(CRUDView):
@@ -39,8 +40,7 @@ class InvestigatorListAPI(CRUDView):
         # Get study id and remove from model filter params
         study_id = filter_params.pop('study_id', None)
 
-        q = (Investigator.query
-             .filter_by(**filter_params))
+        q = apply_filters(Investigator.query, Investigator, filter_params)
 
         # Filter by study
         from dataservice.api.study.models import Study
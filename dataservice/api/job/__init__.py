@@ -0,0 +1,2 @@
+from dataservice.api.job.resources import JobAPI
+from dataservice.api.job.resources import JobListAPI
@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, and_, or_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm.attributes import set_committed_value
+
+from dataservice.extensions import db
+from dataservice.api.common.model import IDMixin, TimestampMixin
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+JOB_STATUS_ENUM = {QUEUED, RUNNING, SUCCEEDED, FAILED}
+
+
+class Job(db.Model, IDMixin, TimestampMixin):
+    """
+    A long running operation run by a worker outside of the API's requests
+
+    Jobs are queued in the database and claimed by `flask worker` processes
+    with SELECT ... FOR UPDATE SKIP LOCKED, so several workers may share
+    the queue without an external broker. A worker keeps the heartbeat of
+    the job it runs up to date, and jobs whose heartbeat is older than
+    JOB_LEASE_SECONDS are claimed again, as their worker has died, if they
+    have attempts left.
+
+    :param kf_id: Unique id given by the Kid's First DCC
+    :param type: The kind of job, which selects the function that runs it
+    :param params: Parameters of the job
+    :param status: One of queued, running, succeeded or failed
+    :param progress: Fraction of the job that is done, from 0 to 1
+    :param result: Summary of the job's outcome once it succeeded
+    :param result_location: Where the output of the job may be found, such
+    as a path of the API
+    :param error: Error of the last failed attempt
+    :param attempts: Number of times the job was started
+    :param max_attempts: Number of times the job is started before it is
+    failed, failed attempts are retried after JOB_RETRY_DELAY seconds,
+    doubled with each attempt
+    :param run_at: Time before which the job is not run
+    :param started_at: Time the last attempt started
+    :param finished_at: Time the job succeeded or failed
+    :param heartbeat_at: Time the worker running the job last reported
+    :param worker: Name of the worker that last claimed the job
+    """
+    __tablename__ = 'job'
+    __prefix__ = 'JB'
+    __table_args__ = (db.Index('ix_job_status_run_at', 'status', 'run_at'),)
+
+    type = db.Column(db.Text(), nullable=False,
+                     doc='The kind of job')
+    params = db.Column(JSONB(), nullable=False, default=dict,
+                       doc='Parameters of the job')
+    status = db.Column(db.Text(), nullable=False, default=QUEUED,
+                       doc='One of queued, running, succeeded or failed')
+    progress = db.Column(db.Float(), nullable=False, default=0,
+                         doc='Fraction of the job that is done')
+    result = db.Column(JSONB(),
+                       doc='Summary of the outcome of the job')
+    result_location = db.Column(db.Text(),
+                                doc='Where the output of the job may be '
+                                'found')
+    error = db.Column(db.Text(),
+                      doc='Error of the last failed attempt')
+    attempts = db.Column(db.Integer(), nullable=False, default=0,
+                         doc='Number of times the job was started')
+    max_attempts = db.Column(db.Integer(), nullable=False, default=1,
+                             server_default='1',
+                             doc='Number of times the job is started '
+                             'before it is failed')
+    run_at = db.Column(db.DateTime(), nullable=False, default=datetime.now,
+                       doc='Time before which the job is not run')
+    started_at = db.Column(db.DateTime(),
+                           doc='Time the last attempt started')
+    finished_at = db.Column(db.DateTime(),
+                            doc='Time the job succeeded or failed')
+    heartbeat_at = db.Column(db.DateTime(),
+                             doc='Time the worker running the job last '
+                             'reported')
+    worker = db.Column(db.Text(),
+                       doc='Name of the worker that last claimed the job')
+
+    @classmethod
+    def claim(cls, worker):
+        """
+        Claim the next job that is due, or whose worker has died, and commit
+        it as running
+
+        Jobs whose worker died on their last attempt are failed rather than
+        claimed, so a job that kills its worker is not run forever.
+
+        :param worker: Name of the claiming worker
+        :returns: The claimed Job or None if there is none to run
+        """
+        table = cls.__table__
+        now = datetime.now()
+        lease = timedelta(seconds=current_app.config['JOB_LEASE_SECONDS'])
+        expired = and_(table.c.status == RUNNING,
+                       table.c.heartbeat_at < now - lease)
+        db.session.execute(
+            table.update()
+            .where(and_(expired, table.c.attempts >= table.c.max_attempts))
+            .values(status=FAILED, finished_at=now,
+                    error='the worker of the last attempt stopped '
+                    'reporting'))
+        due = (select([table.c.kf_id])
+               .where(or_(
+                   and_(table.c.status == QUEUED, table.c.run_at <= now),
+                   and_(expired,
+                        table.c.attempts < table.c.max_attempts)))
+               .order_by(table.c.run_at)
+               .limit(1)
+               .with_for_update(skip_locked=True))
+        kf_id = db.session.execute(
+            table.update()
+            .where(table.c.kf_id == due.as_scalar())
+            .values(status=RUNNING, attempts=table.c.attempts + 1,
+                    started_at=now, heartbeat_at=now, worker=worker,
+                    error=None)
+            .returning(table.c.kf_id)).scalar()
+        db.session.commit()
+        if kf_id is None:
+            return None
+        return cls.query.get(kf_id)
+
+    def record_outcome(self, worker, attempts, **values):
+        """
+        Record the outcome of a worker's attempt at the job in the session's
+        transaction, unless the job was claimed again since the attempt
+        started
+
+        :param worker: Name of the worker that made the attempt
+        :param attempts: Number of attempts of the job when it was claimed
+        :param values: Columns of the job to update
+        :returns: True if the attempt was still the job's current attempt
+        """
+        table = self.__table__
+        kf_id = db.session.execute(
+            table.update()
+            .where(and_(table.c.kf_id == self.kf_id,
+                        table.c.status == RUNNING,
+                        table.c.worker == worker,
+                        table.c.attempts == attempts))
+            .values(**values)
+            .returning(table.c.kf_id)).scalar()
+        return kf_id is not None
+
+    def report_progress(self, done, total):
+        """
+        Record the progress of a running job
+
+        The progress is written in its own transaction so that it may be
+        seen while the job's own changes are not yet committed.
+
+        :param done: Number of steps of the job that are done
+        :param total: Number of steps of the job
+        """
+        progress = min(done / total, 1.0) if total else 1.0
+        self.heartbeat(self.kf_id, progress=progress)
+        set_committed_value(self, 'progress', progress)
+
+    @classmethod
+    def heartbeat(cls, kf_id, **values):
+        """
+        Record that the worker of a job is still running it, in its own
+        transaction
+
+        :param kf_id: The kf_id of the job
+        :param values: Other columns of the job to update
+        """
+        table = cls.__table__
+        with db.engine.begin() as connection:
+            connection.execute(
+                table.update()
+                .where(table.c.kf_id == kf_id)
+                .values(heartbeat_at=datetime.now(), **values))
+
+    def __repr__(self):
+        return '<Job {} {} {}>'.format(self.kf_id, self.type, self.status)
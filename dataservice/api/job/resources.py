@@ -0,0 +1,124 @@
+from flask import abort, request
+from marshmallow import ValidationError
+
+from dataservice.extensions import db
+from dataservice.api.common.pagination import paginated, Pagination
+from dataservice.api.common.views import CRUDView
+from dataservice.api.job.models import Job
+from dataservice.api.job.schemas import JobSchema
+
+
+class JobListAPI(CRUDView):
+    """
+    Job REST API
+    """
+    endpoint = 'jobs_list'
+    rule = '/jobs'
+    schemas = {'Job': JobSchema}
+
+    @paginated
+    def get(self, after, limit):
+        """
+        Get all jobs
+        ---
+        description: Get all jobs
+        tags:
+        - Job
+        parameters:
+        - name: status
+          in: query
+          type: string
+          description: Only return jobs with this status
+        - name: type
+          in: query
+          type: string
+          description: Only return jobs of this type
+        - name: study_id
+          in: query
+          type: string
+          description: Only return jobs with this study_id param, such as
+            the job that creates the bucket of a study
+        - name: after
+          in: query
+          type: string
+          description: Time after which jobs were created
+        - name: after_uuid
+          in: query
+          type: string
+          description: uuid of the last job returned at the `after` time
+        - name: limit
+          in: query
+          type: integer
+          description: Maximum number of jobs to return
+        responses:
+          200:
+            description: Jobs found
+            schema:
+              $ref: '#/definitions/JobPaginated'
+        """
+        filters = {k: request.args[k] for k in ['status', 'type']
+                   if k in request.args}
+        q = Job.query.filter_by(**filters)
+        if 'study_id' in request.args:
+            q = q.filter(Job.params['study_id'].astext ==
+                         request.args['study_id'])
+
+        return (JobSchema(many=True)
+                .jsonify(Pagination(q, after, limit)))
+
+    def post(self):
+        """
+        Queue a new job
+
+        The job is run by a `flask worker` process. Follow its `self` link
+        to check on its status and progress, and to find its result once
+        it succeeded.
+        ---
+        template:
+          path:
+            new_resource.yml
+          properties:
+            resource:
+              Job
+        """
+        body = request.get_json(force=True)
+
+        # Deserialize
+        try:
+            job = JobSchema(strict=True).load(body).data
+        # Request body not valid
+        except ValidationError as e:
+            abort(400, 'could not create job: {}'.format(e.messages))
+
+        # Add to and save in database
+        db.session.add(job)
+        db.session.commit()
+
+        return JobSchema(201, 'job {} created'
+                         .format(job.kf_id)).jsonify(job), 201
+
+
+class JobAPI(CRUDView):
+    """
+    Job REST API
+    """
+    endpoint = 'jobs'
+    rule = '/jobs/<string:kf_id>'
+    schemas = {'Job': JobSchema}
+
+    def get(self, kf_id):
+        """
+        Get a job by id
+        ---
+        template:
+          path:
+            get_by_id.yml
+          properties:
+            resource:
+              Job
+        """
+        job = Job.query.get(kf_id)
+        if job is None:
+            abort(404, 'could not find {} `{}`'.format('job', kf_id))
+
+        return JobSchema().jsonify(job)
@@ -0,0 +1,87 @@
+from marshmallow import (
+    Schema,
+    fields,
+    validates,
+    validates_schema,
+    ValidationError
+)
+from marshmallow.validate import Length, Range
+
+from dataservice.api.job.models import Job
+from dataservice.api.common.schemas import BaseSchema
+from dataservice.api.common.validation import validate_kf_id
+from dataservice.extensions import ma
+
+
+def validate_sd_kf_id(value):
+    # Study models queue jobs, so are imported when validating
+    from dataservice.api.study.models import Study
+    validate_kf_id(Study.__prefix__, value)
+
+
+class ParamsSchema(Schema):
+    """
+    Params of a job type that clients may queue, unknown params are rejected
+    """
+
+    @validates_schema(pass_original=True)
+    def check_unknown_fields(self, data, original_data):
+        unknown = set(original_data) - set(self.fields)
+        if unknown:
+            raise ValidationError('Unknown field', unknown)
+
+
+class RefreshSummariesParamsSchema(ParamsSchema):
+    study_ids = fields.List(fields.Str(validate=validate_sd_kf_id),
+                            required=True, validate=Length(min=1))
+    include_file_size = fields.Boolean()
+
+
+# Job types that clients may queue with the schemas of their params. Other
+# job types, such as `create_bucket` or refreshing the summaries of every
+# study, are only queued by the dataservice itself.
+CLIENT_JOB_PARAMS = {
+    'refresh_summaries': RefreshSummariesParamsSchema
+}
+
+
+class JobSchema(BaseSchema):
+    params = fields.Dict(example={'study_ids': ['SD_ABB2C104']},
+                         description='Parameters of the job')
+    max_attempts = fields.Integer(validate=Range(min=1),
+                                  description='Number of times the job is '
+                                  'started before it is failed')
+
+    class Meta(BaseSchema.Meta):
+        model = Job
+        resource_url = 'api.jobs'
+        collection_url = 'api.jobs_list'
+        exclude = BaseSchema.Meta.exclude + ('heartbeat_at',)
+        dump_only = BaseSchema.Meta.dump_only + (
+            'status', 'progress', 'result', 'result_location', 'error',
+            'attempts', 'run_at', 'started_at', 'finished_at', 'worker')
+
+    _links = ma.Hyperlinks({
+        'self': ma.URLFor(Meta.resource_url, kf_id='<kf_id>'),
+        'collection': ma.URLFor(Meta.collection_url)
+    }, description='Resource links and pagination')
+
+    # Jobs are not Base entities and have no visibility to validate
+    validate_visibility_reason = None
+
+    @validates('type')
+    def valid_type(self, value):
+        if value not in CLIENT_JOB_PARAMS:
+            types = ', '.join(sorted(CLIENT_JOB_PARAMS))
+            raise ValidationError('Not a valid choice. Must be one of: {}'
+                                  .format(types))
+
+    @validates_schema
+    def valid_params(self, data):
+        schema = CLIENT_JOB_PARAMS.get(data.get('type'))
+        params = data.get('params') or {}
+        if schema is None or not isinstance(params, dict):
+            return
+        errors = schema().validate(params)
+        if errors:
+            raise ValidationError(errors, 'params')
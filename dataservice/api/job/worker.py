@@ -0,0 +1,162 @@
+"""
+Runs queued jobs outside of the API's requests
+
+The function that runs each type of job is registered with `job_handler`.
+It is called with the job and its params and returns a summary of its
+result along with where the job's output may be found, or None:
+
+    @job_handler('refresh_summaries')
+    def refresh_summaries(job, study_ids=None):
+        ...
+        return {'refreshed': study_ids}, None
+
+A handler may report its progress with `job.report_progress(done, total)`.
+It must not change the job itself, the worker records the outcome of the
+job in the same transaction as the handler's last changes.
+
+A job that raises is queued again until it was started `max_attempts`
+times, so handlers of jobs that are retried must be idempotent.
+"""
+import os
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from dataservice.extensions import db
+from dataservice.api.job.models import Job, QUEUED, SUCCEEDED, FAILED
+
+# Functions that run jobs, keyed by job type
+HANDLERS = {}
+
+
+def job_handler(type):
+    """
+    Register the function that runs the jobs of a type
+    """
+    def register(f):
+        HANDLERS[type] = f
+        return f
+    return register
+
+
+def worker_name():
+    """
+    Name of this worker process
+    """
+    return '{}:{}'.format(socket.gethostname(), os.getpid())
+
+
+class Heartbeat(threading.Thread):
+    """
+    Keeps the heartbeat of a running job up to date until stopped
+    """
+
+    def __init__(self, app, kf_id, interval):
+        super(Heartbeat, self).__init__(daemon=True)
+        self.app = app
+        self.kf_id = kf_id
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        with self.app.app_context():
+            while not self.stopped.wait(self.interval):
+                Job.heartbeat(self.kf_id)
+            db.session.remove()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job):
+    """
+    Run a claimed job and record its outcome
+
+    A failed job that has attempts left is queued again, to run after
+    JOB_RETRY_DELAY seconds doubled for each attempt it already made.
+
+    The outcome is only recorded if the job was not claimed by another
+    worker in the meantime, as its lease ran out. Otherwise the attempt's
+    outcome and the handler's changes are discarded.
+
+    :param job: A running Job
+    :returns: True if the job succeeded
+    """
+    app = current_app._get_current_object()
+    kf_id = job.kf_id
+    worker, attempts = job.worker, job.attempts
+    heartbeat = Heartbeat(app, kf_id,
+                          app.config['JOB_LEASE_SECONDS'] / 3)
+    heartbeat.start()
+    try:
+        handler = HANDLERS.get(job.type)
+        if handler is None:
+            raise ValueError('unknown job type {}'.format(job.type))
+        result, location = handler(job, **job.params)
+        if not job.record_outcome(worker, attempts, status=SUCCEEDED,
+                                  progress=1.0, result=result,
+                                  result_location=location,
+                                  finished_at=datetime.now()):
+            return _discard(app, kf_id, attempts)
+        db.session.commit()
+        return True
+    except Exception:
+        app.logger.exception('job {} failed'.format(kf_id))
+        db.session.rollback()
+        job = Job.query.get(kf_id)
+        values = {'error': traceback.format_exc()}
+        if job.attempts < job.max_attempts:
+            delay = app.config['JOB_RETRY_DELAY'] * 2 ** (job.attempts - 1)
+            values.update(status=QUEUED,
+                          run_at=datetime.now() + timedelta(seconds=delay))
+        else:
+            values.update(status=FAILED, finished_at=datetime.now())
+        if not job.record_outcome(worker, attempts, **values):
+            return _discard(app, kf_id, attempts)
+        db.session.commit()
+        return False
+    finally:
+        heartbeat.stop()
+
+
+def _discard(app, kf_id, attempts):
+    """
+    Discard the outcome of an attempt at a job that another worker claimed
+    """
+    app.logger.warning('job {} was claimed by another worker, the outcome '
+                       'of attempt {} is discarded'.format(kf_id, attempts))
+    db.session.rollback()
+    return False
+
+
+def work(burst=False, poll_interval=None, stop=None):
+    """
+    Claim and run jobs one at a time until stopped
+
+    :param burst: Stop once there are no jobs to run
+    :param poll_interval: Seconds to wait between checks of an empty queue,
+    defaults to JOB_POLL_INTERVAL
+    :param stop: A threading.Event that stops the worker once the job it is
+    running is done
+    :returns: The number of jobs run
+    """
+    if poll_interval is None:
+        poll_interval = current_app.config['JOB_POLL_INTERVAL']
+    stop = stop or threading.Event()
+    name = worker_name()
+    count = 0
+    while not stop.is_set():
+        job = Job.claim(name)
+        if job is None:
+            if burst:
+                break
+            stop.wait(poll_interval)
+            continue
+        run_job(job)
+        count += 1
+        db.session.remove()
+    return count
@@ -0,0 +1 @@
+from dataservice.api.kf_id.resources import KfIdReservationAPI
@@ -0,0 +1,58 @@
+from flask import abort, request
+from marshmallow import ValidationError
+
+from dataservice.api.common.model import reserve_kf_ids
+from dataservice.api.common.views import CRUDView
+from dataservice.api.kf_id.schemas import (
+    KfIdReservationSchema,
+    model_for_prefix
+)
+
+
+class KfIdReservationAPI(CRUDView):
+    """
+    kf_id reservation API
+    """
+    endpoint = 'kf_id_reservation'
+    rule = '/ids/reserve'
+    schemas = {'KfIdReservation': KfIdReservationSchema}
+
+    def post(self):
+        """
+        Reserve kf_ids for an entity type
+
+        The reserved kf_ids will not be given to any other entity and may be
+        used as the kf_ids of new entities of the type
+        ---
+        description: Reserve kf_ids for an entity type
+        tags:
+        - KfId
+        parameters:
+        - name: body
+          in: body
+          description: Prefix of the entity type and number of kf_ids
+          required: true
+          schema:
+            $ref: '#/definitions/KfIdReservation'
+        responses:
+          201:
+            description: kf_ids reserved
+            schema:
+              $ref: '#/definitions/KfIdReservationResponse'
+          400:
+            description: Invalid prefix or count
+            schema:
+              $ref: '#/definitions/ClientErrorResponse'
+        """
+        body = request.get_json(force=True)
+        try:
+            reservation = KfIdReservationSchema(strict=True).load(body).data
+        except ValidationError as err:
+            abort(400, 'could not reserve kf_ids: {}'.format(err.messages))
+
+        model = model_for_prefix(reservation['prefix'])
+        reservation['kf_ids'] = reserve_kf_ids(model, reservation['count'])
+
+        return KfIdReservationSchema(
+            201, '{} kf_ids reserved'.format(len(reservation['kf_ids']))
+        ).jsonify(reservation), 201
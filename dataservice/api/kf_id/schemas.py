@@ -0,0 +1,50 @@
+from flask import current_app
+from flask_marshmallow import Schema
+from marshmallow import fields, post_dump, validates, ValidationError
+from marshmallow.validate import Range
+
+from dataservice.api.common.model import Base
+
+
+def model_for_prefix(prefix):
+    """
+    Find the model that uses a kf_id prefix
+
+    :returns: The model or None if no model uses the prefix
+    """
+    for model in Base.__subclasses__():
+        if model.__prefix__ == prefix:
+            return model
+
+
+class KfIdReservationSchema(Schema):
+    prefix = fields.Str(required=True, example='PT',
+                        description='Prefix of the entity to reserve '
+                        'kf_ids for')
+    count = fields.Integer(required=True, load_only=True, example=100,
+                           validate=Range(min=1),
+                           description='Number of kf_ids to reserve')
+    kf_ids = fields.List(fields.Str(), dump_only=True,
+                         example=['PT_B048J5', 'PT_B048J6'])
+
+    def __init__(self, code=200, message='success', *args, **kwargs):
+        self.status_code = code
+        self.status_message = message
+        super(KfIdReservationSchema, self).__init__(*args, **kwargs)
+
+    @validates('prefix')
+    def valid_prefix(self, value):
+        if model_for_prefix(value) is None:
+            raise ValidationError('Not a valid prefix')
+
+    @validates('count')
+    def valid_count(self, value):
+        max_count = current_app.config['MAX_KF_ID_RESERVATION']
+        if value > max_count:
+            raise ValidationError('Must be no more than {}'.format(max_count))
+
+    @post_dump(pass_many=False)
+    def wrap_envelope(self, data):
+        return {'_status': {'message': self.status_message,
+                            'code': self.status_code},
+                'results': data}
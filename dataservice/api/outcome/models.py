@@ -1,8 +1,9 @@
 from dataservice.extensions import db
 from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.study_scope import StudyScopedMixin
 
 
-class Outcome(db.Model, Base):
+class Outcome(db.Model, Base, StudyScopedMixin):
     """
     Outcome entity.
 
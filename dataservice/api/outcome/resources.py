@@ -8,6 +8,7 @@ from dataservice.api.outcome.models import Outcome
 from dataservice.api.outcome.schemas import OutcomeSchema
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
 
 
 class OutcomeListAPI(CRUDView):
@@ -36,13 +37,11 @@ class OutcomeListAPI(CRUDView):
         # Get study id and remove from model filter params
         study_id = filter_params.pop('study_id', None)
 
-        q = Outcome.query.filter_by(**filter_params)
+        q = apply_filters(Outcome.query, Outcome, filter_params)
 
         # Filter by study
-        from dataservice.api.participant.models import Participant
         if study_id:
-            q = (q.join(Participant.outcomes)
-                 .filter(Participant.study_id == study_id))
+            q = q.filter(Outcome.study_id == study_id)
 
         return (OutcomeSchema(many=True)
                 .jsonify(Pagination(q, after, limit)))
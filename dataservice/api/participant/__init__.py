@@ -1,2 +1,4 @@
 from dataservice.api.participant.resources import ParticipantAPI
 from dataservice.api.participant.resources import ParticipantListAPI
+from dataservice.api.participant.resources import ParticipantAliasesAPI
+from dataservice.api.participant.resources import ParticipantVisibilityAPI
@@ -1,9 +1,15 @@
+from collections import Counter, defaultdict
 from itertools import chain
 
-from sqlalchemy import and_, event
+from sqlalchemy import and_, case, event, select
 
 from dataservice.extensions import db
-from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.model import Base, KfId, reserve_kf_ids
+from dataservice.api.tombstone.models import (
+    bulk_delete,
+    orphan_studies,
+    record_tombstones
+)
 from dataservice.api.biospecimen.models import Biospecimen
 from dataservice.api.diagnosis.models import Diagnosis
 from dataservice.api.outcome.models import Outcome
@@ -28,6 +34,126 @@ class AliasGroup(db.Model, Base):
     participants = db.relationship('Participant',
                                    backref='alias_group')
 
+    @classmethod
+    def add_aliases(cls, pairs):
+        """
+        Alias many pairs of participants to each other at once
+
+        Each pair of participant kf_ids is an alias relationship. The pairs
+        and the participants' existing alias groups are resolved into
+        connected components with union-find, and every component becomes a
+        single alias group:
+
+        1) A component where no participant has an alias group gets a new
+        alias group.
+        2) A component that spans existing alias groups is merged into the
+        largest of them and the other groups are deleted.
+
+        The result is applied with a few set based statements instead of
+        updating each participant through the ORM. The caller is responsible
+        for committing the session.
+
+        :param pairs: Iterable of (participant kf_id, participant kf_id)
+        :returns: dict with the number of participants updated, alias groups
+        created and alias groups merged
+        """
+        from dataservice.api.errors import DatabaseValidationError
+
+        pairs = [tuple(pair) for pair in pairs]
+        ids = set(chain.from_iterable(pairs))
+        result = {'participants_updated': 0,
+                  'alias_groups_created': 0,
+                  'alias_groups_merged': 0}
+        if not ids:
+            return result
+
+        # Write pending changes so the statements below see them
+        db.session.flush()
+
+        pt = Participant.__table__
+        group_of = dict(db.session.execute(
+            select([pt.c.kf_id, pt.c.alias_group_id])
+            .where(pt.c.kf_id.in_(ids))).fetchall())
+        missing = ids - set(group_of)
+        if missing:
+            raise DatabaseValidationError(
+                Participant.__tablename__, 'alias',
+                'participants {} do not exist'.format(
+                    ', '.join(sorted(missing))))
+
+        # Other members of the existing alias groups
+        groups = {g for g in group_of.values() if g}
+        if groups:
+            group_of.update(db.session.execute(
+                select([pt.c.kf_id, pt.c.alias_group_id])
+                .where(pt.c.alias_group_id.in_(groups))).fetchall())
+
+        # Union-find over participants
+        parent = {kf_id: kf_id for kf_id in group_of}
+
+        def find(kf_id):
+            while parent[kf_id] != kf_id:
+                parent[kf_id] = parent[parent[kf_id]]
+                kf_id = parent[kf_id]
+            return kf_id
+
+        def union(a, b):
+            parent[find(a)] = find(b)
+
+        for a, b in pairs:
+            union(a, b)
+        group_member = {}
+        for kf_id, g in group_of.items():
+            if g:
+                union(kf_id, group_member.setdefault(g, kf_id))
+
+        components = defaultdict(list)
+        for kf_id in group_of:
+            components[find(kf_id)].append(kf_id)
+
+        # Choose the alias group of each component
+        sizes = Counter(g for g in group_of.values() if g)
+        targets = []
+        new_groups = []
+        merged_groups = set()
+        for members in components.values():
+            existing = {group_of[kf_id] for kf_id in members} - {None}
+            if existing:
+                target = max(sorted(existing), key=lambda g: sizes[g])
+                merged_groups |= existing - {target}
+                targets.append((members, target))
+            elif len(members) > 1:
+                new_groups.append(members)
+        new_group_ids = reserve_kf_ids(cls, len(new_groups))
+        targets.extend(zip(new_groups, new_group_ids))
+
+        assignments = {}
+        for members, target in targets:
+            assignments.update({kf_id: target for kf_id in members
+                                if group_of[kf_id] != target})
+
+        if new_group_ids:
+            db.session.execute(cls.__table__.insert(),
+                               [{'kf_id': g} for g in new_group_ids])
+        if assignments:
+            db.session.execute(
+                pt.update()
+                .where(pt.c.kf_id.in_(assignments))
+                .values(alias_group_id=case(assignments, value=pt.c.kf_id)))
+        if merged_groups:
+            record_tombstones((cls, kf_id, None) for kf_id in merged_groups)
+            db.session.execute(
+                cls.__table__.delete()
+                .where(cls.__table__.c.kf_id.in_(merged_groups)))
+
+        # Objects loaded in the session no longer reflect the database
+        db.session.expire_all()
+
+        result['participants_updated'] = len(assignments)
+        result['alias_groups_created'] = len(new_groups)
+        result['alias_groups_merged'] = len(merged_groups)
+        return result
+
 
 class Participant(db.Model, Base):
     """
@@ -51,6 +177,7 @@ class Participant(db.Model, Base):
     family_id = db.Column(KfId(),
                           db.ForeignKey('family.kf_id'),
                           nullable=True,
+                          index=True,
                           doc='Id for the participants grouped by family')
     is_proband = db.Column(
         db.Boolean(),
@@ -120,11 +247,11 @@ class Participant(db.Model, Base):
 
         # Self belongs to alias group, pt does not
         elif (not pt.alias_group) and (self.alias_group):
-            self.alias_group.particpants.append(pt)
+            self.alias_group.participants.append(pt)
 
         # pt belongs to an alias group, self does not
         elif pt.alias_group and (not self.alias_group):
-            pt.alias_group.particpants.append(self)
+            pt.alias_group.participants.append(self)
 
         # Both particpants belong to two different alias groups
         elif pt.alias_group and self.alias_group:
@@ -173,4 +300,4 @@ class Participant(db.Model, Base):
 def delete_orphans(mapper, connection, state):
     q = (db.session.query(AliasGroup)
          .filter(~AliasGroup.participants.any()))
-    q.delete(synchronize_session='fetch')
+    bulk_delete(AliasGroup, q, orphan_studies(AliasGroup))
@@ -5,12 +5,18 @@ from webargs.flaskparser import use_args
 
 from dataservice.extensions import db
 from dataservice.api.common.pagination import paginated, Pagination
-from dataservice.api.participant.models import Participant
+from dataservice.api.participant.models import Participant, AliasGroup
 from dataservice.api.participant.schemas import (
-    ParticipantSchema
+    ParticipantSchema,
+    ParticipantAliasesSchema
 )
 from dataservice.api.common.views import CRUDView
-from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.schemas import (
+    filter_schema_factory,
+    VisibilitySchema
+)
+from dataservice.api.common.filters import apply_filters
+from dataservice.api.common.visibility import visibility_response
 
 
 class ParticipantListAPI(CRUDView):
@@ -36,7 +42,7 @@ class ParticipantListAPI(CRUDView):
               Participant
         """
         # Apply entity filter params
-        q = (Participant.query.filter_by(**filter_params))
+        q = apply_filters(Participant.query, Participant, filter_params)
 
         return (ParticipantSchema(many=True)
                 .jsonify(Pagination(q, after, limit)))
@@ -144,3 +150,105 @@ class ParticipantAPI(CRUDView):
         return ParticipantSchema(
             200, 'participant {} deleted'.format(p.kf_id)
         ).jsonify(p), 200
+
+
+class ParticipantAliasesAPI(CRUDView):
+    """
+    Participant aliases API
+    """
+    endpoint = 'participant_aliases'
+    rule = '/participants/aliases'
+    schemas = {'ParticipantAliases': ParticipantAliasesSchema}
+    statement_timeout = 'bulk'
+
+    def post(self):
+        """
+        Alias pairs of participants to each other
+
+        All participants that are connected through the pairs, or through
+        their existing alias groups, are put into a single alias group.
+        ---
+        description: Alias pairs of participants to each other
+        tags:
+        - Participant
+        parameters:
+        - name: body
+          in: body
+          description: Pairs of participant kf_ids
+          required: true
+          schema:
+            $ref: '#/definitions/ParticipantAliases'
+        responses:
+          200:
+            description: Aliases added
+            schema:
+              $ref: '#/definitions/ParticipantAliasesResponse'
+          400:
+            description: Invalid participants
+            schema:
+              $ref: '#/definitions/ClientErrorResponse'
+        """
+        body = request.get_json(force=True)
+        try:
+            pairs = ParticipantAliasesSchema(strict=True).load(body).data
+        except ValidationError as err:
+            abort(400, 'could not alias participants: {}'
+                  .format(err.messages))
+
+        result = AliasGroup.add_aliases(pairs['aliases'])
+        db.session.commit()
+
+        return ParticipantAliasesSchema(
+            200, '{} participants aliased'
+            .format(result['participants_updated'])
+        ).jsonify(result), 200
+
+
+class ParticipantVisibilityAPI(CRUDView):
+    """
+    Participant visibility API
+    """
+    endpoint = 'participants_visibility'
+    rule = '/participants/<string:kf_id>/visibility'
+    schemas = {'Visibility': VisibilitySchema}
+    statement_timeout = 'bulk'
+
+    def post(self, kf_id):
+        """
+        Hide or release a participant and the entities below it
+
+        Sets the visibility of the participant and of its diagnoses,
+        phenotypes, outcomes, samples, biospecimens and their genomic files,
+        with one statement per table, and returns the number of entities
+        updated in each table.
+        ---
+        description: Hide or release a participant and the entities below it
+        tags:
+        - Participant
+        parameters:
+        - name: kf_id
+          in: path
+          type: string
+          required: true
+          description: Kids First ID of the participant
+        - name: body
+          in: body
+          description: The visibility to set
+          required: true
+          schema:
+            $ref: '#/definitions/Visibility'
+        responses:
+          200:
+            description: Visibility updated
+            schema:
+              $ref: '#/definitions/VisibilityResponse'
+          400:
+            description: Invalid visibility
+            schema:
+              $ref: '#/definitions/ClientErrorResponse'
+          404:
+            description: Participant not found
+            schema:
+              $ref: '#/definitions/NotFoundErrorResponse'
+        """
+        return visibility_response(Participant, kf_id)
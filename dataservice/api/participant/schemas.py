@@ -1,3 +1,6 @@
+from flask_marshmallow import Schema
+from marshmallow import fields, post_dump
+from marshmallow.validate import Length
 from marshmallow_sqlalchemy import field_for
 from dataservice.api.participant.models import Participant
 
@@ -5,7 +8,10 @@ from dataservice.api.common.schemas import BaseSchema
 from dataservice.extensions import ma
 
 from dataservice.api.common.custom_fields import PatchedURLFor
-from dataservice.api.common.validation import enum_validation_generator
+from dataservice.api.common.validation import (
+    enum_validation_generator,
+    validate_kf_id
+)
 
 # Enum Choices for participant fields
 
@@ -77,3 +83,30 @@ class ParticipantSchema(BaseSchema):
         'family_relationships': ma.URLFor('api.family_relationships_list',
                                           participant_id='<kf_id>')
     })
+
+
+def validate_pt_kf_id(value):
+    validate_kf_id(Participant.__prefix__, value)
+
+
+class ParticipantAliasesSchema(Schema):
+    aliases = fields.List(fields.List(fields.Str(validate=validate_pt_kf_id),
+                                      validate=Length(equal=2)),
+                          required=True, load_only=True,
+                          example=[['PT_B048J5', 'PT_B048J6']],
+                          description='Pairs of kf_ids of participants that '
+                          'are aliases of each other')
+    participants_updated = fields.Integer(dump_only=True)
+    alias_groups_created = fields.Integer(dump_only=True)
+    alias_groups_merged = fields.Integer(dump_only=True)
+
+    def __init__(self, code=200, message='success', *args, **kwargs):
+        self.status_code = code
+        self.status_message = message
+        super(ParticipantAliasesSchema, self).__init__(*args, **kwargs)
+
+    @post_dump(pass_many=False)
+    def wrap_envelope(self, data):
+        return {'_status': {'message': self.status_message,
+                            'code': self.status_code},
+                'results': data}
@@ -1,8 +1,9 @@
 from dataservice.extensions import db
 from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.study_scope import StudyScopedMixin
 
 
-class Phenotype(db.Model, Base):
+class Phenotype(db.Model, Base, StudyScopedMixin):
     """
     Phenotype entity.
     :param kf_id: Unique id given by the Kid's First DCC
@@ -11,6 +11,7 @@ from dataservice.api.phenotype.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
 
 
 class PhenotypeListAPI(CRUDView):
@@ -39,13 +40,11 @@ class PhenotypeListAPI(CRUDView):
         # Get study id and remove from model filter params
         study_id = filter_params.pop('study_id', None)
 
-        q = Phenotype.query.filter_by(**filter_params)
+        q = apply_filters(Phenotype.query, Phenotype, filter_params)
 
         # Filter by study
-        from dataservice.api.participant.models import Participant
         if study_id:
-            q = (q.join(Participant.phenotypes)
-                 .filter(Participant.study_id == study_id))
+            q = q.filter(Phenotype.study_id == study_id)
 
         return (PhenotypeSchema(many=True)
                 .jsonify(Pagination(q, after, limit)))
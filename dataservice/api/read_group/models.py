@@ -3,6 +3,8 @@ from sqlalchemy.ext.associationproxy import association_proxy
 
 from dataservice.extensions import db
 from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.study_scope import StudyScopedMixin
+from dataservice.api.tombstone.models import bulk_delete, orphan_studies
 
 
 class ReadGroup(db.Model, Base):
@@ -37,7 +39,7 @@ class ReadGroup(db.Model, Base):
                                                cascade='all, delete-orphan')
 
 
-class ReadGroupGenomicFile(db.Model, Base):
+class ReadGroupGenomicFile(db.Model, Base, StudyScopedMixin):
     """
     Represents association table between read_group table and
     genomic_file table. Contains all read_group, genomic_file combiniations.
@@ -47,6 +49,7 @@ class ReadGroupGenomicFile(db.Model, Base):
     """
     __tablename__ = 'read_group_genomic_file'
     __prefix__ = 'RF'
+    __study_parent__ = ('genomic_file_id', 'genomic_file.kf_id')
     __table_args__ = (db.UniqueConstraint('read_group_id',
                                           'genomic_file_id',),)
     read_group_id = db.Column(KfId(),
@@ -64,4 +67,4 @@ class ReadGroupGenomicFile(db.Model, Base):
 def delete_orphans(mapper, connection, state):
     q = (db.session.query(ReadGroup)
          .filter(~ReadGroup.read_group_genomic_files.any()))
-    q.delete(synchronize_session='fetch')
+    bulk_delete(ReadGroup, q, orphan_studies(ReadGroup))
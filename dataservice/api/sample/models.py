@@ -1,5 +1,6 @@
 from dataservice.extensions import db
 from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.study_scope import StudyScopedMixin
 from dataservice.api.biospecimen.models import Biospecimen
 from sqlalchemy import event
 
@@ -30,7 +31,7 @@ col_mapping = {
 }
 
 
-class Sample(db.Model, Base):
+class Sample(db.Model, Base, StudyScopedMixin):
     """
     Sample - a biologically distinct unit
 
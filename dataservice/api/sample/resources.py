@@ -12,6 +12,7 @@ from dataservice.api.sample.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
 
 
 class SampleListAPI(CRUDView):
@@ -41,15 +42,11 @@ class SampleListAPI(CRUDView):
         study_id = filter_params.pop('study_id', None)
 
         # Apply filter params
-        q = (Sample.query
-             .filter_by(**filter_params))
+        q = apply_filters(Sample.query, Sample, filter_params)
 
         # Apply study_id filter and diagnosis_id filter
-        from dataservice.api.participant.models import Participant
-
         if study_id:
-            q = (q.join(Participant.samples)
-                 .filter(Participant.study_id == study_id))
+            q = q.filter(Sample.study_id == study_id)
 
         return (SampleSchema(many=True)
                 .jsonify(Pagination(q, after, limit)))
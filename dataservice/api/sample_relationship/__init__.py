@@ -4,3 +4,6 @@ from dataservice.api.sample_relationship.resources import (
 from dataservice.api.sample_relationship.resources import (
     SampleRelationshipListAPI
 )
+from dataservice.api.sample_relationship.resources import (
+    SampleLineageAPI
+)
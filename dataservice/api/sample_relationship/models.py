@@ -1,8 +1,11 @@
-from sqlalchemy import event, or_
-
+from sqlalchemy import (
+    event, and_, or_, all_, cast, literal, select, tuple_, Text
+)
+from sqlalchemy.dialects.postgresql import array, ARRAY
 
 from dataservice.extensions import db
-from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.model import Base, KfId, validate_flush_batch
+from dataservice.api.common.filters import apply_filters
 from dataservice.api.sample.models import Sample
 
 
@@ -33,6 +36,7 @@ class SampleRelationship(db.Model, Base):
         KfId(),
         db.ForeignKey('sample.kf_id'),
         nullable=True,
+        index=True,
         doc='kf_id of one sample in the relationship')
 
     child_id = db.Column(
@@ -79,14 +83,14 @@ class SampleRelationship(db.Model, Base):
         Given a sample's kf_id, return all of the immediate/direct sample
         relationships of the sample.
 
-        We cannot return a all samples in the tree bc this would require
-        a recursive query which Dataservice would likely need to do in a
-        longer-running task. The service is not setup for this
+        See query_lineage to get all of the relationships in the sample's
+        tree
         """
         # Apply model property filter params
         if model_filter_params is None:
             model_filter_params = {}
-        q = SampleRelationship.query.filter_by(**model_filter_params)
+        q = apply_filters(SampleRelationship.query, SampleRelationship,
+                          model_filter_params)
 
         # Get sample relationships and join with sample
         q = q.join(Sample, or_(SampleRelationship.parent,
@@ -104,72 +108,154 @@ class SampleRelationship(db.Model, Base):
 
         return q
 
+    @classmethod
+    def query_lineage(cls, sample_kf_id, direction='descendants',
+                      max_depth=None):
+        """
+        Find all ancestor or descendant sample relationships of a sample
+
+        :param sample_kf_id: Kids First ID of the sample
+        :param direction: One of ancestors or descendants
+        :param max_depth: Maximum number of generations to traverse. All
+        generations are traversed if None
+
+        The tree is walked in a single WITH RECURSIVE query over the
+        sample_relationship table. Each row carries the path of relationships
+        visited so far so that a cycle in the relationships is traversed
+        once rather than causing the query to recurse forever.
+
+        Returns a query of (SampleRelationship, depth) tuples, ordered by
+        depth, where the relationships of the sample itself have depth 1
+        """
+        if direction not in ('ancestors', 'descendants'):
+            raise ValueError(f'Invalid lineage direction: {direction}')
+
+        def walk(table):
+            # Columns to join from and to when stepping through the tree
+            if direction == 'ancestors':
+                return table.c.child_id, table.c.parent_id
+            return table.c.parent_id, table.c.child_id
+
+        sr = cls.__table__
+        start, step = walk(sr)
+        lineage = select([
+            sr.c.kf_id,
+            step.label('sample_id'),
+            literal(1).label('depth'),
+            cast(array([sr.c.kf_id]), ARRAY(Text)).label('path')
+        ]).where(start == sample_kf_id).cte('lineage', recursive=True)
+
+        prev = lineage.alias('prev')
+        rel = sr.alias('rel')
+        rel_start, rel_step = walk(rel)
+        recursive = select([
+            rel.c.kf_id,
+            rel_step,
+            prev.c.depth + 1,
+            prev.c.path.concat(cast(array([rel.c.kf_id]), ARRAY(Text)))
+        ]).where(rel_start == prev.c.sample_id)
+        recursive = recursive.where(rel.c.kf_id != all_(prev.c.path))
+        if max_depth is not None:
+            recursive = recursive.where(prev.c.depth < max_depth)
+        lineage = lineage.union_all(recursive)
+
+        return (db.session.query(cls, lineage.c.depth)
+                .join(lineage, cls.kf_id == lineage.c.kf_id)
+                .order_by(lineage.c.depth, cls.kf_id))
+
     def __repr__(self):
         return f"{self.parent.kf_id} parent of {self.child.kf_id}"
 
 
-def validate_sample_relationship(target):
+def validate_sample_relationships(connection, targets):
     """
     Ensure that the reverse relationship does not already exist
     Ensure that the parent != child
 
     If these are not the case then raise DatabaseValidationError
 
-    :param target: the sample_relationship being validated
-    :type target: SampleRelationship
+    The samples and reverse relationships of all of the sample_relationships
+    are looked up with one query each
+
+    :param connection: connection to query with
+    :param targets: the sample_relationships being validated
+    :type targets: list of SampleRelationship
     """
     from dataservice.api.errors import DatabaseValidationError
 
-    # Return if sample_relationship is None
-    if not target:
+    # Skip sample_relationships that are None
+    targets = [t for t in targets if t]
+    if not targets:
         return
 
-    parent_id = target.parent_id
-    child_id = target.child_id
-
-    # Check that at least 1 sample ID is non-null
-    if not (parent_id or child_id):
-        raise DatabaseValidationError(
-            SampleRelationship.__tablename__,
-            "modify",
-            "Both parent_id and child_id cannot be null"
-        )
-
-    # If a parent_id or child_id is not-null then check that the ID
-    # refers to an existing sample
-    for sample_id in [parent_id, child_id]:
-        if sample_id:
-            sample = Sample.query.get(sample_id)
-            if not sample:
-                raise DatabaseValidationError(
-                    SampleRelationship.__tablename__,
-                    "modify",
-                    f"Either parent sample {target.parent_id} or "
-                    f"child sample {target.child_id} or both does not exist"
-                )
-
-    # Check for reverse relation
-    sr = SampleRelationship.query.filter_by(
-        parent_id=child_id,
-        child_id=parent_id,
-    ).first()
-
-    if sr:
-        raise DatabaseValidationError(
-            SampleRelationship.__tablename__,
-            "modify",
-            f"Reverse relationship, Parent: {parent_id} -> Child: "
-            f"{child_id}, not allowed since the SampleRelationship, "
-            f"Parent: {sr.parent_id} -> Child: {sr.child_id}, already exists"
-        )
-
-    # Check for parent = child
-    if parent_id == child_id:
+    # Samples referred to by the relationships
+    sample_ids = {sample_id for t in targets
+                  for sample_id in (t.parent_id, t.child_id) if sample_id}
+    samples = set()
+    if sample_ids:
+        sa = Sample.__table__
+        samples = {kf_id for kf_id, in connection.execute(
+            select([sa.c.kf_id]).where(sa.c.kf_id.in_(sample_ids)))}
+
+    # Reverse relations of the relationships, in the database or amongst
+    # the relationships being validated
+    sr = SampleRelationship.__table__
+    reverse_filters = [and_(sr.c.parent_id == t.child_id,
+                            sr.c.child_id == t.parent_id)
+                       for t in targets
+                       if t.parent_id is None or t.child_id is None]
+    pairs = {(t.child_id, t.parent_id) for t in targets
+             if t.parent_id and t.child_id}
+    if pairs:
+        reverse_filters.append(
+            tuple_(sr.c.parent_id, sr.c.child_id).in_(pairs))
+    existing = {(t.parent_id, t.child_id) for t in targets}
+    if reverse_filters:
+        existing.update(tuple(row) for row in connection.execute(
+            select([sr.c.parent_id, sr.c.child_id])
+            .where(or_(*reverse_filters))))
+
+    messages = []
+    for target in targets:
+        parent_id = target.parent_id
+        child_id = target.child_id
+
+        # Check that at least 1 sample ID is non-null
+        if not (parent_id or child_id):
+            messages.append("Both parent_id and child_id cannot be null")
+            continue
+
+        # If a parent_id or child_id is not-null then check that the ID
+        # refers to an existing sample
+        if any(sample_id and sample_id not in samples
+               for sample_id in [parent_id, child_id]):
+            messages.append(
+                f"Either parent sample {target.parent_id} or "
+                f"child sample {target.child_id} or both does not exist"
+            )
+            continue
+
+        # Check for reverse relation
+        if parent_id != child_id and (child_id, parent_id) in existing:
+            messages.append(
+                f"Reverse relationship, Parent: {parent_id} -> Child: "
+                f"{child_id}, not allowed since the SampleRelationship, "
+                f"Parent: {child_id} -> Child: {parent_id}, already exists"
+            )
+            continue
+
+        # Check for parent = child
+        if parent_id == child_id:
+            messages.append(
+                f"Cannot create Sample relationship where parent sample is "
+                "the same as the child sample"
+            )
+
+    if messages:
         raise DatabaseValidationError(
             SampleRelationship.__tablename__,
             "modify",
-            f"Cannot create Sample relationship where parent sample is the"
-            " same as the child sample"
+            "; ".join(messages)
         )
 
 
@@ -179,4 +265,4 @@ def relationship_on_insert_or_update(mapper, connection, target):
     """
     Run preprocessing/validation of relationship before insert or update
     """
-    validate_sample_relationship(target)
+    validate_flush_batch(connection, target, validate_sample_relationships)
@@ -1,12 +1,16 @@
 from flask import abort, request
 from marshmallow import ValidationError
+from marshmallow import fields
+from marshmallow.validate import OneOf, Range
 from webargs.flaskparser import use_args
 
 from dataservice.extensions import db
 from dataservice.api.common.pagination import paginated, Pagination
+from dataservice.api.sample.models import Sample
 from dataservice.api.sample_relationship.models import SampleRelationship
 from dataservice.api.sample_relationship.schemas import (
     SampleRelationshipSchema,
+    SampleLineageSchema,
     SampleRelationshipFilterSchema
 )
 from dataservice.api.common.views import CRUDView
@@ -174,3 +178,81 @@ class SampleRelationshipAPI(CRUDView):
 
         return SampleRelationshipSchema(200, 'sample_relationship {} deleted'
                                         .format(sa.kf_id)).jsonify(sa), 200
+
+
+class SampleLineageAPI(CRUDView):
+    """
+    Sample lineage REST API
+    """
+    endpoint = 'sample_lineage'
+    rule = '/samples/<string:kf_id>/lineage'
+    schemas = {'SampleLineage': SampleLineageSchema}
+    # Walks the whole lineage of the sample with a recursive query
+    statement_timeout = 'default'
+
+    @use_args({
+        'direction': fields.Str(
+            missing='descendants',
+            validate=OneOf(['ancestors', 'descendants'])),
+        'max_depth': fields.Int(validate=Range(min=1))
+    }, locations=('query',))
+    def get(self, args, kf_id):
+        """
+        Get the lineage of a sample
+
+        Returns every sample relationship above or below the sample in its
+        tree, each with the number of generations it is from the sample
+        ---
+        description: Get the ancestor or descendant sample relationships of
+          a sample
+        tags:
+        - SampleRelationship
+        parameters:
+        - name: kf_id
+          in: path
+          type: string
+          required: true
+        - name: direction
+          in: query
+          type: string
+          enum: [ancestors, descendants]
+          default: descendants
+          description: Whether to walk up or down the sample tree
+        - name: max_depth
+          in: query
+          type: integer
+          minimum: 1
+          description: Maximum number of generations to return
+        responses:
+          200:
+            description: Sample relationships in the lineage
+            schema:
+              type: object
+              properties:
+                _status:
+                  type: object
+                  properties:
+                    code:
+                      type: integer
+                    message:
+                      type: string
+                results:
+                  type: array
+                  items:
+                    $ref: '#/definitions/SampleLineage'
+          404:
+            description: sample not found
+            schema:
+              $ref: '#/definitions/NotFoundErrorResponse'
+        """
+        if Sample.query.get(kf_id) is None:
+            abort(404, 'could not find {} `{}`'.format('sample', kf_id))
+
+        relationships = []
+        for sr, depth in SampleRelationship.query_lineage(
+                kf_id, direction=args['direction'],
+                max_depth=args.get('max_depth')):
+            sr.depth = depth
+            relationships.append(sr)
+
+        return SampleLineageSchema(many=True).jsonify(relationships)
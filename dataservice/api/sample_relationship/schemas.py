@@ -40,3 +40,14 @@ class SampleRelationshipFilterSchema(SampleRelationshipSchema):
     @validates('sample_id')
     def valid_sample_id(self, value):
         validate_kf_id('SA', value)
+
+
+class SampleLineageSchema(SampleRelationshipSchema):
+    parent_id = field_for(SampleRelationship, 'parent_id', dump_only=True,
+                          example='SA_B048J5')
+    child_id = field_for(SampleRelationship, 'child_id', dump_only=True,
+                         example='SA_B048J6')
+    depth = fields.Integer(dump_only=True, example=1,
+                           description='Number of generations between the '
+                           'relationship and the sample lineage was '
+                           'requested for')
@@ -10,6 +10,7 @@ from dataservice.api.sequencing_center.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
 
 
 class SequencingCenterListAPI(CRUDView):
@@ -38,15 +39,13 @@ class SequencingCenterListAPI(CRUDView):
         # Get study id and remove from model filter params
         study_id = filter_params.pop('study_id', None)
 
-        q = (SequencingCenter.query
-             .filter_by(**filter_params))
+        q = apply_filters(SequencingCenter.query, SequencingCenter,
+                          filter_params)
         # Filter by study
-        from dataservice.api.participant.models import Participant
         from dataservice.api.biospecimen.models import Biospecimen
         if study_id:
             q = (q.join(SequencingCenter.biospecimens)
-                 .join(Biospecimen.participant)
-                 .filter(Participant.study_id == study_id)
+                 .filter(Biospecimen.study_id == study_id)
                  .group_by(SequencingCenter.kf_id))
 
         return (SequencingCenterSchema(many=True)
@@ -3,6 +3,8 @@ from sqlalchemy.ext.associationproxy import association_proxy
 
 from dataservice.extensions import db
 from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.study_scope import StudyScopedMixin
+from dataservice.api.tombstone.models import bulk_delete, orphan_studies
 
 
 class SequencingExperiment(db.Model, Base):
@@ -235,7 +237,7 @@ class SequencingExperiment(db.Model, Base):
                                      doc='The kf_id of the sequencing center')
 
 
-class SequencingExperimentGenomicFile(db.Model, Base):
+class SequencingExperimentGenomicFile(db.Model, Base, StudyScopedMixin):
     """
     Represents association table between sequencing_experiment table and
     genomic_file table. Contains all sequencing_experiment,
@@ -246,6 +248,7 @@ class SequencingExperimentGenomicFile(db.Model, Base):
     """
     __tablename__ = 'sequencing_experiment_genomic_file'
     __prefix__ = 'SG'
+    __study_parent__ = ('genomic_file_id', 'genomic_file.kf_id')
     __table_args__ = (db.UniqueConstraint('sequencing_experiment_id',
                                           'genomic_file_id',),)
     sequencing_experiment_id = db.Column(
@@ -266,4 +269,4 @@ def delete_orphans(mapper, connection, state):
          .filter(
          ~SequencingExperiment.sequencing_experiment_genomic_files.any())
          )
-    q.delete(synchronize_session='fetch')
+    bulk_delete(SequencingExperiment, q, orphan_studies(SequencingExperiment))
@@ -14,6 +14,8 @@ from dataservice.api.sequencing_experiment.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
+from dataservice.api.common.study_scope import files_in_study
 
 
 class SequencingExperimentListAPI(CRUDView):
@@ -45,25 +47,16 @@ class SequencingExperimentListAPI(CRUDView):
         # Get genomic file id and remove from model filter params
         genomic_file_id = filter_params.pop('genomic_file_id', None)
 
-        q = (SequencingExperiment.query
-             .filter_by(**filter_params))
+        q = apply_filters(SequencingExperiment.query, SequencingExperiment,
+                          filter_params)
 
         # Filter by study
-        from dataservice.api.participant.models import Participant
-        from dataservice.api.biospecimen.models import Biospecimen
-        from dataservice.api.genomic_file.models import GenomicFile
-        from dataservice.api.biospecimen_genomic_file.models import (
-            BiospecimenGenomicFile
-        )
-
         if study_id:
             q = (q.join(SequencingExperiment
                         .sequencing_experiment_genomic_files)
-                 .join(SequencingExperimentGenomicFile.genomic_file)
-                 .join(GenomicFile.biospecimen_genomic_files)
-                 .join(BiospecimenGenomicFile.biospecimen)
-                 .join(Biospecimen.participant)
-                 .filter(Participant.study_id == study_id)
+                 .filter(files_in_study(
+                     SequencingExperimentGenomicFile.genomic_file_id,
+                     study_id))
                  .group_by(SequencingExperiment.kf_id))
 
         # Filter by genomic_file_id
@@ -12,6 +12,8 @@ from dataservice.api.sequencing_experiment_genomic_file.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
+from dataservice.api.common.study_scope import files_in_study
 
 
 class SequencingExperimentGenomicFileListAPI(CRUDView):
@@ -40,22 +42,13 @@ class SequencingExperimentGenomicFileListAPI(CRUDView):
         # Get study id and remove from model filter params
         study_id = filter_params.pop('study_id', None)
 
-        q = SequencingExperimentGenomicFile.query.filter_by(**filter_params)
+        q = apply_filters(SequencingExperimentGenomicFile.query,
+                          SequencingExperimentGenomicFile, filter_params)
 
         # Filter by study
-        from dataservice.api.participant.models import Participant
-        from dataservice.api.biospecimen.models import Biospecimen
-        from dataservice.api.genomic_file.models import GenomicFile
-        from dataservice.api.biospecimen_genomic_file.models import (
-            BiospecimenGenomicFile
-        )
         if study_id:
-            q = (q.join(SequencingExperimentGenomicFile.genomic_file)
-                 .join(GenomicFile.biospecimen_genomic_files)
-                 .join(BiospecimenGenomicFile.biospecimen)
-                 .join(Biospecimen.participant)
-                 .filter(Participant.study_id == study_id)
-                 .group_by(SequencingExperimentGenomicFile.kf_id))
+            q = q.filter(files_in_study(
+                SequencingExperimentGenomicFile.genomic_file_id, study_id))
 
         return (SequencingExperimentGenomicFileSchema(many=True)
                 .jsonify(Pagination(q, after, limit)))
@@ -1,2 +1,5 @@
 from dataservice.api.study.resources import StudyAPI
 from dataservice.api.study.resources import StudyListAPI
+from dataservice.api.study.resources import StudyVisibilityAPI
+# Registers the job that creates the bucket of a new study
+from dataservice.api.study import jobs
@@ -0,0 +1,41 @@
+import requests
+from flask import current_app
+
+from dataservice.api.job.worker import job_handler
+from dataservice.api.study.models import Study
+
+
+def bucket_session():
+    """
+    Get the app's session with the bucket service, so that connections to
+    the service are reused by the jobs a worker runs
+    """
+    session = current_app.extensions.get('bucket_service')
+    if session is None:
+        session = requests.Session()
+        token = current_app.config['BUCKET_SERVICE_TOKEN']
+        if token:
+            session.headers['Authorization'] = 'Bearer {}'.format(token)
+        current_app.extensions['bucket_service'] = session
+    return session
+
+
+@job_handler('create_bucket')
+def create_bucket(job, study_id):
+    """
+    Invoke the bucket service to create the s3 bucket of a study
+
+    A bucket that already exists is not an error, so the job may be retried
+    after the service timed out or failed.
+    """
+    url = current_app.config['BUCKET_SERVICE_URL']
+    if url is None or Study.query.get(study_id) is None:
+        return {'study_id': study_id, 'bucket': 'skipped'}, None
+
+    resp = bucket_session().post(
+        url + '/buckets', json={'study_id': study_id},
+        timeout=current_app.config['BUCKET_SERVICE_TIMEOUT'])
+    if resp.status_code == 409:
+        return {'study_id': study_id, 'bucket': 'exists'}, None
+    resp.raise_for_status()
+    return {'study_id': study_id, 'bucket': 'created'}, None
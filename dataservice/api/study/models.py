@@ -1,8 +1,8 @@
-import requests
 from sqlalchemy import event
 from flask import current_app
 from dataservice.extensions import db
 from dataservice.api.common.model import Base, KfId
+from dataservice.api.job.models import Job
 from dataservice.api.participant.models import Participant
 from dataservice.api.study_file.models import StudyFile
 
@@ -98,17 +98,17 @@ class Study(db.Model, Base):
 @event.listens_for(Study, 'after_insert', propagate=True)
 def make_bucket(mapper, connection, target):
     """
-    Invokes the new bucket service to create a bucket in s3 for this study.
+    Queues a job that invokes the bucket service to create a bucket in s3
+    for this study, see `dataservice.api.study.jobs.create_bucket`.
     Only creates a new bucket on insertion of a study.
     Will not attempt to remove the bucket on deletion to prevent any unwanted
     data loss.
+
+    The job is inserted in the study's transaction, so it is only run once
+    the study is committed, and the insert does not wait on the service.
     """
-    url = current_app.config['BUCKET_SERVICE_URL']
-    if url is not None:
-        header = {}
-        token = current_app.config['BUCKET_SERVICE_TOKEN']
-        if token:
-            header['Authorization'] = 'Bearer {}'.format(token)
-        resp = requests.post(url+'/buckets',
-                             json={'study_id': target.kf_id},
-                             headers=header)
+    if current_app.config['BUCKET_SERVICE_URL'] is not None:
+        connection.execute(Job.__table__.insert().values(
+            type='create_bucket',
+            params={'study_id': target.kf_id},
+            max_attempts=current_app.config['BUCKET_SERVICE_MAX_ATTEMPTS']))
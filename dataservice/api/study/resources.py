@@ -8,7 +8,12 @@ from dataservice.api.common.pagination import paginated, Pagination
 from dataservice.api.study.models import Study
 from dataservice.api.study.schemas import StudySchema
 from dataservice.api.common.views import CRUDView
-from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.schemas import (
+    filter_schema_factory,
+    VisibilitySchema
+)
+from dataservice.api.common.filters import apply_filters
+from dataservice.api.common.visibility import visibility_response
 
 
 class StudyListAPI(CRUDView):
@@ -35,8 +40,7 @@ class StudyListAPI(CRUDView):
         """
         filter_params.pop('study_id', None)
 
-        q = (Study.query
-             .filter_by(**filter_params))
+        q = apply_filters(Study.query, Study, filter_params)
 
         return (StudySchema(many=True)
                 .jsonify(Pagination(q, after, limit)))
@@ -141,3 +145,52 @@ class StudyAPI(CRUDView):
         return StudySchema(
             200, 'study {} deleted'.format(st.kf_id)
         ).jsonify(st), 200
+
+
+class StudyVisibilityAPI(CRUDView):
+    """
+    Study visibility API
+    """
+    endpoint = 'studies_visibility'
+    rule = '/studies/<string:kf_id>/visibility'
+    schemas = {'Visibility': VisibilitySchema}
+    statement_timeout = 'bulk'
+
+    def post(self, kf_id):
+        """
+        Hide or release a study and the entities below it
+
+        Sets the visibility of the study and of its files, participants and
+        every entity below them, with one statement per table, and returns
+        the number of entities updated in each table.
+        ---
+        description: Hide or release a study and the entities below it
+        tags:
+        - Study
+        parameters:
+        - name: kf_id
+          in: path
+          type: string
+          required: true
+          description: Kids First ID of the study
+        - name: body
+          in: body
+          description: The visibility to set
+          required: true
+          schema:
+            $ref: '#/definitions/Visibility'
+        responses:
+          200:
+            description: Visibility updated
+            schema:
+              $ref: '#/definitions/VisibilityResponse'
+          400:
+            description: Invalid visibility
+            schema:
+              $ref: '#/definitions/ClientErrorResponse'
+          404:
+            description: Study not found
+            schema:
+              $ref: '#/definitions/NotFoundErrorResponse'
+        """
+        return visibility_response(Study, kf_id)
@@ -11,6 +11,7 @@ from dataservice.api.study_file.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
 
 
 class StudyFileListAPI(CRUDView):
@@ -35,7 +36,7 @@ class StudyFileListAPI(CRUDView):
             resource:
               StudyFile
         """
-        q = StudyFile.query.filter_by(**filter_params)
+        q = apply_filters(StudyFile.query, StudyFile, filter_params)
 
         pager = indexd_pagination(q, after, limit)
 
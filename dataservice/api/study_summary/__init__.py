@@ -0,0 +1,3 @@
+from dataservice.api.study_summary.resources import StudySummaryAPI
+# Registers the job that refreshes summaries
+from dataservice.api.study_summary import jobs
@@ -0,0 +1,25 @@
+from dataservice.extensions import db
+from dataservice.api.job.worker import job_handler
+from dataservice.api.study.models import Study
+from dataservice.api.study_summary.models import StudySummary
+
+
+@job_handler('refresh_summaries')
+def refresh_summaries(job, study_ids=None, include_file_size=True):
+    """
+    Refresh the summaries of studies, all studies if none are given
+
+    Each summary is committed once it is refreshed.
+    """
+    if not study_ids:
+        study_ids = [kf_id for kf_id, in db.session.query(Study.kf_id)]
+
+    for i, study_id in enumerate(study_ids):
+        StudySummary.refresh(study_id, include_file_size=include_file_size)
+        db.session.commit()
+        job.report_progress(i + 1, len(study_ids))
+
+    location = None
+    if len(study_ids) == 1:
+        location = '/studies/{}/summary'.format(study_ids[0])
+    return {'refreshed': study_ids}, location
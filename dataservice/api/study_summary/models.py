@@ -0,0 +1,200 @@
+import time
+from datetime import datetime
+
+from sqlalchemy import func, distinct
+from sqlalchemy.dialects.postgresql import JSONB
+
+from dataservice.extensions import db
+from dataservice.api.common.model import KfId
+from dataservice.api.common.study_scope import files_in_study
+from dataservice.api.participant.models import Participant
+from dataservice.api.biospecimen.models import Biospecimen
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.sequencing_experiment.models import (
+    SequencingExperiment,
+    SequencingExperimentGenomicFile
+)
+
+# Key used when grouping on a column that has no value
+MISSING_KEY = 'Not Reported'
+
+
+class StudySummary(db.Model):
+    """
+    Pre-computed summary statistics for a study
+
+    A summary is computed with a handful of aggregate queries over the study's
+    participants, biospecimens and genomic files and stored so that it may be
+    served without crawling the study's collections.
+
+    :param study_id: The kf_id of the study that is summarized
+    :param participant_count: Number of participants in the study
+    :param proband_count: Number of probands in the study
+    :param family_count: Number of families in the study
+    :param biospecimen_count: Number of biospecimens in the study
+    :param biospecimens_by_analyte_type: Biospecimen counts keyed by
+    analyte_type
+    :param genomic_file_count: Number of genomic files in the study
+    :param genomic_files_by_data_type: Genomic file counts keyed by data_type
+    :param genomic_files_by_experiment_strategy: Genomic file counts keyed by
+    the experiment_strategy of the files' sequencing experiments
+    :param total_file_size: Sum of the sizes of the study's genomic files in
+    bytes, as reported by indexd
+    :param refreshed_at: Time the summary was last computed
+    :param refresh_duration_ms: Time taken to compute the summary
+    """
+    __tablename__ = 'study_summary'
+
+    study_id = db.Column(KfId(),
+                         db.ForeignKey('study.kf_id', ondelete='CASCADE'),
+                         primary_key=True,
+                         doc='The kf_id of the summarized study')
+    participant_count = db.Column(db.Integer(), nullable=False, default=0,
+                                  doc='Number of participants in the study')
+    proband_count = db.Column(db.Integer(), nullable=False, default=0,
+                              doc='Number of probands in the study')
+    family_count = db.Column(db.Integer(), nullable=False, default=0,
+                             doc='Number of families in the study')
+    biospecimen_count = db.Column(db.Integer(), nullable=False, default=0,
+                                  doc='Number of biospecimens in the study')
+    biospecimens_by_analyte_type = db.Column(
+        JSONB(), nullable=False, default=dict,
+        doc='Biospecimen counts keyed by analyte type'
+    )
+    genomic_file_count = db.Column(db.Integer(), nullable=False, default=0,
+                                   doc='Number of genomic files in the study')
+    genomic_files_by_data_type = db.Column(
+        JSONB(), nullable=False, default=dict,
+        doc='Genomic file counts keyed by data type'
+    )
+    genomic_files_by_experiment_strategy = db.Column(
+        JSONB(), nullable=False, default=dict,
+        doc='Genomic file counts keyed by experiment strategy'
+    )
+    total_file_size = db.Column(db.BigInteger(),
+                                doc='Total size of the genomic files in bytes')
+    refreshed_at = db.Column(db.DateTime(), nullable=False,
+                             default=datetime.now,
+                             doc='Time the summary was last computed')
+    refresh_duration_ms = db.Column(db.Float(),
+                                    doc='Time taken to compute the summary')
+
+    @classmethod
+    def refresh(cls, study_id, include_file_size=True):
+        """
+        Compute the summary for a study and store it in the session
+
+        Counts are computed with one aggregate query per statistic. The total
+        file size is not stored in the dataservice and must be collected from
+        indexd, one document per file, so it may be skipped with
+        `include_file_size=False`.
+
+        :param study_id: Kids First ID of the study
+        :param include_file_size: Whether to sum file sizes from indexd
+        :returns: The refreshed StudySummary. The caller is responsible for
+        committing the session.
+        """
+        start = time.perf_counter()
+
+        summary = cls.query.get(study_id)
+        if summary is None:
+            summary = cls(study_id=study_id)
+
+        # Participant counts
+        (summary.participant_count,
+         summary.proband_count,
+         summary.family_count) = (
+            db.session.query(
+                func.count(Participant.kf_id),
+                func.count(Participant.kf_id).filter(
+                    Participant.is_proband.is_(True)),
+                func.count(distinct(Participant.family_id)))
+            .filter(Participant.study_id == study_id)
+            .one())
+
+        # Biospecimen counts
+        q = (db.session.query(Biospecimen.analyte_type,
+                              func.count(Biospecimen.kf_id))
+             .filter(Biospecimen.study_id == study_id)
+             .group_by(Biospecimen.analyte_type))
+        summary.biospecimens_by_analyte_type = _count_dict(q)
+        summary.biospecimen_count = sum(
+            summary.biospecimens_by_analyte_type.values())
+
+        # Genomic file counts
+        study_files = cls._study_genomic_files(study_id)
+        summary.genomic_file_count = study_files.count()
+
+        q = (db.session.query(GenomicFile.data_type,
+                              func.count(GenomicFile.kf_id))
+             .filter(files_in_study(GenomicFile.kf_id, study_id))
+             .group_by(GenomicFile.data_type))
+        summary.genomic_files_by_data_type = _count_dict(q)
+
+        q = (db.session.query(
+             SequencingExperiment.experiment_strategy,
+             func.count(distinct(
+                 SequencingExperimentGenomicFile.genomic_file_id)))
+             .join(SequencingExperimentGenomicFile,
+                   SequencingExperimentGenomicFile.sequencing_experiment_id ==
+                   SequencingExperiment.kf_id)
+             .filter(files_in_study(
+                 SequencingExperimentGenomicFile.genomic_file_id, study_id))
+             .group_by(SequencingExperiment.experiment_strategy))
+        summary.genomic_files_by_experiment_strategy = _count_dict(q)
+
+        # File sizes live in indexd, each file must be loaded to get its size
+        if include_file_size:
+            summary.total_file_size = cls._total_file_size(study_files)
+
+        summary.refreshed_at = datetime.now()
+        summary.refresh_duration_ms = (time.perf_counter() - start) * 1000
+        db.session.add(summary)
+
+        return summary
+
+    @staticmethod
+    def _study_genomic_files(study_id):
+        """
+        Query for the kf_ids of the genomic files in a study
+        """
+        return (db.session.query(GenomicFile.kf_id)
+                .filter(files_in_study(GenomicFile.kf_id, study_id)))
+
+    @staticmethod
+    def _total_file_size(study_files, batch_size=1000):
+        """
+        Sum the sizes of a study's genomic files
+
+        Files are loaded in batches ordered by kf_id rather than streamed from
+        a single cursor, as loading a file that was deleted in indexd will
+        remove it from the database and commit the session.
+        """
+        total = 0
+        last_id = ''
+        column = GenomicFile.kf_id
+        while True:
+            ids = [kf_id for kf_id, in (study_files
+                                        .filter(column > last_id)
+                                        .order_by(column)
+                                        .limit(batch_size))]
+            if not ids:
+                return total
+            last_id = ids[-1]
+            files = GenomicFile.query.filter(GenomicFile.kf_id.in_(ids)).all()
+            total += sum(gf.size or 0 for gf in files
+                         if not getattr(gf, 'was_deleted', False))
+
+    def __repr__(self):
+        return '<StudySummary {}>'.format(self.study_id)
+
+
+def _count_dict(q):
+    """
+    Build a dict of counts from a query of (key, count) rows
+    """
+    counts = {}
+    for key, count in q:
+        key = MISSING_KEY if key is None else key
+        counts[key] = counts.get(key, 0) + count
+    return counts
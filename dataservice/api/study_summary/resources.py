@@ -0,0 +1,76 @@
+from flask import abort
+
+from dataservice.extensions import db
+from dataservice.api.study.models import Study
+from dataservice.api.job.models import Job, QUEUED, RUNNING
+from dataservice.api.job.schemas import JobSchema
+from dataservice.api.study_summary.models import StudySummary
+from dataservice.api.study_summary.schemas import StudySummarySchema
+from dataservice.api.common.views import CRUDView
+
+
+class StudySummaryAPI(CRUDView):
+    """
+    Study summary API
+    """
+    endpoint = 'study_summaries'
+    rule = '/studies/<string:kf_id>/summary'
+    schemas = {'StudySummary': StudySummarySchema}
+    # Aggregates the entities of a whole study
+    statement_timeout = 'default'
+
+    def get(self, kf_id):
+        """
+        Get the summary statistics of a study
+
+        Summaries are pre-computed by workers and refreshed by the
+        `refresh-summaries` command. The first request for a study that has
+        not yet been summarized queues a job that computes its summary and
+        returns the job with a 202. Follow the job's `self` link to find out
+        when the summary is ready.
+        ---
+        description: Get StudySummary by id
+        tags:
+        - StudySummary
+        parameters:
+        - name: kf_id
+          in: path
+          description: ID of the Study to summarize
+          required: true
+          type: string
+        responses:
+          200:
+            description: StudySummary found
+            schema:
+              $ref: '#/definitions/StudySummaryResponse'
+          202:
+            description: StudySummary is being computed
+            schema:
+              $ref: '#/definitions/JobResponse'
+          404:
+            description: Study not found
+            schema:
+              $ref: '#/definitions/NotFoundErrorResponse'
+        """
+        summary = StudySummary.query.get(kf_id)
+        if summary is not None:
+            return StudySummarySchema().jsonify(summary)
+
+        if Study.query.get(kf_id) is None:
+            abort(404, 'could not find {} `{}`'
+                  .format('study', kf_id))
+
+        # Queue the summary unless it is already being computed
+        job = (Job.query
+               .filter(Job.type == 'refresh_summaries',
+                       Job.status.in_([QUEUED, RUNNING]),
+                       Job.params['study_ids'].contains([kf_id]))
+               .first())
+        if job is None:
+            job = Job(type='refresh_summaries',
+                      params={'study_ids': [kf_id]})
+            db.session.add(job)
+            db.session.commit()
+
+        return JobSchema(202, 'summary of study {} is being computed'
+                         .format(kf_id)).jsonify(job), 202
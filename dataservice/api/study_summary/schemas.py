@@ -0,0 +1,22 @@
+from marshmallow_sqlalchemy import field_for
+
+from dataservice.api.study_summary.models import StudySummary
+from dataservice.api.common.schemas import BaseSchema
+from dataservice.extensions import ma
+
+
+class StudySummarySchema(BaseSchema):
+
+    study_id = field_for(StudySummary, 'study_id', dump_only=True,
+                         example='SD_ABB2C104')
+
+    class Meta(BaseSchema.Meta):
+        model = StudySummary
+        resource_url = 'api.study_summaries'
+        collection_url = 'api.studies_list'
+        dump_only = ('refreshed_at', 'refresh_duration_ms')
+
+    _links = ma.Hyperlinks({
+        'self': ma.URLFor(Meta.resource_url, kf_id='<study_id>'),
+        'study': ma.URLFor('api.studies', kf_id='<study_id>')
+    })
@@ -3,6 +3,7 @@ from sqlalchemy.ext.associationproxy import association_proxy
 
 from dataservice.extensions import db
 from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.study_scope import StudyScopedMixin
 
 
 class Task(db.Model, Base):
@@ -40,7 +41,7 @@ class Task(db.Model, Base):
                                          cascade='all, delete-orphan')
 
 
-class TaskGenomicFile(db.Model, Base):
+class TaskGenomicFile(db.Model, Base, StudyScopedMixin):
     """
     Represents association table between task table and
     genomic_file table. Contains all task, genomic_file combiniations.
@@ -54,6 +55,7 @@ class TaskGenomicFile(db.Model, Base):
 
     __tablename__ = 'task_genomic_file'
     __prefix__ = 'TG'
+    __study_parent__ = ('genomic_file_id', 'genomic_file.kf_id')
     __table_args__ = (db.UniqueConstraint('genomic_file_id',
                                           'task_id',
                                           'is_input'),)
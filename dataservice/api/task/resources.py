@@ -11,6 +11,8 @@ from dataservice.api.task.schemas import (
 )
 from dataservice.api.common.views import CRUDView
 from dataservice.api.common.schemas import filter_schema_factory
+from dataservice.api.common.filters import apply_filters
+from dataservice.api.common.study_scope import files_in_study
 
 
 class TaskListAPI(CRUDView):
@@ -38,27 +40,17 @@ class TaskListAPI(CRUDView):
         # Get study id and remove from model filter params
         study_id = filter_params.pop('study_id', None)
 
-        q = (Task.query
-             .filter_by(**filter_params))
+        q = apply_filters(Task.query, Task, filter_params)
 
         # Filter by study
-        from dataservice.api.participant.models import Participant
-        from dataservice.api.biospecimen.models import Biospecimen
-        from dataservice.api.genomic_file.models import GenomicFile
         from dataservice.api.task.models import (
             TaskGenomicFile
         )
-        from dataservice.api.biospecimen_genomic_file.models import (
-            BiospecimenGenomicFile
-        )
 
         if study_id:
             q = (q.join(Task.task_genomic_files)
-                 .join(TaskGenomicFile.genomic_file)
-                 .join(GenomicFile.biospecimen_genomic_files)
-                 .join(BiospecimenGenomicFile.biospecimen)
-                 .join(Biospecimen.participant)
-                 .filter(Participant.study_id == study_id)
+                 .filter(files_in_study(TaskGenomicFile.genomic_file_id,
+                                        study_id))
                  .group_by(Task.kf_id))
 
         return (TaskSchema(many=True)
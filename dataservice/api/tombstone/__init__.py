@@ -0,0 +1 @@
+from dataservice.api.tombstone.resources import DeletionListAPI
@@ -0,0 +1,274 @@
+from datetime import datetime
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import object_session
+from sqlalchemy.dialects.postgresql import UUID
+
+from dataservice.extensions import db
+from dataservice.api.common.model import Base, KfId
+from dataservice.api.common.id_service import uuid_generator
+
+
+class Tombstone(db.Model):
+    """
+    A record of a deleted entity
+
+    Tombstones let clients that follow change feeds find out about entities
+    that were deleted. They are removed once they are older than
+    TOMBSTONE_RETENTION_DAYS by the `compact-tombstones` command.
+
+    :param uuid: Unique id of the tombstone, orders tombstones deleted at
+    the same time
+    :param type: The table of the deleted entity
+    :param kf_id: The kf_id of the deleted entity
+    :param study_id: The kf_id of the study the entity belonged to, if any
+    :param deleted_at: Time the entity was deleted
+    """
+    __tablename__ = 'tombstone'
+    __table_args__ = (db.Index('ix_tombstone_deleted_at_uuid',
+                               'deleted_at', 'uuid'),)
+
+    uuid = db.Column(UUID(), primary_key=True, default=uuid_generator)
+    type = db.Column(db.Text(), nullable=False,
+                     doc='The table of the deleted entity')
+    kf_id = db.Column(KfId(), nullable=False, index=True,
+                      doc='The kf_id of the deleted entity')
+    study_id = db.Column(KfId(), index=True,
+                         doc='The kf_id of the study the entity belonged to')
+    deleted_at = db.Column(db.DateTime(), nullable=False,
+                           default=datetime.now,
+                           doc='Time the entity was deleted')
+
+    @classmethod
+    def compact(cls, before, batch_size=10000):
+        """
+        Remove the tombstones of entities deleted before a time
+
+        Tombstones are removed in batches, each in its own transaction, so
+        that the table is not locked for long.
+
+        :param before: Remove tombstones older than this datetime
+        :param batch_size: Number of tombstones removed per transaction
+        :returns: The number of tombstones removed
+        """
+        table = cls.__table__
+        removed = 0
+        while True:
+            batch = (select([table.c.uuid])
+                     .where(table.c.deleted_at < before)
+                     .limit(batch_size))
+            count = db.session.execute(
+                table.delete().where(table.c.uuid.in_(batch))).rowcount
+            db.session.commit()
+            removed += count
+            if count < batch_size:
+                return removed
+
+    def __repr__(self):
+        return '<Tombstone {} {}>'.format(self.type, self.kf_id)
+
+
+def record_tombstones(entities, connection=None):
+    """
+    Record tombstones for deleted entities with a single INSERT
+
+    :param entities: (model, kf_id, study_id) tuples of the deleted entities,
+    study_id may be None
+    :param connection: The connection to record them with, defaults to the
+    session's
+    """
+    now = datetime.now()
+    rows = [{'uuid': uuid_generator(),
+             'type': model.__tablename__,
+             'kf_id': kf_id,
+             'study_id': study_id,
+             'deleted_at': now}
+            for model, kf_id, study_id in entities]
+    if rows:
+        (connection or db.session).execute(
+            Tombstone.__table__.insert().values(rows))
+
+
+def bulk_delete(model, query, studies=None):
+    """
+    Delete the entities of a query in bulk, recording a tombstone for each
+
+    Bulk deletes do not emit the mapper events that record tombstones for
+    entities deleted through the session, so they must be recorded here.
+    Orphans are deleted once the rows linking them to their study are gone,
+    so their studies may be given, see `orphan_studies`.
+
+    :param model: The model to delete entities of
+    :param query: A query for the entities to delete
+    :param studies: Optional dict of the study_id of entities whose study
+    can no longer be looked up
+    :returns: The kf_ids of the deleted entities
+    """
+    kf_ids = [kf_id for kf_id, in query.with_entities(model.kf_id)]
+    if kf_ids:
+        found = dict(studies or {})
+        found.update(study_ids(model, kf_ids))
+        record_tombstones((model, kf_id, found.get(kf_id))
+                          for kf_id in kf_ids)
+        (db.session.query(model)
+         .filter(model.kf_id.in_(kf_ids))
+         .delete(synchronize_session='fetch'))
+    return kf_ids
+
+
+def study_ids(model, kf_ids):
+    """
+    Get the study that each of a model's entities belongs to
+
+    The study_id of entities below participants is read from their
+    denormalized study_id, see `dataservice.api.common.study_scope`. Other
+    entities are joined to their participants or to the genomic files they
+    are linked to. Entities that are not linked to a study are left out.
+
+    :param model: A model deriving from Base
+    :param kf_ids: The kf_ids of entities of the model
+    :returns: A dict of study kf_ids keyed by entity kf_id
+    """
+    q = _study_query(model)
+    if q is None or not kf_ids:
+        return {}
+    return dict(q.filter(model.kf_id.in_(kf_ids)))
+
+
+def _study_query(model):
+    """
+    Query for the (kf_id, study_id) of a model's entities
+    """
+    from dataservice.api.study.models import Study
+    from dataservice.api.participant.models import Participant
+    from dataservice.api.family.models import Family
+    from dataservice.api.family_relationship.models import (
+        FamilyRelationship
+    )
+    from dataservice.api.sample.models import Sample
+    from dataservice.api.sample_relationship.models import (
+        SampleRelationship
+    )
+    from dataservice.api.sequencing_experiment.models import (
+        SequencingExperiment,
+        SequencingExperimentGenomicFile
+    )
+    from dataservice.api.read_group.models import (
+        ReadGroup,
+        ReadGroupGenomicFile
+    )
+    from dataservice.api.task.models import Task, TaskGenomicFile
+
+    def via_participant(q, participant_id):
+        return q.join(Participant, participant_id == Participant.kf_id)
+
+    def via_link(link_id, link):
+        return (db.session.query(model.kf_id, link.study_id)
+                .join(link, link_id == model.kf_id))
+
+    q = db.session.query(model.kf_id, Participant.study_id)
+    if model is Study:
+        return db.session.query(Study.kf_id, Study.kf_id)
+    elif 'study_id' in model.__table__.c:
+        return db.session.query(model.kf_id, model.study_id)
+    elif model is Family:
+        return q.join(Participant, Participant.family_id == model.kf_id)
+    elif model is FamilyRelationship:
+        return via_participant(q, model.participant1_id)
+    elif model is SampleRelationship:
+        return (db.session.query(model.kf_id, Sample.study_id)
+                .join(Sample, model.child_id == Sample.kf_id))
+    elif model is SequencingExperiment:
+        link = SequencingExperimentGenomicFile
+        return via_link(link.sequencing_experiment_id, link)
+    elif model is ReadGroup:
+        return via_link(ReadGroupGenomicFile.read_group_id,
+                        ReadGroupGenomicFile)
+    elif model is Task:
+        return via_link(TaskGenomicFile.task_id, TaskGenomicFile)
+    return None
+
+
+def orphan_studies(model):
+    """
+    Get the studies of the entities of a model that may be left orphaned by
+    the current flush
+
+    :param model: The model of the orphans
+    :returns: A dict of study kf_ids keyed by entity kf_id, as found by
+    `find_deleted_studies` before the flush
+    """
+    return db.session.info.get('orphan_studies', {}).get(model, {})
+
+
+def _orphan_keys(obj):
+    """
+    Get the (model, kf_id) of the entities that deleting an entity may leave
+    orphaned, and the study_id they are found in through it
+    """
+    from dataservice.api.participant.models import Participant, AliasGroup
+    from dataservice.api.family.models import Family
+    from dataservice.api.sequencing_experiment.models import (
+        SequencingExperiment,
+        SequencingExperimentGenomicFile
+    )
+    from dataservice.api.read_group.models import (
+        ReadGroup,
+        ReadGroupGenomicFile
+    )
+
+    if isinstance(obj, Participant):
+        return [(Family, obj.family_id, obj.study_id),
+                (AliasGroup, obj.alias_group_id, obj.study_id)]
+    elif isinstance(obj, SequencingExperimentGenomicFile):
+        return [(SequencingExperiment, obj.sequencing_experiment_id,
+                 obj.study_id)]
+    elif isinstance(obj, ReadGroupGenomicFile):
+        return [(ReadGroup, obj.read_group_id, obj.study_id)]
+    return []
+
+
+@event.listens_for(db.session, 'before_flush')
+def find_deleted_studies(session, flush_context, instances):
+    """
+    Find the studies of the entities that are about to be deleted
+
+    The study of an entity is found before the flush, as the entities it is
+    linked to its study through may be deleted first. Entities of each model
+    are looked up with one query. The studies of the families, alias groups,
+    sequencing experiments and read groups that the deleted entities link
+    are kept in `session.info` for the listeners that delete them in bulk
+    once they are orphaned.
+    """
+    deleted = {}
+    session.info['tombstones'] = []
+    orphans = session.info['orphan_studies'] = {}
+    for obj in session.deleted:
+        if isinstance(obj, Base):
+            deleted.setdefault(type(obj), []).append(obj)
+        for model, kf_id, study_id in _orphan_keys(obj):
+            if kf_id and study_id:
+                orphans.setdefault(model, {})[kf_id] = study_id
+    for model, objs in deleted.items():
+        studies = study_ids(model, [obj.kf_id for obj in objs])
+        for obj in objs:
+            obj.__dict__['_tombstone_study_id'] = studies.get(obj.kf_id)
+
+
+@event.listens_for(Base, 'after_delete', propagate=True)
+def collect_tombstone(mapper, connection, target):
+    """
+    Collect an entity deleted through the session, its tombstone is
+    recorded with those of the other entities deleted by the flush
+    """
+    study_id = target.__dict__.get('_tombstone_study_id')
+    (object_session(target).info.setdefault('tombstones', [])
+     .append((type(target), target.kf_id, study_id)))
+
+
+@event.listens_for(db.session, 'after_flush')
+def record_flushed_tombstones(session, flush_context):
+    """
+    Record the tombstones of the entities deleted by a flush
+    """
+    record_tombstones(session.info.pop('tombstones', []))
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from flask import abort, current_app, request
+
+from dataservice.api.common.pagination import (
+    paginated,
+    after_filter,
+    settled,
+    page_response,
+    Pagination
+)
+from dataservice.api.common.views import CRUDView
+from dataservice.api.tombstone.models import Tombstone
+from dataservice.api.tombstone.schemas import TombstoneSchema
+
+
+class DeletionListAPI(CRUDView):
+    """
+    Deletion feed API
+    """
+    endpoint = 'deletions_list'
+    rule = '/deletions'
+    schemas = {'Tombstone': TombstoneSchema}
+
+    @paginated(cursor='since')
+    def get(self, after, limit):
+        """
+        Get the entities that were deleted since a cursor
+
+        Deletions are ordered by the time they were made and may be followed
+        like a change feed. Tombstones are kept for TOMBSTONE_RETENTION_DAYS,
+        a cursor older than that must be replaced with a full sync.
+        ---
+        description: Get the entities that were deleted since a cursor
+        tags:
+        - Tombstone
+        parameters:
+        - name: since
+          in: query
+          type: string
+          description: Time after which deletions are returned
+        - name: since_uuid
+          in: query
+          type: string
+          description: uuid of the last deletion returned at the `since` time
+        - name: study_id
+          in: query
+          type: string
+          description: Only return entities deleted from this study
+        - name: type
+          in: query
+          type: string
+          description: Only return entities deleted from this table
+        - name: limit
+          in: query
+          type: integer
+          description: Maximum number of deletions to return
+        responses:
+          200:
+            description: Entities deleted since the cursor
+            schema:
+              $ref: '#/definitions/TombstonePaginated'
+          410:
+            description: The cursor is older than the tombstones that are kept
+        """
+        retention = current_app.config['TOMBSTONE_RETENTION_DAYS']
+        since = after[0]
+        if (since != datetime.fromtimestamp(0) and
+                since < datetime.now() - timedelta(days=retention)):
+            abort(410, 'deletions are only kept for {} days, the cursor '
+                  'is too old'.format(retention))
+
+        q = (Tombstone.query
+             .filter(settled(Tombstone.deleted_at))
+             .filter(after_filter(Tombstone, after, 'deleted_at')))
+        filters = {k: request.args[k] for k in ['study_id', 'type']
+                   if k in request.args}
+        q = q.filter_by(**filters)
+        pager = Pagination(q, after, limit, key='deleted_at')
+
+        data = TombstoneSchema(many=True).dump(pager.items).data
+        return page_response(data, pager, request.endpoint, **filters)
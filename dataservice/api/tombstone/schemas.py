@@ -0,0 +1,22 @@
+from flask_marshmallow import Schema
+from marshmallow import fields, post_dump
+
+
+class TombstoneSchema(Schema):
+    type = fields.Str(description='Table of the deleted entity',
+                      example='participant')
+    kf_id = fields.Str(example='PT_DZB048J5')
+    study_id = fields.Str(description='The study the entity belonged to',
+                          example='SD_ABB2C104')
+    deleted_at = fields.DateTime(description='Time the entity was deleted')
+
+    def __init__(self, code=200, message='success', *args, **kwargs):
+        self.status_code = code
+        self.status_message = message
+        super(TombstoneSchema, self).__init__(*args, **kwargs)
+
+    @post_dump(pass_many=True)
+    def wrap_envelope(self, data, many):
+        return {'_status': {'message': self.status_message,
+                            'code': self.status_code},
+                'results': data}
@@ -2,6 +2,7 @@
 """Click commands."""
 
 import click
+from flask.cli import with_appcontext
 
 
 @click.command()
@@ -28,18 +29,33 @@ def erd():
 
 
 @click.command()
-def populate_db():
+@with_appcontext
+@click.option('--participants', default=10, show_default=True,
+              help='Total number of participants to generate')
+@click.option('--participants-per-study', default=1000, show_default=True,
+              help='Maximum number of participants in a study')
+@click.option('--seed', default=0, show_default=True,
+              help='Seed of the generated data')
+@click.option('--indexd-docs', type=click.File('w'),
+              help='Write the indexd documents of generated files to this '
+              'file as JSON lines')
+def populate_db(participants, participants_per_study, seed, indexd_docs):
     """
     Run the dummy data generator
 
     Populate the database
     """
     from dataservice.util.data_gen.data_generator import DataGenerator
-    dg = DataGenerator()
-    dg.create_and_publish_all()
+    dg = DataGenerator(seed=seed, participants=participants,
+                       participants_per_study=participants_per_study,
+                       indexd_docs=indexd_docs)
+    counts = dg.create_and_publish_all()
+    for table, count in sorted(counts.items()):
+        click.echo('{:<36}{:>12}'.format(table, count))
 
 
 @click.command()
+@with_appcontext
 def clear_db():
     """
     Run the dummy data generator
@@ -48,4 +64,366 @@ def clear_db():
     """
     from dataservice.util.data_gen.data_generator import DataGenerator
     dg = DataGenerator()
-    dg.drop_all()
+    dg.clear_all()
+
+
+@click.command()
+@with_appcontext
+@click.option('--study-id', 'study_ids', multiple=True,
+              help='Only refresh the summary of this study. May be repeated')
+@click.option('--skip-file-size', is_flag=True,
+              help='Do not sum genomic file sizes from indexd')
+def refresh_summaries(study_ids, skip_file_size):
+    """
+    Refresh the pre-computed study summaries
+
+    Refreshes all studies if no study is specified
+    """
+    from dataservice.extensions import db
+    from dataservice.api.study.models import Study
+    from dataservice.api.study_summary.models import StudySummary
+
+    if not study_ids:
+        study_ids = [kf_id for kf_id, in db.session.query(Study.kf_id)]
+
+    for study_id in study_ids:
+        summary = StudySummary.refresh(
+            study_id, include_file_size=not skip_file_size)
+        db.session.commit()
+        click.echo('Refreshed summary for {} in {:.1f}ms'
+                   .format(study_id, summary.refresh_duration_ms))
+
+
+@click.command()
+@with_appcontext
+@click.option('--burst', is_flag=True,
+              help='Stop once there are no jobs to run')
+@click.option('--poll-interval', type=float,
+              help='Seconds to wait between checks of an empty queue. '
+              'Defaults to JOB_POLL_INTERVAL')
+def worker(burst, poll_interval):
+    """
+    Run queued jobs until stopped
+
+    A job that is running when the worker receives SIGINT or SIGTERM is
+    finished before the worker exits
+    """
+    import signal
+    import threading
+    from dataservice.api.job.worker import work
+
+    stop = threading.Event()
+
+    def handle_signal(signum, frame):
+        click.echo('Stopping after the current job', err=True)
+        stop.set()
+
+    handlers = {signum: signal.signal(signum, handle_signal)
+                for signum in [signal.SIGINT, signal.SIGTERM]}
+    try:
+        count = work(burst=burst, poll_interval=poll_interval, stop=stop)
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+    click.echo('Ran {} jobs'.format(count))
+
+
+@click.command()
+@with_appcontext
+@click.argument('pairs_file', type=click.File('r'))
+def add_aliases(pairs_file):
+    """
+    Alias pairs of participants to each other
+
+    PAIRS_FILE is a CSV file with the kf_ids of two aliased participants
+    on each line
+    """
+    import csv
+    from dataservice.extensions import db
+    from dataservice.api.participant.models import AliasGroup
+
+    pairs = [row for row in csv.reader(pairs_file) if row]
+    for row in pairs:
+        if len(row) != 2:
+            raise click.BadParameter('expected 2 kf_ids per line, got {}'
+                                     .format(row), param_hint='PAIRS_FILE')
+    result = AliasGroup.add_aliases(pairs)
+    db.session.commit()
+    click.echo('Updated {participants_updated} participants, created '
+               '{alias_groups_created} and merged {alias_groups_merged} '
+               'alias groups'.format(**result))
+
+
+@click.command()
+@with_appcontext
+@click.option('--days', type=int,
+              help='Remove tombstones older than this many days. Defaults '
+              'to TOMBSTONE_RETENTION_DAYS')
+def compact_tombstones(days):
+    """
+    Remove the tombstones of entities deleted before the retention period
+    """
+    from datetime import datetime, timedelta
+    from flask import current_app
+    from dataservice.api.tombstone.models import Tombstone
+
+    if days is None:
+        days = current_app.config['TOMBSTONE_RETENTION_DAYS']
+    removed = Tombstone.compact(datetime.now() - timedelta(days=days))
+    click.echo('Removed {} tombstones older than {} days'
+               .format(removed, days))
+
+
+@click.command()
+@with_appcontext
+@click.option('--batch-size', default=10000, show_default=True,
+              help='Number of entities checked per transaction')
+def backfill_study_ids(batch_size):
+    """
+    Set the denormalized study_id of entities that are out of sync
+
+    Needed after rows are written outside of the ORM
+    """
+    from dataservice.api.common.study_scope import backfill_study_ids
+
+    for table, count in backfill_study_ids(batch_size).items():
+        click.echo('Updated {} {} rows'.format(count, table))
+
+
+@click.command()
+@with_appcontext
+def check_study_ids():
+    """
+    Check that the denormalized study_id of entities is in sync
+
+    Exits with an error if any entity's study_id differs from its links,
+    or if any entity is linked to several studies
+    """
+    from dataservice.api.common.study_scope import check_study_ids
+
+    problems = check_study_ids()
+    for (table, problem), count in sorted(problems.items()):
+        click.echo('{} {} rows {}'.format(count, table, problem), err=True)
+    if problems:
+        raise SystemExit(1)
+    click.echo('All study ids are in sync')
+
+
+@click.command()
+@with_appcontext
+@click.option('--size', default=200, show_default=True,
+              help='Number of participants in the seeded study')
+@click.option('--iterations', default=50, show_default=True,
+              help='Number of operations run by each scenario')
+@click.option('--scenario', 'scenarios', multiple=True,
+              help='Only run this scenario. May be repeated')
+@click.option('--seed', default=0, show_default=True,
+              help='Seed of the generated data')
+@click.option('--baseline', type=click.File('r'),
+              help='JSON results of a previous run to compare against')
+@click.option('--output', type=click.File('w'),
+              help='Write the results as JSON to this file')
+@click.option('--tolerance', default=0.2, show_default=True,
+              help='Fraction a metric may regress from the baseline')
+@click.option('--keep', is_flag=True,
+              help='Do not remove the seeded data when done')
+@click.option('--indexd-latency', default=0.0, show_default=True,
+              help='Milliseconds the fake indexd waits before each response')
+def bench(size, iterations, scenarios, seed, baseline, output, tolerance,
+          keep, indexd_latency):
+    """
+    Run the API benchmarks against the configured database
+
+    Exits with a non-zero status if any metric regressed from the baseline
+    by more than the tolerance
+    """
+    import json
+    from benchmarks import run_benchmarks, compare_results, SCENARIOS
+
+    for name in scenarios:
+        if name not in SCENARIOS:
+            raise click.BadParameter('unknown scenario {}, expected one of {}'
+                                     .format(name, ', '.join(SCENARIOS)),
+                                     param_hint='--scenario')
+
+    results = run_benchmarks(size, iterations, scenarios=scenarios,
+                             seed=seed, keep=keep,
+                             indexd_latency=indexd_latency / 1000)
+
+    row = '{:<24}{:>10}{:>10}{:>10}{:>10}{:>10}{:>10}'
+    click.echo(row.format('scenario', 'p50 ms', 'p95 ms', 'p99 ms',
+                          'queries', 'indexd', 'req/s'))
+    for name, m in results.items():
+        click.echo(row.format(name, m['p50_ms'], m['p95_ms'], m['p99_ms'],
+                              m['queries_per_request'],
+                              m['indexd_calls_per_request'],
+                              m['requests_per_second']))
+
+    if output:
+        json.dump(results, output, indent=2, sort_keys=True)
+
+    if baseline:
+        regressions = compare_results(results, json.load(baseline),
+                                      tolerance=tolerance)
+        for name, metric, old, new, change in regressions:
+            click.echo('{} {} regressed from {} to {} ({:+.0%})'
+                       .format(name, metric, old, new, change), err=True)
+        if regressions:
+            raise SystemExit(1)
+        click.echo('No regressions from baseline')
+
+
+@click.command('bench-encoding')
+@with_appcontext
+@click.option('--size', default=10, show_default=True,
+              help='Number of participants in the seeded study')
+@click.option('--iterations', default=20, show_default=True,
+              help='Number of times each page is encoded')
+@click.option('--page-size', 'page_sizes', multiple=True, type=int,
+              help='Number of results in an encoded page. May be repeated')
+def bench_encoding(size, iterations, page_sizes):
+    """
+    Time the response encoders on pages of several sizes
+    """
+    from benchmarks.encoding import run_encoding_benchmarks, PAGE_SIZES
+
+    results = run_encoding_benchmarks(size, iterations,
+                                      page_sizes=page_sizes or PAGE_SIZES)
+
+    row = '{:<12}{:>10}{:>10}{:>10}{:>12}'
+    click.echo(row.format('encoder', 'page', 'p50 ms', 'p95 ms', 'bytes'))
+    for name, pages in results.items():
+        for page_size, m in pages.items():
+            click.echo(row.format(name, page_size, m['p50_ms'], m['p95_ms'],
+                                  m['bytes']))
+
+
+@click.command('bench-pages')
+@with_appcontext
+@click.option('--size', default=500, show_default=True,
+              help='Number of participants in the seeded study')
+@click.option('--iterations', default=5, show_default=True,
+              help='Number of times each page is requested in each mode')
+@click.option('--limit', default=1000, show_default=True,
+              help='Number of results requested per page')
+def bench_pages(size, iterations, limit):
+    """
+    Compare pages of list endpoints loaded as rows and as entities
+    """
+    from benchmarks.pages import run_page_benchmarks
+
+    results = run_page_benchmarks(size, iterations, limit)
+
+    row = '{:<16}{:>10}{:>10}{:>10}{:>12}'
+    click.echo(row.format('endpoint', 'mode', 'results', 'p50 ms',
+                          'peak kb'))
+    for endpoint, modes in results.items():
+        for mode, m in modes.items():
+            click.echo(row.format(endpoint, mode, m['results'], m['p50_ms'],
+                                  m['peak_memory_kb']))
+
+
+@click.command()
+@with_appcontext
+@click.option('--output', type=click.File('wb'), default='swagger.json',
+              show_default=True, help='File to write the spec to')
+def build_spec(output):
+    """
+    Write the rendered swagger spec to a file
+
+    The API serves the spec from this file instead of building it when
+    SWAGGER_SPEC_PATH points to it
+    """
+    from flask import current_app
+    from dataservice.api.docs.resources import build_spec
+    from dataservice.api.common.encoding import encode_json
+
+    output.write(encode_json(build_spec(current_app)))
+    click.echo('Wrote the swagger spec to {}'.format(output.name))
+
+
+@click.command()
+@click.option('--output', type=click.File('w'), default='build.json',
+              show_default=True, help='File to write the metadata to')
+def build_metadata(output):
+    """
+    Write the git and package metadata to a file
+
+    The API loads the metadata from this file instead of calling git on
+    start up when BUILD_METADATA_PATH points to it
+    """
+    import json
+    from dataservice import build_metadata
+
+    json.dump(build_metadata(), output, indent=2, sort_keys=True)
+    click.echo('Wrote the build metadata to {}'.format(output.name))
+
+
+@click.command()
+@with_appcontext
+@click.option('--config', 'config_name', default='production',
+              show_default=True, help='Config to start the app with')
+@click.option('--runs', default=3, show_default=True,
+              help='Number of times the app is started in each mode')
+def profile_startup(config_name, runs):
+    """
+    Profile the start up of the app with and without prebuilt files
+
+    The app is started in new processes as it is by default, creating the
+    spec and calling git on start up, and with the spec and metadata
+    prebuilt by `build-spec` and `build-metadata` and a lazily created spec.
+    The median of each measurement is printed.
+    """
+    import json
+    import os
+    import subprocess
+    import sys
+    import tempfile
+    from statistics import median
+    from flask import current_app
+    from dataservice import build_metadata
+    from dataservice.api.docs.resources import build_spec
+    from dataservice.api.common.encoding import encode_json
+    from benchmarks.startup import STEPS
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = os.path.join(root, 'benchmarks', 'startup.py')
+    env = dict(os.environ, PYTHONPATH=root)
+    for key in ['SWAGGER_SPEC_PATH', 'BUILD_METADATA_PATH']:
+        env.pop(key, None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spec_path = os.path.join(tmp, 'swagger.json')
+        metadata_path = os.path.join(tmp, 'build.json')
+        with open(spec_path, 'wb') as f:
+            f.write(encode_json(build_spec(current_app)))
+        with open(metadata_path, 'w') as f:
+            json.dump(build_metadata(), f)
+        modes = [
+            ('default', dict(env, LAZY_SPEC='false')),
+            ('prebuilt', dict(env, LAZY_SPEC='true',
+                              SWAGGER_SPEC_PATH=spec_path,
+                              BUILD_METADATA_PATH=metadata_path)),
+        ]
+
+        profiles = {}
+        for mode, mode_env in modes:
+            profiles[mode] = [
+                json.loads(subprocess.check_output(
+                    [sys.executable, script, '--config', config_name],
+                    env=mode_env, cwd=root).decode('utf-8'))
+                for _ in range(runs)]
+
+    def measure(mode, get):
+        return round(median(get(p) for p in profiles[mode]), 1)
+
+    rows = [(step + ' ms', lambda p, s=step: p['steps_ms'].get(s, 0))
+            for step in ['import'] + STEPS + ['create_app', 'first_swagger']]
+    rows += [(key, lambda p, k=key: p[k])
+             for key in ['boot_ms', 'boot_memory_kb', 'peak_memory_kb',
+                         'max_rss_kb']]
+    row = '{:<28}{:>12}{:>12}'
+    click.echo(row.format('', *(mode for mode, _ in modes)))
+    for name, get in rows:
+        click.echo(row.format(name, *(measure(mode, get)
+                                      for mode, _ in modes)))
@@ -1,5 +1,5 @@
 from flask_migrate import Migrate
-from flask_sqlalchemy import SQLAlchemy
+from dataservice.extensions.database import SQLAlchemy
 from flask_marshmallow import Marshmallow
 from dataservice.extensions.flask_indexd import Indexd
 
@@ -0,0 +1,176 @@
+"""
+Flask-SQLAlchemy extended with the engine settings used by the dataservice
+and routing of read only requests to a replica
+"""
+import threading
+import time
+
+from flask import g, has_app_context
+from flask_sqlalchemy import (
+    SQLAlchemy as BaseSQLAlchemy,
+    SignallingSession,
+    get_state
+)
+from sqlalchemy import event, exc, orm
+from sqlalchemy.pool import NullPool
+
+POOL_PROFILES = ['default', 'pgbouncer']
+# Bind key of the read replica
+REPLICA_BIND = 'replica'
+# Seconds a replica is behind its primary, zero if it has replayed all it
+# has received or is not a replica at all
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+# Engine options that only apply to a pool kept by the process
+POOL_OPTIONS = ['pool_size', 'pool_timeout', 'pool_recycle', 'max_overflow']
+
+
+def _ping_connection(dbapi_connection, connection_record, connection_proxy):
+    """
+    Test a connection before it is checked out of the pool
+
+    A connection that was closed by the server is discarded and the pool
+    checks out another.
+    """
+    try:
+        cursor = dbapi_connection.cursor()
+        cursor.execute('SELECT 1')
+        cursor.close()
+    except Exception:
+        raise exc.DisconnectionError()
+
+
+class RoutingSession(SignallingSession):
+    """
+    A session that sends the queries of read only requests to the replica
+
+    A request is read only when `g.use_replica` is set. Flushes always go to
+    the primary, so objects changed while serving a read only request are
+    still saved.
+    """
+
+    def get_bind(self, mapper=None, clause=None):
+        if (not self._flushing and has_app_context() and
+                g.get('use_replica')):
+            return get_state(self.app).db.get_engine(self.app,
+                                                     bind=REPLICA_BIND)
+        return super(RoutingSession, self).get_bind(mapper, clause)
+
+
+class ReplicaMonitor(object):
+    """
+    Periodically checks how far the replica is behind the primary
+
+    :param db: The SQLAlchemy extension
+    :param app: The app the replica is configured for
+    """
+
+    def __init__(self, db, app):
+        self.db = db
+        self.app = app
+        self.lag = None
+        self.checked_at = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        """
+        Whether the replica was reachable and within REPLICA_MAX_LAG seconds
+        of the primary when last checked
+
+        The replica is checked at most every REPLICA_CHECK_INTERVAL seconds.
+        Requests made while it is checked use the previous result.
+        """
+        config = self.app.config
+        with self._lock:
+            now = time.monotonic()
+            check = (self.checked_at is None or
+                     now - self.checked_at >= config['REPLICA_CHECK_INTERVAL'])
+            if check:
+                self.checked_at = now
+        if check:
+            self.lag = self.check()
+        return self.lag is not None and self.lag <= config['REPLICA_MAX_LAG']
+
+    def check(self):
+        """
+        Get the lag of the replica in seconds
+
+        :returns: The lag, or None if the replica could not be queried
+        """
+        engine = self.db.get_engine(self.app, bind=REPLICA_BIND)
+        try:
+            return float(engine.execute(REPLICA_LAG_SQL).scalar())
+        except exc.SQLAlchemyError as e:
+            self.app.logger.warning('could not check the replica: %s', e)
+            return None
+
+
+class SQLAlchemy(BaseSQLAlchemy):
+    """
+    Adds the following settings to Flask-SQLAlchemy's config:
+
+    - SQLALCHEMY_POOL_PROFILE: `default` keeps a pool of connections in each
+      process. `pgbouncer` opens a connection for every session and leaves
+      pooling to a PgBouncer in transaction mode.
+    - SQLALCHEMY_POOL_PRE_PING: test connections as they are checked out of
+      the pool
+    - SQLALCHEMY_REPLICA_URI: a replica of the database that read only
+      requests may be served from, see `RoutingSession`
+    - REPLICA_MAX_LAG: seconds the replica may be behind before read only
+      requests are served by the primary instead
+    - REPLICA_CHECK_INTERVAL: seconds between checks of the replica's lag
+    """
+
+    def init_app(self, app):
+        app.config.setdefault('SQLALCHEMY_POOL_PROFILE', 'default')
+        app.config.setdefault('SQLALCHEMY_POOL_PRE_PING', False)
+        app.config.setdefault('SQLALCHEMY_REPLICA_URI', None)
+        app.config.setdefault('REPLICA_MAX_LAG', 10)
+        app.config.setdefault('REPLICA_CHECK_INTERVAL', 5)
+        if app.config['SQLALCHEMY_POOL_PROFILE'] not in POOL_PROFILES:
+            raise ValueError('SQLALCHEMY_POOL_PROFILE must be one of: {}'
+                             .format(', '.join(POOL_PROFILES)))
+        if app.config['SQLALCHEMY_REPLICA_URI']:
+            binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+            binds[REPLICA_BIND] = app.config['SQLALCHEMY_REPLICA_URI']
+            app.config['SQLALCHEMY_BINDS'] = binds
+            app.extensions['replica_monitor'] = ReplicaMonitor(self, app)
+        super(SQLAlchemy, self).init_app(app)
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    def replica_available(self, app=None):
+        """
+        Whether read only requests may currently be served by the replica
+
+        :returns: False if no replica is configured or it is too far behind
+        the primary
+        """
+        app = self.get_app(app)
+        monitor = app.extensions.get('replica_monitor')
+        return monitor is not None and monitor.available()
+
+    def apply_driver_hacks(self, app, info, options):
+        super(SQLAlchemy, self).apply_driver_hacks(app, info, options)
+        if app.config['SQLALCHEMY_POOL_PROFILE'] == 'pgbouncer':
+            for key in POOL_OPTIONS:
+                options.pop(key, None)
+            options['poolclass'] = NullPool
+
+    def get_engine(self, app=None, bind=None):
+        app = self.get_app(app)
+        engine = super(SQLAlchemy, self).get_engine(app, bind)
+        # Engines are created lazily, so the ping is added to an engine's
+        # pool the first time the engine is used
+        if (app.config['SQLALCHEMY_POOL_PRE_PING'] and
+                not isinstance(engine.pool, NullPool) and
+                not event.contains(engine.pool, 'checkout',
+                                   _ping_connection)):
+            event.listen(engine.pool, 'checkout', _ping_connection)
+        return engine
@@ -1,4 +1,5 @@
 import requests
+import threading
 import uuid
 
 from flask import current_app, abort
@@ -13,15 +14,22 @@ class RecordNotFound(HTTPError):
 class Indexd(object):
     """
     Indexd flask extension for interacting with the Gen3 Indexd service
+
+    Each request uses its own session, so the extension may be used by
+    threaded workers. With INDEXD_KEEP_ALIVE, the session of a thread is
+    kept between the requests it serves so that connections to indexd are
+    reused.
     """
 
     def __init__(self, app=None):
         self.app = app
+        self._local = threading.local()
         if app is not None:
             self.init_app(app)
 
     def init_app(self, app):
         app.config.setdefault('INDEXD_URL', None)
+        app.config.setdefault('INDEXD_KEEP_ALIVE', False)
         self.url = app.config['INDEXD_URL']
         if hasattr(app, 'teardown_appcontext'):
             app.teardown_appcontext(self.teardown)
@@ -38,7 +46,9 @@ class Indexd(object):
 
     def teardown(self, exception):
         ctx = stack.top
-        if hasattr(ctx, 'indexd_session'):
+        if (hasattr(ctx, 'indexd_session') and
+                ctx.indexd_session is not getattr(self._local, 'session',
+                                                  None)):
             ctx.indexd_session.close()
 
     def get(self, record):
@@ -281,5 +291,16 @@ class Indexd(object):
         ctx = stack.top
         if ctx is not None:
             if not hasattr(ctx, 'indexd_session'):
-                ctx.indexd_session = self.new_session()
+                ctx.indexd_session = self._thread_session()
             return ctx.indexd_session
+
+    def _thread_session(self):
+        """
+        Get the session kept by the current thread, or a new session if
+        sessions are not kept
+        """
+        if not current_app.config['INDEXD_KEEP_ALIVE']:
+            return self.new_session()
+        if getattr(self._local, 'session', None) is None:
+            self._local.session = self.new_session()
+        return self._local.session
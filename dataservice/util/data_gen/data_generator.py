@@ -1,592 +1,574 @@
-from datetime import datetime
-from dateutil import relativedelta
-from itertools import tee
-import uuid
-import random
+"""
+Generate a synthetic dataset for development and load testing
+
+Rows are generated one study at a time, in foreign key order, and streamed
+into Postgres with COPY FROM STDIN instead of being inserted through the
+ORM, so that datasets of millions of rows may be created quickly. All field
+values are drawn from a generator seeded with a fixed seed, the same
+arguments always produce the same data.
+
+Since rows bypass the ORM, genomic files and study files are not registered
+in indexd. Their indexd documents may instead be written as JSON lines to be
+loaded into a FakeIndexd.
+"""
 import csv
+import json
 import os
+import random
+import uuid
+from collections import Counter, OrderedDict, deque
+from datetime import datetime, timedelta
 
-from dataservice import create_app
 from dataservice.extensions import db
+from dataservice.api.common.model import reserve_kf_ids
+from dataservice.api.common.study_scope import StudyScopedMixin
+from dataservice.api.investigator.models import Investigator
 from dataservice.api.study.models import Study
-from dataservice.api.participant.models import Participant, AliasGroup
+from dataservice.api.study_file.models import StudyFile
 from dataservice.api.family.models import Family
+from dataservice.api.participant.models import Participant, AliasGroup
 from dataservice.api.family_relationship.models import FamilyRelationship
 from dataservice.api.diagnosis.models import Diagnosis
-from dataservice.api.biospecimen.models import Biospecimen
-from dataservice.api.genomic_file.models import GenomicFile
-from dataservice.api.sequencing_experiment.models import SequencingExperiment
-from dataservice.api.sequencing_center.models import SequencingCenter
+from dataservice.api.phenotype.models import Phenotype
 from dataservice.api.outcome.models import Outcome
-from dataservice.api.workflow.models import (
-    Workflow,
-    WorkflowGenomicFile
+from dataservice.api.sample.models import Sample
+from dataservice.api.sample_relationship.models import SampleRelationship
+from dataservice.api.biospecimen.models import (
+    Biospecimen,
+    BiospecimenDiagnosis
+)
+from dataservice.api.sequencing_center.models import SequencingCenter
+from dataservice.api.sequencing_experiment.models import (
+    SequencingExperiment,
+    SequencingExperimentGenomicFile
+)
+from dataservice.api.read_group.models import (
+    ReadGroup,
+    ReadGroupGenomicFile
+)
+from dataservice.api.cavatica_app.models import CavaticaApp
+from dataservice.api.task.models import Task, TaskGenomicFile
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.biospecimen_genomic_file.models import (
+    BiospecimenGenomicFile
+)
+from dataservice.api.participant.schemas import (
+    GENDER_ENUM,
+    ETHNICITY_ENUM,
+    RACE_ENUM
+)
+from dataservice.api.biospecimen.schemas import (
+    ANALYTE_TYPE_ENUM,
+    DUO_ID_BIOSPECIMEN_ENUM,
+    PRESERVATION_METHOD_ENUM
+)
+from dataservice.api.diagnosis.schemas import DIAGNOSIS_CATEGORY_ENUM
+from dataservice.api.outcome.schemas import VITAL_STATUS_ENUM
+from dataservice.api.phenotype.schemas import OBSERVED_ENUM
+from dataservice.api.sequencing_experiment.schemas import (
+    EXPERIMENT_STRATEGY_ENUM,
+    PLATFORM_ENUM
 )
-from dataservice.api.investigator.models import Investigator
-from dataservice.api.phenotype.models import Phenotype
-from dataservice.api.study_file.models import StudyFile
 
-MB_TO_BYTES = 1000000000
+MB_TO_BYTES = 1000000
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+# Creation time of the first generated row, each following row is a
+# millisecond later
+EPOCH = datetime(2018, 1, 1)
+# Order in which the rows of a study are copied, parents before children
+COPY_ORDER = [
+    Investigator, Study, StudyFile, Family, AliasGroup, Participant,
+    FamilyRelationship, Diagnosis, Phenotype, Outcome, Sample,
+    SampleRelationship, Biospecimen, BiospecimenDiagnosis,
+    SequencingExperiment, ReadGroup, Task, GenomicFile,
+    BiospecimenGenomicFile, SequencingExperimentGenomicFile,
+    ReadGroupGenomicFile, TaskGenomicFile
+]
+# Number of kf_ids reserved at once for each model
+KF_ID_BLOCK = 10000
+# One in this many participants is aliased to the next participant
+ALIAS_EVERY = 100
+FAMILY_TYPES = {1: 'Proband Only', 2: 'Duo', 3: 'Trio', 4: 'Trio+'}
+RELATIONS = [('Mother', 'Child'), ('Father', 'Child'),
+             ('Sibling', 'Sibling')]
+SEQUENCING_CENTERS = ['Baylor College of Medicine', 'Washington University',
+                      'HudsonAlpha', 'Broad Institute']
+CAVATICA_APPS = ['kf-alignment-workflow', 'kf-somatic-workflow',
+                 'kf-rnaseq-workflow']
+
+
+def _read_choices(file_name):
+    """
+    Read the first column of a file of choices in the data_gen directory
+    """
+    path = os.path.join(DATA_DIR, file_name)
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        return [row for row in csv.reader(f) if row]
 
 
 class DataGenerator(object):
-    def __init__(self, config_name=None):
-        if not config_name:
-            config_name = os.environ.get('FLASK_CONFIG', 'default')
-        self.setup(config_name)
-        self._participant_choices()
-        self._diagnoses_choices()
-        self._sequencing_center_choices()
-        self._biospecimen_choices()
-        self._experiment_choices()
-        self._genomic_files_choices()
-        self._outcomes_choices()
-        self._phenotype_choices()
-
-    def _participant_choices(self):
-        """
-        Provides the choices for filling participant entity
-        """
-        self.max_participants = 10
-
-        self.is_proband_list = [True, False]
-        data_lim = ['GRU', 'HMB', 'DS', 'Other']
-        data_lim_mod = ['IRB', 'PUB', 'COL', 'NPU', 'MDS', 'GSO']
-        self.consent_type_list = [(x + '-' + y)
-                                  for x in data_lim for y in data_lim_mod]
-        self.race_list = [
-            "White",
-            "Black or African American",
-            "Asian",
-            "Native Hawaiian or Other Pacific Islander",
-            "American Indian or Alaska Native",
-            "Other",
-            "Unavailable",
-            "Not Reported",
-            "not allowed to collect"]
-        self.ethnicity_list = [
-            "hispanic or latino",
-            "not hispanic or latino",
-            "Unknown",
-            "not reported",
-            "not allowed to collect"]
-        self.gender_list = ['female', 'male', 'unknown', 'unspecified',
-                            'not reported']
-
-    def _biospecimen_choices(self):
-        """
-        Provides the choices for filling biospecimen entity
-        """
-        self.min_biospecimens = 0
-        self.max_biospecimens = 5
-        self.tissue_type_list = ['Tumor', 'Normal', 'Abnormal', 'Peritumoral',
-                                 'Unknown', 'Not Reported']
-        sref_file = open('dataservice/util/data_gen/composition.txt', 'r')
-        reader = csv.reader(sref_file)
-        self.composition_list = []
-        for line in reader:
-            self.composition_list.append(line[0])
-        self.tumor_descriptor_list = [
-            'Metastatic',
-            'Primary',
-            'Recurrence',
-            'Xenograft',
-            'NOS',
-            'Unknown',
-            'Not Reported']
-        at_file = open('dataservice/util/data_gen/analyte_type.txt', 'r')
-        reader = csv.reader(at_file)
-        self.analyte_type_list = []
-        for line in reader:
-            self.analyte_type_list.append(line[0])
-        self.shipment_origin_list = ['CORIELL']
-
-    def _sequencing_center_choices(self):
-        """
-        Provides the choices for filling Sequencing Center entity
-        """
-        self.name_list = [
-            'Baylor College of Medicine',
-            'Washington University',
-            'HudsonAlpha',
-            'Broad Institute']
-
-    def _experiment_choices(self):
-        """
-        Provides the choices for filling Sequencing Experiment entity
-        """
-        self.min_seq_exps = 1
-        self.max_seq_exps = 3
-        aref_file = open('dataservice/util/data_gen/instrument_model.txt', 'r')
-        reader = csv.reader(aref_file)
-        self.instrument_model_list = []
-        for line in reader:
-            self.instrument_model_list.append(line[0])
-
-        self.is_paired_end_list = [True, False]
-        self.library_strand_list = ['Unstranded', 'First_Stranded',
-                                    'Second_Stranded']
-        self.experiment_strategy_list = [
-            'WGS',
-            'WXS',
-            'RNA-Seq',
-            'ChIP-Seq',
-            'Linked-Read WGS (10x Chromium)',
-            'miRNA-Seq',
-            'Bisulfite-Seq',
-            'Validation',
-            'Amplicon',
-            'Targeted Sequencing',
-            'Other']
-        self.platform_list = ['Illumina', 'SOLiD', 'LS454', 'Ion Torrent',
-                              'Complete Genomics', 'PacBio', 'Other']
-
-    def _diagnoses_choices(self):
-        """
-        Provides the choices for filling Diagnosis entity
-        """
-        self.max_diagnoses = 10
-        self.min_diagnoses = 1
-        dref_file = open('dataservice/util/data_gen/diagnoses.txt', 'r')
-        reader = csv.reader(dref_file)
-        self.diagnosis_list = []
-        for line in reader:
-            self.diagnosis_list.append(line[0])
-        self.diagnosis_category_list = ['cancer', 'structural birth defect']
-        asref_file = open('dataservice/util/data_gen/anatomical_site.txt', 'r')
-        reader = csv.reader(asref_file)
-        self.tumor_location_list = []
-        for line in reader:
-            self.tumor_location_list.append(line[0])
-
-    def _genomic_files_choices(self):
-        """
-        Provides the choices for filling Genomic File entity
-        """
-        self.min_gen_files = 0
-        self.max_gen_files = 5
-        self.file_format_list = ['.cram', '.bam', '.vcf']
-        self.controlled_access_list = [True, False]
-        self.data_type_list = []
-        fref_file = open('dataservice/util/data_gen/data_type.txt', 'r')
-        reader = csv.reader(fref_file)
-        for line in reader:
-            self.data_type_list.append(line[0])
-
-    def _phenotype_choices(self):
-        """
-        Provides Choices for filling Phenotypes
-        """
-        self.min_phenotypes = 0
-        self.max_phenotypes = 8
-        pref_file = open('dataservice/util/data_gen/phenotype_hpo.csv', 'r')
-        reader = csv.reader(pref_file)
-        self.phenotype_chosen_list = []
-        for row in reader:
-            self.phenotype_chosen_list.append(row)
-        self.observed_list = ['negative', 'positive']
-
-    def _outcomes_choices(self):
-        """
-        Provides the Choices for filling Outcome Entity
-        """
-        self.min_outcomes = 0
-        self.max_outcomes = 5
-        self.vital_status_list = ['Alive', 'Dead', 'Not Reported']
-        self.disease_related_list = [True, False, 'Not Reported']
-
-    def _get_unique_sites(self, diagnoses):
-        """
-        Method to return set of anatomical_sites for
-        biospecimens from diagnoses;
-        Assuming the biospecimen is be collected from the same place that was
-        used for the diagnosis
-        """
-        self.anatomical_site_list = []
-        for i in range(0, len(diagnoses)):
-            self.anatomical_site_list.append(diagnoses[i].tumor_location)
-
-    def setup(self, config_name):
-        """
-        Creates tables in database
-        """
-        self.app = create_app(config_name)
-        self.app_context = self.app.app_context()
-        self.app_context.push()
-        db.create_all()
-
-    def teardown(self):
-        db.session.remove()
-        self.app_context.pop()
-
-    def drop_all(self):
-        db.session.remove()
-        db.drop_all()
-        self.app_context.pop()
+    """
+    Generates studies of participants along with every entity under them
+
+    Every participant gets a family, diagnoses, phenotypes, outcomes,
+    samples, biospecimens and genomic files linked to sequencing
+    experiments, read groups and tasks. Studies are generated and committed
+    one at a time.
+
+    :param seed: Seed of all generated values
+    :param participants: Total number of participants to generate
+    :param participants_per_study: Maximum number of participants in a study
+    :param indexd_docs: A file to write the indexd document of every
+    generated file to, as JSON lines
+    """
+
+    def __init__(self, seed=0, participants=10, participants_per_study=1000,
+                 indexd_docs=None):
+        self.rng = random.Random(seed)
+        self.participants = participants
+        self.participants_per_study = participants_per_study
+        self.indexd_docs = indexd_docs
+        self.counts = Counter()
+
+        self._clock = 0
+        self._kf_ids = {}
+        self._issued = Counter()
+        self._choices()
+
+    def _choices(self):
+        """
+        Load the values that fields are chosen from
+        """
+        self.investigators = _read_choices('investigator.csv')
+        self.diagnoses = [r[0] for r in _read_choices('diagnoses.txt')]
+        self.anatomical_sites = [r[0] for r in
+                                 _read_choices('anatomical_site.txt')]
+        self.compositions = [r[0] for r in _read_choices('composition.txt')]
+        self.instrument_models = [r[0] for r in
+                                  _read_choices('instrument_model.txt')]
+        self.data_types = [r[0] for r in _read_choices('data_type.txt')]
+        self.phenotypes = _read_choices('phenotype_hpo.csv')
+        # Sort enums so that choices do not depend on set ordering
+        self.genders = sorted(GENDER_ENUM)
+        self.ethnicities = sorted(ETHNICITY_ENUM)
+        self.races = sorted(RACE_ENUM)
+        self.analyte_types = sorted(ANALYTE_TYPE_ENUM)
+        self.duo_ids = sorted(DUO_ID_BIOSPECIMEN_ENUM)
+        self.preservation_methods = sorted(PRESERVATION_METHOD_ENUM)
+        self.diagnosis_categories = sorted(DIAGNOSIS_CATEGORY_ENUM)
+        self.vital_statuses = sorted(VITAL_STATUS_ENUM)
+        self.observed = sorted(OBSERVED_ENUM)
+        self.experiment_strategies = sorted(EXPERIMENT_STRATEGY_ENUM)
+        self.platforms = sorted(PLATFORM_ENUM)
 
     def create_and_publish_all(self):
         """
-        Create and save all objects to db
-        """
-        # Create families
-        self._create_family(self.max_participants)
-        # Create participants
-        self._create_participants_and_studies(self.max_participants)
-        # Create aliased participants
-        self._create_aliases(5)
-        # Create workflows
-        workflows = self._create_workflows(2)
-        # Link workflows and genomic files
-        self._link_genomic_files_to_workflows(workflows)
-        # Create family relationships
-        self._create_family_relationships()
-        # Tear down
-        self.teardown()
-
-    def _create_aliases(self, total):
-        for i in range(total):
-            id1 = random.randint(0, self.max_participants - 1)
-            p1 = Participant.query.filter_by(
-                external_id='participant_{}'.format(id1)).first()
-            p2 = Participant.query.filter_by(
-                external_id='participant_{}'.format(id1 + 1)).first()
-            p1.add_alias(p2)
-        db.session.commit()
-
-    def _create_study_files(self, total=None):
-        """
-        Create Study Files
-        """
-        study_files = []
-        for i in range(total):
-            sf_data = {
-                'file_name': 'StudyFile{}'.format(i),
-            }
-            study_files.append(StudyFile(**sf_data))
-        return study_files
-
-    def _create_studies_investigators(self, total=None):
-        """
-        Create studies and investigators
-        investigator.csv contains list of investigator name, instistuion name
-        and studies
-        """
-        pref_file = open('dataservice/util/data_gen/investigator.csv', 'r')
-        reader = csv.reader(pref_file)
-        investigator_chosen_list = []
-        for row in reader:
-            investigator_chosen_list.append(row)
-
-        invest_study = random.choice(investigator_chosen_list)
-        # Create Investigators
-        min_investigators = 1
-        max_investigators = len(invest_study)
-        if not total:
-            total = random.randint(min_investigators, max_investigators)
-        investigators = []
-        for i in range(total):
-            kwargs = {
-                'name': invest_study[0],
-                'institution': invest_study[1]
-            }
-            inv = Investigator(**kwargs)
-            investigators.append(inv)
-            db.session.add(inv)
-        db.session.commit()
-        # Create Studies
-        studies = []
-        for i in range(total):
-            kwargs = {
-                'attribution': ('https://dbgap.ncbi.nlm.nih.gov/'
-                                'aa/wga.cgi?view_pdf&stacc=phs000178.v9.p8'),
-                'external_id': 'phs00{}'.format(i),
-                'name': invest_study[2],
-                'version': 'v1',
-                'investigator_id': investigators[i].kf_id
-            }
-            study_files = self._create_study_files(random.randint(0, total))
-            s = Study(**kwargs, study_files=study_files)
-            studies.append(s)
-            db.session.add(s)
-        db.session.commit()
-
-        return studies
-
-    def _pairwise(self, iterable):
-        """
-        Iterate over an iterable in consecutive pairs
-        """
-        a, b = tee(iterable)
-        next(b, None)
-        return zip(a, b)
-
-    def _create_family_relationships(self):
-        """
-        Create family relationships between pairs of participants
-        """
-        participants = Participant.query.all()
-        for participant, relative in self._pairwise(participants):
-            gender = participant.gender
-            rel = 'mother'
-            if gender == 'male':
-                rel = 'father'
-            r = FamilyRelationship(participant=participant, relative=relative,
-                                   participant_to_relative_relation=rel)
-            db.session.add(r)
-        db.session.commit()
-
-    def _create_participants_and_studies(self, total):
-        """
-        Creates studies and participants with biospecimens, and diagnoses
-        """
-        # Studies
-        studies = self._create_studies_investigators()
-        #
-        seq_centers = self._create_sequencing_centers()
-        # Participants
-        for i in range(total):
-            diagnoses = self._create_diagnoses(
-                random.randint(self.min_diagnoses, self.max_diagnoses))
-            self._get_unique_sites(diagnoses)
-            biospecimens = self._create_biospecimens(random.randint
-                                                     (self.min_biospecimens,
-                                                      self.max_biospecimens))
-            outcomes = self._create_outcomes(random.randint(self.min_outcomes,
-                                                            self.max_outcomes))
-            phenotypes = self._create_phenotypes(
-                random.randint(self.min_phenotypes, self.max_phenotypes))
-            p = Participant(
-                external_id='participant_{}'.format(i),
-                # family_id='family_{}'.format(total % (i + 1)),
-                is_proband=random.choice(self.is_proband_list),
-                consent_type=random.choice(self.consent_type_list),
-                biospecimens=biospecimens,
-                diagnoses=diagnoses,
-                outcomes=outcomes,
-                phenotypes=phenotypes,
-                study_id=random.choice(studies).kf_id)
-            db.session.add(p)
-            f = Family(participants=[p])
-            db.session.add(f)
-        db.session.commit()
+        Generate and save the whole dataset
 
-    def _create_family(self, total):
+        :returns: A Counter of the number of rows copied to each table
         """
-        Create Family
-        """
-        f_list = []
-        for i in range(total):
-            f = Family(external_id='family_{}'.format(total % (i + 1)))
-            db.session.add(f)
+        db.create_all()
+        self._create_shared()
         db.session.commit()
 
-    def _create_biospecimens(self, total):
-        """
-        Create biospecimens with genomic_files
-        """
-
-        s_list = []
-        dt = datetime.now()
-        for i in range(total):
-            biospecimen_data = {
-                'external_sample_id': 'sample_{}'.format(i),
-                'tissue_type': random.choice(self.tissue_type_list),
-                'composition': random.choice(self.composition_list),
-                'anatomical_site': random.choice(self.anatomical_site_list),
-                'age_at_event_days': random.randint(0, 32872),
-                'tumor_descriptor': random.choice(self.tumor_descriptor_list),
-                'external_aliquot_id': 'aliquot_{}'.format(i),
-                'shipment_origin': random.choice(self.shipment_origin_list),
-                'analyte_type': random.choice(self.analyte_type_list),
-                'concentration_mg_per_ml': (random.randint(700, 4000)) / 10,
-                'volume_ml': (random.randint(200, 400)) / 10,
-                'shipment_date': dt - relativedelta.relativedelta(
-                    years=random.randint(1, 2)) - relativedelta.relativedelta(
-                    months=random.randint(1, 12)) +
-                relativedelta.relativedelta(days=random.randint(1, 30))
-            }
-            genomic_files = self._create_genomic_files(
-                random.randint(self.min_gen_files,
-                               self.max_gen_files))
-            sc = random.choice(SequencingCenter.query.all())
-            b = Biospecimen(
-                **biospecimen_data, genomic_files=genomic_files,
-                sequencing_center_id=sc.kf_id)
-            s_list.append(b)
-        return s_list
-
-    def _create_genomic_files(self, total):
-        """
-        Creates genomic files with sequencing experiments
-        """
-        max_size_mb = 5000
-        min_size_mb = 1000
-
-        gf_list = []
-        for i in range(total):
-            kwargs = {
-                'file_name': 'file_{}'.format(i),
-                'size': (random.randint(min_size_mb, max_size_mb) *
-                         MB_TO_BYTES),
-                'data_type': random.choice(self.data_type_list),
-                'file_format': random.choice(
-                    self.file_format_list),
-                'urls': ['s3://file_{}'.format(i)],
-                'controlled_access': random.choice(
-                    self.controlled_access_list),
-                'hashes': {'md5': str(uuid.uuid4()).replace('-', '')}
-            }
-            se = random.choice(SequencingExperiment.query.all())
-            gf_list.append(GenomicFile(**kwargs,
-                           sequencing_experiment_id=se.kf_id))
-        return gf_list
-
-    def _create_experiments(self, total):
-        """
-        Creates sequencing experiments
-        """
-
-        e_list = []
-        dt = datetime.now()
-        for i in range(total):
-
-            e_data = {
-                'external_id': 'sequencing_experiment_{}'.format(i),
-                'experiment_date': dt - relativedelta.relativedelta(
-                    years=random.randint(1, 3)) + relativedelta.relativedelta(
-                    months=random.randint(1, 6)) +
-                relativedelta.relativedelta(days=random.randint(1, 30)),
-                'experiment_strategy':
-                random.choice(self.experiment_strategy_list),
-                'library_name': 'Test_library_name_{}'.format(i),
-                'library_strand': random.choice(self.library_strand_list),
-                'is_paired_end': random.choice(self.is_paired_end_list),
-                'platform': random.choice(self.platform_list),
-                'instrument_model': random.choice(self.instrument_model_list),
-                'max_insert_size': random.choice([300, 350, 500]),
-                'mean_insert_size': random.randint(300, 500),
-                'mean_depth': random.randint(40, 60),
-                'total_reads': random.randint(400, 1000),
-                'mean_read_length': random.randint(400, 1000)
-            }
-            genomic_files = self._create_genomic_files(
-                random.randint(self.min_gen_files,
-                               self.max_gen_files))
-            se = SequencingExperiment(**e_data,
-                                      genomic_files=genomic_files)
-            e_list.append(SequencingExperiment(**e_data,
-                          genomic_files=genomic_files))
-        return e_list
-
-    def _create_workflows(self, total=None):
-        """
-        Create workflows
-        """
-        min_workflows = 1
-        max_workflows = 5
-        if not total:
-            total = random.randint(min_workflows, max_workflows)
-        wf_list = []
-        for i in range(total):
-            data = {
-                'task_id': 'task_{}'.format(i),
-                'name': 'kf_alignment_{}'.format(i),
-                'github_commit_url': (
-                    'https://github.com/kids-first/'
-                    'kf-alignment-workflow/commit/'
-                    '0d7f93dff6463446b0ed43dc2883f60c28e6f1f4')
-            }
-            wf = Workflow(**data)
-            db.session.add(wf)
-            wf_list.append(wf)
-        db.session.commit()
+        study = 0
+        remaining = self.participants
+        while remaining > 0:
+            size = min(remaining, self.participants_per_study)
+            self._create_study(study, size)
+            db.session.commit()
+            remaining -= size
+            study += 1
 
-        return wf_list
+        return self.counts
 
-    def _link_genomic_files_to_workflows(self, workflows):
+    def clear_all(self):
         """
-        Link all genomic files to at least 1 workflow
+        Remove all rows from the data model's tables
         """
-        for gf in GenomicFile.query.all():
-            is_input = not (gf.data_type.startswith('aligned'))
-            n_workflows = random.randint(1, len(workflows))
-            for i in range(n_workflows):
-                wgf = WorkflowGenomicFile(workflow_id=workflows[i].kf_id,
-                                          genomic_file_id=gf.kf_id,
-                                          is_input=is_input)
-                db.session.add(wgf)
+        tables = ', '.join(t.name for t in db.metadata.sorted_tables)
+        db.session.execute('TRUNCATE {} CASCADE'.format(tables))
         db.session.commit()
 
-    def _create_diagnoses(self, total):
-        """
-        Creates diagnoses
-        """
-        diag_list = []
-        for i in range(total):
-
-            data = {
-                'external_id': 'diagnosis_{}'.format(i),
-                'diagnosis': random.choice(self.diagnosis_list),
-                'diagnosis_category': random.choice(
-                    self.diagnosis_category_list),
-                'tumor_location': random.choice(self.tumor_location_list),
-                'age_at_event_days': random.randint(0, 32872)
-            }
-            diag_list.append(Diagnosis(**data))
-        return diag_list
-
-    def _create_outcomes(self, total):
-        """
-        creates outcomes
-        """
-        outcomes_list = []
-        for i in range(total):
-            # Fill disaese_related only if person is dead
-            vs = random.choice(self.vital_status_list)
-            if vs == 'Dead':
-                dr = random.choice(self.disease_related_list)
-                data = {
-                    'vital_status': vs,
-                    'disease_related': dr,
-                    'age_at_event_days': random.randint(0, 32872)
-                }
-                outcomes_list.append(Outcome(**data))
+    def _create_shared(self):
+        """
+        Create the sequencing centers and cavatica apps shared by studies
+        """
+        rows = OrderedDict()
+        rows[SequencingCenter] = [
+            self._row(SequencingCenter, name=name,
+                      external_id='SC-{}'.format(i))
+            for i, name in enumerate(SEQUENCING_CENTERS)
+        ]
+        rows[CavaticaApp] = [
+            self._row(CavaticaApp, name=name, revision=1,
+                      external_cavatica_app_id='kids-first/{}'.format(name),
+                      github_commit_url=(
+                          'https://github.com/kids-first/{}/commit/{:040x}'
+                          .format(name, self.rng.getrandbits(160))))
+            for name in CAVATICA_APPS
+        ]
+        for model, model_rows in rows.items():
+            self._copy(model, model_rows)
+        self.sequencing_center_ids = [r['kf_id']
+                                      for r in rows[SequencingCenter]]
+        self.cavatica_app_ids = [r['kf_id'] for r in rows[CavaticaApp]]
+
+    def _create_study(self, index, size):
+        """
+        Generate and copy a study of `size` participants
+        """
+        rng = self.rng
+        rows = {model: [] for model in COPY_ORDER}
+
+        name, institution, title = rng.choice(self.investigators)[:3]
+        investigator = self._row(Investigator, name=name,
+                                 institution=institution)
+        study = self._row(Study, external_id='phs{:06d}'.format(index),
+                          name=title, version='v1',
+                          short_code='KF-{}'.format(index),
+                          data_access_authority='dbGaP',
+                          investigator_id=investigator['kf_id'])
+        rows[Investigator].append(investigator)
+        rows[Study].append(study)
+        for i in range(rng.randint(0, 3)):
+            file_name = '{}-study-file-{}.pdf'.format(study['external_id'], i)
+            study_file = self._row(StudyFile, external_id=file_name,
+                                   study_id=study['kf_id'],
+                                   availability='Immediate Download',
+                                   data_type='Other', file_format='pdf',
+                                   latest_did=self._uuid())
+            self._document(study_file, file_name, study['external_id'])
+            rows[StudyFile].append(study_file)
+
+        experiments = []
+        for i in range(max(1, size // 10)):
+            se = self._row(
+                SequencingExperiment,
+                external_id='{}-SE-{}'.format(study['external_id'], i),
+                experiment_strategy=rng.choice(self.experiment_strategies),
+                experiment_date=EPOCH - timedelta(days=rng.randint(0, 1000)),
+                is_paired_end=rng.random() < 0.5,
+                platform=rng.choice(self.platforms),
+                instrument_model=rng.choice(self.instrument_models),
+                mean_depth=rng.randint(30, 60),
+                total_reads=rng.randint(10 ** 8, 10 ** 9),
+                sequencing_center_id=rng.choice(self.sequencing_center_ids))
+            rg = self._row(ReadGroup,
+                           external_id='{}-RG-{}'.format(study['external_id'],
+                                                         i),
+                           flow_cell='FC{:06d}'.format(rng.randint(0, 10**6)),
+                           lane_number=rng.randint(1, 8),
+                           quality_scale='Illumina18')
+            rows[SequencingExperiment].append(se)
+            rows[ReadGroup].append(rg)
+            experiments.append((se['kf_id'], rg['kf_id']))
+
+        tasks = []
+        for i in range(5):
+            task = self._row(Task, external_task_id=self._uuid(),
+                             name='{} task {}'.format(study['external_id'],
+                                                      i),
+                             cavatica_app_id=rng.choice(
+                                 self.cavatica_app_ids))
+            rows[Task].append(task)
+            tasks.append(task['kf_id'])
+
+        participant = 0
+        while participant < size:
+            family_size = min(rng.randint(1, 4), size - participant)
+            self._create_family(rows, study, participant, family_size,
+                                experiments, tasks)
+            participant += family_size
+
+        # Rows are copied outside of the session, so their denormalized
+        # study_id is set here rather than by sync_study_ids
+        for model in COPY_ORDER:
+            if issubclass(model, StudyScopedMixin):
+                for row in rows[model]:
+                    row['study_id'] = study['kf_id']
+            self._copy(model, rows[model])
+
+    def _create_family(self, rows, study, first, size, experiments, tasks):
+        """
+        Generate a family of participants, the first being the proband
+        """
+        rng = self.rng
+        family = self._row(Family,
+                           external_id='{}-FM-{}'.format(study['external_id'],
+                                                         first),
+                           family_type=FAMILY_TYPES[size])
+        rows[Family].append(family)
+
+        members = []
+        for i in range(first, first + size):
+            alias_group_id = None
+            if i % ALIAS_EVERY == 1 and members:
+                # Alias this participant to the previous one
+                group = self._row(AliasGroup)
+                rows[AliasGroup].append(group)
+                alias_group_id = group['kf_id']
+                members[-1]['alias_group_id'] = alias_group_id
+            p = self._row(
+                Participant,
+                external_id='{}-PT-{}'.format(study['external_id'], i),
+                family_id=family['kf_id'],
+                is_proband=i == first,
+                race=rng.choice(self.races),
+                ethnicity=rng.choice(self.ethnicities),
+                gender=rng.choice(self.genders),
+                affected_status=i == first,
+                species='Homo sapiens',
+                study_id=study['kf_id'],
+                alias_group_id=alias_group_id)
+            rows[Participant].append(p)
+            members.append(p)
+            self._create_participant_entities(rows, p, experiments, tasks)
+
+        proband = members[0]
+        for relative, (relation, reverse) in zip(members[1:], RELATIONS):
+            rows[FamilyRelationship].append(self._row(
+                FamilyRelationship,
+                participant1_id=relative['kf_id'],
+                participant2_id=proband['kf_id'],
+                participant1_to_participant2_relation=relation,
+                participant2_to_participant1_relation=reverse))
+
+    def _create_participant_entities(self, rows, p, experiments, tasks):
+        """
+        Generate the clinical data, samples, biospecimens and genomic files
+        of a participant
+        """
+        rng = self.rng
+        diagnoses = []
+        for i in range(rng.randint(1, 3)):
+            dg = self._row(
+                Diagnosis,
+                external_id='{}-DG-{}'.format(p['external_id'], i),
+                source_text_diagnosis=rng.choice(self.diagnoses),
+                diagnosis_category=rng.choice(self.diagnosis_categories),
+                source_text_tumor_location=rng.choice(self.anatomical_sites),
+                age_at_event_days=rng.randint(0, 32872),
+                participant_id=p['kf_id'])
+            rows[Diagnosis].append(dg)
+            diagnoses.append(dg)
+
+        for i in range(rng.randint(0, 4)):
+            phenotype, hpo_id = rng.choice(self.phenotypes)[:2]
+            rows[Phenotype].append(self._row(
+                Phenotype,
+                external_id='{}-PH-{}'.format(p['external_id'], i),
+                source_text_phenotype=phenotype, hpo_id_phenotype=hpo_id,
+                observed=rng.choice(self.observed),
+                age_at_event_days=rng.randint(0, 32872),
+                participant_id=p['kf_id']))
+
+        if rng.random() < 0.5:
+            vital_status = rng.choice(self.vital_statuses)
+            rows[Outcome].append(self._row(
+                Outcome,
+                external_id='{}-OC'.format(p['external_id']),
+                vital_status=vital_status,
+                disease_related=(rng.choice(['Yes', 'No'])
+                                 if vital_status == 'Deceased' else None),
+                age_at_event_days=rng.randint(0, 32872),
+                participant_id=p['kf_id']))
+
+        samples = []
+        for i in range(rng.randint(1, 2)):
+            dg = rng.choice(diagnoses)
+            sample = self._row(
+                Sample,
+                external_id='{}-SA-{}'.format(p['external_id'], i),
+                age_at_event_days=dg['age_at_event_days'],
+                anatomical_location=dg['source_text_tumor_location'],
+                preservation_method=rng.choice(self.preservation_methods),
+                participant_id=p['kf_id'])
+            rows[Sample].append(sample)
+            samples.append((sample, dg))
+            if i > 0:
+                parent = samples[0][0]
+                rows[SampleRelationship].append(self._row(
+                    SampleRelationship,
+                    parent_id=parent['kf_id'],
+                    child_id=sample['kf_id'],
+                    external_parent_id=parent['external_id'],
+                    external_child_id=sample['external_id']))
+
+        for sample, dg in samples:
+            for i in range(rng.randint(1, 2)):
+                bs = self._row(
+                    Biospecimen,
+                    external_sample_id=sample['external_id'],
+                    external_aliquot_id='{}-AL-{}'.format(
+                        sample['external_id'], i),
+                    composition=rng.choice(self.compositions),
+                    source_text_anatomical_site=(
+                        dg['source_text_tumor_location']),
+                    age_at_event_days=dg['age_at_event_days'],
+                    analyte_type=rng.choice(self.analyte_types),
+                    concentration_mg_per_ml=rng.randint(700, 4000) / 10,
+                    volume_ul=rng.randint(200, 400) / 10,
+                    shipment_date=EPOCH + timedelta(
+                        days=rng.randint(0, 1000)),
+                    preservation_method=sample['preservation_method'],
+                    participant_id=p['kf_id'],
+                    sequencing_center_id=rng.choice(
+                        self.sequencing_center_ids),
+                    sample_id=sample['kf_id'],
+                    consent_type='GRU',
+                    dbgap_consent_code='phs001168.c1',
+                    duo_ids=rng.sample(self.duo_ids, rng.randint(0, 3)))
+                rows[Biospecimen].append(bs)
+                rows[BiospecimenDiagnosis].append(self._row(
+                    BiospecimenDiagnosis, biospecimen_id=bs['kf_id'],
+                    diagnosis_id=dg['kf_id']))
+                self._create_genomic_files(rows, bs, experiments, tasks)
+
+    def _create_genomic_files(self, rows, bs, experiments, tasks):
+        """
+        Generate a biospecimen's genomic files with their links to sequencing
+        experiments, read groups and tasks
+        """
+        rng = self.rng
+        for i in range(rng.randint(0, 3)):
+            data_type = rng.choice(self.data_types)
+            file_format = rng.choice(['cram', 'bam', 'vcf'])
+            file_name = '{}-GF-{}.{}'.format(bs['external_aliquot_id'], i,
+                                             file_format)
+            gf = self._row(GenomicFile, external_id=file_name,
+                           data_type=data_type, file_format=file_format,
+                           is_harmonized=rng.random() < 0.5,
+                           controlled_access=rng.random() < 0.8,
+                           availability='Immediate Download',
+                           latest_did=self._uuid())
+            self._document(gf, file_name, bs['participant_id'])
+            se_id, rg_id = rng.choice(experiments)
+            rows[GenomicFile].append(gf)
+            rows[BiospecimenGenomicFile].append(self._row(
+                BiospecimenGenomicFile, biospecimen_id=bs['kf_id'],
+                genomic_file_id=gf['kf_id']))
+            rows[SequencingExperimentGenomicFile].append(self._row(
+                SequencingExperimentGenomicFile,
+                sequencing_experiment_id=se_id, genomic_file_id=gf['kf_id']))
+            rows[ReadGroupGenomicFile].append(self._row(
+                ReadGroupGenomicFile, read_group_id=rg_id,
+                genomic_file_id=gf['kf_id']))
+            rows[TaskGenomicFile].append(self._row(
+                TaskGenomicFile, task_id=rng.choice(tasks),
+                genomic_file_id=gf['kf_id'],
+                is_input=not data_type.startswith('aligned')))
+
+    def _row(self, model, **values):
+        """
+        Build a row of a model with its kf_id, uuid and timestamps
+        """
+        ids = self._kf_ids.setdefault(model, deque())
+        if not ids:
+            # Reserve blocks that grow with the number of rows generated so
+            # that small tables and datasets do not waste reservations
+            count = min(max(self._issued[model], 100), KF_ID_BLOCK)
+            ids.extend(reserve_kf_ids(model, count))
+        self._issued[model] += 1
+        created_at = EPOCH + timedelta(milliseconds=self._clock)
+        self._clock += 1
+        values.update(kf_id=ids.popleft(), uuid=self._uuid(),
+                      created_at=created_at, modified_at=created_at)
+        return values
+
+    def _uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _document(self, row, file_name, owner):
+        """
+        Write the indexd document of a generated file
+        """
+        size = self.rng.randint(1, 5000) * MB_TO_BYTES
+        md5 = '{:032x}'.format(self.rng.getrandbits(128))
+        if self.indexd_docs is None:
+            return
+        created = row['created_at'].isoformat()
+        doc = {
+            'did': row['latest_did'],
+            'baseid': row['uuid'],
+            'rev': md5[:8],
+            'form': 'object',
+            'file_name': file_name,
+            'size': size,
+            'hashes': {'md5': md5},
+            'urls': ['s3://kf-data-gen/{}/{}'.format(owner, file_name)],
+            'acl': [],
+            'authz': ['/programs/INTERNAL'],
+            'metadata': {},
+            'version': None,
+            'created_date': created,
+            'updated_date': created,
+        }
+        self.indexd_docs.write(json.dumps(doc) + '\n')
+
+    def _copy(self, model, rows):
+        """
+        Stream rows into a model's table with COPY FROM STDIN
+        """
+        if not rows:
+            return
+        table = model.__table__
+        columns = [c.name for c in table.columns if c.name in rows[0]]
+        statement = "COPY {} ({}) FROM STDIN WITH (ENCODING 'UTF8')".format(
+            table.name, ', '.join('"{}"'.format(c) for c in columns))
+        lines = ('\t'.join(_copy_value(row.get(c)) for c in columns) + '\n'
+                 for row in rows)
+        cursor = db.session.connection().connection.cursor()
+        cursor.copy_expert(statement, CopyStream(lines))
+        self.counts[table.name] += len(rows)
+
+
+class CopyStream(object):
+    """
+    A file-like object reading UTF-8 from an iterator of strings, used to
+    stream rows to COPY without building the whole input in memory
+    """
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = ''
+
+    def read(self, size=-1):
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
                 break
-            else:
-                data = {
-                    'vital_status': vs,
-                    'age_at_event_days': random.randint(0, 32872)
-                }
-                outcomes_list.append(Outcome(**data))
-        return outcomes_list
-
-    def _create_phenotypes(self, total):
-        """
-        Create phenotypes
-        """
-        phen_list = []
-        for i in range(total):
-            ph = random.choice(self.phenotype_chosen_list)
-            phen = {
-                'phenotype': ph[0],
-                'hpo_id': ph[1],
-                'observed': random.choice(self.observed_list),
-                'age_at_event_days': random.randint(0, 32872)
-            }
-            phen_list.append(Phenotype(**phen))
-        return phen_list
-
-    def _create_sequencing_centers(self):
-        """
-        Create sequencing center
-        """
-        sc = {
-          'name': random.choice(self.name_list)
-          }
-        sequencing_experiments = self._create_experiments(
-            random.randint(self.min_seq_exps, self.max_seq_exps))
-        sc = SequencingCenter(**sc,
-                              sequencing_experiments=sequencing_experiments)
-        db.session.add(sc)
-        db.session.commit()
-        return SequencingCenter(**sc)
+            chunks.append(line)
+            length += len(line)
+        data = ''.join(chunks)
+        if size < 0:
+            size = len(data)
+        self._buffer = data[size:]
+        return data[:size].encode('utf-8')
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+
+def _copy_value(value):
+    """
+    Format a value in the text format of COPY
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        text = 't' if value else 'f'
+    elif isinstance(value, datetime):
+        text = value.isoformat()
+    elif isinstance(value, (list, tuple)):
+        text = '{{{}}}'.format(','.join(
+            '"{}"'.format(str(v).replace('\\', '\\\\').replace('"', '\\"'))
+            for v in value))
+    elif isinstance(value, dict):
+        text = json.dumps(value)
+    else:
+        text = str(value)
+    return (text.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
@@ -0,0 +1,313 @@
+"""
+An in-process fake of the Gen3 indexd API
+
+Serves the endpoints used by dataservice.extensions.flask_indexd over real
+HTTP so that connection handling, concurrency and latency of the indexd
+client may be measured without a deployment of indexd:
+
+- POST / - create a new document
+- GET /<did> - get a document
+- PUT /<did>?rev= - update a document
+- POST /<did>?rev= - create a new version of a document
+- GET /<did>/versions - get all versions of a document
+- DELETE /<did>?rev= - delete a document
+- POST /bulk/documents - get many documents by did
+
+Documents keep indexd's revision semantics: every change gives a document a
+new rev and a change must provide the current rev. Versions of a document
+share a baseid.
+
+Usage:
+
+    with FakeIndexd(latency=0.01) as fake:
+        app.config['INDEXD_URL'] = fake.url
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from werkzeug.exceptions import HTTPException, NotFound
+from werkzeug.routing import Map, Rule
+from werkzeug.serving import make_server, WSGIRequestHandler
+from werkzeug.wrappers import Request, Response
+
+VALID_HASH_ALGOS = {'md5', 'sha1', 'sha256', 'sha512', 'crc', 'etag'}
+# Fields that may be changed by a PUT
+UPDATABLE_FIELDS = {'urls', 'acl', 'authz', 'file_name', 'version',
+                    'metadata', 'urls_metadata'}
+# Fields that must be given to create a document or version
+REQUIRED_FIELDS = {'form', 'size', 'hashes', 'urls'}
+
+
+class IndexdError(HTTPException):
+    """
+    An error response in the format returned by indexd
+    """
+
+    def __init__(self, code, error):
+        super(IndexdError, self).__init__()
+        self.code = code
+        self.error = error
+
+    def get_response(self, environ=None):
+        return _json_response({'error': self.error}, self.code)
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    """
+    Do not log every request made to the fake
+    """
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class FakeIndexd(object):
+    """
+    Serve a fake indexd from a background thread
+
+    :param latency: Seconds to wait before responding to each call
+    :param error_rate: Fraction of calls that fail with a 500
+    :param deleted_rate: Fraction of document GETs that find the document
+    was deleted. The document is removed and a 404 is returned.
+    :param seed: Seed used to decide which calls fail
+    :param host: Interface to listen on
+    :param port: Port to listen on, a free port is chosen by default
+    """
+
+    def __init__(self, latency=0, error_rate=0, deleted_rate=0, seed=None,
+                 host='127.0.0.1', port=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.deleted_rate = deleted_rate
+        self.host = host
+        self.port = port
+
+        self.documents = {}
+        self.calls = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._server = None
+        self._thread = None
+
+        self.url_map = Map([
+            Rule('/', methods=['POST'], endpoint='create'),
+            Rule('/bulk/documents', methods=['POST'], endpoint='bulk'),
+            Rule('/<did>', methods=['GET'], endpoint='get'),
+            Rule('/<did>', methods=['PUT'], endpoint='update'),
+            Rule('/<did>', methods=['POST'], endpoint='new_version'),
+            Rule('/<did>', methods=['DELETE'], endpoint='delete'),
+            Rule('/<did>/versions', methods=['GET'], endpoint='versions'),
+        ])
+
+    @property
+    def url(self):
+        """
+        Base url of the server, suitable for INDEXD_URL
+        """
+        return 'http://{}:{}/'.format(self.host, self.port)
+
+    def start(self):
+        """
+        Start serving requests from a daemon thread
+        """
+        self._server = make_server(self.host, self.port, self, threaded=True,
+                                   request_handler=_QuietRequestHandler)
+        self.port = self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the server and wait for its thread to exit
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add_document(self, doc):
+        """
+        Store a document directly, without a call to the api
+
+        Missing fields are given the values indexd would have assigned.
+
+        :param doc: A dict of document fields
+        :returns: The stored document
+        """
+        now = datetime.now().isoformat()
+        doc = dict(doc)
+        doc.setdefault('did', str(uuid.uuid4()))
+        doc.setdefault('baseid', str(uuid.uuid4()))
+        doc.setdefault('rev', _new_rev())
+        doc.setdefault('form', 'object')
+        doc.setdefault('version', None)
+        doc.setdefault('created_date', now)
+        doc.setdefault('updated_date', now)
+        for key, default in [('acl', []), ('authz', []), ('metadata', {}),
+                             ('urls_metadata', {}), ('hashes', {}),
+                             ('urls', []), ('file_name', None),
+                             ('size', None)]:
+            doc.setdefault(key, default)
+        with self._lock:
+            self.documents[doc['did']] = doc
+        return doc
+
+    def load_documents(self, lines):
+        """
+        Store documents from JSON lines, such as those written by the
+        DataGenerator
+
+        :param lines: An iterable of JSON encoded documents, like a file
+        :returns: Number of documents stored
+        """
+        count = 0
+        for line in lines:
+            if line.strip():
+                self.add_document(json.loads(line))
+                count += 1
+        return count
+
+    def delete_document(self, did):
+        """
+        Remove a document as if it were deleted outside of the dataservice
+        """
+        with self._lock:
+            self.documents.pop(did, None)
+
+    def __call__(self, environ, start_response):
+        request = Request(environ)
+        adapter = self.url_map.bind_to_environ(environ)
+        try:
+            try:
+                endpoint, args = adapter.match()
+            except NotFound:
+                raise IndexdError(404, 'not found')
+            with self._lock:
+                self.calls[endpoint] += 1
+                fail = self._rng.random() < self.error_rate
+            if self.latency:
+                time.sleep(self.latency)
+            if fail:
+                raise IndexdError(500, 'injected failure')
+            response = getattr(self, 'on_' + endpoint)(request, **args)
+        except HTTPException as e:
+            response = e
+        return response(environ, start_response)
+
+    def on_create(self, request):
+        body = self._load_document(request)
+        doc = self.add_document(body)
+        return _json_response(_ids(doc))
+
+    def on_get(self, request, did):
+        with self._lock:
+            doc = self._get(did)
+            if self._rng.random() < self.deleted_rate:
+                del self.documents[did]
+                raise IndexdError(404, 'no record found')
+            return _json_response(doc)
+
+    def on_update(self, request, did):
+        body = _json_body(request)
+        unknown = set(body) - UPDATABLE_FIELDS
+        if unknown:
+            raise IndexdError(400, 'Additional properties are not allowed '
+                              '({})'.format(', '.join(sorted(unknown))))
+        with self._lock:
+            doc = self._get(did, rev=request.args.get('rev'))
+            doc.update(body)
+            doc['rev'] = _new_rev()
+            doc['updated_date'] = datetime.now().isoformat()
+            return _json_response(_ids(doc))
+
+    def on_new_version(self, request, did):
+        body = self._load_document(request)
+        with self._lock:
+            doc = self._get(did)
+            body['baseid'] = doc['baseid']
+            new = self.add_document(body)
+            return _json_response(_ids(new))
+
+    def on_versions(self, request, did):
+        with self._lock:
+            baseid = self._get(did)['baseid']
+            versions = [d for d in self.documents.values()
+                        if d['baseid'] == baseid]
+            return _json_response({str(i): d for i, d in enumerate(versions)})
+
+    def on_delete(self, request, did):
+        with self._lock:
+            self._get(did, rev=request.args.get('rev'))
+            del self.documents[did]
+        return Response('', status=200)
+
+    def on_bulk(self, request):
+        dids = _json_body(request)
+        if not isinstance(dids, list):
+            raise IndexdError(400, 'dids must be a list')
+        with self._lock:
+            return _json_response([self.documents[did] for did in dids
+                                   if did in self.documents])
+
+    def _get(self, did, rev=None):
+        """
+        Get a document, checking its revision if one is given
+        """
+        doc = self.documents.get(did)
+        if doc is None:
+            raise IndexdError(404, 'no record found')
+        if rev is not None and rev != doc['rev']:
+            raise IndexdError(409, 'revision mismatch')
+        return doc
+
+    def _load_document(self, request):
+        """
+        Validate the body of a request to create a document or version
+        """
+        body = _json_body(request)
+        missing = REQUIRED_FIELDS - set(body)
+        if missing:
+            raise IndexdError(400, 'missing required fields: {}'
+                              .format(', '.join(sorted(missing))))
+        invalid = set(body['hashes']) - VALID_HASH_ALGOS
+        if invalid:
+            raise IndexdError(400, 'invalid hash types: {}'
+                              .format(', '.join(sorted(invalid))))
+        # Identifiers are assigned by indexd
+        for key in ['did', 'baseid', 'rev']:
+            body.pop(key, None)
+        return body
+
+
+def _new_rev():
+    return str(uuid.uuid4())[:8]
+
+
+def _ids(doc):
+    return {'did': doc['did'], 'baseid': doc['baseid'], 'rev': doc['rev']}
+
+
+def _json_body(request):
+    try:
+        return json.loads(request.get_data(as_text=True))
+    except ValueError:
+        raise IndexdError(400, 'request body is not valid json')
+
+
+def _json_response(body, status=200):
+    return Response(json.dumps(body), status=status,
+                    mimetype='application/json')
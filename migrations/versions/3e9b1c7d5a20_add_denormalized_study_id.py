@@ -0,0 +1,78 @@
+"""
+Add denormalized study_id to entities below participants
+
+Revision ID: 3e9b1c7d5a20
+Revises: b7f3c9e21d48
+Create Date: 2026-10-19 18:05:41.226103
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import dataservice
+
+
+# revision identifiers, used by Alembic.
+revision = '3e9b1c7d5a20'
+down_revision = 'b7f3c9e21d48'
+branch_labels = None
+depends_on = None
+
+# Tables with a study_id, each after the table it is copied from, with the
+# statement that copies it
+TABLES = [
+    ('biospecimen', """
+        UPDATE biospecimen t SET study_id = p.study_id FROM participant p
+        WHERE t.participant_id = p.kf_id"""),
+    ('diagnosis', """
+        UPDATE diagnosis t SET study_id = p.study_id FROM participant p
+        WHERE t.participant_id = p.kf_id"""),
+    ('outcome', """
+        UPDATE outcome t SET study_id = p.study_id FROM participant p
+        WHERE t.participant_id = p.kf_id"""),
+    ('phenotype', """
+        UPDATE phenotype t SET study_id = p.study_id FROM participant p
+        WHERE t.participant_id = p.kf_id"""),
+    ('sample', """
+        UPDATE sample t SET study_id = p.study_id FROM participant p
+        WHERE t.participant_id = p.kf_id"""),
+    ('biospecimen_diagnosis', """
+        UPDATE biospecimen_diagnosis t SET study_id = b.study_id
+        FROM biospecimen b WHERE t.biospecimen_id = b.kf_id"""),
+    ('biospecimen_genomic_file', """
+        UPDATE biospecimen_genomic_file t SET study_id = b.study_id
+        FROM biospecimen b WHERE t.biospecimen_id = b.kf_id"""),
+    ('genomic_file', """
+        UPDATE genomic_file t SET study_id = l.study_id
+        FROM (SELECT DISTINCT ON (genomic_file_id) genomic_file_id, study_id
+              FROM biospecimen_genomic_file
+              ORDER BY genomic_file_id, created_at, kf_id) l
+        WHERE t.kf_id = l.genomic_file_id"""),
+    ('read_group_genomic_file', """
+        UPDATE read_group_genomic_file t SET study_id = g.study_id
+        FROM genomic_file g WHERE t.genomic_file_id = g.kf_id"""),
+    ('sequencing_experiment_genomic_file', """
+        UPDATE sequencing_experiment_genomic_file t SET study_id = g.study_id
+        FROM genomic_file g WHERE t.genomic_file_id = g.kf_id"""),
+    ('task_genomic_file', """
+        UPDATE task_genomic_file t SET study_id = g.study_id
+        FROM genomic_file g WHERE t.genomic_file_id = g.kf_id"""),
+]
+
+
+def upgrade():
+    for table, backfill in TABLES:
+        op.add_column(table, sa.Column(
+            'study_id', dataservice.api.common.model.KfId(length=11),
+            nullable=True))
+        op.create_foreign_key(None, table, 'study', ['study_id'],
+                              ['kf_id'], ondelete='SET NULL')
+        op.execute(backfill)
+        op.create_index('ix_{}_study_id'.format(table), table,
+                        ['study_id', 'created_at', 'uuid'], unique=False)
+
+
+def downgrade():
+    for table, _ in reversed(TABLES):
+        op.drop_index('ix_{}_study_id'.format(table), table_name=table)
+        op.drop_column(table, 'study_id')
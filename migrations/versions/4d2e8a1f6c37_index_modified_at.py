@@ -0,0 +1,56 @@
+"""
+Add indices on (modified_at, uuid) for change feeds
+
+Revision ID: 4d2e8a1f6c37
+Revises: f1a6d20c93b5
+Create Date: 2026-10-19 16:05:42.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d2e8a1f6c37'
+down_revision = 'f1a6d20c93b5'
+branch_labels = None
+depends_on = None
+
+TABLES = [
+    'alias_group',
+    'biospecimen',
+    'biospecimen_diagnosis',
+    'biospecimen_genomic_file',
+    'cavatica_app',
+    'diagnosis',
+    'family',
+    'family_relationship',
+    'genomic_file',
+    'investigator',
+    'outcome',
+    'participant',
+    'phenotype',
+    'read_group',
+    'read_group_genomic_file',
+    'sample',
+    'sample_relationship',
+    'sequencing_center',
+    'sequencing_experiment',
+    'sequencing_experiment_genomic_file',
+    'study',
+    'study_file',
+    'task',
+    'task_genomic_file'
+]
+
+
+def upgrade():
+    for table in TABLES:
+        op.create_index('ix_{}_modified_at_uuid'.format(table), table,
+                        ['modified_at', 'uuid'], unique=False)
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_index('ix_{}_modified_at_uuid'.format(table),
+                      table_name=table)
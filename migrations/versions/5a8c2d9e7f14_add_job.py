@@ -0,0 +1,58 @@
+"""
+Add job table
+
+Revision ID: 5a8c2d9e7f14
+Revises: 8d2e6f4a1c93
+Create Date: 2026-10-19 21:14:52.301847
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+import dataservice
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8c2d9e7f14'
+down_revision = '8d2e6f4a1c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'job',
+        sa.Column('uuid', postgresql.UUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('modified_at', sa.DateTime(), nullable=True),
+        sa.Column('kf_id', dataservice.api.common.model.KfId(length=11),
+                  nullable=False),
+        sa.Column('type', sa.Text(), nullable=False),
+        sa.Column('params', postgresql.JSONB(astext_type=sa.Text()),
+                  nullable=False),
+        sa.Column('status', sa.Text(), nullable=False),
+        sa.Column('progress', sa.Float(), nullable=False),
+        sa.Column('result', postgresql.JSONB(astext_type=sa.Text()),
+                  nullable=True),
+        sa.Column('result_location', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('run_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('worker', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('kf_id'),
+        sa.UniqueConstraint('uuid')
+    )
+    op.create_index(op.f('ix_job_created_at'), 'job', ['created_at'],
+                    unique=False)
+    op.create_index('ix_job_status_run_at', 'job', ['status', 'run_at'],
+                    unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_job_status_run_at', table_name='job')
+    op.drop_index(op.f('ix_job_created_at'), table_name='job')
+    op.drop_table('job')
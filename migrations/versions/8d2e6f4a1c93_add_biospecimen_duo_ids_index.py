@@ -0,0 +1,25 @@
+"""
+Add GIN index on biospecimen duo_ids
+
+Revision ID: 8d2e6f4a1c93
+Revises: 3e9b1c7d5a20
+Create Date: 2026-10-19 19:42:17.508314
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e6f4a1c93'
+down_revision = '3e9b1c7d5a20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_biospecimen_duo_ids', 'biospecimen', ['duo_ids'],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_biospecimen_duo_ids', table_name='biospecimen')
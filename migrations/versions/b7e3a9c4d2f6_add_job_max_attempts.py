@@ -0,0 +1,26 @@
+"""
+Add max_attempts to job
+
+Revision ID: b7e3a9c4d2f6
+Revises: 5a8c2d9e7f14
+Create Date: 2026-10-19 23:02:17.514630
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3a9c4d2f6'
+down_revision = '5a8c2d9e7f14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('job', sa.Column('max_attempts', sa.Integer(),
+                                   server_default='1', nullable=False))
+
+
+def downgrade():
+    op.drop_column('job', 'max_attempts')
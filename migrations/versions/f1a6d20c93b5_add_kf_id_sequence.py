@@ -0,0 +1,27 @@
+"""
+Add kf_id_seq sequence that kf_ids are allocated from
+
+Revision ID: f1a6d20c93b5
+Revises: 8c4e71d0b9f2
+Create Date: 2026-10-19 14:41:26.930177
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.schema import CreateSequence, DropSequence
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a6d20c93b5'
+down_revision = '8c4e71d0b9f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(CreateSequence(sa.Sequence('kf_id_seq', minvalue=1,
+                                          maxvalue=32**8 - 1)))
+
+
+def downgrade():
+    op.execute(DropSequence(sa.Sequence('kf_id_seq')))
@@ -5,5 +5,5 @@ setup(
     version="1.11.0",
     description="Data Service API",
     license="Apache 2",
-    packages=find_packages()
+    packages=find_packages(exclude=['benchmarks*', 'tests*'])
 )
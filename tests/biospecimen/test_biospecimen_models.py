@@ -12,6 +12,7 @@ from dataservice.api.sequencing_center.models import SequencingCenter
 from tests.utils import FlaskTestCase
 from dataservice.api.errors import DatabaseValidationError
 
+from sqlalchemy import event
 from sqlalchemy.exc import IntegrityError
 
 
@@ -334,6 +335,57 @@ class ModelTest(FlaskTestCase):
             db.session.commit()
         db.session.rollback()
 
+    def test_link_biospecimen_diagnosis_batch(self):
+        """
+        Test that links flushed together are validated with one query and
+        that every invalid link is reported
+        """
+        ids = self.create_seqexp()
+        study = Study(external_id='phs001')
+        pts = []
+        for i in range(2):
+            pts.append(Participant(
+                external_id='p{}'.format(i), study=study,
+                biospecimens=[
+                    Biospecimen(analyte_type='DNA',
+                                sequencing_center_id=ids[
+                                    'sequencing_center_id'])
+                    for _ in range(3)],
+                diagnoses=[Diagnosis(external_id='d{}'.format(i))]))
+        db.session.add(study)
+        db.session.commit()
+        bs_ids = [[bs.kf_id for bs in p.biospecimens] for p in pts]
+        dg_ids = [p.diagnoses[0].kf_id for p in pts]
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', count)
+
+        # Invalid links to the other participant's diagnosis
+        for i in range(2):
+            db.session.add(BiospecimenDiagnosis(biospecimen_id=bs_ids[i][0],
+                                                diagnosis_id=dg_ids[1 - i]))
+        with self.assertRaises(DatabaseValidationError) as e:
+            db.session.commit()
+        db.session.rollback()
+        for i in range(2):
+            self.assertIn(bs_ids[i][0], e.exception.message)
+
+        # Valid links
+        del statements[:]
+        for i in range(2):
+            for bs_id in bs_ids[i]:
+                db.session.add(BiospecimenDiagnosis(biospecimen_id=bs_id,
+                                                    diagnosis_id=dg_ids[i]))
+        db.session.commit()
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+        self.assertEqual(BiospecimenDiagnosis.query.count(), 6)
+        selects = [s for s in statements if s.startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+
     def _make_biospecimen(self, external_sample_id=None,
                           external_aliquot_id=None):
         '''
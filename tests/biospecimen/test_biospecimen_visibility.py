@@ -0,0 +1,28 @@
+from tests.utils import IndexdTestCase, create_study, post_visibility
+
+
+class BiospecimenVisibilityTest(IndexdTestCase):
+    """
+    Test hiding biospecimens and the entities below them
+    """
+
+    def test_biospecimen(self):
+        """
+        Test hiding a failed biospecimen
+        """
+        study, p, bs, gf = create_study()
+        modified_at = gf.modified_at
+        body = {'visible': False, 'visibility_reason': 'Sample Issue'}
+        resp = post_visibility(self.client, 'api.biospecimens_visibility',
+                               bs.kf_id, body)
+
+        self.assertEqual(resp.status_code, 200, resp.json)
+        self.assertEqual(set(resp.json['results']['updated']), {
+            'biospecimen', 'biospecimen_diagnosis',
+            'biospecimen_genomic_file', 'genomic_file',
+            'read_group_genomic_file', 'sequencing_experiment_genomic_file',
+            'task_genomic_file'
+        })
+        self.assertEqual(p.visible, True)
+        self.assertEqual(gf.visible, False)
+        self.assertGreater(gf.modified_at, modified_at)
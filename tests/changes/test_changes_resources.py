@@ -0,0 +1,149 @@
+import json
+import uuid
+from datetime import timedelta
+
+from flask import url_for
+
+from dataservice.extensions import db
+from dataservice.api.study.models import Study
+from dataservice.api.participant.models import Participant
+from dataservice.api.phenotype.models import Phenotype
+from dataservice.api.biospecimen.models import Biospecimen
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.sequencing_center.models import SequencingCenter
+from dataservice.api.biospecimen_genomic_file.models import (
+    BiospecimenGenomicFile
+)
+from tests.utils import IndexdTestCase
+from tests.mocks import MockIndexd
+
+
+class ChangesTest(IndexdTestCase):
+    """
+    Test change feeds
+    """
+
+    def test_collection_changes(self):
+        """
+        Test that a collection's feed pages through entities in the order
+        they were modified
+        """
+        study = Study(external_id='phs001')
+        participants = [Participant(external_id='P{}'.format(i),
+                                    is_proband=True)
+                        for i in range(5)]
+        study.participants.extend(participants)
+        db.session.add(study)
+        db.session.commit()
+
+        # Modify the first participant so that it becomes the last change
+        participants[0].external_id = 'changed'
+        db.session.commit()
+
+        resp = self._get(url_for('api.participants_changes', limit=2))
+        self.assertEqual(resp['total'], 5)
+        self.assertEqual(resp['limit'], 2)
+        self.assertEqual(resp['_links']['self'],
+                         '/participants/changes')
+
+        kf_ids = []
+        while True:
+            kf_ids.extend(p['kf_id'] for p in resp['results'])
+            if 'next' not in resp['_links']:
+                break
+            resp = self._get(resp['_links']['next'])
+        expected = [p.kf_id for p in participants[1:] + participants[:1]]
+        self.assertEqual(kf_ids, expected)
+        self.assertEqual(resp['results'][-1]['external_id'], 'changed')
+
+        # The last page's link only returns later changes
+        cursor = resp['_links']['self']
+        participants[2].is_proband = False
+        db.session.commit()
+        kf_ids = [p['kf_id'] for p in self._get(cursor)['results']]
+        self.assertNotIn(participants[1].kf_id, kf_ids)
+        self.assertEqual(kf_ids[-1], participants[2].kf_id)
+
+    def test_changes_since(self):
+        """
+        Test the since and since_uuid parameters of a feed
+        """
+        study = Study(external_id='phs001')
+        db.session.add(study)
+        db.session.commit()
+
+        since = (study.modified_at - timedelta(seconds=1)).isoformat()
+        resp = self._get(url_for('api.studies_changes', since=since))
+        self.assertEqual([s['kf_id'] for s in resp['results']],
+                         [study.kf_id])
+
+        resp = self._get(url_for('api.studies_changes',
+                                 since=study.modified_at.isoformat(),
+                                 since_uuid=study.uuid))
+        self.assertEqual(resp['results'], [])
+
+        # Changes are held back for CHANGE_FEED_DELAY
+        self.app.config['CHANGE_FEED_DELAY'] = 60
+        resp = self._get(url_for('api.studies_changes', since=since))
+        self.assertEqual(resp['results'], [])
+
+    def test_study_changes(self):
+        """
+        Test that a study's feed follows changes across its subgraph
+        """
+        study = Study(external_id='phs001')
+        other = Study(external_id='phs002')
+        p = Participant(external_id='P0', is_proband=True)
+        study.participants.append(p)
+        other.participants.append(Participant(external_id='P1',
+                                              is_proband=True))
+        ph = Phenotype(source_text_phenotype='fever', participant=p)
+        bs = Biospecimen(external_sample_id='S0', analyte_type='DNA',
+                         participant=p,
+                         sequencing_center=SequencingCenter(name='Baylor'))
+        db.session.add_all([study, other, ph, bs])
+        db.session.commit()
+        gf = GenomicFile(external_id='gf0', file_name='file_0',
+                         urls=['s3://bucket/key'],
+                         hashes={'md5': str(uuid.uuid4())},
+                         size=MockIndexd.doc['size'])
+        db.session.add(BiospecimenGenomicFile(biospecimen=bs,
+                                              genomic_file=gf))
+        db.session.commit()
+
+        url = url_for('api.study_changes', kf_id=study.kf_id)
+        resp = self._get(url)
+        changes = [(c['type'], c['kf_id']) for c in resp['results']]
+        self.assertEqual(set(changes), {
+            ('study', study.kf_id),
+            ('participant', p.kf_id),
+            ('phenotype', ph.kf_id),
+            ('biospecimen', bs.kf_id),
+            ('genomic_file', gf.kf_id),
+            ('biospecimen_genomic_file',
+             bs.biospecimen_genomic_files[0].kf_id)
+        })
+        modified = [c['modified_at'] for c in resp['results']]
+        self.assertEqual(modified, sorted(modified))
+        self.assertEqual(resp['total'], 6)
+        links = {c['kf_id']: c['_links']['self'] for c in resp['results']}
+        self.assertEqual(links[study.kf_id], '/studies/' + study.kf_id)
+
+        # Only later changes are returned from a cursor
+        resp = self._get(url_for('api.study_changes', kf_id=study.kf_id,
+                                 limit=5))
+        ph.source_text_phenotype = 'cough'
+        db.session.commit()
+        resp = self._get(resp['_links']['next'])
+        self.assertEqual([c['kf_id'] for c in resp['results']],
+                         [changes[-1][1], ph.kf_id])
+        self.assertIn('since=', resp['_links']['self'])
+
+        resp = self.client.get(url_for('api.study_changes',
+                                       kf_id='SD_00000000'))
+        self.assertEqual(resp.status_code, 404)
+
+    def _get(self, url):
+        response = self.client.get(url, headers=self._api_headers())
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data.decode('utf-8'))
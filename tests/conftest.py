@@ -8,6 +8,7 @@ import pytest
 from dataservice import create_app
 from dataservice.utils import iterate_pairwise, read_json
 from dataservice.extensions import db
+from dataservice.api.common import views
 from dataservice.api.investigator.models import Investigator
 from dataservice.api.study.models import Study
 from dataservice.api.participant.models import Participant
@@ -105,8 +106,11 @@ def app():
 def sns_topic(app):
     TOPIC_ARN = 'arn:aws:sns:*:123456789012:my_topic'
     app.config['SNS_EVENT_ARN'] = TOPIC_ARN
+    # Do not reuse a client created by a previous test
+    views._sns_client = None
     yield create_app('testing')
     app.config['SNS_EVENT_ARN'] = None
+    views._sns_client = None
 
 
 @pytest.yield_fixture(scope='module')
@@ -121,7 +125,7 @@ def client(app):
     mock.Session().get.side_effect = indexd_mock.get
     mock.Session().post.side_effect = indexd_mock.post
 
-    mod = 'dataservice.api.study.models.requests'
+    mod = 'dataservice.api.study.jobs.requests'
     mock_bs = patch(mod)
     mock_bs = mock_bs.start()
 
@@ -329,11 +333,15 @@ def _add_foreign_keys(inputs, entity):
         object_mapper,
         ColumnProperty
     )
+    from dataservice.api.common.study_scope import StudyScopedMixin
     mapper = object_mapper(entity)
     for prop in mapper.iterate_properties:
         if isinstance(prop, ColumnProperty):
             attr = getattr(entity.__class__.__table__.c, prop.key)
-            if attr.foreign_keys:
+            # The denormalized study_id is maintained by the dataservice
+            if attr.foreign_keys and not (
+                    prop.key == 'study_id' and
+                    isinstance(entity, StudyScopedMixin)):
                 value = getattr(entity, prop.key)
                 if value:
                     inputs.update({prop.key: value})
@@ -13,6 +13,8 @@ from tests.utils import FlaskTestCase
 
 FAMILY_RELATIONSHIPS_URL = 'api.family_relationships'
 FAMILY_RELATIONSHIPS_LIST_URL = 'api.family_relationships_list'
+FAMILY_PEDIGREE_URL = 'api.family_pedigree'
+PARTICIPANT_PEDIGREE_URL = 'api.participant_pedigree'
 
 
 class FamilyRelationshipTest(FlaskTestCase):
@@ -275,3 +277,116 @@ class FamilyRelationshipTest(FlaskTestCase):
         db.session.commit()
 
         return p1, p2, p3, p4, study, kwargs
+
+
+class PedigreeTest(FlaskTestCase):
+    """
+    Test family and participant pedigree api
+    """
+
+    def test_family_pedigree(self):
+        """
+        Test getting the pedigree of a family
+        """
+        family, pts, rels = self._create_pedigree()
+
+        response = self.client.get(url_for(FAMILY_PEDIGREE_URL,
+                                           kf_id=family.kf_id),
+                                   headers=self._api_headers())
+        assert response.status_code == 200
+        resp = json.loads(response.data.decode('utf-8'))
+        pedigree = resp['results']
+
+        assert pedigree['family_id'] == family.kf_id
+        assert family.kf_id in resp['_links']['family']
+
+        # Family members and the relative outside of the family
+        assert [n['kf_id'] for n in pedigree['nodes']] == sorted(
+            pt.kf_id for pt in pts.values())
+        node = [n for n in pedigree['nodes']
+                if n['kf_id'] == pts['child'].kf_id][0]
+        assert node['is_proband'] is True
+        assert node['family_id'] == family.kf_id
+
+        # All relationships of the family members, without duplicates
+        assert [e['kf_id'] for e in pedigree['edges']] == sorted(
+            r.kf_id for r in rels)
+        edge = [e for e in pedigree['edges']
+                if e['kf_id'] == rels[0].kf_id][0]
+        assert edge == {
+            'kf_id': rels[0].kf_id,
+            'source': pts['mother'].kf_id,
+            'target': pts['child'].kf_id,
+            'relation': 'mother',
+            'reverse_relation': 'Child'
+        }
+
+    def test_participant_pedigree(self):
+        """
+        Test getting the pedigree of a participant
+        """
+        family, pts, rels = self._create_pedigree()
+
+        # Participant in a family gets the family pedigree
+        response = self.client.get(url_for(PARTICIPANT_PEDIGREE_URL,
+                                           kf_id=pts['father'].kf_id),
+                                   headers=self._api_headers())
+        pedigree = json.loads(response.data.decode('utf-8'))['results']
+        assert pedigree['family_id'] == family.kf_id
+        assert len(pedigree['nodes']) == 4
+        assert len(pedigree['edges']) == 3
+
+        # Participant without a family gets direct relationships
+        response = self.client.get(url_for(PARTICIPANT_PEDIGREE_URL,
+                                           kf_id=pts['aunt'].kf_id),
+                                   headers=self._api_headers())
+        pedigree = json.loads(response.data.decode('utf-8'))['results']
+        assert pedigree['family_id'] is None
+        assert ([n['kf_id'] for n in pedigree['nodes']] ==
+                sorted([pts['aunt'].kf_id, pts['mother'].kf_id]))
+        assert [e['kf_id'] for e in pedigree['edges']] == [rels[2].kf_id]
+
+    def test_pedigree_not_found(self):
+        """
+        Test getting the pedigree of a family or participant that does not
+        exist
+        """
+        for endpoint, kf_id in [(FAMILY_PEDIGREE_URL, 'FM_00000000'),
+                                (PARTICIPANT_PEDIGREE_URL, 'PT_00000000')]:
+            response = self.client.get(url_for(endpoint, kf_id=kf_id),
+                                       headers=self._api_headers())
+            assert response.status_code == 404
+            resp = json.loads(response.data.decode('utf-8'))
+            assert 'could not find' in resp['_status']['message']
+
+    def _create_pedigree(self):
+        """
+        Create a trio family and a relative of the mother who is not in the
+        family
+        """
+        study = Study(external_id='phs001')
+        family = Family(external_id='family')
+        pts = {name: Participant(external_id=name,
+                                 is_proband=(name == 'child'))
+               for name in ['mother', 'father', 'child', 'aunt']}
+        for name in ['mother', 'father', 'child']:
+            pts[name].family = family
+        study.participants.extend(pts.values())
+        db.session.add(study)
+        db.session.commit()
+
+        rels = [
+            FamilyRelationship(participant1=pts['mother'],
+                               participant2=pts['child'],
+                               participant1_to_participant2_relation='mother'),
+            FamilyRelationship(participant1=pts['father'],
+                               participant2=pts['child'],
+                               participant1_to_participant2_relation='father'),
+            FamilyRelationship(participant1=pts['aunt'],
+                               participant2=pts['mother'],
+                               participant1_to_participant2_relation='sibling')
+        ]
+        db.session.add_all(rels)
+        db.session.commit()
+
+        return family, pts, rels
@@ -41,7 +41,7 @@ def client(app):
     mock.Session().get.side_effect = indexd_mock.get
     mock.Session().post.side_effect = indexd_mock.post
 
-    mod = 'dataservice.api.study.models.requests'
+    mod = 'dataservice.api.study.jobs.requests'
     mock_bs = patch(mod)
     mock_bs = mock_bs.start()
 
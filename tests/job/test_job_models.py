@@ -0,0 +1,121 @@
+import threading
+from datetime import datetime, timedelta
+
+from dataservice.extensions import db
+from dataservice.api.job.models import Job
+from dataservice.api.job.worker import job_handler, run_job, HANDLERS
+from tests.utils import FlaskTestCase
+
+
+class ModelTest(FlaskTestCase):
+    """
+    Test claiming and running jobs
+    """
+
+    def tearDown(self):
+        HANDLERS.pop('count', None)
+        super(ModelTest, self).tearDown()
+
+    def test_claim(self):
+        """
+        Test that jobs are claimed once, in order, when they are due
+        """
+        now = datetime.now()
+        later = Job(type='count', run_at=now + timedelta(hours=1))
+        first = Job(type='count', run_at=now - timedelta(minutes=2),
+                    max_attempts=2)
+        second = Job(type='count', run_at=now - timedelta(minutes=1))
+        db.session.add_all([later, first, second])
+        db.session.commit()
+        kf_ids = [first.kf_id, second.kf_id]
+
+        # Each worker claims a different job at the same time
+        claimed = []
+        barrier = threading.Barrier(2)
+
+        def claim(name):
+            with self.app.app_context():
+                barrier.wait()
+                claimed.append(Job.claim(name).kf_id)
+                db.session.remove()
+
+        threads = [threading.Thread(target=claim, args=(name,))
+                   for name in ['w1', 'w2']]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(claimed), sorted(kf_ids))
+        self.assertIsNone(Job.claim('w3'))
+
+        job = Job.query.get(first.kf_id)
+        self.assertEqual(job.status, 'running')
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.heartbeat_at)
+
+        # Jobs of dead workers are claimed again
+        job.heartbeat_at = now - timedelta(
+            seconds=self.app.config['JOB_LEASE_SECONDS'] + 1)
+        db.session.commit()
+        job = Job.claim('w3')
+        self.assertEqual(job.kf_id, first.kf_id)
+        self.assertEqual((job.attempts, job.worker), (2, 'w3'))
+
+        # Jobs that have no attempts left when their worker dies are failed
+        lease = self.app.config['JOB_LEASE_SECONDS']
+        Job.query.filter(Job.kf_id.in_(kf_ids)).update(
+            {'heartbeat_at': now - timedelta(seconds=lease + 1)},
+            synchronize_session=False)
+        db.session.commit()
+        self.assertIsNone(Job.claim('w4'))
+        db.session.expire_all()
+        for kf_id in kf_ids:
+            job = Job.query.get(kf_id)
+            self.assertEqual(job.status, 'failed')
+            self.assertIn('stopped reporting', job.error)
+
+    def test_progress(self):
+        """
+        Test that progress is visible while a job runs
+        """
+        seen = []
+
+        @job_handler('count')
+        def count(job, n):
+            for i in range(n):
+                job.report_progress(i + 1, n)
+                seen.append(db.session.execute(
+                    'SELECT progress FROM job').scalar())
+            return {'counted': n}, None
+
+        db.session.add(Job(type='count', params={'n': 4}))
+        db.session.commit()
+        job = Job.claim('w1')
+        self.assertTrue(run_job(job))
+        self.assertEqual(seen, [0.25, 0.5, 0.75, 1.0])
+        self.assertEqual(job.result, {'counted': 4})
+
+    def test_lost_lease(self):
+        """
+        Test that the outcome of a job claimed by another worker while it
+        ran is discarded
+        """
+        @job_handler('count')
+        def count(job, n):
+            db.session.add(Job(type='count', params={'n': n + 1}))
+            # Another worker claims the job as this one stopped reporting
+            Job.heartbeat(job.kf_id, worker='w2', attempts=job.attempts + 1)
+            return {'counted': n}, None
+
+        db.session.add(Job(type='count', params={'n': 1}))
+        db.session.commit()
+        job = Job.claim('w1')
+        kf_id = job.kf_id
+        self.assertFalse(run_job(job))
+
+        job = Job.query.get(kf_id)
+        self.assertEqual((job.status, job.worker, job.attempts),
+                         ('running', 'w2', 2))
+        self.assertIsNone(job.result)
+        # The handler's changes are discarded with the outcome
+        self.assertEqual(Job.query.count(), 1)
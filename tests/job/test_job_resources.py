@@ -0,0 +1,135 @@
+import json
+
+from flask import url_for
+
+from dataservice.extensions import db
+from dataservice.api.study.models import Study
+from dataservice.api.study_summary.models import StudySummary
+from dataservice.api.job.models import Job
+from dataservice.api.job.worker import work
+from tests.utils import FlaskTestCase
+
+JOBS_URL = 'api.jobs'
+JOBS_LIST_URL = 'api.jobs_list'
+
+
+class JobTest(FlaskTestCase):
+    """
+    Test job api
+    """
+
+    def test_post_and_run(self):
+        """
+        Test queuing a summary refresh and following it to its result
+        """
+        study = Study(external_id='phs001')
+        db.session.add(study)
+        db.session.commit()
+        study_id = study.kf_id
+
+        body = {'type': 'refresh_summaries',
+                'params': {'study_ids': [study_id],
+                           'include_file_size': False}}
+        response = self.client.post(url_for(JOBS_LIST_URL),
+                                    headers=self._api_headers(),
+                                    data=json.dumps(body))
+        self.assertEqual(response.status_code, 201)
+        resp = json.loads(response.data.decode('utf-8'))
+        job = resp['results']
+        self.assertEqual(job['status'], 'queued')
+        self.assertEqual(job['progress'], 0)
+        self.assertEqual(job['attempts'], 0)
+
+        # The bucket job of the study is run along with the refresh
+        self.assertEqual(work(burst=True), 2)
+
+        response = self.client.get(resp['_links']['self'])
+        resp = json.loads(response.data.decode('utf-8'))
+        job = resp['results']
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['progress'], 1)
+        self.assertEqual(job['attempts'], 1)
+        self.assertEqual(job['result'], {'refreshed': [study_id]})
+        self.assertEqual(job['result_location'],
+                         '/studies/{}/summary'.format(study_id))
+        self.assertIsNotNone(job['finished_at'])
+        self.assertIsNotNone(StudySummary.query.get(study_id))
+
+    def test_failed(self):
+        """
+        Test that errors of jobs are recorded
+        """
+        db.session.add(Job(type='refresh_summaries',
+                           params={'study_ids': ['SD_00000000']}))
+        db.session.add(Job(type='refresh_summaries',
+                           params={'unknown': True}))
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['worker', '--burst'])
+        self.assertIn('Ran 2 jobs', result.output)
+        jobs = Job.query.order_by(Job.created_at).all()
+        self.assertEqual({j.status for j in jobs}, {'failed'})
+        self.assertIn('IntegrityError', jobs[0].error)
+        self.assertIn('unknown', jobs[1].error)
+        self.assertEqual(StudySummary.query.count(), 0)
+
+    def test_list(self):
+        """
+        Test listing jobs filtered by status
+        """
+        db.session.add_all([Job(type='refresh_summaries'),
+                            Job(type='refresh_summaries', status='failed')])
+        db.session.commit()
+
+        response = self.client.get(url_for(JOBS_LIST_URL, status='queued'),
+                                   headers=self._api_headers())
+        resp = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(resp['total'], 1)
+        self.assertEqual(resp['results'][0]['status'], 'queued')
+
+        # The bucket job of a study is found by its study_id
+        study = Study(external_id='phs001')
+        db.session.add(study)
+        db.session.commit()
+        response = self.client.get(url_for(JOBS_LIST_URL,
+                                           study_id=study.kf_id),
+                                   headers=self._api_headers())
+        resp = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(resp['total'], 1)
+        self.assertEqual(resp['results'][0]['type'], 'create_bucket')
+        self.assertEqual(resp['results'][0]['max_attempts'],
+                         self.app.config['BUCKET_SERVICE_MAX_ATTEMPTS'])
+
+        response = self.client.get(url_for(JOBS_URL, kf_id='JB_00000000'),
+                                   headers=self._api_headers())
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid(self):
+        """
+        Test queuing jobs of unknown or internal types, or with invalid
+        fields or params
+        """
+        study_ids = ['SD_00000000']
+        for body in [{'type': 'export_everything'},
+                     {'type': 'create_bucket',
+                      'params': {'study_id': study_ids[0]}},
+                     {'type': 'refresh_summaries', 'params': 'all'},
+                     {'type': 'refresh_summaries'},
+                     {'type': 'refresh_summaries',
+                      'params': {'study_ids': []}},
+                     {'type': 'refresh_summaries',
+                      'params': {'study_ids': ['PT_00000000']}},
+                     {'type': 'refresh_summaries',
+                      'params': {'study_ids': study_ids, 'unknown': True}},
+                     {'type': 'refresh_summaries',
+                      'params': {'study_ids': study_ids},
+                      'max_attempts': 0},
+                     {'params': {}}]:
+            response = self.client.post(url_for(JOBS_LIST_URL),
+                                        headers=self._api_headers(),
+                                        data=json.dumps(body))
+            self.assertEqual(response.status_code, 400, body)
+            resp = json.loads(response.data.decode('utf-8'))
+            self.assertIn('could not create job',
+                          resp['_status']['message'])
+        self.assertEqual(Job.query.count(), 0)
@@ -3,6 +3,7 @@ import random
 from sqlalchemy.exc import IntegrityError
 
 from dataservice.extensions import db
+from dataservice.api.errors import DatabaseValidationError
 from dataservice.api.participant.models import Participant, AliasGroup
 from dataservice.api.study.models import Study
 from tests.utils import FlaskTestCase
@@ -250,3 +251,75 @@ class ModelTest(FlaskTestCase):
         db.session.delete(groups[1].participants[0])
         db.session.commit()
         self.assertEqual(1, AliasGroup.query.count())
+
+    def test_add_alias_to_existing_group(self):
+        """
+        Test adding a participant without an alias group as an alias of a
+        participant with an alias group, in either direction
+        """
+        data = self._create_save_to_db()
+        g = AliasGroup.query.first()
+
+        p0 = Participant.query.get(data['p0']['obj'].kf_id)
+        p4 = Participant.query.get(data['p4']['obj'].kf_id)
+        p4.add_alias(p0)
+        db.session.commit()
+
+        self.assertEqual(1, AliasGroup.query.count())
+        self.assertEqual(g.kf_id, p4.alias_group_id)
+        self.assertEqual(4, len(p4.aliases))
+
+        g.participants.remove(p4)
+        db.session.commit()
+        p0.add_alias(p4)
+        db.session.commit()
+        self.assertEqual(g.kf_id, p4.alias_group_id)
+
+    def test_add_aliases(self):
+        """
+        Test aliasing many pairs of participants at once
+        """
+        data = self._create_save_participants(n=8)
+        ids = {k: v['obj'].kf_id for k, v in data.items()}
+
+        # p0-p1-p2 and p3-p4 chains
+        result = AliasGroup.add_aliases([
+            (ids['p0'], ids['p1']), (ids['p2'], ids['p1']),
+            (ids['p3'], ids['p4']), (ids['p5'], ids['p5'])
+        ])
+        db.session.commit()
+        self.assertEqual({'participants_updated': 5,
+                          'alias_groups_created': 2,
+                          'alias_groups_merged': 0}, result)
+        self.assertEqual(2, AliasGroup.query.count())
+        p0 = Participant.query.get(ids['p0'])
+        self.assertEqual({'p1', 'p2'}, {a.external_id for a in p0.aliases})
+        self.assertIsNone(Participant.query.get(ids['p5']).alias_group_id)
+        g = p0.alias_group_id
+
+        # Join the two groups and add a new participant, the larger group
+        # is kept
+        result = AliasGroup.add_aliases([(ids['p4'], ids['p2']),
+                                         (ids['p6'], ids['p3'])])
+        db.session.commit()
+        self.assertEqual({'participants_updated': 3,
+                          'alias_groups_created': 0,
+                          'alias_groups_merged': 1}, result)
+        self.assertEqual(1, AliasGroup.query.count())
+        self.assertEqual(g, AliasGroup.query.first().kf_id)
+        self.assertEqual(6, len(AliasGroup.query.first().participants))
+
+        # Aliasing existing aliases is a no-op
+        result = AliasGroup.add_aliases([(ids['p0'], ids['p6'])])
+        self.assertEqual(0, result['participants_updated'])
+
+    def test_add_aliases_missing_participant(self):
+        """
+        Test aliasing participants that do not exist
+        """
+        data = self._create_save_participants()
+        with self.assertRaises(DatabaseValidationError) as e:
+            AliasGroup.add_aliases([(data['p0']['obj'].kf_id,
+                                     'PT_00000000')])
+        self.assertIn('PT_00000000', e.exception.message)
+        self.assertEqual(0, AliasGroup.query.count())
@@ -12,6 +12,7 @@ from tests.utils import FlaskTestCase
 
 PARTICIPANT_URL = 'api.participants'
 PARTICIPANT_LIST_URL = 'api.participants_list'
+PARTICIPANT_ALIASES_URL = 'api.participant_aliases'
 
 
 class ParticipantTest(FlaskTestCase):
@@ -231,6 +232,41 @@ class ParticipantTest(FlaskTestCase):
             else:
                 self.assertEqual(v, val)
 
+    def test_post_aliases(self):
+        """
+        Test aliasing pairs of participants
+        """
+        study = Study(external_id='phs001')
+        pts = [Participant(external_id='p{}'.format(i), is_proband=False)
+               for i in range(3)]
+        study.participants.extend(pts)
+        db.session.add(study)
+        db.session.commit()
+        ids = [p.kf_id for p in pts]
+
+        body = {'aliases': [[ids[0], ids[1]], [ids[1], ids[2]]]}
+        response = self.client.post(url_for(PARTICIPANT_ALIASES_URL),
+                                    data=json.dumps(body),
+                                    headers=self._api_headers())
+        self.assertEqual(response.status_code, 200)
+        resp = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(resp['results'], {'participants_updated': 3,
+                                           'alias_groups_created': 1,
+                                           'alias_groups_merged': 0})
+        self.assertEqual(
+            2, len(Participant.query.get(ids[0]).aliases))
+
+        # Invalid pairs and unknown participants
+        for aliases in [[[ids[0]]], [[ids[0], 'foo']],
+                        [[ids[0], 'PT_00000000']]]:
+            response = self.client.post(url_for(PARTICIPANT_ALIASES_URL),
+                                        data=json.dumps({'aliases': aliases}),
+                                        headers=self._api_headers())
+            self.assertEqual(response.status_code, 400)
+            resp = json.loads(response.data.decode('utf-8'))
+            self.assertIn('could not alias participant',
+                          resp['_status']['message'])
+
     def test_delete_participant(self):
         """
         Test deleting a participant by id
@@ -0,0 +1,51 @@
+from tests.utils import IndexdTestCase, create_study, post_visibility
+
+
+class ParticipantVisibilityTest(IndexdTestCase):
+    """
+    Test hiding and releasing participants and the entities below them
+    """
+
+    def test_participant(self):
+        """
+        Test a consent hold on a participant and releasing it
+        """
+        study, p, bs, gf = create_study()
+        body = {'visible': False, 'visibility_reason': 'Consent Hold',
+                'visibility_comment': 'Waiting on consent'}
+        resp = post_visibility(self.client, 'api.participants_visibility',
+                               p.kf_id, body)
+
+        self.assertEqual(resp.status_code, 200, resp.json)
+        updated = resp.json['results']['updated']
+        self.assertNotIn('study', updated)
+        self.assertEqual(updated['participant'], 1)
+        self.assertEqual(updated['genomic_file'], 1)
+        self.assertEqual(updated['task_genomic_file'], 1)
+        self.assertEqual(study.visible, True)
+        self.assertEqual(gf.visibility_comment, 'Waiting on consent')
+
+        body = {'visible': True, 'visibility_reason': 'Ready For Release'}
+        resp = post_visibility(self.client, 'api.participants_visibility',
+                               p.kf_id, body)
+        self.assertEqual(resp.json['results']['updated']['biospecimen'], 1)
+        self.assertEqual(bs.visible, True)
+        self.assertIsNone(bs.visibility_comment)
+
+    def test_invalid(self):
+        """
+        Test invalid visibility changes and entities that do not exist
+        """
+        study, p, bs, gf = create_study()
+        for body in [{}, {'visible': 'hidden'},
+                     {'visible': False, 'visibility_reason': 'Because'}]:
+            resp = post_visibility(self.client, 'api.participants_visibility',
+                                   p.kf_id, body)
+            self.assertEqual(resp.status_code, 400, body)
+            self.assertIn('could not update visibility',
+                          resp.json['_status']['message'])
+
+        resp = post_visibility(self.client, 'api.biospecimens_visibility',
+                               'BS_00000000', {'visible': False})
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(bs.visible, True)
@@ -81,6 +81,28 @@ class ModelTest(FlaskTestCase):
             db.session.commit()
         assert "Reverse relationship" in str(e.value)
 
+    def test_validate_batch(self):
+        """
+        Test that relationships flushed together are validated together
+        """
+        create_relationships()
+        participant = Sample.query.first().participant
+        samples = [Sample(external_id=f"new_{i}", participant=participant)
+                   for i in range(3)]
+
+        # Reverse relationships within the same flush
+        db.session.add_all([
+            SampleRelationship(parent=samples[0], child=samples[1]),
+            SampleRelationship(parent=samples[1], child=samples[0]),
+            SampleRelationship(parent=samples[2], child=samples[2])
+        ])
+        with pytest.raises(DatabaseValidationError) as e:
+            db.session.commit()
+        db.session.rollback()
+        assert str(e.value.message).count("Reverse relationship") == 2
+        assert "same as" in e.value.message
+        assert 8 == SampleRelationship.query.count()
+
     def test_find(self):
         """
         Test find relationship
@@ -4,12 +4,15 @@ from flask import url_for
 from dataservice.extensions import db
 from dataservice.api.sample_relationship.models import SampleRelationship
 from dataservice.api.sample.models import Sample
+from dataservice.api.participant.models import Participant
+from dataservice.api.study.models import Study
 from tests.utils import FlaskTestCase
 from tests.sample_relationship.common import create_relationships
 
 
 SAMPLE_RELATIONSHIPS_URL = 'api.sample_relationships'
 SAMPLE_RELATIONSHIPS_LIST_URL = 'api.sample_relationships_list'
+SAMPLE_LINEAGE_URL = 'api.sample_lineage'
 
 
 class SampleRelationshipTest(FlaskTestCase):
@@ -282,3 +285,133 @@ class SampleRelationshipTest(FlaskTestCase):
         response = json.loads(response.data.decode('utf-8'))
         content = response.get('results')
         assert len(content) == 0
+
+
+class SampleLineageTest(FlaskTestCase):
+    """
+    Test sample lineage api
+    """
+
+    def test_descendants(self):
+        """
+        Test getting all descendant relationships of a sample
+        """
+        samples = self._create_tree()
+        content = self._get_lineage(samples['A'].kf_id)
+
+        assert [(r['parent_id'], r['child_id'], r['depth'])
+                for r in content] == sorted(
+            [
+                (samples['A'].kf_id, samples['B'].kf_id, 1),
+                (samples['A'].kf_id, samples['C'].kf_id, 1),
+                (samples['B'].kf_id, samples['D'].kf_id, 2),
+                (samples['D'].kf_id, samples['E'].kf_id, 3),
+            ],
+            key=lambda r: (r[2], self._rel_id(r[0], r[1])))
+
+        # Leaf has no descendants
+        assert self._get_lineage(samples['E'].kf_id) == []
+
+    def test_ancestors(self):
+        """
+        Test getting all ancestor relationships of a sample
+        """
+        samples = self._create_tree()
+        content = self._get_lineage(samples['E'].kf_id,
+                                    direction='ancestors')
+
+        # Includes the root relationship with a null parent
+        assert [(r['parent_id'], r['child_id'], r['depth'])
+                for r in content] == [
+            (samples['D'].kf_id, samples['E'].kf_id, 1),
+            (samples['B'].kf_id, samples['D'].kf_id, 2),
+            (samples['A'].kf_id, samples['B'].kf_id, 3),
+            (None, samples['A'].kf_id, 4),
+        ]
+
+    def test_max_depth(self):
+        """
+        Test limiting the number of generations in the lineage
+        """
+        samples = self._create_tree()
+        content = self._get_lineage(samples['A'].kf_id, max_depth=2)
+        assert len(content) == 3
+        assert max(r['depth'] for r in content) == 2
+
+        content = self._get_lineage(samples['E'].kf_id,
+                                    direction='ancestors', max_depth=1)
+        assert len(content) == 1
+
+    def test_cycle(self):
+        """
+        Test that a cycle of relationships is only traversed once
+        """
+        p = Participant(external_id='P0', is_proband=False)
+        samples = [Sample(external_id=f'S{i}') for i in range(3)]
+        p.samples.extend(samples)
+        db.session.add(Study(external_id='study', participants=[p]))
+        db.session.commit()
+        for i in range(3):
+            db.session.add(SampleRelationship(parent=samples[i],
+                                              child=samples[(i + 1) % 3]))
+            db.session.commit()
+
+        for direction in ['ancestors', 'descendants']:
+            content = self._get_lineage(samples[0].kf_id,
+                                        direction=direction)
+            assert len(content) == 3
+            assert [r['depth'] for r in content] == [1, 2, 3]
+
+    def test_invalid_params(self):
+        """
+        Test requesting lineage with invalid parameters
+        """
+        samples = self._create_tree()
+        for params in ['direction=sideways', 'max_depth=0']:
+            url = (url_for(SAMPLE_LINEAGE_URL, kf_id=samples['A'].kf_id) +
+                   f'?{params}')
+            response = self.client.get(url, headers=self._api_headers())
+            assert response.status_code == 400
+
+        response = self.client.get(
+            url_for(SAMPLE_LINEAGE_URL, kf_id='SA_00000000'),
+            headers=self._api_headers())
+        assert response.status_code == 404
+
+    def _get_lineage(self, kf_id, **params):
+        """
+        Get the results of a sample lineage request
+        """
+        response = self.client.get(url_for(SAMPLE_LINEAGE_URL, kf_id=kf_id,
+                                           **params),
+                                   headers=self._api_headers())
+        assert response.status_code == 200
+        return json.loads(response.data.decode('utf-8'))['results']
+
+    def _rel_id(self, parent_id, child_id):
+        """
+        Get the kf_id of a sample relationship
+        """
+        return SampleRelationship.query.filter_by(
+            parent_id=parent_id, child_id=child_id).one().kf_id
+
+    def _create_tree(self):
+        """
+        Create the sample tree:
+
+            A -> B -> D -> E
+            A -> C
+        """
+        p = Participant(external_id='P0', is_proband=False)
+        samples = {name: Sample(external_id=name) for name in 'ABCDE'}
+        p.samples.extend(samples.values())
+        db.session.add(Study(external_id='study', participants=[p]))
+        db.session.commit()
+
+        for parent, child in [(None, 'A'), ('A', 'B'), ('A', 'C'),
+                              ('B', 'D'), ('D', 'E')]:
+            db.session.add(SampleRelationship(
+                parent=samples.get(parent), child=samples[child]))
+        db.session.commit()
+
+        return samples
@@ -1,8 +1,11 @@
+import requests
 from sqlalchemy.exc import IntegrityError
 
 from dataservice.extensions import db
 from dataservice.api.participant.models import Participant
 from dataservice.api.study.models import Study
+from dataservice.api.job.models import Job
+from dataservice.api.job.worker import work
 from tests.utils import FlaskTestCase
 from unittest.mock import patch, Mock
 
@@ -46,17 +49,68 @@ class ModelTest(FlaskTestCase):
 
     def test_bucket_service(self):
         """
-        Test that a request is sent to create a new bucket
+        Test that a job is queued and run to create a new bucket
         """
         s = Study(external_id='phs002', short_code='KF-ST0')
         db.session.add(s)
         db.session.commit()
-        assert self.bucket_service.post.call_count == 1
+        study_id = s.kf_id
+        session = self.bucket_service.Session()
+        # The study is inserted without calling the bucket service
+        assert session.post.call_count == 0
+        job = Job.query.filter_by(type='create_bucket').one()
+        assert job.params == {'study_id': study_id}
+        assert job.status == 'queued'
+
+        assert work(burst=True) == 1
+        assert session.post.call_count == 1
+        session.post.assert_called_with('/buckets',
+                                        json={'study_id': study_id},
+                                        timeout=10)
+        session.headers.__setitem__.assert_called_with('Authorization',
+                                                       'Bearer test123')
+        job = Job.query.filter_by(type='create_bucket').one()
+        assert job.status == 'succeeded'
+        assert job.result == {'study_id': study_id, 'bucket': 'created'}
+
+    def test_bucket_service_retry(self):
+        """
+        Test that bucket jobs are retried until the bucket exists
+        """
+        self.app.config['JOB_RETRY_DELAY'] = 0
+        session = self.bucket_service.Session()
+        session.post.side_effect = [requests.ConnectionError('timed out'),
+                                    Mock(status_code=409)]
+        s = Study(external_id='phs002')
+        db.session.add(s)
+        db.session.commit()
+
+        # The failed attempt is queued again and run in the same burst
+        assert work(burst=True) == 2
+        assert session.post.call_count == 2
+        job = Job.query.filter_by(type='create_bucket').one()
+        assert job.status == 'succeeded'
+        assert job.attempts == 2
+        assert job.result['bucket'] == 'exists'
+
+    def test_bucket_service_failed(self):
+        """
+        Test that bucket jobs fail once they are out of attempts
+        """
+        self.app.config['JOB_RETRY_DELAY'] = 0
+        self.app.config['BUCKET_SERVICE_MAX_ATTEMPTS'] = 2
+        session = self.bucket_service.Session()
+        session.post.return_value.raise_for_status.side_effect = (
+            requests.HTTPError('500 Server Error'))
+        s = Study(external_id='phs002')
+        db.session.add(s)
+        db.session.commit()
 
-        headers = {'Authorization': 'Bearer test123'}
-        self.bucket_service.post.assert_called_with('/buckets',
-                                                    json={'study_id': s.kf_id},
-                                                    headers=headers)
+        assert work(burst=True) == 2
+        job = Job.query.filter_by(type='create_bucket').one()
+        assert job.status == 'failed'
+        assert job.attempts == 2
+        assert '500 Server Error' in job.error
 
     def test_update(self):
         """
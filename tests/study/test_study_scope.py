@@ -0,0 +1,145 @@
+from flask import url_for
+from sqlalchemy import text
+
+from dataservice.extensions import db
+from dataservice.api.study.models import Study
+from dataservice.api.participant.models import Participant
+from dataservice.api.biospecimen.models import Biospecimen
+from dataservice.api.biospecimen_genomic_file.models import (
+    BiospecimenGenomicFile
+)
+from dataservice.api.study_summary.models import StudySummary
+from dataservice.api.common.study_scope import (
+    scoped_models,
+    check_study_ids,
+    backfill_study_ids
+)
+from tests.utils import IndexdTestCase, create_study
+
+
+class StudyScopeTest(IndexdTestCase):
+    """
+    Test the denormalized study_id of entities below participants
+    """
+
+    def test_create(self):
+        """
+        Test that new entities copy the study of the entities above them
+        """
+        study, p, bs, gf = create_study()
+        db.session.expire_all()
+        for obj in [p.phenotypes[0], bs, bs.biospecimen_genomic_files[0],
+                    gf, gf.task_genomic_files[0]]:
+            self.assertEqual(obj.study_id, study.kf_id, obj)
+        self.assertEqual(check_study_ids(), {})
+
+    def test_move(self):
+        """
+        Test that moving a participant to another study moves everything
+        below it, and that loaded instances are kept in sync
+        """
+        study, p, bs, gf = create_study()
+        other = Study(external_id='phs002')
+        link = gf.task_genomic_files[0]
+        p.study = other
+        db.session.flush()
+        for obj in [bs, gf, link]:
+            self.assertEqual(obj.__dict__['study_id'], other.kf_id, obj)
+        db.session.commit()
+        self.assertEqual(link.study_id, other.kf_id)
+        self.assertEqual(check_study_ids(), {})
+
+    def test_links(self):
+        """
+        Test that a genomic file takes the study of its first biospecimen
+        and loses it when it is unlinked
+        """
+        study, p, bs, gf = create_study()
+        other = Study(external_id='phs002',
+                      participants=[Participant(external_id='P1',
+                                                is_proband=True)])
+        bs2 = Biospecimen(analyte_type='DNA',
+                          participant=other.participants[0],
+                          sequencing_center=bs.sequencing_center)
+        db.session.add(BiospecimenGenomicFile(biospecimen=bs2,
+                                              genomic_file=gf))
+        db.session.commit()
+        self.assertEqual(gf.study_id, study.kf_id)
+        self.assertEqual(check_study_ids(),
+                         {('genomic_file', 'in several studies'): 1})
+
+        db.session.delete(bs.biospecimen_genomic_files[0])
+        db.session.commit()
+        self.assertEqual(gf.study_id, other.kf_id)
+        db.session.delete(bs2.biospecimen_genomic_files[0])
+        db.session.commit()
+        self.assertIsNone(gf.study_id)
+        self.assertIsNone(gf.task_genomic_files[0].study_id)
+
+    def test_backfill(self):
+        """
+        Test syncing study ids written outside of the session
+        """
+        study, p, bs, gf = create_study()
+        db.session.execute(text('UPDATE biospecimen SET study_id = NULL'))
+        db.session.execute(text('UPDATE genomic_file SET study_id = NULL'))
+        db.session.commit()
+        # Links below them differ from their cleared parents
+        self.assertEqual(set(check_study_ids()), {
+            ('biospecimen', 'out of sync'),
+            ('biospecimen_genomic_file', 'out of sync'),
+            ('genomic_file', 'out of sync'),
+            ('task_genomic_file', 'out of sync')
+        })
+
+        result = self.app.test_cli_runner().invoke(args=['check-study-ids'])
+        self.assertEqual(result.exit_code, 1)
+
+        updated = backfill_study_ids(batch_size=1)
+        self.assertEqual(list(updated),
+                         [m.__tablename__ for m in scoped_models()])
+        self.assertEqual(updated['biospecimen'], 1)
+        self.assertEqual(updated['genomic_file'], 1)
+        self.assertEqual(check_study_ids(), {})
+
+        result = self.app.test_cli_runner().invoke(args=['check-study-ids'])
+        self.assertEqual(result.exit_code, 0, result.output)
+
+    def test_filter(self):
+        """
+        Test that lists filtered by study use the denormalized study_id
+        """
+        study, p, bs, gf = create_study()
+        other = Study(external_id='phs002')
+        db.session.add(other)
+        db.session.commit()
+        for endpoint in ['api.biospecimens_list', 'api.genomic_files_list',
+                         'api.task_genomic_files_list', 'api.tasks_list']:
+            for study_id, total in [(study.kf_id, 1), (other.kf_id, 0)]:
+                resp = self.client.get(url_for(endpoint, study_id=study_id))
+                self.assertEqual(resp.json['total'], total, endpoint)
+
+    def test_filter_shared_file(self):
+        """
+        Test that a file linked to biospecimens of two studies is listed,
+        with the entities below it, under both studies
+        """
+        study, p, bs, gf = create_study()
+        other = Study(external_id='phs002',
+                      participants=[Participant(external_id='P1',
+                                                is_proband=True)])
+        bs2 = Biospecimen(analyte_type='DNA',
+                          participant=other.participants[0],
+                          sequencing_center=bs.sequencing_center)
+        db.session.add(BiospecimenGenomicFile(biospecimen=bs2,
+                                              genomic_file=gf))
+        db.session.commit()
+        self.assertEqual(gf.study_id, study.kf_id)
+        for endpoint in ['api.genomic_files_list',
+                         'api.task_genomic_files_list', 'api.tasks_list']:
+            for study_id in [study.kf_id, other.kf_id]:
+                resp = self.client.get(url_for(endpoint, study_id=study_id))
+                self.assertEqual(resp.json['total'], 1, endpoint)
+
+        summary = StudySummary.refresh(other.kf_id, include_file_size=False)
+        self.assertEqual(summary.genomic_file_count, 1)
@@ -0,0 +1,68 @@
+from dataservice.extensions import db
+from dataservice.api.biospecimen_genomic_file.models import (
+    BiospecimenGenomicFile
+)
+from tests.utils import IndexdTestCase, create_study, post_visibility
+
+
+class StudyVisibilityTest(IndexdTestCase):
+    """
+    Test hiding a study and the entities below it
+    """
+
+    def test_study(self):
+        """
+        Test hiding a whole study
+        """
+        study, p, bs, gf = create_study(study_file=True)
+        other = create_study('phs002', study_file=True)[0]
+        body = {'visible': False, 'visibility_reason': 'Pre-Release'}
+        resp = post_visibility(self.client, 'api.studies_visibility',
+                               study.kf_id, body)
+
+        self.assertEqual(resp.status_code, 200, resp.json)
+        results = resp.json['results']
+        self.assertEqual(results['visible'], False)
+        self.assertEqual(results['updated'], {
+            'study': 1, 'study_file': 1, 'participant': 1, 'biospecimen': 1,
+            'diagnosis': 0, 'outcome': 0, 'phenotype': 1, 'sample': 0,
+            'biospecimen_diagnosis': 0, 'biospecimen_genomic_file': 1,
+            'genomic_file': 1, 'read_group_genomic_file': 0,
+            'sequencing_experiment_genomic_file': 0, 'task_genomic_file': 1
+        })
+        for obj in [study, study.study_files[0], p, p.phenotypes[0], bs,
+                    gf, gf.task_genomic_files[0]]:
+            self.assertEqual(obj.visible, False, obj)
+            self.assertEqual(obj.visibility_reason, 'Pre-Release', obj)
+        # Shared entities and other studies are left as they are
+        self.assertEqual(gf.task_genomic_files[0].task.visible, True)
+        self.assertEqual(other.participants[0].visible, True)
+
+        # Entities that already have the visibility are not updated
+        resp = post_visibility(self.client, 'api.studies_visibility',
+                               study.kf_id, body)
+        self.assertEqual(sum(resp.json['results']['updated'].values()), 0)
+
+    def test_shared_file(self):
+        """
+        Test that a file linked to biospecimens of two studies is hidden
+        with either study, whichever study_id it copied
+        """
+        study, p, bs, gf = create_study()
+        other, p2, bs2, gf2 = create_study('phs002')
+        db.session.add(BiospecimenGenomicFile(biospecimen=bs2,
+                                              genomic_file=gf))
+        db.session.commit()
+        self.assertEqual(gf.study_id, study.kf_id)
+        body = {'visible': False, 'visibility_reason': 'Pre-Release'}
+        resp = post_visibility(self.client, 'api.studies_visibility',
+                               other.kf_id, body)
+
+        self.assertEqual(resp.status_code, 200, resp.json)
+        updated = resp.json['results']['updated']
+        self.assertEqual(updated['genomic_file'], 2)
+        self.assertEqual(updated['task_genomic_file'], 2)
+        self.assertEqual(gf.visible, False)
+        self.assertEqual(gf.task_genomic_files[0].visible, False)
+        # Entities of the other study that are not shared are left as is
+        self.assertEqual(bs.visible, True)
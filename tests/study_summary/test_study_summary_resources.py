@@ -0,0 +1,213 @@
+import json
+import uuid
+
+from flask import url_for
+
+from dataservice.extensions import db
+from dataservice.api.study.models import Study
+from dataservice.api.family.models import Family
+from dataservice.api.participant.models import Participant
+from dataservice.api.biospecimen.models import Biospecimen
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.sequencing_center.models import SequencingCenter
+from dataservice.api.sequencing_experiment.models import (
+    SequencingExperiment,
+    SequencingExperimentGenomicFile
+)
+from dataservice.api.biospecimen_genomic_file.models import (
+    BiospecimenGenomicFile
+)
+from dataservice.api.study_summary.models import StudySummary
+from dataservice.api.job.models import Job
+from dataservice.api.job.worker import work
+from tests.utils import IndexdTestCase
+from tests.mocks import MockIndexd
+
+STUDY_SUMMARY_URL = 'api.study_summaries'
+
+
+class StudySummaryTest(IndexdTestCase):
+    """
+    Test study summary api
+    """
+
+    def test_get_summary(self):
+        """
+        Test that the summary is computed by a job queued by the first
+        request
+        """
+        study_id = self._create_study().kf_id
+        url = url_for(STUDY_SUMMARY_URL, kf_id=study_id)
+
+        response = self.client.get(url, headers=self._api_headers())
+        self.assertEqual(response.status_code, 202)
+        resp = json.loads(response.data.decode('utf-8'))
+        job = resp['results']
+        self.assertEqual(job['type'], 'refresh_summaries')
+        self.assertEqual(job['params'], {'study_ids': [study_id]})
+        self.assertIn('being computed', resp['_status']['message'])
+        self.assertEqual(StudySummary.query.count(), 0)
+
+        # Requests before the job ran wait on the same job
+        response = self.client.get(url, headers=self._api_headers())
+        self.assertEqual(response.status_code, 202)
+        resp = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(resp['results']['kf_id'], job['kf_id'])
+        self.assertEqual(Job.query.filter_by(type='refresh_summaries')
+                         .count(), 1)
+
+        work(burst=True)
+        self.assertEqual(Job.query.get(job['kf_id']).status, 'succeeded')
+        response = self.client.get(url, headers=self._api_headers())
+        self.assertEqual(response.status_code, 200)
+        resp = json.loads(response.data.decode('utf-8'))
+
+        summary = resp['results']
+        self.assertEqual(summary['study_id'], study_id)
+        self.assertEqual(summary['participant_count'], 3)
+        self.assertEqual(summary['proband_count'], 1)
+        self.assertEqual(summary['family_count'], 1)
+        self.assertEqual(summary['biospecimen_count'], 3)
+        self.assertEqual(summary['biospecimens_by_analyte_type'],
+                         {'DNA': 2, 'RNA': 1})
+        self.assertEqual(summary['genomic_file_count'], 2)
+        self.assertEqual(summary['genomic_files_by_data_type'],
+                         {'Aligned Reads': 1, 'Not Reported': 1})
+        self.assertEqual(summary['genomic_files_by_experiment_strategy'],
+                         {'WGS': 2, 'WXS': 1})
+        self.assertEqual(summary['total_file_size'],
+                         2 * MockIndexd.doc['size'])
+        self.assertIsNotNone(summary['refreshed_at'])
+        self.assertIsNotNone(summary['refresh_duration_ms'])
+        self.assertIn(study_id, resp['_links']['study'])
+
+        self.assertEqual(StudySummary.query.count(), 1)
+
+    def test_get_stored_summary(self):
+        """
+        Test that a stored summary is served without being recomputed
+        """
+        study = self._create_study()
+        StudySummary.refresh(study.kf_id)
+        db.session.commit()
+        refreshed_at = StudySummary.query.get(study.kf_id).refreshed_at
+
+        db.session.add(Participant(external_id='new', is_proband=True,
+                                   study_id=study.kf_id))
+        db.session.commit()
+
+        response = self.client.get(url_for(STUDY_SUMMARY_URL,
+                                           kf_id=study.kf_id),
+                                   headers=self._api_headers())
+        resp = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(resp['results']['participant_count'], 3)
+        self.assertEqual(StudySummary.query.get(study.kf_id).refreshed_at,
+                         refreshed_at)
+
+        # Refreshing picks up the new participant
+        StudySummary.refresh(study.kf_id, include_file_size=False)
+        db.session.commit()
+        summary = StudySummary.query.get(study.kf_id)
+        self.assertEqual(summary.participant_count, 4)
+        self.assertEqual(summary.proband_count, 2)
+        self.assertGreater(summary.refreshed_at, refreshed_at)
+
+    def test_summary_empty_study(self):
+        """
+        Test the summary of a study without any data
+        """
+        study = Study(external_id='phs002')
+        db.session.add(study)
+        db.session.commit()
+        url = url_for(STUDY_SUMMARY_URL, kf_id=study.kf_id)
+
+        response = self.client.get(url, headers=self._api_headers())
+        self.assertEqual(response.status_code, 202)
+        work(burst=True)
+        response = self.client.get(url, headers=self._api_headers())
+        summary = json.loads(response.data.decode('utf-8'))['results']
+        self.assertEqual(summary['participant_count'], 0)
+        self.assertEqual(summary['family_count'], 0)
+        self.assertEqual(summary['biospecimens_by_analyte_type'], {})
+        self.assertEqual(summary['genomic_file_count'], 0)
+        self.assertEqual(summary['total_file_size'], 0)
+
+    def test_summary_not_found(self):
+        """
+        Test requesting a summary of a study that does not exist
+        """
+        response = self.client.get(url_for(STUDY_SUMMARY_URL,
+                                           kf_id='SD_00000000'),
+                                   headers=self._api_headers())
+        self.assertEqual(response.status_code, 404)
+        resp = json.loads(response.data.decode('utf-8'))
+        self.assertIn('could not find', resp['_status']['message'])
+
+    def test_summary_deleted_with_study(self):
+        """
+        Test that a study's summary is removed when the study is deleted
+        """
+        study = Study(external_id='phs002')
+        db.session.add(study)
+        db.session.commit()
+        StudySummary.refresh(study.kf_id)
+        db.session.commit()
+
+        db.session.delete(study)
+        db.session.commit()
+        self.assertEqual(StudySummary.query.count(), 0)
+
+    def _create_study(self):
+        """
+        Create a study with a family of three, each with a biospecimen, and
+        two genomic files
+        """
+        study = Study(external_id='phs001')
+        family = Family(external_id='family')
+        sc = SequencingCenter(name='Baylor')
+        participants = [
+            Participant(external_id='P{}'.format(i), is_proband=(i == 0),
+                        family=family)
+            for i in range(3)
+        ]
+        study.participants.extend(participants)
+        biospecimens = [
+            Biospecimen(external_sample_id='S{}'.format(i),
+                        analyte_type=analyte_type,
+                        participant=p, sequencing_center=sc)
+            for i, (p, analyte_type) in enumerate(
+                zip(participants, ['DNA', 'DNA', 'RNA']))
+        ]
+        db.session.add(study)
+        db.session.add_all(biospecimens)
+        db.session.commit()
+
+        gfs = []
+        for i, data_type in enumerate(['Aligned Reads', None]):
+            gf = GenomicFile(external_id='gf{}'.format(i),
+                             data_type=data_type,
+                             file_name='file_{}'.format(i),
+                             urls=['s3://bucket/key'],
+                             hashes={'md5': str(uuid.uuid4())},
+                             size=MockIndexd.doc['size'])
+            db.session.add(gf)
+            gfs.append(gf)
+            # Link both of the first participant's biospecimen and another
+            # participant's biospecimen to each file
+            for bs in [biospecimens[0], biospecimens[i + 1]]:
+                db.session.add(BiospecimenGenomicFile(biospecimen=bs,
+                                                      genomic_file=gf))
+        db.session.commit()
+
+        for strategy, files in [('WGS', gfs), ('WXS', gfs[:1])]:
+            se = SequencingExperiment(external_id=strategy,
+                                      experiment_strategy=strategy,
+                                      is_paired_end=True, platform='Illumina',
+                                      sequencing_center=sc)
+            for gf in files:
+                se.sequencing_experiment_genomic_files.append(
+                    SequencingExperimentGenomicFile(genomic_file=gf))
+            db.session.add(se)
+        db.session.commit()
+
+        return study
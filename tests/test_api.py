@@ -2,6 +2,8 @@ import json
 import pkg_resources
 import pytest
 
+from config import TestingConfig
+from dataservice import create_app
 from dataservice.api.common import id_service
 from tests.conftest import (
     ENDPOINT_ENTITY_MAP,
@@ -446,6 +448,29 @@ class TestAPI:
         assert type(status['tags']) is list
         assert 'Dataservice' in status['message']
 
+    def test_build_metadata(self, client, tmpdir, mocker):
+        """ Test that status is served from prebuilt metadata """
+        path = str(tmpdir.join('build.json'))
+        runner = client.application.test_cli_runner()
+        result = runner.invoke(args=['build-metadata', '--output', path])
+        assert result.exit_code == 0, result.output
+        with open(path) as f:
+            metadata = json.load(f)
+        status = json.loads(client.get('/status').data.decode('utf-8'))
+        assert metadata['GIT_COMMIT'] == status['_status']['commit']
+        assert metadata['PKG_VERSION'] == status['_status']['version']
+
+        metadata['GIT_COMMIT'] = 'abcdef0'
+        with open(path, 'w') as f:
+            json.dump(metadata, f)
+        check_output = mocker.patch('dataservice.subprocess.check_output')
+        mocker.patch.object(TestingConfig, 'BUILD_METADATA_PATH', path)
+        app = create_app('testing')
+        assert check_output.call_count == 0
+        status = json.loads(app.test_client().get('/status').data
+                            .decode('utf-8'))
+        assert status['_status']['commit'] == 'abcdef0'
+
     def test_versions(self, client):
         """ Test that versions are aligned accross package, docs, and api """
         package = pkg_resources.get_distribution("kf-api-dataservice").version
@@ -0,0 +1,157 @@
+import json
+
+from dataservice.extensions import db
+from dataservice.api.study.models import Study
+from dataservice.api.participant.models import Participant
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.sequencing_center.models import SequencingCenter
+from benchmarks import run_benchmarks, compare_results, SCENARIOS
+from benchmarks.runner import percentile
+from benchmarks.encoding import run_encoding_benchmarks
+from benchmarks.pages import run_page_benchmarks
+from tests.utils import FlaskTestCase
+
+
+class BenchmarkTest(FlaskTestCase):
+    """
+    Test the API benchmarks
+    """
+
+    def test_run_benchmarks(self):
+        """
+        Test that all scenarios run and clean up after themselves
+        """
+        results = run_benchmarks(size=3, iterations=2)
+
+        self.assertEqual(list(results), list(SCENARIOS))
+        for name, metrics in results.items():
+            self.assertEqual(metrics['operations'], 2, name)
+            self.assertGreater(metrics['queries_per_request'], 0, name)
+            self.assertGreater(metrics['requests_per_second'], 0, name)
+            self.assertLessEqual(metrics['p50_ms'], metrics['p99_ms'], name)
+        self.assertEqual(results['biospecimen_bulk_post']['requests'], 50)
+
+        for model in [Study, Participant, GenomicFile, SequencingCenter]:
+            self.assertEqual(model.query.count(), 0, model)
+
+    def test_keep_dataset(self):
+        """
+        Test that seeded data is kept when asked
+        """
+        run_benchmarks(size=2, iterations=1, scenarios=['detail_get'],
+                       keep=True)
+        self.assertEqual(Study.query.count(), 1)
+        self.assertEqual(Participant.query.count(), 2)
+        self.assertEqual(GenomicFile.query.count(), 8)
+
+    def test_bench_command(self):
+        """
+        Test running the benchmarks from the cli and comparing to a baseline
+        """
+        runner = self.app.test_cli_runner()
+        with runner.isolated_filesystem():
+            result = runner.invoke(args=['bench', '--size', '2',
+                                         '--iterations', '1',
+                                         '--scenario', 'detail_get',
+                                         '--output', 'results.json'])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn('detail_get', result.output)
+            with open('results.json') as f:
+                baseline = json.load(f)
+
+            baseline['detail_get']['queries_per_request'] /= 2
+            with open('baseline.json', 'w') as f:
+                json.dump(baseline, f)
+            result = runner.invoke(args=['bench', '--size', '2',
+                                         '--iterations', '1',
+                                         '--scenario', 'detail_get',
+                                         '--baseline', 'baseline.json'])
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn('queries_per_request regressed', result.output)
+
+            result = runner.invoke(args=['bench', '--scenario', 'foo'])
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn('unknown scenario foo', result.output)
+        db.session.remove()
+
+    def test_encoding_benchmarks(self):
+        """
+        Test that each encoder is timed on each page size
+        """
+        results = run_encoding_benchmarks(size=1, iterations=2,
+                                          page_sizes=(3, 10))
+
+        self.assertEqual(set(results), {'json', 'orjson', 'msgpack'})
+        for name, pages in results.items():
+            self.assertEqual(list(pages), [3, 10], name)
+            self.assertLess(pages[3]['bytes'], pages[10]['bytes'], name)
+        self.assertEqual(results['json'][10]['bytes'],
+                         results['orjson'][10]['bytes'])
+        self.assertEqual(GenomicFile.query.count(), 0)
+
+        result = self.app.test_cli_runner().invoke(
+            args=['bench-encoding', '--size', '1', '--iterations', '1',
+                  '--page-size', '5'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('msgpack', result.output)
+        db.session.remove()
+
+    def test_page_benchmarks(self):
+        """
+        Test that pages are measured when loaded as rows and as entities
+        """
+        results = run_page_benchmarks(size=2, iterations=1, limit=3)
+
+        self.assertEqual(list(results), ['/participants', '/biospecimens'])
+        for endpoint, modes in results.items():
+            self.assertEqual(list(modes), ['entities', 'rows'], endpoint)
+            for metrics in modes.values():
+                self.assertEqual(metrics['results'], 2 if endpoint ==
+                                 '/participants' else 3, endpoint)
+                self.assertGreater(metrics['peak_memory_kb'], 0, endpoint)
+        self.assertTrue(self.app.config['PAGE_ROWS'])
+        self.assertEqual(Participant.query.count(), 0)
+
+        result = self.app.test_cli_runner().invoke(
+            args=['bench-pages', '--size', '1', '--iterations', '1'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('/biospecimens', result.output)
+        db.session.remove()
+
+    def test_profile_startup(self):
+        """
+        Test profiling the start up of the app in new processes
+        """
+        result = self.app.test_cli_runner().invoke(
+            args=['profile-startup', '--config', 'testing', '--runs', '1'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('prebuilt', result.output)
+        self.assertIn('register_spec ms', result.output)
+        self.assertIn('max_rss_kb', result.output)
+
+    def test_percentile(self):
+        """
+        Test percentiles are interpolated between ranks
+        """
+        values = [4, 1, 3, 2]
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile(values, 50), 2.5)
+        self.assertEqual(percentile(values, 100), 4)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_compare_results(self):
+        """
+        Test that only metrics worse than the tolerance are regressions
+        """
+        baseline = {'a': {'p95_ms': 10, 'queries_per_request': 2,
+                          'requests_per_second': 100}}
+        results = {'a': {'p50_ms': 1, 'p95_ms': 11, 'p99_ms': 20,
+                         'queries_per_request': 3,
+                         'requests_per_second': 70},
+                   'b': {'p50_ms': 1, 'p95_ms': 1, 'p99_ms': 1,
+                         'queries_per_request': 1,
+                         'requests_per_second': 1}}
+        regressions = compare_results(results, baseline, tolerance=0.2)
+        self.assertEqual([(s, m) for s, m, _, _, _ in regressions],
+                         [('a', 'queries_per_request'),
+                          ('a', 'requests_per_second')])
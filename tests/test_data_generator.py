@@ -0,0 +1,119 @@
+import io
+import json
+
+import requests
+from flask import url_for
+from unittest.mock import patch
+
+from dataservice.extensions import db, indexd
+from dataservice.api.participant.models import Participant
+from dataservice.api.biospecimen.models import Biospecimen
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.study_file.models import StudyFile
+from dataservice.util.data_gen.data_generator import (
+    DataGenerator,
+    CopyStream,
+    _copy_value
+)
+from dataservice.api.common.study_scope import check_study_ids
+from dataservice.util.fake_indexd import FakeIndexd
+from tests.utils import FlaskTestCase
+
+
+class DataGeneratorTest(FlaskTestCase):
+    """
+    Test the synthetic data generator
+    """
+
+    def test_generate(self):
+        """
+        Test that every generated row is copied to the database
+        """
+        dg = DataGenerator(participants=25, participants_per_study=10)
+        counts = dg.create_and_publish_all()
+
+        self.assertEqual(counts['study'], 3)
+        self.assertEqual(counts['participant'], 25)
+        for table in db.metadata.sorted_tables:
+            count = db.session.execute(
+                'SELECT count(*) FROM {}'.format(table.name)).scalar()
+            self.assertEqual(count, counts[table.name], table.name)
+        for table in ['family', 'diagnosis', 'sample', 'biospecimen',
+                      'genomic_file', 'biospecimen_genomic_file',
+                      'read_group_genomic_file', 'task_genomic_file']:
+            self.assertGreater(counts[table], 0, table)
+        self.assertEqual(check_study_ids(), {})
+
+        # Rows are readable through the api
+        resp = self.client.get(url_for('api.biospecimens_list', limit=5),
+                               headers=self._api_headers())
+        resp = json.loads(resp.data.decode('utf-8'))
+        self.assertEqual(resp['total'], counts['biospecimen'])
+        self.assertEqual(len(resp['results']), 5)
+
+    def test_deterministic(self):
+        """
+        Test that the same seed generates the same data
+        """
+        def snapshot():
+            return [(bs.external_aliquot_id, bs.analyte_type, bs.duo_ids,
+                     str(bs.uuid), bs.created_at)
+                    for bs in Biospecimen.query.order_by(
+                        Biospecimen.external_aliquot_id)]
+
+        DataGenerator(seed=1, participants=10).create_and_publish_all()
+        first = snapshot()
+        DataGenerator().clear_all()
+        self.assertEqual(Participant.query.count(), 0)
+
+        DataGenerator(seed=1, participants=10).create_and_publish_all()
+        self.assertEqual(snapshot(), first)
+
+        DataGenerator().clear_all()
+        DataGenerator(seed=2, participants=10).create_and_publish_all()
+        self.assertNotEqual(snapshot(), first)
+
+    def test_indexd_documents(self):
+        """
+        Test that generated files may be served by a fake indexd
+        """
+        docs = io.StringIO()
+        counts = DataGenerator(participants=10, indexd_docs=docs)\
+            .create_and_publish_all()
+        docs.seek(0)
+
+        requests_patch = patch('dataservice.extensions.flask_indexd.requests',
+                               requests)
+        requests_patch.start()
+        indexd_url = indexd.url
+        try:
+            with FakeIndexd() as fake:
+                indexd.url = fake.url
+                self.assertEqual(fake.load_documents(docs),
+                                 counts['genomic_file'] +
+                                 counts['study_file'])
+                for model in [GenomicFile, StudyFile]:
+                    for f in model.query:
+                        self.assertFalse(getattr(f, 'was_deleted', False))
+                        self.assertEqual(f.uuid,
+                                         fake.documents[f.latest_did]
+                                         ['baseid'])
+                        self.assertGreater(f.size, 0)
+        finally:
+            indexd.url = indexd_url
+            requests_patch.stop()
+
+    def test_copy_format(self):
+        """
+        Test values are escaped for COPY
+        """
+        self.assertEqual(_copy_value(None), '\\N')
+        self.assertEqual(_copy_value(True), 't')
+        self.assertEqual(_copy_value('a\tb\\c\n'), 'a\\tb\\\\c\\n')
+        self.assertEqual(_copy_value(['a', 'b"c']), '{"a","b\\\\"c"}')
+        self.assertEqual(_copy_value({'a': 1}), '{"a": 1}')
+
+        stream = CopyStream(['abc\n', 'de\n', 'f\n'])
+        self.assertEqual(stream.read(5), b'abc\nd')
+        self.assertEqual(stream.read(), b'e\nf\n')
+        self.assertEqual(stream.read(10), b'')
@@ -0,0 +1,124 @@
+import json
+
+import psycopg2
+from flask import Flask, jsonify, url_for
+from sqlalchemy import event, exc
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import NullPool
+from unittest.mock import patch
+
+from dataservice.extensions import db
+from dataservice.extensions.database import SQLAlchemy, _ping_connection
+from dataservice.api.participant.resources import (
+    ParticipantAPI,
+    ParticipantListAPI
+)
+from dataservice.api.sample_relationship.resources import SampleLineageAPI
+from tests.utils import FlaskTestCase
+
+
+class DatabaseTest(FlaskTestCase):
+    """
+    Test engine settings and statement timeouts
+    """
+
+    def test_pool_profiles(self):
+        """
+        Test that the pgbouncer profile does not pool connections
+        """
+        url = make_url(self.app.config['SQLALCHEMY_DATABASE_URI'])
+        options = {}
+        db.apply_pool_defaults(self.app, options)
+        db.apply_driver_hacks(self.app, url, options)
+        self.assertEqual(options['pool_size'], 5)
+        self.assertNotIn('poolclass', options)
+
+        self.app.config['SQLALCHEMY_POOL_PROFILE'] = 'pgbouncer'
+        options = {}
+        db.apply_pool_defaults(self.app, options)
+        db.apply_driver_hacks(self.app, url, options)
+        self.assertNotIn('pool_size', options)
+        self.assertIs(options['poolclass'], NullPool)
+
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_POOL_PROFILE'] = 'other'
+        with self.assertRaises(ValueError):
+            SQLAlchemy().init_app(app)
+
+    def test_pre_ping(self):
+        """
+        Test that closed connections are discarded when checked out
+        """
+        self.assertTrue(self.app.config['SQLALCHEMY_POOL_PRE_PING'])
+        self.assertTrue(event.contains(db.engine.pool, 'checkout',
+                                       _ping_connection))
+
+        conn = psycopg2.connect(db.engine.url.__to_string__(
+            hide_password=False).replace('postgres://', 'postgresql://'))
+        _ping_connection(conn, None, None)
+        conn.close()
+        with self.assertRaises(exc.DisconnectionError):
+            _ping_connection(conn, None, None)
+
+    def test_statement_timeouts(self):
+        """
+        Test that the timeout of a request depends on the endpoint
+        """
+        timeouts = []
+
+        def get(*args, **kwargs):
+            timeouts.append(db.session.execute('SHOW statement_timeout')
+                            .scalar())
+            return jsonify({})
+
+        self.app.config['STATEMENT_TIMEOUTS'] = {
+            'detail': 1000, 'default': 2000, 'bulk': 3000
+        }
+        with patch.object(ParticipantAPI, 'get', side_effect=get), \
+                patch.object(ParticipantListAPI, 'get', side_effect=get), \
+                patch.object(SampleLineageAPI, 'get', side_effect=get):
+            self.client.get(url_for('api.participants', kf_id='PT_00000000'))
+            self.client.get(url_for('api.participants_list'))
+            # Aggregates of one entity are not held to the detail timeout
+            self.client.get(url_for('api.sample_lineage',
+                                    kf_id='SA_00000000'))
+        self.assertEqual(timeouts, ['1s', '2s', '2s'])
+
+    def test_statement_timeout_after_commit(self):
+        """
+        Test that the timeout of a request lasts after the view commits
+        """
+        timeouts = []
+
+        def get(*args, **kwargs):
+            db.session.commit()
+            timeouts.append(db.session.execute('SHOW statement_timeout')
+                            .scalar())
+            return jsonify({})
+
+        self.app.config['STATEMENT_TIMEOUTS'] = {'default': 2000}
+        with patch.object(ParticipantListAPI, 'get', side_effect=get):
+            self.client.get(url_for('api.participants_list'))
+        self.assertEqual(timeouts, ['2s'])
+        # The timeout ends with the request
+        db.session.commit()
+        self.assertNotEqual(db.session.execute('SHOW statement_timeout')
+                            .scalar(), '2s')
+
+    def test_statement_timeout_error(self):
+        """
+        Test that a statement cancelled by its timeout returns a 504
+        """
+        def get(*args, **kwargs):
+            db.session.execute('SELECT pg_sleep(1)')
+
+        self.app.config['STATEMENT_TIMEOUTS'] = {'default': 50}
+        with patch.object(ParticipantListAPI, 'get', side_effect=get):
+            resp = self.client.get(url_for('api.participants_list'),
+                                   headers=self._api_headers())
+
+        self.assertEqual(resp.status_code, 504)
+        resp = json.loads(resp.data.decode('utf-8'))
+        self.assertIn('took too long', resp['_status']['message'])
+        # The session may be used after the error
+        db.session.execute('SELECT 1')
@@ -0,0 +1,73 @@
+import json
+from datetime import datetime
+
+import msgpack
+from flask import url_for
+
+from dataservice.extensions import db
+from dataservice.api.study.models import Study
+from dataservice.api.participant.models import Participant
+from dataservice.api.common.encoding import encode_json
+from tests.utils import FlaskTestCase
+
+
+class EncodingTest(FlaskTestCase):
+    """
+    Test the encoders of API responses
+    """
+
+    def setUp(self):
+        super(EncodingTest, self).setUp()
+        study = Study(external_id='phs001')
+        study.participants.extend(
+            Participant(external_id='P{}'.format(i), is_proband=True)
+            for i in range(3))
+        db.session.add(study)
+        db.session.commit()
+        self.study = study
+
+    def test_orjson_identical(self):
+        """
+        Test that orjson encodes responses exactly as the stdlib encoder
+        """
+        urls = [url_for('api.participants_list', limit=2),
+                url_for('api.studies', kf_id=self.study.kf_id)]
+        bodies = {}
+        for backend in ['orjson', 'json']:
+            self.app.config['JSON_ENCODER'] = backend
+            bodies[backend] = [self.client.get(url).data for url in urls]
+        self.assertEqual(bodies['orjson'], bodies['json'])
+
+        # Values orjson does not encode, like large integers, fall back
+        values = [{'b': datetime(2020, 1, 2, 3, 4, 5), 'a': None,
+                   'c': ['Étude ünïcode', 1.5]},
+                  {'a': 2 ** 70}]
+        for as_ascii in [True, False]:
+            self.app.config['JSON_AS_ASCII'] = as_ascii
+            self.app.config['JSON_ENCODER'] = 'orjson'
+            orjson_bodies = [encode_json(data) for data in values]
+            self.app.config['JSON_ENCODER'] = 'json'
+            self.assertEqual(orjson_bodies,
+                             [encode_json(data) for data in values])
+
+        # Non ASCII characters are escaped as Flask does by default
+        self.app.config['JSON_AS_ASCII'] = True
+        self.app.config['JSON_ENCODER'] = 'orjson'
+        self.assertEqual(encode_json({'a': 'é\x7f'}),
+                         b'{"a":"\\u00e9\\u007f"}\n')
+
+    def test_msgpack(self):
+        """
+        Test that MessagePack is returned when asked for
+        """
+        url = url_for('api.participants_list', limit=2)
+        resp = self.client.get(url, headers={'Accept': 'application/msgpack'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.mimetype, 'application/msgpack')
+        self.assertIn('Accept', resp.headers['Vary'])
+        expected = json.loads(self.client.get(url).data.decode('utf-8'))
+        self.assertEqual(msgpack.unpackb(resp.data, raw=False), expected)
+
+        resp = self.client.get(url, headers={
+            'Accept': 'application/json, application/msgpack;q=0.5'})
+        self.assertEqual(resp.mimetype, 'application/json')
@@ -0,0 +1,231 @@
+import json
+import threading
+import time
+
+import requests
+from flask import url_for
+from unittest.mock import patch
+
+from dataservice.extensions import db, indexd
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.util.fake_indexd import FakeIndexd
+from tests.utils import FlaskTestCase
+
+GENOMICFILE_URL = 'api.genomic_files'
+GENOMICFILE_LIST_URL = 'api.genomic_files_list'
+
+
+class FakeIndexdTest(FlaskTestCase):
+    """
+    Test the indexd client against the fake indexd server
+    """
+
+    def setUp(self):
+        super(FakeIndexdTest, self).setUp()
+        # Other tests may leave the indexd client's requests module mocked
+        self.requests_patch = patch(
+            'dataservice.extensions.flask_indexd.requests', requests)
+        self.requests_patch.start()
+        self.fake = FakeIndexd(seed=0).start()
+        self.indexd_url = indexd.url
+        indexd.url = self.fake.url
+
+    def tearDown(self):
+        indexd.url = self.indexd_url
+        self.fake.stop()
+        self.requests_patch.stop()
+        super(FakeIndexdTest, self).tearDown()
+
+    def test_create_and_get(self):
+        """
+        Test that files are registered in and merged from the fake
+        """
+        kf_id = self._create_file()
+
+        gf = GenomicFile.query.get(kf_id)
+        doc = self.fake.documents[gf.latest_did]
+        self.assertEqual(doc['baseid'], gf.uuid)
+        self.assertEqual(doc['file_name'], 'hg38.bam')
+        self.assertEqual(doc['authz'], ['/programs/TEST'])
+
+        db.session.remove()
+        resp = self._get(kf_id)
+        self.assertEqual(resp.status_code, 200)
+        results = json.loads(resp.data.decode('utf-8'))['results']
+        self.assertEqual(results['size'], 123)
+        self.assertEqual(results['hashes'], {'md5': 'abc'})
+        self.assertEqual(self.fake.calls['create'], 1)
+        self.assertGreaterEqual(self.fake.calls['get'], 1)
+
+    def test_update(self):
+        """
+        Test that changed metadata updates the document and a changed size
+        creates a new version
+        """
+        kf_id = self._create_file()
+        did = GenomicFile.query.get(kf_id).latest_did
+        rev = self.fake.documents[did]['rev']
+
+        resp = self._patch(kf_id, {'file_name': 'hg19.bam'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.fake.documents[did]['file_name'], 'hg19.bam')
+        self.assertNotEqual(self.fake.documents[did]['rev'], rev)
+        self.assertEqual(len(self.fake.documents), 1)
+
+        resp = self._patch(kf_id, {'size': 456, 'authz': ['/programs/NEW']})
+        self.assertEqual(resp.status_code, 200)
+        new_did = GenomicFile.query.get(kf_id).latest_did
+        self.assertNotEqual(new_did, did)
+        self.assertEqual(len(self.fake.documents), 2)
+        self.assertEqual(self.fake.documents[new_did]['size'], 456)
+        self.assertEqual(self.fake.documents[new_did]['baseid'],
+                         self.fake.documents[did]['baseid'])
+        # The authz of previous versions is updated too
+        self.assertEqual(self.fake.documents[did]['authz'],
+                         ['/programs/NEW'])
+
+        versions = requests.get(self.fake.url + new_did + '/versions').json()
+        self.assertEqual([v['did'] for v in versions.values()],
+                         [did, new_did])
+
+    def test_delete(self):
+        """
+        Test that deleting a file deletes its document
+        """
+        kf_id = self._create_file()
+        resp = self.client.delete(url_for(GENOMICFILE_URL, kf_id=kf_id),
+                                  headers=self._api_headers())
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.fake.documents, {})
+
+    def test_deleted_document(self):
+        """
+        Test that a file whose document was deleted in indexd is removed
+        """
+        kf_id = self._create_file()
+        self.fake.delete_document(GenomicFile.query.get(kf_id).latest_did)
+        db.session.remove()
+
+        self._get(kf_id)
+        self.assertEqual(GenomicFile.query.count(), 0)
+
+        self._create_file()
+        self.fake.deleted_rate = 1
+        db.session.remove()
+        resp = self.client.get(url_for(GENOMICFILE_LIST_URL),
+                               headers=self._api_headers())
+        results = json.loads(resp.data.decode('utf-8'))['results']
+        self.assertEqual(results, [])
+        self.assertEqual(GenomicFile.query.count(), 0)
+
+    def test_error_rate(self):
+        """
+        Test that injected failures are returned by the api
+        """
+        self.fake.error_rate = 1
+        resp = self.client.post(url_for(GENOMICFILE_LIST_URL),
+                                data=json.dumps(self._body()),
+                                headers=self._api_headers())
+        self.assertEqual(resp.status_code, 500)
+        self.assertIn('injected failure',
+                      json.loads(resp.data.decode('utf-8'))
+                      ['_status']['message'])
+        self.assertEqual(GenomicFile.query.count(), 0)
+
+    def test_revisions(self):
+        """
+        Test that changes must provide the current rev
+        """
+        doc = self.fake.add_document({'size': 1, 'hashes': {'md5': 'a'}})
+        url = self.fake.url + doc['did']
+        rev = doc['rev']
+
+        resp = requests.put(url + '?rev=wrong', json={'file_name': 'a'})
+        self.assertEqual(resp.status_code, 409)
+        resp = requests.delete(url + '?rev=wrong')
+        self.assertEqual(resp.status_code, 409)
+
+        resp = requests.put(url + '?rev=' + rev, json={'file_name': 'a'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp.json()['rev'], rev)
+        rev = resp.json()['rev']
+
+        resp = requests.put(url + '?rev=' + rev, json={'size': 2})
+        self.assertEqual(resp.status_code, 400)
+
+        resp = requests.delete(url + '?rev=' + rev)
+        self.assertEqual(resp.status_code, 200)
+        resp = requests.get(url)
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(resp.json(), {'error': 'no record found'})
+
+    def test_bulk_documents(self):
+        """
+        Test getting many documents at once
+        """
+        docs = [self.fake.add_document({'file_name': str(i)})
+                for i in range(3)]
+        dids = [docs[2]['did'], 'missing', docs[0]['did']]
+        resp = requests.post(self.fake.url + 'bulk/documents', json=dids)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([d['file_name'] for d in resp.json()], ['2', '0'])
+
+    def test_keep_alive(self):
+        """
+        Test that each thread reuses its own session when keep alive is on
+        """
+        self.assertIsNot(indexd._thread_session(), indexd._thread_session())
+
+        self.app.config['INDEXD_KEEP_ALIVE'] = True
+        try:
+            session = indexd._thread_session()
+            self.assertIs(indexd._thread_session(), session)
+
+            other = []
+
+            def target():
+                with self.app.app_context():
+                    other.append(indexd._thread_session())
+            thread = threading.Thread(target=target)
+            thread.start()
+            thread.join()
+            self.assertIsNot(other[0], session)
+        finally:
+            self.app.config['INDEXD_KEEP_ALIVE'] = False
+            indexd._local.session = None
+
+    def test_latency(self):
+        """
+        Test that each call is delayed
+        """
+        self.fake.latency = 0.05
+        start = time.perf_counter()
+        requests.get(self.fake.url + 'missing')
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+
+    def _body(self):
+        return {
+            'file_name': 'hg38.bam',
+            'size': 123,
+            'authz': ['/programs/TEST'],
+            'hashes': {'md5': 'abc'},
+            'urls': ['s3://bucket/key'],
+            'controlled_access': True,
+            'availability': 'Immediate Download'
+        }
+
+    def _create_file(self):
+        resp = self.client.post(url_for(GENOMICFILE_LIST_URL),
+                                data=json.dumps(self._body()),
+                                headers=self._api_headers())
+        self.assertEqual(resp.status_code, 201, resp.data)
+        return json.loads(resp.data.decode('utf-8'))['results']['kf_id']
+
+    def _get(self, kf_id):
+        return self.client.get(url_for(GENOMICFILE_URL, kf_id=kf_id),
+                               headers=self._api_headers())
+
+    def _patch(self, kf_id, body):
+        return self.client.patch(url_for(GENOMICFILE_URL, kf_id=kf_id),
+                                 data=json.dumps(body),
+                                 headers=self._api_headers())
@@ -3,6 +3,12 @@ import json
 from dateutil import parser, tz
 from urllib.parse import urlencode
 from pprint import pprint
+from dataservice.extensions import db
+from dataservice.api.biospecimen.models import Biospecimen
+from dataservice.api.diagnosis.models import Diagnosis
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.outcome.models import Outcome
+from dataservice.api.participant.models import Participant
 from tests.conftest import (
     ENTITY_ENDPOINT_MAP,
     ENDPOINTS,
@@ -201,5 +207,103 @@ class TestFilterParams:
         for k, v in invalid_params.items():
             assert k in resp['_status']['message']
 
+    @pytest.mark.parametrize('model,params,expression', [
+        (Diagnosis, {'age_at_event_days[gte]': 365},
+         lambda m: m.age_at_event_days >= 365),
+        (Diagnosis, {'age_at_event_days[gt]': 100,
+                     'age_at_event_days[lt]': 365},
+         lambda m: (m.age_at_event_days > 100) & (m.age_at_event_days < 365)),
+        (Outcome, {'age_at_event_days[lte]': 120,
+                   'vital_status[ne]': 'Deceased'},
+         lambda m: ((m.age_at_event_days <= 120) &
+                    (m.vital_status != 'Deceased'))),
+        (GenomicFile, {'data_type[in]': 'Aligned Reads,Other'},
+         lambda m: m.data_type.in_(['Aligned Reads', 'Other'])),
+        (Participant, {'created_at[gte]': '2000-01-01T00:00:00'},
+         lambda m: m.created_at >= '2000-01-01'),
+        (Biospecimen, {'duo_ids': 'DUO:0000021, DUO:0000025'},
+         lambda m: m.duo_ids.contains(['DUO:0000021', 'DUO:0000025'])),
+        (Biospecimen, {'duo_ids[any]': 'DUO:0000005,DUO:0000021'},
+         lambda m: m.duo_ids.overlap(['DUO:0000005', 'DUO:0000021'])),
+        (Biospecimen, {'duo_ids[exact]': 'DUO:0000021'},
+         lambda m: (m.duo_ids.contains(['DUO:0000021']) &
+                    m.duo_ids.contained_by(['DUO:0000021']))),
+    ])
+    def test_operator_filters(self, client, entities, model, params,
+                              expression):
+        """
+        Test filtering with range and set operators
+        """
+        expected_total = model.query.filter(expression(model)).count()
+
+        endpoint = '{}?{}'.format(ENTITY_ENDPOINT_MAP[model],
+                                  urlencode(params))
+        response = client.get(endpoint)
+
+        resp = json.loads(response.data.decode('utf-8'))
+        assert response.status_code == 200, resp
+        assert resp['total'] == expected_total
+
+    def test_in_and_ne_filters(self, client, entities):
+        """
+        Test filtering by sets of kf_ids
+        """
+        kf_ids = sorted(p.kf_id for p in Participant.query.limit(2))
+        params = {'kf_id[in]': ','.join(kf_ids)}
+        response = client.get('/participants?' + urlencode(params))
+        resp = json.loads(response.data.decode('utf-8'))
+        assert sorted(r['kf_id'] for r in resp['results']) == kf_ids
+
+        params = {'kf_id[ne]': kf_ids[0]}
+        response = client.get('/participants?' + urlencode(params))
+        resp = json.loads(response.data.decode('utf-8'))
+        assert resp['total'] == Participant.query.count() - 1
+
+    def test_exact_list_filter(self, client, entities):
+        """
+        Test that exact list filters ignore the order of values
+        """
+        bs = Biospecimen.query.first()
+        duo_ids = bs.duo_ids
+        bs.duo_ids = ['DUO:0000025', 'DUO:0000021', 'DUO:0000025']
+        db.session.commit()
+
+        for values in ['DUO:0000021,DUO:0000025', 'DUO:0000025,DUO:0000021',
+                       'DUO:0000021']:
+            expected = {b.kf_id for b in Biospecimen.query
+                        if set(b.duo_ids or []) == set(values.split(','))}
+            response = client.get('/biospecimens?' + urlencode(
+                {'duo_ids[exact]': values, 'limit': 100}))
+            resp = json.loads(response.data.decode('utf-8'))
+            assert {r['kf_id'] for r in resp['results']} == expected, values
+            assert (bs.kf_id in expected) == (values != 'DUO:0000021')
+
+        bs.duo_ids = duo_ids
+        db.session.commit()
+
+    @pytest.mark.parametrize('endpoint,params', [
+        ('/diagnoses', {'age_at_event_days[gte]': 'hello'}),
+        ('/diagnoses', {'age_at_event_days[in]': '1,hello'}),
+        ('/diagnoses', {'age_at_event_days[lt]': -1}),
+        ('/participants', {'modified_at[gt]': 'yesterday'}),
+        ('/outcomes', {'vital_status[in]': 'Alive,Unknown Status'}),
+        ('/biospecimens', {'duo_ids': 'DUO:0000021,DUO:9999999'}),
+        ('/biospecimens', {'duo_ids[any]': 'DUO:0000021;DUO:0000025'}),
+        # Fields stored in indexd and filters by related entities
+        ('/genomic-files', {'size[gt]': 1000}),
+        ('/genomic-files', {'biospecimen_id[in]': 'BS_00000000'}),
+    ])
+    def test_invalid_operator_filters(self, client, entities, endpoint,
+                                      params):
+        """
+        Test that operator values are validated like equality values
+        """
+        response = client.get('{}?{}'.format(endpoint, urlencode(params)))
+
+        assert response.status_code == 400
+        resp = json.loads(response.data.decode('utf-8'))
+        for k in params:
+            assert k in resp['_status']['message']
+
     def _datetime_string(self, dt):
         return 'T'.join(str(dt).split(' ')).split('+')[0]
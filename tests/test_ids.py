@@ -2,8 +2,21 @@ import pytest
 import random
 import re
 import string
-from dataservice.api.common.model import Base
-from dataservice.api.common.id_service import uuid_generator, kf_id_generator
+from sqlalchemy import event
+import json
+from flask import url_for
+
+from dataservice.api.common.model import Base, reserve_kf_ids
+from dataservice.api.common.id_service import (
+    uuid_generator,
+    kf_id_generator,
+    encode_kf_id,
+    permute,
+    KfIdAllocator,
+    KF_ID_SPACE
+)
+
+KF_ID_RE = r'^{}_[A-HJ-KM-NP-TV-Z0-9]{{8}}$'
 
 
 def test_kf_id():
@@ -28,6 +41,94 @@ def test_kf_id():
 
         assert re.search(r'^'+prefix+r'_[A-HJ-KM-NP-TV-Z0-9]{8}', kf_id)
 
+
+def test_permute():
+    """
+    Test that permuting is a bijection on the kf_id space that does not
+    preserve order
+    """
+    numbers = [permute(n) for n in range(100000)]
+    assert len(set(numbers)) == len(numbers)
+    assert all(0 <= n < KF_ID_SPACE for n in numbers)
+    assert numbers[1:11] != sorted(numbers[1:11])
+    assert permute(KF_ID_SPACE - 1) < KF_ID_SPACE
+
+
+def test_allocator_blocks(client):
+    """
+    Test that kf_ids are allocated a block at a time and skip existing ids
+    """
+    from dataservice.extensions import db
+    from dataservice.api.study.models import Study
+
+    allocator = Study.__table__.c.kf_id.default.arg
+    assert isinstance(allocator, KfIdAllocator)
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', count)
+
+    block_size = client.application.config['KF_ID_BLOCK_SIZE']
+    # Only count the blocks of studies, not those of their bucket jobs
+    config = client.application.config
+    bucket_service_url = config['BUCKET_SERVICE_URL']
+    config['BUCKET_SERVICE_URL'] = None
+    allocator._ids.clear()
+    studies = [Study(external_id=str(i)) for i in range(block_size + 1)]
+    db.session.add_all(studies)
+    db.session.commit()
+    config['BUCKET_SERVICE_URL'] = bucket_service_url
+    event.remove(db.engine, 'before_cursor_execute', count)
+
+    kf_ids = [s.kf_id for s in studies]
+    assert len(set(kf_ids)) == len(kf_ids)
+    assert all(re.search(KF_ID_RE.format('SD'), kf_id) for kf_id in kf_ids)
+    assert len([s for s in statements if 'nextval' in s]) == 2
+
+    # Ids that are already taken are skipped
+    seq = db.session.execute("SELECT last_value FROM kf_id_seq").scalar()
+    taken = encode_kf_id('SD', permute(seq + 1))
+    db.session.add(Study(kf_id=taken, external_id='taken'))
+    db.session.commit()
+    kf_ids = reserve_kf_ids(Study, 3)
+    assert len(kf_ids) == 3
+    assert taken not in kf_ids
+
+
+def test_reserve_kf_ids(client):
+    """
+    Test reserving kf_ids through the api
+    """
+    body = {'prefix': 'PT', 'count': 5}
+    response = client.post(url_for('api.kf_id_reservation'),
+                           data=json.dumps(body),
+                           headers={'Content-Type': 'application/json'})
+    assert response.status_code == 201
+    resp = json.loads(response.data.decode('utf-8'))
+    kf_ids = resp['results']['kf_ids']
+    assert resp['results']['prefix'] == 'PT'
+    assert len(set(kf_ids)) == 5
+    assert all(re.search(KF_ID_RE.format('PT'), kf_id) for kf_id in kf_ids)
+
+    # Reserved kf_ids are not reserved again
+    response = client.post(url_for('api.kf_id_reservation'),
+                           data=json.dumps(body),
+                           headers={'Content-Type': 'application/json'})
+    resp = json.loads(response.data.decode('utf-8'))
+    assert not set(kf_ids) & set(resp['results']['kf_ids'])
+
+    for body in [{'prefix': 'XX', 'count': 5}, {'prefix': 'PT', 'count': 0},
+                 {'prefix': 'PT', 'count': 10**6}, {'count': 5}]:
+        response = client.post(url_for('api.kf_id_reservation'),
+                               data=json.dumps(body),
+                               headers={'Content-Type': 'application/json'})
+        assert response.status_code == 400
+        resp = json.loads(response.data.decode('utf-8'))
+        assert 'could not reserve kf_ids' in resp['_status']['message']
+
+
 def test_kf_id_field(client):
     from dataservice.extensions import db
 
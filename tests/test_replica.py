@@ -0,0 +1,135 @@
+import json
+
+from flask import url_for
+from sqlalchemy import event
+from unittest.mock import patch
+
+from config import TestingConfig
+from dataservice.extensions import db
+from dataservice.extensions.database import REPLICA_BIND, ReplicaMonitor
+from dataservice.api.study.models import Study
+from dataservice.api.job.models import Job
+from tests.utils import FlaskTestCase
+
+
+class ReplicaTest(FlaskTestCase):
+    """
+    Test routing of read only requests to a replica
+
+    The replica is the test database itself, so statements are told apart
+    by the engine that executed them.
+    """
+
+    def setUp(self):
+        self.config_patch = patch.multiple(
+            TestingConfig,
+            SQLALCHEMY_REPLICA_URI=TestingConfig.SQLALCHEMY_DATABASE_URI,
+            REPLICA_CHECK_INTERVAL=0)
+        self.config_patch.start()
+        super(ReplicaTest, self).setUp()
+
+        self.statements = {'primary': [], 'replica': []}
+        self.engines = {
+            'primary': db.engine,
+            'replica': db.get_engine(self.app, bind=REPLICA_BIND)
+        }
+        self.recorders = {name: self._recorder(name)
+                          for name in self.engines}
+        for name, engine in self.engines.items():
+            event.listen(engine, 'before_cursor_execute',
+                         self.recorders[name])
+
+    def tearDown(self):
+        for name, engine in self.engines.items():
+            event.remove(engine, 'before_cursor_execute',
+                         self.recorders[name])
+        super(ReplicaTest, self).tearDown()
+        self.config_patch.stop()
+
+    def test_routing(self):
+        """
+        Test that reads go to the replica and writes to the primary
+        """
+        resp = self.client.post(url_for('api.studies_list'),
+                                data=json.dumps({'external_id': 'S1'}),
+                                headers=self._api_headers())
+        self.assertEqual(resp.status_code, 201)
+        self.assertTrue(self._ran('primary', 'INSERT INTO study'))
+        self.assertFalse(self._ran('replica', 'INSERT'))
+        self.assertIn('read_primary_until', resp.headers['Set-Cookie'])
+        kf_id = json.loads(resp.data.decode('utf-8'))['results']['kf_id']
+
+        # The client that wrote reads from the primary
+        self._reset()
+        resp = self.client.get(url_for('api.studies', kf_id=kf_id))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(self._ran('primary', 'FROM study'))
+        self.assertFalse(self._ran('replica', 'FROM study'))
+
+        # Other clients read from the replica
+        self._reset()
+        client = self.app.test_client()
+        resp = client.get(url_for('api.studies', kf_id=kf_id))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(self._ran('replica', 'FROM study'))
+        self.assertFalse(self._ran('primary', 'FROM study'))
+
+        # Unless they ask to read their own writes
+        self._reset()
+        client.get(url_for('api.studies', kf_id=kf_id),
+                   headers={'X-Read-Your-Writes': 'true'})
+        self.assertTrue(self._ran('primary', 'FROM study'))
+        self.assertFalse(self._ran('replica', 'FROM study'))
+
+    def test_writes_while_reading(self):
+        """
+        Test that changes made while serving a GET are flushed to the primary
+        """
+        study = Study(external_id='S1')
+        db.session.add(study)
+        db.session.commit()
+        kf_id = study.kf_id
+
+        self._reset()
+        resp = self.app.test_client().get(
+            url_for('api.study_summaries', kf_id=kf_id))
+        self.assertEqual(resp.status_code, 202)
+        self.assertTrue(self._ran('replica', 'FROM study'))
+        self.assertTrue(self._ran('primary', 'INSERT INTO job'))
+        self.assertEqual(Job.query.filter_by(type='refresh_summaries')
+                         .count(), 1)
+
+    def test_lag_fallback(self):
+        """
+        Test that the primary serves reads when the replica is behind or down
+        """
+        monitor = self.app.extensions['replica_monitor']
+        self.assertEqual(monitor.check(), 0)
+
+        for lag in [100, None]:
+            self._reset()
+            with patch.object(ReplicaMonitor, 'check', return_value=lag):
+                resp = self.app.test_client().get(url_for('api.studies_list'))
+            self.assertEqual(resp.status_code, 200)
+            self.assertTrue(self._ran('primary', 'FROM study'))
+            self.assertFalse(self._ran('replica', 'FROM study'))
+
+        # The lag is not checked again within the check interval
+        monitor.app.config['REPLICA_CHECK_INTERVAL'] = 60
+        monitor.checked_at = None
+        with patch.object(ReplicaMonitor, 'check', return_value=0) as check:
+            self.assertTrue(db.replica_available())
+            self.assertTrue(db.replica_available())
+        self.assertEqual(check.call_count, 1)
+
+    def _recorder(self, name):
+        def record(conn, cursor, statement, *args):
+            self.statements[name].append(statement)
+        return record
+
+    def _reset(self):
+        for statements in self.statements.values():
+            del statements[:]
+
+    def _ran(self, engine, text):
+        return any(text in s for s in self.statements[engine])
@@ -0,0 +1,84 @@
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from dataservice.extensions import db
+from dataservice.api.common.pagination import Pagination
+from dataservice.api.participant.models import Participant
+from dataservice.api.participant.schemas import ParticipantSchema
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.genomic_file.schemas import GenomicFileSchema
+from dataservice.api.common import serializers
+from tests.conftest import ENDPOINTS
+
+pytest_plugins = ['tests.mocks']
+
+
+class TestCompiledSerializers:
+    """
+    Test that compiled serializers and pages of rows dump exactly as
+    marshmallow dumps entities
+    """
+
+    @pytest.mark.parametrize('endpoint', ENDPOINTS)
+    @pytest.mark.parametrize('accept', ['application/json',
+                                        'application/msgpack'])
+    def test_identical(self, client, entities, endpoint, accept):
+        """
+        Test that list pages are identical with and without them, whether
+        they are loaded as rows or entities
+        """
+        config = client.application.config
+        bodies = []
+        for compiled, rows in [(False, False), (True, False), (False, True),
+                               (True, True)]:
+            config.update(COMPILED_SERIALIZERS=compiled, PAGE_ROWS=rows)
+            resp = client.get(endpoint, headers={'Accept': accept})
+            assert resp.status_code == 200
+            bodies.append(resp.data)
+        assert bodies[1:] == bodies[:1] * 3
+        if accept == 'application/json':
+            assert json.loads(bodies[0].decode('utf-8'))['results']
+
+    def test_rows(self, client, entities):
+        """ Test that pages are loaded as rows unless turned off """
+        config = client.application.config
+        after = (datetime.fromtimestamp(0), str(uuid.UUID(int=0)))
+        db.session.expunge_all()
+        schema = ParticipantSchema(many=True)
+        items = schema.page_items(Pagination(Participant.query, after, 10))
+        assert items and not isinstance(items[0], Participant)
+        assert all((i.alias_group and i.alias_group.kf_id) == i.alias_group_id
+                   for i in items)
+        assert not any(isinstance(obj, Participant)
+                       for obj in db.session.identity_map.values())
+
+        # Schemas that dump more than columns get entities
+        schema = GenomicFileSchema(many=True)
+        items = schema.page_items(Pagination(GenomicFile.query, after, 10))
+        assert isinstance(items[0], GenomicFile)
+
+        config['PAGE_ROWS'] = False
+        schema = ParticipantSchema(many=True)
+        items = schema.page_items(Pagination(Participant.query, after, 10))
+        config['PAGE_ROWS'] = True
+        assert isinstance(items[0], Participant)
+
+    def test_fallback(self, client, entities):
+        """ Test that values that can not be copied are dumped by fields """
+        p = Participant.query.first()
+        p.family_id = None
+        p.external_id = 'a b/c'
+        schema = ParticipantSchema(many=True)
+        with client.application.test_request_context():
+            compiled = schema.dump([p]).data
+            client.application.config['COMPILED_SERIALIZERS'] = False
+            expected = ParticipantSchema(many=True).dump([p]).data
+        client.application.config['COMPILED_SERIALIZERS'] = True
+        db.session.rollback()
+        assert compiled == expected
+        assert compiled['results'][0]['_links']['family'] is None
+        assert (type(schema), serializers._dump_keys(schema)) in \
+            serializers._compiled
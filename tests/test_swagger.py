@@ -1,6 +1,12 @@
+import gzip
+import json
+
 import pytest
 
 import dataservice
+from config import TestingConfig
+from dataservice import create_app
+from dataservice.api.docs import resources
 
 
 class TestSwagger:
@@ -59,3 +65,54 @@ class TestSwagger:
             check_field(p[1:], d[p[0]])
 
         check_field(path.split('.'), swagger)
+
+    def test_cached(self, mocker):
+        """ Test that the spec is rendered once and revalidated by ETag """
+        build = mocker.patch('dataservice.api.docs.resources.build_spec',
+                             wraps=resources.build_spec)
+        app = create_app('testing')
+        client = app.test_client()
+        first = client.get('/swagger')
+        second = client.get('/swagger')
+        assert build.call_count == 1
+        assert first.data == second.data
+        assert first.headers['ETag'] == second.headers['ETag']
+
+        resp = client.get('/swagger', headers={
+            'If-None-Match': first.headers['ETag']})
+        assert resp.status_code == 304
+        assert resp.data == b''
+
+        resp = client.get('/swagger', headers={'Accept-Encoding': 'gzip'})
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in resp.headers['Vary']
+        assert resp.headers['ETag'] != first.headers['ETag']
+        assert gzip.decompress(resp.data) == first.data
+
+    def test_build_spec(self, swagger, tmpdir, mocker):
+        """ Test serving a spec written by the build-spec command """
+        path = str(tmpdir.join('swagger.json'))
+        app = create_app('testing')
+        result = app.test_cli_runner().invoke(
+            args=['build-spec', '--output', path])
+        assert result.exit_code == 0, result.output
+        with open(path) as f:
+            assert json.load(f) == swagger
+
+        build = mocker.patch('dataservice.api.docs.resources.build_spec')
+        app = create_app('testing')
+        app.config['SWAGGER_SPEC_PATH'] = path
+        resp = app.test_client().get('/swagger')
+        assert build.call_count == 0
+        with open(path, 'rb') as f:
+            assert resp.data == f.read()
+
+    def test_lazy(self, mocker):
+        """ Test that the spec is created on first use unless configured """
+        app = create_app('testing')
+        assert app.spec is None
+        app.test_client().get('/swagger')
+        assert app.spec is not None
+
+        mocker.patch.object(TestingConfig, 'LAZY_SPEC', False)
+        assert create_app('testing').spec is not None
@@ -0,0 +1,139 @@
+import json
+from datetime import datetime, timedelta
+
+from flask import url_for
+from sqlalchemy import event
+
+from dataservice.extensions import db
+from dataservice.api.study.models import Study
+from dataservice.api.read_group.models import (
+    ReadGroup,
+    ReadGroupGenomicFile
+)
+from dataservice.api.tombstone.models import Tombstone
+from tests.utils import IndexdTestCase, create_study
+
+DELETIONS_URL = 'api.deletions_list'
+
+
+class TombstoneTest(IndexdTestCase):
+    """
+    Test tombstones of deleted entities
+    """
+
+    def test_delete_cascade(self):
+        """
+        Test that entities deleted along with a participant, and orphans
+        deleted in bulk, get tombstones
+        """
+        study, p, bs, gf = create_study(family=True)
+        ph = p.phenotypes[0]
+        kf_ids = {'participant': p.kf_id, 'phenotype': ph.kf_id,
+                  'biospecimen': bs.kf_id, 'family': p.family_id,
+                  'biospecimen_genomic_file':
+                  bs.biospecimen_genomic_files[0].kf_id}
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', count)
+        resp = self.client.delete(url_for('api.participants',
+                                          kf_id=p.kf_id),
+                                  headers=self._api_headers())
+        event.remove(db.engine, 'before_cursor_execute', count)
+        self.assertEqual(resp.status_code, 200)
+        # One insert for the flushed entities and one for the family
+        inserts = [s for s in statements
+                   if s.startswith('INSERT INTO tombstone')]
+        self.assertEqual(len(inserts), 2)
+
+        tombstones = {t.type: t for t in Tombstone.query}
+        self.assertEqual({t: tombstones[t].kf_id for t in tombstones},
+                         kf_ids)
+        # The family was deleted in bulk once it had no participants
+        for table in ['participant', 'phenotype', 'biospecimen',
+                      'biospecimen_genomic_file', 'family']:
+            self.assertEqual(tombstones[table].study_id, study.kf_id)
+
+    def test_delete_genomic_file(self):
+        """
+        Test that the study of a genomic file is found before its links to
+        its biospecimens are deleted
+        """
+        study, p, bs, gf = create_study(family=True)
+        db.session.delete(gf)
+        db.session.commit()
+
+        tombstone = Tombstone.query.filter_by(type='genomic_file').one()
+        self.assertEqual(tombstone.kf_id, gf.kf_id)
+        self.assertEqual(tombstone.study_id, study.kf_id)
+
+    def test_delete_orphan_read_group(self):
+        """
+        Test that a read group deleted in bulk once its last file is
+        deleted gets the study of that file
+        """
+        study, p, bs, gf = create_study(family=True)
+        rg = ReadGroup(lane_number=1)
+        db.session.add(ReadGroupGenomicFile(read_group=rg, genomic_file=gf))
+        db.session.commit()
+        kf_id = rg.kf_id
+        db.session.delete(gf)
+        db.session.commit()
+
+        tombstone = Tombstone.query.filter_by(type='read_group').one()
+        self.assertEqual(tombstone.kf_id, kf_id)
+        self.assertEqual(tombstone.study_id, study.kf_id)
+
+    def test_deletions(self):
+        """
+        Test paging through and filtering deletions
+        """
+        studies = [Study(external_id='phs00{}'.format(i)) for i in range(3)]
+        db.session.add_all(studies)
+        db.session.commit()
+        for study in studies:
+            db.session.delete(study)
+            db.session.commit()
+
+        resp = self._get(url_for(DELETIONS_URL, limit=2))
+        self.assertEqual(resp['total'], 3)
+        self.assertEqual([t['kf_id'] for t in resp['results']],
+                         [s.kf_id for s in studies[:2]])
+        resp = self._get(resp['_links']['next'])
+        self.assertEqual([t['kf_id'] for t in resp['results']],
+                         [studies[2].kf_id])
+        self.assertNotIn('next', resp['_links'])
+
+        resp = self._get(url_for(DELETIONS_URL, study_id=studies[1].kf_id))
+        self.assertEqual([t['kf_id'] for t in resp['results']],
+                         [studies[1].kf_id])
+        resp = self._get(url_for(DELETIONS_URL, type='participant'))
+        self.assertEqual(resp['results'], [])
+
+        # Cursors older than the retention period must re-sync
+        since = datetime.now() - timedelta(days=365)
+        resp = self.client.get(url_for(DELETIONS_URL,
+                                       since=since.isoformat()),
+                               headers=self._api_headers())
+        self.assertEqual(resp.status_code, 410)
+
+    def test_compact(self):
+        """
+        Test removing old tombstones
+        """
+        now = datetime.now()
+        for days in [0, 100, 200]:
+            db.session.add(Tombstone(type='study', kf_id='SD_00000000',
+                                     deleted_at=now - timedelta(days=days)))
+        db.session.commit()
+
+        self.assertEqual(Tombstone.compact(now - timedelta(days=90),
+                                           batch_size=1), 2)
+        self.assertEqual(Tombstone.query.count(), 1)
+
+    def _get(self, url):
+        response = self.client.get(url, headers=self._api_headers())
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data.decode('utf-8'))
@@ -1,6 +1,23 @@
+import json
 import unittest
+import uuid
+
+from flask import url_for
+
 from dataservice import create_app
 from dataservice.extensions import db
+from dataservice.api.study.models import Study
+from dataservice.api.study_file.models import StudyFile
+from dataservice.api.participant.models import Participant
+from dataservice.api.family.models import Family
+from dataservice.api.phenotype.models import Phenotype
+from dataservice.api.biospecimen.models import Biospecimen
+from dataservice.api.genomic_file.models import GenomicFile
+from dataservice.api.sequencing_center.models import SequencingCenter
+from dataservice.api.biospecimen_genomic_file.models import (
+    BiospecimenGenomicFile
+)
+from dataservice.api.task.models import Task, TaskGenomicFile
 
 from tests.mocks import MockIndexd
 from unittest.mock import patch, Mock
@@ -10,7 +27,7 @@ class WithBucketService():
     """ Mocks responses from the bucket service """
 
     def setUpBucketMock(self):
-        mod = 'dataservice.api.study.models.requests'
+        mod = 'dataservice.api.study.jobs.requests'
         self.patch_bucket_service = patch(mod)
         self.bucket_service = self.patch_bucket_service.start()
         
@@ -19,11 +36,11 @@ class WithBucketService():
         mock_resp_post = Mock()
         mock_resp_post.status_code = 201
 
-        self.bucket_service.Session().get.side_effect = mock_resp_get
-        self.bucket_service.Session().post.side_effect = mock_resp_post
+        self.bucket_service.Session().get.return_value = mock_resp_get
+        self.bucket_service.Session().post.return_value = mock_resp_post
 
     def tearDownBucketMock(self):
-        self.bucket_service.stop()
+        self.patch_bucket_service.stop()
 
 
 class FlaskTestCase(unittest.TestCase, WithBucketService):
@@ -64,3 +81,55 @@ class IndexdTestCase(FlaskTestCase):
     def tearDown(self):
         super(IndexdTestCase, self).tearDown()
         self.indexd_patch.stop()
+
+
+def create_study(external_id='phs001', family=False, study_file=False):
+    """
+    Create a study with a participant that has a phenotype and a
+    biospecimen with a genomic file used by a task
+
+    :param external_id: The external_id of the study
+    :param family: Whether the participant belongs to a family
+    :param study_file: Whether the study has a study file
+    :returns: The study, participant, biospecimen and genomic file
+    """
+    study = Study(external_id=external_id)
+    if study_file:
+        study.study_files.append(StudyFile(
+            file_name='study_file', urls=['s3://bucket/study'],
+            hashes={'md5': str(uuid.uuid4())},
+            size=MockIndexd.doc['size']))
+    p = Participant(external_id='P0', is_proband=True)
+    if family:
+        p.family = Family(external_id='F0')
+    study.participants.append(p)
+    p.phenotypes.append(Phenotype(source_text_phenotype='fever'))
+    bs = Biospecimen(external_sample_id='S0', analyte_type='DNA',
+                     participant=p,
+                     sequencing_center=SequencingCenter(
+                         name='Baylor ' + external_id))
+    db.session.add_all([study, bs])
+    db.session.commit()
+    gf = GenomicFile(external_id='gf0', file_name='file_0',
+                     urls=['s3://bucket/key'],
+                     hashes={'md5': str(uuid.uuid4())},
+                     size=MockIndexd.doc['size'])
+    db.session.add(BiospecimenGenomicFile(biospecimen=bs,
+                                          genomic_file=gf))
+    db.session.add(TaskGenomicFile(task=Task(name='align'),
+                                   genomic_file=gf))
+    db.session.commit()
+    return study, p, bs, gf
+
+
+def post_visibility(client, endpoint, kf_id, body):
+    """
+    Post a visibility change and expire the session so that entities are
+    reloaded with their new visibility
+    """
+    resp = client.post(url_for(endpoint, kf_id=kf_id),
+                       headers={'Accept': 'application/json',
+                                'Content-Type': 'application/json'},
+                       data=json.dumps(body))
+    db.session.expire_all()
+    return resp